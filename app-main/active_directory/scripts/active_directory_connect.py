@@ -6,6 +6,8 @@ from urllib.parse import urlparse
 
 from ldap3 import ALL, Connection, Server
 
+from utils.env import get_float_env
+
 # Load .env file
 dotenv_path = '/usr/src/project/.devcontainer/.env'
 load_dotenv(dotenv_path=dotenv_path)
@@ -22,23 +24,6 @@ def _get_clean_env(name: str) -> Optional[str]:
     return stripped or None
 
 
-def _get_float_env(name: str, default: float, *, minimum: float | None = None) -> float:
-    """Return a float from the environment variable with optional clamping."""
-
-    value = os.getenv(name)
-    if value is None:
-        result = default
-    else:
-        try:
-            result = float(value)
-        except (TypeError, ValueError):
-            result = default
-
-    if minimum is not None and result < minimum:
-        return minimum
-    return result
-
-
 def _missing_config_message(missing: list[str]) -> str:
     formatted = ', '.join(sorted(missing))
     return (
@@ -73,64 +58,91 @@ def _parse_server(value: str) -> tuple[str, bool, Optional[int]]:
     return parsed.hostname, use_ssl, port_int
 
 
+def _load_connection_settings() -> Tuple[Optional[dict], str]:
+    """Return server and credential settings or ``None`` with an error message."""
+
+    ad_username = _get_clean_env('ACTIVE_DIRECTORY_USERNAME')
+    ad_password = _get_clean_env('ACTIVE_DIRECTORY_PASSWORD')
+    ad_server_raw = _get_clean_env('ACTIVE_DIRECTORY_SERVER')
+
+    missing_variables = [
+        name
+        for name, value in {
+            'ACTIVE_DIRECTORY_USERNAME': ad_username,
+            'ACTIVE_DIRECTORY_PASSWORD': ad_password,
+            'ACTIVE_DIRECTORY_SERVER': ad_server_raw,
+        }.items()
+        if not value
+    ]
+
+    if missing_variables:
+        return None, _missing_config_message(missing_variables)
+
+    ad_host, use_ssl, ad_port = _parse_server(ad_server_raw)
+    if not ad_host:
+        return None, _missing_config_message(['ACTIVE_DIRECTORY_SERVER'])
+
+    connect_timeout = get_float_env(
+        'ACTIVE_DIRECTORY_CONNECT_TIMEOUT',
+        5.0,
+        minimum=0.1,
+    )
+    receive_timeout = get_float_env(
+        'ACTIVE_DIRECTORY_RECEIVE_TIMEOUT',
+        10.0,
+        minimum=0.1,
+    )
+
+    return {
+        "host": ad_host,
+        "use_ssl": use_ssl,
+        "port": ad_port,
+        "username": ad_username,
+        "password": ad_password,
+        # ldap3 expects integer timeouts; coercing to int avoids socket errors.
+        "connect_timeout": max(1, int(round(connect_timeout))),
+        "receive_timeout": max(1, int(round(receive_timeout))),
+    }, ""
+
+
+def build_server(config: dict) -> Server:
+    """Create the ``ldap3.Server`` described by ``config``."""
+
+    server_kwargs = {
+        "use_ssl": config["use_ssl"],
+        "get_info": ALL,
+        "connect_timeout": config["connect_timeout"],
+    }
+    if config.get("port") is not None:
+        try:
+            server_kwargs["port"] = int(config["port"])
+        except (TypeError, ValueError):
+            pass
+
+    return Server(
+        config["host"],
+        **server_kwargs,
+    )
+
+
+def build_connection(server: Server, config: dict) -> Connection:
+    """Create an unbound ``ldap3.Connection`` for ``server`` using ``config`` credentials."""
+
+    return Connection(
+        server,
+        config["username"],
+        config["password"],
+        receive_timeout=config["receive_timeout"],
+    )
+
+
 def active_directory_connect() -> Tuple[Optional[Connection], str]:
     try:
-        ad_username = _get_clean_env('ACTIVE_DIRECTORY_USERNAME')
-        ad_password = _get_clean_env('ACTIVE_DIRECTORY_PASSWORD')
-        ad_server_raw = _get_clean_env('ACTIVE_DIRECTORY_SERVER')
-
-        missing_variables = [
-            name
-            for name, value in {
-                'ACTIVE_DIRECTORY_USERNAME': ad_username,
-                'ACTIVE_DIRECTORY_PASSWORD': ad_password,
-                'ACTIVE_DIRECTORY_SERVER': ad_server_raw,
-            }.items()
-            if not value
-        ]
-
-        if missing_variables:
-            return None, _missing_config_message(missing_variables)
-
-        ad_host, use_ssl, ad_port = _parse_server(ad_server_raw)
-        if not ad_host:
-            return None, _missing_config_message(['ACTIVE_DIRECTORY_SERVER'])
-
-        connect_timeout = _get_float_env(
-            'ACTIVE_DIRECTORY_CONNECT_TIMEOUT',
-            5.0,
-            minimum=0.1,
-        )
-        receive_timeout = _get_float_env(
-            'ACTIVE_DIRECTORY_RECEIVE_TIMEOUT',
-            10.0,
-            minimum=0.1,
-        )
-        # ldap3 expects integer timeouts; coercing to int avoids socket errors.
-        connect_timeout_int = max(1, int(round(connect_timeout)))
-        receive_timeout_int = max(1, int(round(receive_timeout)))
-
-        server_kwargs = {
-            "use_ssl": use_ssl,
-            "get_info": ALL,
-            "connect_timeout": connect_timeout_int,
-        }
-        if ad_port is not None:
-            try:
-                server_kwargs["port"] = int(ad_port)
-            except (TypeError, ValueError):
-                pass
-
-        server = Server(
-            ad_host,
-            **server_kwargs,
-        )
-        conn = Connection(
-            server,
-            ad_username,
-            ad_password,
-            receive_timeout=receive_timeout_int,
-        )
+        config, message = _load_connection_settings()
+        if config is None:
+            return None, message
+
+        conn = build_connection(build_server(config), config)
 
         # Check if the connection is successful
         if not conn.bind():
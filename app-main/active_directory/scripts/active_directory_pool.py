@@ -0,0 +1,261 @@
+"""Process-wide pool of authenticated Active Directory connections.
+
+Opening a new LDAPS connection costs a TLS handshake, a bind and (with
+``get_info=ALL``) a full schema download. The pool keeps a small number of
+bound connections per worker process and hands them out one caller at a time,
+so repeated lookups during a single request reuse the same socket.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from ldap3 import BASE, NO_ATTRIBUTES, Connection
+from ldap3.core.exceptions import LDAPException
+
+from utils.env import get_float_env, get_int_env
+
+from .active_directory_connect import (
+    _load_connection_settings,
+    build_connection,
+    build_server,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ActiveDirectoryPoolError(Exception):
+    """Raised when the pool cannot provide a bound connection."""
+
+
+class _PooledConnection:
+    __slots__ = ("connection", "created_at", "last_used_at")
+
+    def __init__(self, connection: Connection):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used_at = now
+
+
+class LDAPConnectionPool:
+    """Thread-safe pool of bound ``ldap3`` connections.
+
+    At most ``max_size`` connections exist at any time; callers wait up to
+    ``borrow_timeout`` seconds for one to become available. Idle connections are
+    health checked before reuse and recycled once they exceed ``max_lifetime``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int,
+        borrow_timeout: float,
+        health_check_interval: float,
+        max_lifetime: float,
+        connection_factory: Optional[Callable[[], Connection]] = None,
+    ):
+        self.max_size = max(1, int(max_size))
+        self.borrow_timeout = borrow_timeout
+        self.health_check_interval = health_check_interval
+        self.max_lifetime = max_lifetime
+        self._connection_factory = connection_factory or self._default_connection_factory
+        self._idle: deque[_PooledConnection] = deque()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._lock = threading.Lock()
+        self._server = None
+        self._pid = os.getpid()
+
+    # ------------------------------------------------------------------
+    # Connection lifecycle
+    # ------------------------------------------------------------------
+    def _default_connection_factory(self) -> Connection:
+        config, message = _load_connection_settings()
+        if config is None:
+            raise ActiveDirectoryPoolError(message)
+
+        with self._lock:
+            if self._server is None:
+                self._server = build_server(config)
+            server = self._server
+
+        conn = build_connection(server, config)
+        # The schema is downloaded once into the shared Server object; later
+        # binds skip the round trip.
+        read_server_info = server.schema is None
+        if not conn.bind(read_server_info=read_server_info):
+            raise ActiveDirectoryPoolError("Failed to connect to Active Directory")
+        return conn
+
+    def _open(self) -> _PooledConnection:
+        try:
+            return _PooledConnection(self._connection_factory())
+        except ActiveDirectoryPoolError:
+            raise
+        except Exception as exc:
+            raise ActiveDirectoryPoolError(
+                f"Error connecting to Active Directory: {type(exc).__name__}: {exc}"
+            ) from exc
+
+    @staticmethod
+    def _close(pooled: _PooledConnection) -> None:
+        try:
+            pooled.connection.unbind()
+        except Exception:
+            logger.debug("Ignoring error while closing pooled LDAP connection", exc_info=True)
+
+    def _is_usable(self, pooled: _PooledConnection) -> bool:
+        conn = pooled.connection
+        if getattr(conn, "closed", False) or not getattr(conn, "bound", True):
+            return False
+
+        now = time.monotonic()
+        if self.max_lifetime and now - pooled.created_at >= self.max_lifetime:
+            return False
+
+        if self.health_check_interval and now - pooled.last_used_at >= self.health_check_interval:
+            try:
+                # Cheapest possible round trip: rootDSE, no attributes.
+                return bool(
+                    conn.search(
+                        search_base="",
+                        search_filter="(objectClass=*)",
+                        search_scope=BASE,
+                        attributes=NO_ATTRIBUTES,
+                    )
+                )
+            except LDAPException:
+                return False
+        return True
+
+    def _rebind(self, pooled: _PooledConnection) -> Optional[_PooledConnection]:
+        """Try to re-establish a stale connection in place."""
+
+        conn = pooled.connection
+        try:
+            if not getattr(conn, "closed", True):
+                conn.unbind()
+        except Exception:
+            pass
+
+        try:
+            if conn.bind(read_server_info=False):
+                return _PooledConnection(conn)
+        except Exception:
+            logger.debug("Rebinding pooled LDAP connection failed", exc_info=True)
+        return None
+
+    def _reset_after_fork(self) -> None:
+        # Sockets inherited from a parent process must not be shared.
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        with self._lock:
+            if pid == self._pid:
+                return
+            self._idle.clear()
+            self._slots = threading.BoundedSemaphore(self.max_size)
+            self._server = None
+            self._pid = pid
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def acquire(self) -> _PooledConnection:
+        self._reset_after_fork()
+
+        if not self._slots.acquire(timeout=self.borrow_timeout):
+            raise ActiveDirectoryPoolError(
+                f"Timed out after {self.borrow_timeout}s waiting for an Active Directory connection"
+            )
+
+        try:
+            while True:
+                with self._lock:
+                    pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    return self._open()
+                if self._is_usable(pooled):
+                    return pooled
+                recovered = self._rebind(pooled)
+                if recovered is not None:
+                    return recovered
+                self._close(pooled)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, pooled: _PooledConnection, *, discard: bool = False) -> None:
+        try:
+            if discard or getattr(pooled.connection, "closed", False):
+                self._close(pooled)
+                return
+            pooled.last_used_at = time.monotonic()
+            with self._lock:
+                self._idle.append(pooled)
+        finally:
+            try:
+                self._slots.release()
+            except ValueError:
+                # Slot bookkeeping was reset by a fork while this connection was out.
+                pass
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """Borrow a bound connection; it is discarded if an LDAP error escapes."""
+
+        pooled = self.acquire()
+        discard = False
+        try:
+            yield pooled.connection
+        except LDAPException:
+            discard = True
+            raise
+        finally:
+            self.release(pooled, discard=discard)
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for pooled in idle:
+            self._close(pooled)
+
+    @property
+    def idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+
+_POOL: Optional[LDAPConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_connection_pool() -> LDAPConnectionPool:
+    """Return the process-wide connection pool, creating it on first use."""
+
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = LDAPConnectionPool(
+                    max_size=get_int_env('ACTIVE_DIRECTORY_POOL_SIZE', 4, minimum=1),
+                    borrow_timeout=get_float_env('ACTIVE_DIRECTORY_POOL_TIMEOUT', 10.0, minimum=0.1),
+                    health_check_interval=get_float_env(
+                        'ACTIVE_DIRECTORY_POOL_HEALTH_CHECK_SECONDS', 30.0, minimum=0.0
+                    ),
+                    max_lifetime=get_float_env('ACTIVE_DIRECTORY_POOL_MAX_LIFETIME', 900.0, minimum=0.0),
+                )
+    return _POOL
+
+
+def pooled_connection():
+    """Shortcut for ``get_connection_pool().connection()``."""
+
+    return get_connection_pool().connection()
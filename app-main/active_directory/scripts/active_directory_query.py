@@ -4,8 +4,8 @@ import logging
 import os
 
 from ldap3 import SUBTREE, ALL_ATTRIBUTES
-from .active_directory_connect import active_directory_connect
-from ldap3.core.exceptions import LDAPException
+from .active_directory_pool import ActiveDirectoryPoolError, pooled_connection
+from ldap3.core.exceptions import LDAPCommunicationError, LDAPException
 
 logger = logging.getLogger(__name__)
 
@@ -27,109 +27,130 @@ def serialize_value(value):
     else:
         return value
 
-def active_directory_query(*, base_dn, search_filter, search_attributes=ALL_ATTRIBUTES, limit=None, excluded_attributes=[]):
-    try:
-        conn, message = active_directory_connect()
-
-        # cnvert limit to int
-        if limit is not None:
-            try:
-                limit = int(limit)
-            except ValueError:
-                print('Invalid limit value. Limit must be an integer.')
-                return []
+def _iter_entries(conn, *, base_dn, search_filter, search_attributes, limit, excluded_attributes):
+    """Yield one attribute dict per entry, fetching a single page at a time."""
 
-        if not conn:
-            print('Failed to connect to AD:', message)
-            return []
+    page_size = 500 if limit is None or limit > 500 else limit
+    paged_cookie = None
+    entries_collected = 0
 
-        if not conn.bind():
-            print('Error in bind', conn.result)
-            return []
+    attributes_to_fetch = ALL_ATTRIBUTES if search_attributes is ALL_ATTRIBUTES else search_attributes
 
-        ldap_list = []
-        page_size = 500 if limit is None or limit > 500 else limit
-        paged_cookie = None
-        entries_collected = 0
 
-        attributes_to_fetch = ALL_ATTRIBUTES if search_attributes is ALL_ATTRIBUTES else search_attributes
 
+    search_timed_out = False
 
+    while True:
+        conn.search(
+            search_base=base_dn,
+            search_filter=search_filter,
+            search_scope=SUBTREE,
+            attributes=attributes_to_fetch,
+            paged_size=page_size,
+            paged_cookie=paged_cookie,
+            time_limit=SEARCH_TIME_LIMIT,
+        )
 
-        search_timed_out = False
+        for entry in conn.entries:
+            if limit is not None and entries_collected >= limit:
+                break
 
-        while True:
-            conn.search(
-                search_base=base_dn,
-                search_filter=search_filter,
-                search_scope=SUBTREE,
-                attributes=attributes_to_fetch,
-                paged_size=page_size,
-                paged_cookie=paged_cookie,
-                time_limit=SEARCH_TIME_LIMIT,
-            )
+            attr_dict = {}
+            for attr in entry.entry_attributes_as_dict.keys():
+                if attr in excluded_attributes:
+                    continue  # Skip excluded attributes
+                attr_values = entry.entry_attributes_as_dict.get(attr, [])
+                # serialized_values = [serialize_value(value) for value in attr_values]
+                # attr_dict[attr] = serialized_values
+                attr_dict[attr] = attr_values
 
-            for entry in conn.entries:
-                if limit is not None and entries_collected >= limit:
+            # If search_attributes is not set to ALL_ATTRIBUTES, process only the attributes in search_attributes
+            else:
+                attributes_to_process = search_attributes
+            for attr in attributes_to_process:
+                attr_values = entry.entry_attributes_as_dict.get(attr, [])
+                # Serialize each attribute value
+                # serialized_values = [serialize_value(value) for value in attr_values]
+                attr_dict[attr] = attr_values
+
+            yield attr_dict
+            entries_collected += 1
+
+        if limit is not None and entries_collected >= limit:
+            break
+
+        result_controls = conn.result.get('controls') if isinstance(conn.result, dict) else None
+        if result_controls and '1.2.840.113556.1.4.319' in result_controls:
+            paged_cookie = result_controls['1.2.840.113556.1.4.319']['value']['cookie']
+            if not paged_cookie:
+                break
+        else:
+            if isinstance(conn.result, dict):
+                description = conn.result.get('description')
+                if description == 'timeLimitExceeded':
+                    search_timed_out = True
                     break
+                if description and description != 'success':
+                    logger.warning(
+                        'Active Directory query returned description=%s for base_dn=%s filter=%s',
+                        description,
+                        base_dn,
+                        search_filter,
+                    )
+            else:
+                print('Paged search control not found in server response.')
+            break
 
-                attr_dict = {}
-                for attr in entry.entry_attributes_as_dict.keys():
-                    if attr in excluded_attributes:
-                        continue  # Skip excluded attributes
-                    attr_values = entry.entry_attributes_as_dict.get(attr, [])
-                    # serialized_values = [serialize_value(value) for value in attr_values]
-                    # attr_dict[attr] = serialized_values
-                    attr_dict[attr] = attr_values
-
-                # If search_attributes is not set to ALL_ATTRIBUTES, process only the attributes in search_attributes
-                else:
-                    attributes_to_process = search_attributes
-                for attr in attributes_to_process:
-                    attr_values = entry.entry_attributes_as_dict.get(attr, [])
-                    # Serialize each attribute value
-                    # serialized_values = [serialize_value(value) for value in attr_values]
-                    attr_dict[attr] = attr_values
-
-                ldap_list.append(attr_dict)
-                entries_collected += 1
+    if search_timed_out:
+        logger.warning(
+            'Active Directory query time limit (%ss) exceeded for base_dn=%s filter=%s',
+            SEARCH_TIME_LIMIT,
+            base_dn,
+            search_filter,
+        )
 
-            if limit is not None and entries_collected >= limit:
-                break
 
-            result_controls = conn.result.get('controls') if isinstance(conn.result, dict) else None
-            if result_controls and '1.2.840.113556.1.4.319' in result_controls:
-                paged_cookie = result_controls['1.2.840.113556.1.4.319']['value']['cookie']
-                if not paged_cookie:
-                    break
-            else:
-                if isinstance(conn.result, dict):
-                    description = conn.result.get('description')
-                    if description == 'timeLimitExceeded':
-                        search_timed_out = True
-                        break
-                    if description and description != 'success':
-                        logger.warning(
-                            'Active Directory query returned description=%s for base_dn=%s filter=%s',
-                            description,
-                            base_dn,
-                            search_filter,
-                        )
-                else:
-                    print('Paged search control not found in server response.')
-                break
+def _collect_entries(conn, **search_kwargs):
+    return list(_iter_entries(conn, **search_kwargs))
 
-        conn.unbind()
-        if search_timed_out:
-            logger.warning(
-                'Active Directory query time limit (%ss) exceeded for base_dn=%s filter=%s',
-                SEARCH_TIME_LIMIT,
-                base_dn,
-                search_filter,
-            )
-        return ldap_list
 
+def _coerce_limit(limit):
+    # cnvert limit to int
+    if limit is None:
+        return None
+    return int(limit)
 
+
+def active_directory_query(*, base_dn, search_filter, search_attributes=ALL_ATTRIBUTES, limit=None, excluded_attributes=[]):
+    try:
+        try:
+            limit = _coerce_limit(limit)
+        except ValueError:
+            print('Invalid limit value. Limit must be an integer.')
+            return []
+
+        search_kwargs = {
+            'base_dn': base_dn,
+            'search_filter': search_filter,
+            'search_attributes': search_attributes,
+            'limit': limit,
+            'excluded_attributes': excluded_attributes,
+        }
+
+        # A pooled connection may have been dropped by the server while idle;
+        # retry once on a fresh connection before giving up.
+        for attempt in range(2):
+            try:
+                with pooled_connection() as conn:
+                    return _collect_entries(conn, **search_kwargs)
+            except LDAPCommunicationError as error:
+                if attempt:
+                    raise
+                logger.info('Retrying Active Directory query after connection error: %s', error)
+
+    except ActiveDirectoryPoolError as error:
+        print('Failed to connect to AD:', error)
+        return []
     except LDAPException as error:
         print(f"An error occurred during the LDAP operation: {error}")
         return []
@@ -138,6 +159,60 @@ def active_directory_query(*, base_dn, search_filter, search_attributes=ALL_ATTR
         return []
 
 
+def iter_active_directory_query(*, base_dn, search_filter, search_attributes=ALL_ATTRIBUTES, limit=None, excluded_attributes=[], raise_errors=False):
+    """Stream entries for the query one LDAP page at a time.
+
+    Accepts the same arguments as :func:`active_directory_query` but only holds a
+    single page in memory. The pooled connection stays borrowed until the
+    generator is exhausted or closed. Errors end the stream early and are logged;
+    with ``raise_errors`` they are re-raised so the caller can tell a failed
+    stream from a complete one.
+    """
+
+    try:
+        limit = _coerce_limit(limit)
+    except ValueError:
+        logger.warning('Invalid limit value %r for Active Directory query', limit)
+        return
+
+    search_kwargs = {
+        'base_dn': base_dn,
+        'search_filter': search_filter,
+        'search_attributes': search_attributes,
+        'limit': limit,
+        'excluded_attributes': excluded_attributes,
+    }
+
+    yielded = False
+    try:
+        for attempt in range(2):
+            try:
+                with pooled_connection() as conn:
+                    for entry in _iter_entries(conn, **search_kwargs):
+                        yielded = True
+                        yield entry
+                return
+            except LDAPCommunicationError as error:
+                # Entries already sent cannot be replayed, so only retry
+                # failures that happen before the first page arrives.
+                if attempt or yielded:
+                    raise
+                logger.info('Retrying Active Directory query after connection error: %s', error)
+    except ActiveDirectoryPoolError as error:
+        logger.warning('Failed to connect to AD: %s', error)
+        if raise_errors:
+            raise
+    except LDAPException as error:
+        logger.warning(
+            'LDAP error while streaming query base_dn=%s filter=%s: %s',
+            base_dn,
+            search_filter,
+            error,
+        )
+        if raise_errors:
+            raise
+
+
 
 
 def run():
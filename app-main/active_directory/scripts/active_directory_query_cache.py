@@ -0,0 +1,175 @@
+"""In-process TTL cache for repeated Active Directory lookups.
+
+Only queries that opt in (via ``execute_active_directory_query(cache_profile=...)``)
+are cached. Identical concurrent misses are coalesced so a burst of requests for
+the same principal results in a single LDAP round trip.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable, Hashable, Optional
+
+from ldap3 import ALL_ATTRIBUTES
+
+_WHITESPACE_BETWEEN_PARENS = re.compile(r"\)\s+\(")
+
+
+def normalize_filter(search_filter: str | None) -> str:
+    """Return a canonical form of an LDAP filter for cache keys.
+
+    Active Directory matches the attributes we cache on (UPN, sAMAccountName,
+    DNs) case-insensitively, so case and insignificant whitespace are folded.
+    """
+
+    if not search_filter:
+        return ""
+    return _WHITESPACE_BETWEEN_PARENS.sub(")(", search_filter.strip()).lower()
+
+
+def _normalize_attributes(attributes) -> Hashable:
+    if attributes is None or attributes is ALL_ATTRIBUTES or attributes == ALL_ATTRIBUTES:
+        return ALL_ATTRIBUTES
+    if isinstance(attributes, str):
+        attributes = [attributes]
+    return tuple(sorted({str(attr).strip().lower() for attr in attributes if attr}))
+
+
+def build_cache_key(*, base_dn, search_filter, search_attributes, limit, excluded_attributes) -> tuple:
+    return (
+        (base_dn or "").strip().lower(),
+        normalize_filter(search_filter),
+        _normalize_attributes(search_attributes),
+        limit,
+        _normalize_attributes(excluded_attributes or ()),
+    )
+
+
+def _copy_entries(entries):
+    # Callers occasionally mutate the returned dicts; never hand out the cached objects.
+    return [
+        {key: list(value) if isinstance(value, list) else value for key, value in entry.items()}
+        for entry in entries
+    ]
+
+
+class _InFlight:
+    __slots__ = ("event", "result", "failed")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.failed = False
+
+
+class QueryResultCache:
+    """Bounded LRU cache with per-entry expiry and single-flight loading."""
+
+    def __init__(self, *, max_entries: int, negative_ttl: float, wait_timeout: float = 30.0):
+        self.max_entries = max(0, int(max_entries))
+        self.negative_ttl = max(0.0, float(negative_ttl))
+        self.wait_timeout = wait_timeout
+        self._entries: OrderedDict[tuple, tuple[float, list]] = OrderedDict()
+        self._in_flight: dict[tuple, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+        )
+
+    def get_or_load(self, key: tuple, loader: Callable[[], list], *, ttl: float, profile: str = "default") -> list:
+        if ttl <= 0 or self.max_entries == 0:
+            return loader()
+
+        with self._lock:
+            cached = self._entries.get(key)
+            now = time.monotonic()
+            if cached is not None:
+                expires_at, value = cached
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats[profile]["hits"] += 1
+                    return _copy_entries(value)
+                del self._entries[key]
+
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                self._in_flight[key] = flight
+                self._stats[profile]["misses"] += 1
+            else:
+                self._stats[profile]["coalesced"] += 1
+
+        if not leader:
+            if flight.event.wait(self.wait_timeout) and not flight.failed:
+                return _copy_entries(flight.result)
+            return loader()
+
+        try:
+            result = loader()
+        except BaseException:
+            flight.failed = True
+            raise
+        else:
+            flight.result = result
+            self._store(key, result, ttl=ttl, profile=profile)
+            return _copy_entries(result)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.event.set()
+
+    def _store(self, key: tuple, result, *, ttl: float, profile: str) -> None:
+        if result is None:
+            return
+        # Empty results are also what the query layer returns on transient
+        # errors, so they are only remembered briefly.
+        effective_ttl = ttl if result else min(ttl, self.negative_ttl)
+        if effective_ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + effective_ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats[profile]["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "profiles": {name: dict(counters) for name, counters in self._stats.items()},
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+_CACHE: Optional[QueryResultCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_query_cache() -> QueryResultCache:
+    """Return the process-wide query cache configured from Django settings."""
+
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                from django.conf import settings
+
+                _CACHE = QueryResultCache(
+                    max_entries=getattr(settings, 'ACTIVE_DIRECTORY_QUERY_CACHE_MAX_ENTRIES', 2048),
+                    negative_ttl=getattr(settings, 'ACTIVE_DIRECTORY_QUERY_CACHE_NEGATIVE_TTL', 15.0),
+                )
+    return _CACHE
@@ -1,14 +1,101 @@
 from .scripts.active_directory_get_inactive_computers import get_inactive_computers as _get_inactive_computers
-from .scripts.active_directory_query import active_directory_query
+from .scripts.active_directory_query import active_directory_query, iter_active_directory_query
 from .scripts.active_directory_query_assistant import active_directory_query_assistant
+from .scripts.active_directory_query_cache import build_cache_key, get_query_cache
+from django.conf import settings
 from ldap3 import SUBTREE, ALL_ATTRIBUTES
+from ldap3.utils.conv import escape_filter_chars
 
 def get_inactive_computers(days=30, base_dn='DC=win,DC=dtu,DC=dk'):
     return _get_inactive_computers(days=days, base_dn=base_dn)
     
 
-def execute_active_directory_query(*, base_dn, search_filter, search_attributes=ALL_ATTRIBUTES, limit=None, excluded_attributes=[]):
-    return active_directory_query(base_dn=base_dn, search_filter=search_filter, search_attributes=search_attributes, limit=limit, excluded_attributes=excluded_attributes)
+def execute_active_directory_query(*, base_dn, search_filter, search_attributes=ALL_ATTRIBUTES, limit=None, excluded_attributes=[], cache_profile=None, cache_ttl=None):
+    """Run an LDAP query, optionally through the in-process result cache.
+
+    Caching is opt-in: pass ``cache_profile`` to use the TTL configured in
+    ``ACTIVE_DIRECTORY_QUERY_CACHE_TTLS`` (hit/miss counters are tracked per
+    profile), or ``cache_ttl`` to override it for this call.
+    """
+
+    def _load():
+        return active_directory_query(base_dn=base_dn, search_filter=search_filter, search_attributes=search_attributes, limit=limit, excluded_attributes=excluded_attributes)
+
+    if cache_profile is None and cache_ttl is None:
+        return _load()
+
+    if cache_ttl is None:
+        cache_ttl = getattr(settings, 'ACTIVE_DIRECTORY_QUERY_CACHE_TTLS', {}).get(cache_profile, 0)
+
+    key = build_cache_key(
+        base_dn=base_dn,
+        search_filter=search_filter,
+        search_attributes=search_attributes,
+        limit=limit,
+        excluded_attributes=excluded_attributes,
+    )
+    return get_query_cache().get_or_load(key, _load, ttl=cache_ttl, profile=cache_profile or 'default')
+
+
+def get_active_directory_query_cache_stats():
+    """Return size and per-profile hit/miss counters for this worker's query cache."""
+
+    return get_query_cache().stats()
+
+
+def clear_active_directory_query_cache():
+    get_query_cache().clear()
+
+
+def execute_active_directory_query_iter(*, base_dn, search_filter, search_attributes=ALL_ATTRIBUTES, limit=None, excluded_attributes=[], raise_errors=False):
+    return iter_active_directory_query(base_dn=base_dn, search_filter=search_filter, search_attributes=search_attributes, limit=limit, excluded_attributes=excluded_attributes, raise_errors=raise_errors)
+
+
+def _first_value(value):
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else ""
+    return str(value or "").strip()
+
+
+def list_ou_computers(base_dn):
+    """Return ``name``/``dNSHostName``/``distinguishedName`` for every computer under ``base_dn``."""
+
+    entries = execute_active_directory_query_iter(
+        base_dn=base_dn,
+        search_filter="(objectCategory=computer)",
+        search_attributes=["name", "dNSHostName", "distinguishedName"],
+    )
+    return [
+        {attribute: _first_value(entry.get(attribute)) for attribute in ("name", "dNSHostName", "distinguishedName")}
+        for entry in entries
+    ]
+
+
+def resolve_computer_dns(dns_host_names, *, attribute="dNSHostName"):
+    """Map lower-cased ``dNSHostName`` values to distinguishedNames; unknown hosts are omitted.
+
+    Pass ``attribute="name"`` to resolve NetBIOS computer names instead.
+    """
+
+    chunk_size = max(1, int(getattr(settings, "AD_BULK_RESOLVE_CHUNK_SIZE", 100)))
+    names = sorted({str(name).strip().lower() for name in dns_host_names if name and str(name).strip()})
+    base_dn = getattr(settings, "AD_OU_SCOPE_SEARCH_BASE", "DC=win,DC=dtu,DC=dk")
+    resolved = {}
+    for start in range(0, len(names), chunk_size):
+        chunk = names[start:start + chunk_size]
+        clauses = "".join(f"({attribute}={escape_filter_chars(name)})" for name in chunk)
+        results = execute_active_directory_query(
+            base_dn=base_dn,
+            search_filter=f"(&(objectCategory=computer)(|{clauses}))",
+            search_attributes=[attribute, "distinguishedName"],
+            limit=len(chunk),
+        )
+        for entry in results or ():
+            name = _first_value(entry.get(attribute)).lower()
+            dn = _first_value(entry.get("distinguishedName"))
+            if name and dn:
+                resolved[name] = dn
+    return resolved
 
 
 def execute_active_directory_query_assistant(*, user_prompt):
@@ -0,0 +1,150 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+from ldap3.core.exceptions import LDAPSocketReceiveError
+
+from active_directory.scripts import active_directory_query as query_module
+from active_directory.scripts.active_directory_pool import (
+    ActiveDirectoryPoolError,
+    LDAPConnectionPool,
+)
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.bound = True
+        self.unbind_calls = 0
+
+    def unbind(self):
+        self.unbind_calls += 1
+        self.closed = True
+        self.bound = False
+
+    def bind(self, read_server_info=True):
+        self.closed = False
+        self.bound = True
+        return True
+
+
+def _make_pool(factory, **overrides):
+    options = {
+        "max_size": 2,
+        "borrow_timeout": 0.05,
+        "health_check_interval": 0,
+        "max_lifetime": 0,
+        "connection_factory": factory,
+    }
+    options.update(overrides)
+    return LDAPConnectionPool(**options)
+
+
+class LDAPConnectionPoolTests(SimpleTestCase):
+    def test_connections_are_reused(self):
+        factory = mock.Mock(side_effect=_FakeConnection)
+        pool = _make_pool(factory)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(factory.call_count, 1)
+
+    def test_borrow_times_out_when_pool_exhausted(self):
+        pool = _make_pool(_FakeConnection, max_size=1)
+
+        held = pool.acquire()
+        with self.assertRaises(ActiveDirectoryPoolError):
+            pool.acquire()
+        pool.release(held)
+
+        with pool.connection():
+            pass
+
+    def test_connection_discarded_after_ldap_error(self):
+        factory = mock.Mock(side_effect=_FakeConnection)
+        pool = _make_pool(factory)
+
+        with self.assertRaises(LDAPSocketReceiveError):
+            with pool.connection() as conn:
+                raise LDAPSocketReceiveError("connection reset")
+
+        self.assertEqual(conn.unbind_calls, 1)
+        self.assertEqual(pool.idle_count, 0)
+
+    def test_stale_connection_is_rebound(self):
+        factory = mock.Mock(side_effect=_FakeConnection)
+        pool = _make_pool(factory)
+
+        with pool.connection() as conn:
+            pass
+        conn.bound = False
+
+        with pool.connection() as reused:
+            self.assertTrue(reused.bound)
+
+        self.assertIs(conn, reused)
+        self.assertEqual(factory.call_count, 1)
+
+
+class ActiveDirectoryQueryPoolUsageTests(SimpleTestCase):
+    def test_query_retries_once_on_communication_error(self):
+        pool = _make_pool(_FakeConnection)
+        collected = [{"distinguishedName": ["CN=user,DC=win,DC=dtu,DC=dk"]}]
+
+        with mock.patch.object(
+            query_module, "pooled_connection", side_effect=pool.connection
+        ), mock.patch.object(
+            query_module,
+            "_collect_entries",
+            side_effect=[LDAPSocketReceiveError("reset"), collected],
+        ) as collect:
+            result = query_module.active_directory_query(
+                base_dn="DC=win,DC=dtu,DC=dk",
+                search_filter="(objectClass=user)",
+            )
+
+        self.assertEqual(result, collected)
+        self.assertEqual(collect.call_count, 2)
+
+    def test_stream_does_not_retry_after_entries_were_yielded(self):
+        pool = _make_pool(_FakeConnection)
+
+        def _entries(conn, **kwargs):
+            yield {"cn": ["first"]}
+            raise LDAPSocketReceiveError("reset")
+
+        with mock.patch.object(
+            query_module, "pooled_connection", side_effect=pool.connection
+        ), mock.patch.object(query_module, "_iter_entries", side_effect=_entries) as iter_entries:
+            result = list(
+                query_module.iter_active_directory_query(
+                    base_dn="DC=win,DC=dtu,DC=dk",
+                    search_filter="(objectClass=user)",
+                )
+            )
+
+        self.assertEqual(result, [{"cn": ["first"]}])
+        self.assertEqual(iter_entries.call_count, 1)
+        self.assertEqual(pool.idle_count, 0)
+
+    def test_stream_reraises_errors_when_asked(self):
+        pool = _make_pool(_FakeConnection)
+
+        def _entries(conn, **kwargs):
+            yield {"cn": ["first"]}
+            raise LDAPSocketReceiveError("reset")
+
+        with mock.patch.object(
+            query_module, "pooled_connection", side_effect=pool.connection
+        ), mock.patch.object(query_module, "_iter_entries", side_effect=_entries):
+            stream = query_module.iter_active_directory_query(
+                base_dn="DC=win,DC=dtu,DC=dk",
+                search_filter="(objectClass=user)",
+                raise_errors=True,
+            )
+            self.assertEqual(next(stream), {"cn": ["first"]})
+            with self.assertRaises(LDAPSocketReceiveError):
+                next(stream)
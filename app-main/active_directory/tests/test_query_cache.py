@@ -0,0 +1,110 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from active_directory import services
+from active_directory.scripts.active_directory_query_cache import (
+    QueryResultCache,
+    build_cache_key,
+)
+
+
+def _key(search_filter="(userPrincipalName=alice@dtu.dk)", attributes=("userPrincipalName",)):
+    return build_cache_key(
+        base_dn="DC=win,DC=dtu,DC=dk",
+        search_filter=search_filter,
+        search_attributes=list(attributes),
+        limit=None,
+        excluded_attributes=[],
+    )
+
+
+class QueryResultCacheTests(SimpleTestCase):
+    def test_equivalent_filters_share_a_key(self):
+        self.assertEqual(
+            _key("(&(objectClass=user) (userPrincipalName=Alice@DTU.dk))", ("mail", "cn")),
+            _key("(&(objectclass=user)(userprincipalname=alice@dtu.dk))", ("cn", "mail")),
+        )
+
+    def test_hits_are_served_without_reloading(self):
+        cache = QueryResultCache(max_entries=10, negative_ttl=0)
+        loader = mock.Mock(return_value=[{"cn": ["alice"]}])
+
+        first = cache.get_or_load(_key(), loader, ttl=60, profile="upn_probe")
+        first[0]["cn"].append("mutated")
+        second = cache.get_or_load(_key(), loader, ttl=60, profile="upn_probe")
+
+        self.assertEqual(second, [{"cn": ["alice"]}])
+        self.assertEqual(loader.call_count, 1)
+        self.assertEqual(cache.stats()["profiles"]["upn_probe"]["hits"], 1)
+        self.assertEqual(cache.stats()["profiles"]["upn_probe"]["misses"], 1)
+
+    def test_size_bound_evicts_least_recently_used(self):
+        cache = QueryResultCache(max_entries=2, negative_ttl=0)
+        for name in ("a", "b", "c"):
+            cache.get_or_load(_key(f"(cn={name})"), lambda: [{"cn": [name]}], ttl=60)
+
+        stats = cache.stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["profiles"]["default"]["evictions"], 1)
+
+    def test_empty_results_use_negative_ttl(self):
+        cache = QueryResultCache(max_entries=10, negative_ttl=0)
+        loader = mock.Mock(return_value=[])
+
+        cache.get_or_load(_key(), loader, ttl=60)
+        cache.get_or_load(_key(), loader, ttl=60)
+
+        self.assertEqual(loader.call_count, 2)
+
+    def test_concurrent_misses_are_coalesced(self):
+        cache = QueryResultCache(max_entries=10, negative_ttl=0)
+        release = threading.Event()
+        calls = []
+
+        def _loader():
+            calls.append(1)
+            release.wait(5)
+            return [{"cn": ["alice"]}]
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load(_key(), _loader, ttl=60)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        while cache.stats()["profiles"].get("default", {}).get("coalesced", 0) < 4:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[{"cn": ["alice"]}]] * 5)
+
+
+class ExecuteActiveDirectoryQueryCacheTests(SimpleTestCase):
+    def setUp(self):
+        services.clear_active_directory_query_cache()
+        self.addCleanup(services.clear_active_directory_query_cache)
+
+    def test_uncached_by_default(self):
+        with mock.patch.object(services, "active_directory_query", return_value=[{"cn": ["a"]}]) as query:
+            services.execute_active_directory_query(base_dn="DC=win,DC=dtu,DC=dk", search_filter="(cn=a)")
+            services.execute_active_directory_query(base_dn="DC=win,DC=dtu,DC=dk", search_filter="(cn=a)")
+
+        self.assertEqual(query.call_count, 2)
+
+    @override_settings(ACTIVE_DIRECTORY_QUERY_CACHE_TTLS={"upn_probe": 60})
+    def test_cache_profile_enables_caching(self):
+        with mock.patch.object(services, "active_directory_query", return_value=[{"cn": ["a"]}]) as query:
+            for _ in range(3):
+                services.execute_active_directory_query(
+                    base_dn="DC=win,DC=dtu,DC=dk",
+                    search_filter="(cn=a)",
+                    cache_profile="upn_probe",
+                )
+
+        self.assertEqual(query.call_count, 1)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import datetime
+import json
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from ldap3.core.exceptions import LDAPSocketReceiveError
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from active_directory.views import ActiveDirectoryQueryView
+
+
+class ActiveDirectoryQueryViewTests(TestCase):
+    def setUp(self) -> None:
+        self.factory = APIRequestFactory()
+        self.user = get_user_model().objects.create_user(username="tester", password="pass")
+
+    def _get(self, params: dict):
+        request = self.factory.get("/active-directory/v1.0/query", params)
+        force_authenticate(request, user=self.user)
+        return ActiveDirectoryQueryView.as_view()(request)
+
+    def test_ndjson_stream_writes_one_line_per_entry(self) -> None:
+        entries = iter(
+            [
+                {"cn": ["alice"], "whenCreated": [datetime.datetime(2024, 1, 2, 3, 4, 5)]},
+                {"cn": ["bob"], "objectSid": [b"\x01\x02"]},
+            ]
+        )
+
+        with patch(
+            "active_directory.views.execute_active_directory_query_iter", return_value=entries
+        ) as mock_iter, patch("active_directory.views.execute_active_directory_query") as mock_query:
+            response = self._get(
+                {"base_dn": "DC=win,DC=dtu,DC=dk", "search_filter": "(cn=*)", "stream": "ndjson"}
+            )
+            body = b"".join(response.streaming_content).decode("utf-8")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        mock_query.assert_not_called()
+        mock_iter.assert_called_once()
+
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(
+            lines,
+            [
+                {"cn": ["alice"], "whenCreated": ["2024-01-02T03:04:05"]},
+                {"cn": ["bob"], "objectSid": ["AQI="]},
+            ],
+        )
+
+    def test_ndjson_stream_ends_with_an_error_line_when_ldap_fails(self) -> None:
+        def entries():
+            yield {"cn": ["alice"]}
+            raise LDAPSocketReceiveError("reset")
+
+        with patch(
+            "active_directory.views.execute_active_directory_query_iter", return_value=entries()
+        ) as mock_iter:
+            response = self._get({"search_filter": "(cn=*)", "stream": "ndjson"})
+            body = b"".join(response.streaming_content).decode("utf-8")
+
+        self.assertTrue(mock_iter.call_args.kwargs["raise_errors"])
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(lines[0], {"cn": ["alice"]})
+        self.assertEqual(lines[-1]["status"], "error")
+        self.assertEqual(len(lines), 2)
+
+    def test_unknown_stream_format_is_rejected(self) -> None:
+        with patch("active_directory.views.execute_active_directory_query_iter") as mock_iter:
+            response = self._get({"stream": "csv"})
+
+        self.assertEqual(response.status_code, 400)
+        mock_iter.assert_not_called()
+
+    def test_default_response_is_buffered_json(self) -> None:
+        with patch(
+            "active_directory.views.execute_active_directory_query",
+            return_value=[{"cn": ["alice"]}],
+        ):
+            response = self._get({"search_filter": "(cn=alice)"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [{"cn": ["alice"]}])
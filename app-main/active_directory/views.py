@@ -4,20 +4,26 @@ from __future__ import annotations
 
 import base64
 import datetime
-from typing import Iterable, List, Optional
+from typing import Iterable, Iterator, List, Optional
+
+from django.http import StreamingHttpResponse
 
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from ldap3 import ALL_ATTRIBUTES
+from ldap3.core.exceptions import LDAPException
 from rest_framework import status
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
 from utils.api import SecuredAPIView
 
+from .scripts.active_directory_pool import ActiveDirectoryPoolError
 from .services import (
     execute_active_directory_query,
     execute_active_directory_query_assistant,
+    execute_active_directory_query_iter,
 )
 
 
@@ -123,6 +129,15 @@ class ActiveDirectoryQueryView(SecuredAPIView):
         default="thumbnailPhoto",
     )
 
+    stream_param = openapi.Parameter(
+        "stream",
+        in_=openapi.IN_QUERY,
+        description="Set to 'ndjson' to stream one JSON object per line as LDAP pages arrive.",
+        type=openapi.TYPE_STRING,
+        required=False,
+        enum=["ndjson"],
+    )
+
     @staticmethod
     def _serialize_value(value):
         if isinstance(value, datetime.datetime):
@@ -135,12 +150,25 @@ class ActiveDirectoryQueryView(SecuredAPIView):
     def _serialize_results(cls, results: Iterable[dict]) -> List[dict]:
         serialised = []
         for entry in results:
-            serialised_entry = {}
-            for key, values in entry.items():
-                serialised_entry[key] = [cls._serialize_value(value) for value in values]
-            serialised.append(serialised_entry)
+            serialised.append(cls._serialize_entry(entry))
         return serialised
 
+    @classmethod
+    def _serialize_entry(cls, entry: dict) -> dict:
+        return {key: [cls._serialize_value(value) for value in values] for key, values in entry.items()}
+
+    @classmethod
+    def _stream_ndjson(cls, results: Iterable[dict]) -> Iterator[bytes]:
+        encoder = JSONEncoder(ensure_ascii=False)
+        try:
+            for entry in results:
+                yield (encoder.encode(cls._serialize_entry(entry)) + "\n").encode("utf-8")
+        except (ActiveDirectoryPoolError, LDAPException):
+            # The 200 status is already on the wire, so a final line is the
+            # only way to tell the client the result set is incomplete.
+            error = {"status": "error", "error": "The Active Directory query failed before all entries were sent."}
+            yield (encoder.encode(error) + "\n").encode("utf-8")
+
     @swagger_auto_schema(
         manual_parameters=[
             base_dn_param,
@@ -148,6 +176,7 @@ class ActiveDirectoryQueryView(SecuredAPIView):
             search_attributes_param,
             limit_param,
             excluded_attributes_param,
+            stream_param,
         ],
         operation_description="""
 **Active Directory Query Endpoint**
@@ -161,6 +190,7 @@ The synergy between the parameters allows for tailored queries:
 - **`search_attributes`**: Controls which attributes of the objects are retrieved.
 - **`limit`**: Provides pagination capability.
 - **`excluded_attributes`**: Refines the returned data by excluding specified attributes, enhancing query efficiency and relevance.
+- **`stream`**: Use `ndjson` for large result sets. Each entry is written as one JSON line (`application/x-ndjson`) as soon as its LDAP page arrives instead of buffering the whole result. If the query fails part-way the last line is `{"status": "error", "error": "..."}`.
 """,
         responses={200: "Successful response with the queried data"},
     )
@@ -170,6 +200,13 @@ The synergy between the parameters allows for tailored queries:
         search_attributes = request.query_params.get("search_attributes", ALL_ATTRIBUTES)
         limit = request.query_params.get("limit")
         excluded_attributes = request.query_params.get("excluded_attributes", "thumbnailPhoto")
+        stream = request.query_params.get("stream")
+
+        if stream not in {None, "", "ndjson"}:
+            return Response(
+                {"error": "Unsupported stream format. Use 'ndjson'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         if limit is not None:
             try:
@@ -186,13 +223,23 @@ The synergy between the parameters allows for tailored queries:
 
         excluded_attribute_list = [item.strip() for item in excluded_attributes.split(",") if item.strip()]
 
-        results = execute_active_directory_query(
-            base_dn=base_dn,
-            search_filter=search_filter,
-            search_attributes=attribute_list,
-            limit=limit_value,
-            excluded_attributes=excluded_attribute_list,
-        )
+        query_kwargs = {
+            "base_dn": base_dn,
+            "search_filter": search_filter,
+            "search_attributes": attribute_list,
+            "limit": limit_value,
+            "excluded_attributes": excluded_attribute_list,
+        }
+
+        if stream == "ndjson":
+            response = StreamingHttpResponse(
+                self._stream_ndjson(execute_active_directory_query_iter(**query_kwargs, raise_errors=True)),
+                content_type="application/x-ndjson",
+            )
+            response["X-Accel-Buffering"] = "no"
+            return response
+
+        results = execute_active_directory_query(**query_kwargs)
 
         serialised_results = self._serialize_results(results)
         return Response(serialised_results)
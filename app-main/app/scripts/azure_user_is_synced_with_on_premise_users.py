@@ -18,7 +18,12 @@ def azure_user_is_synced_with_on_premise_users(sam_accountname: str, on_premises
     base_dn = "DC=win,DC=dtu,DC=dk"
     search_filter = f"(sAMAccountName={sam_accountname})"
     search_attributes = ['mS-DS-ConsistencyGuid']
-    active_directory_response = execute_active_directory_query(base_dn=base_dn, search_filter=search_filter, search_attributes=search_attributes)
+    active_directory_response = execute_active_directory_query(
+        base_dn=base_dn,
+        search_filter=search_filter,
+        search_attributes=search_attributes,
+        cache_profile='consistency_guid',
+    )
 
     try:
         ms_ds_consistency_guid = convert_to_base64(active_directory_response[0]['mS-DS-ConsistencyGuid'][0])
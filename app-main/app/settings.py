@@ -147,6 +147,24 @@ try:
 except ValueError:
     AD_GROUP_CACHE_TIMEOUT = 15 * 60
 
+# Cached access control decisions (per user and endpoint template); invalidated
+# by signals whenever endpoints, group memberships or limiters change.
+AUTHZ_DECISION_CACHE_TIMEOUT = int(
+    _as_float(os.getenv('AUTHZ_DECISION_CACHE_TIMEOUT'), AD_GROUP_CACHE_TIMEOUT, minimum=0)
+)
+
+# Buffered audit logging: APIRequestLog / UserActivityLog API rows are queued
+# and written with bulk_create by a background thread. Overflow policy is one
+# of "sync" (write inline), "block" (wait, then write inline) or "drop".
+# The test runner (utils/test_runner.py) writes inline.
+AUDIT_LOG_ASYNC = _as_bool(os.getenv('AUDIT_LOG_ASYNC'), True)
+AUDIT_LOG_QUEUE_SIZE = int(_as_float(os.getenv('AUDIT_LOG_QUEUE_SIZE'), 10000, minimum=1))
+AUDIT_LOG_BATCH_SIZE = int(_as_float(os.getenv('AUDIT_LOG_BATCH_SIZE'), 200, minimum=1))
+AUDIT_LOG_FLUSH_INTERVAL = _as_float(os.getenv('AUDIT_LOG_FLUSH_INTERVAL'), 1.0, minimum=0.05)
+AUDIT_LOG_ENQUEUE_TIMEOUT = _as_float(os.getenv('AUDIT_LOG_ENQUEUE_TIMEOUT'), 0.5, minimum=0)
+AUDIT_LOG_OVERFLOW_POLICY = (os.getenv('AUDIT_LOG_OVERFLOW_POLICY') or 'sync').strip().lower()
+TEST_RUNNER = 'utils.test_runner.TestRunner'
+
 default_group_sync_bases = _split_env_list(os.getenv('AD_GROUP_SYNC_BASE_DNS'))
 if not default_group_sync_bases:
     default_group_sync_bases = [
@@ -188,6 +206,49 @@ except ValueError:
     HIBP_API_TIMEOUT = 15.0
 HIBP_API_USER_AGENT = os.getenv('HIBP_API_USER_AGENT', 'AIT-Security-API/1.0')
 
+# Shared outbound HTTP client (utils/http_client.py): one pooled session per
+# upstream. Each value can be overridden per upstream with
+# OUTBOUND_HTTP_<UPSTREAM>_{POOL_MAXSIZE,TIMEOUT,MAX_RETRIES,BACKOFF_FACTOR};
+# TIMEOUT is the default when a caller does not pass its own.
+OUTBOUND_HTTP_POOL_MAXSIZE = int(_as_float(os.getenv('OUTBOUND_HTTP_POOL_MAXSIZE'), 10, minimum=1))
+OUTBOUND_HTTP_TIMEOUT = _as_float(os.getenv('OUTBOUND_HTTP_TIMEOUT'), 15, minimum=0.1)
+OUTBOUND_HTTP_MAX_RETRIES = int(_as_float(os.getenv('OUTBOUND_HTTP_MAX_RETRIES'), 1, minimum=0))
+OUTBOUND_HTTP_BACKOFF_FACTOR = _as_float(os.getenv('OUTBOUND_HTTP_BACKOFF_FACTOR'), 0.1, minimum=0)
+
+
+def _outbound_http_upstream(name: str, *, retry_on_status: bool = True, **defaults) -> dict:
+    prefix = f'OUTBOUND_HTTP_{name.upper()}_'
+    return {
+        'pool_maxsize': int(_as_float(
+            os.getenv(prefix + 'POOL_MAXSIZE'), defaults.get('pool_maxsize', OUTBOUND_HTTP_POOL_MAXSIZE), minimum=1
+        )),
+        'timeout': _as_float(os.getenv(prefix + 'TIMEOUT'), defaults.get('timeout', OUTBOUND_HTTP_TIMEOUT), minimum=0.1),
+        'max_retries': int(_as_float(
+            os.getenv(prefix + 'MAX_RETRIES'), defaults.get('max_retries', OUTBOUND_HTTP_MAX_RETRIES), minimum=0
+        )),
+        'backoff_factor': _as_float(
+            os.getenv(prefix + 'BACKOFF_FACTOR'), defaults.get('backoff_factor', OUTBOUND_HTTP_BACKOFF_FACTOR), minimum=0
+        ),
+        'retry_on_status': retry_on_status,
+    }
+
+
+OUTBOUND_HTTP_UPSTREAMS = {
+    # GRAPH_HTTP_MAX_RETRIES / GRAPH_HTTP_BACKOFF_FACTOR keep working for Graph.
+    # Throttled Graph responses are retried by graph_request through the
+    # shared rate limiter, not by the session.
+    'graph': _outbound_http_upstream(
+        'graph',
+        timeout=20,
+        retry_on_status=False,
+        max_retries=_as_float(os.getenv('GRAPH_HTTP_MAX_RETRIES'), OUTBOUND_HTTP_MAX_RETRIES, minimum=0),
+        backoff_factor=_as_float(os.getenv('GRAPH_HTTP_BACKOFF_FACTOR'), OUTBOUND_HTTP_BACKOFF_FACTOR, minimum=0),
+    ),
+    'defender': _outbound_http_upstream('defender', timeout=20),
+    'hibp': _outbound_http_upstream('hibp', timeout=HIBP_API_TIMEOUT),
+    'openapi': _outbound_http_upstream('openapi', pool_maxsize=2, timeout=5),
+}
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
@@ -241,6 +302,81 @@ ACTIVE_DIRECTORY_SEARCH_TIMEOUT = _as_float(
     minimum=1.0,
 )
 
+# Opt-in LDAP result cache used by execute_active_directory_query(cache_profile=...).
+# TTLs are in seconds per call-site profile; 0 disables caching for that profile.
+ACTIVE_DIRECTORY_QUERY_CACHE_MAX_ENTRIES = int(
+    _as_float(os.getenv('ACTIVE_DIRECTORY_QUERY_CACHE_MAX_ENTRIES'), 2048, minimum=0)
+)
+ACTIVE_DIRECTORY_QUERY_CACHE_NEGATIVE_TTL = _as_float(
+    os.getenv('ACTIVE_DIRECTORY_QUERY_CACHE_NEGATIVE_TTL'),
+    15.0,
+    minimum=0.0,
+)
+ACTIVE_DIRECTORY_QUERY_CACHE_TTLS = {
+    'upn_probe': _as_float(os.getenv('AD_CACHE_TTL_UPN_PROBE'), 300.0, minimum=0.0),
+    'member_of': _as_float(os.getenv('AD_CACHE_TTL_MEMBER_OF'), 60.0, minimum=0.0),
+    'consistency_guid': _as_float(os.getenv('AD_CACHE_TTL_CONSISTENCY_GUID'), 900.0, minimum=0.0),
+}
+# Base DN used to resolve a principal's distinguishedName for OU limiter checks.
+AD_OU_SCOPE_SEARCH_BASE = os.getenv('AD_OU_SCOPE_SEARCH_BASE', 'DC=win,DC=dtu,DC=dk')
+# Bulk UPN -> DN resolution (HIBP domain filtering): principals per OR filter and parallel queries.
+AD_BULK_RESOLVE_CHUNK_SIZE = int(_as_float(os.getenv('AD_BULK_RESOLVE_CHUNK_SIZE'), 100, minimum=1))
+AD_BULK_RESOLVE_MAX_WORKERS = int(_as_float(os.getenv('AD_BULK_RESOLVE_MAX_WORKERS'), 4, minimum=1))
+
+# Read-through cache for Graph user lookups (execute_get_user). 404s use their
+# own TTL; entries for a user are dropped after any MFA method delete.
+GRAPH_USER_CACHE_TTL = _as_float(os.getenv('GRAPH_USER_CACHE_TTL'), 60, minimum=0)
+GRAPH_USER_CACHE_NEGATIVE_TTL = _as_float(os.getenv('GRAPH_USER_CACHE_NEGATIVE_TTL'), 30, minimum=0)
+
+# Local Entra ID user mirror, kept current by `manage.py sync_entra_users` (delta
+# queries). With GRAPH_USER_MIRROR_READS, user lookups whose $select fields are all
+# mirrored are answered locally while the last sync is within GRAPH_USER_MIRROR_MAX_AGE.
+GRAPH_USER_MIRROR_READS = _as_bool(os.getenv('GRAPH_USER_MIRROR_READS'), False)
+GRAPH_USER_MIRROR_MAX_AGE = _as_float(os.getenv('GRAPH_USER_MIRROR_MAX_AGE'), 3600, minimum=0)
+GRAPH_USER_MIRROR_FIELDS = [
+    field.strip() for field in os.getenv('GRAPH_USER_MIRROR_FIELDS', '').split(',') if field.strip()
+] or None
+
+# Advanced hunting: results are cached by normalised KQL for HUNTING_QUERY_CACHE_TTL
+# seconds (0 disables reuse) and kept for paging for HUNTING_QUERY_RESULT_RETENTION.
+# Background jobs run on HUNTING_QUERY_MAX_WORKERS threads with a longer timeout.
+HUNTING_QUERY_CACHE_TTL = _as_float(os.getenv('HUNTING_QUERY_CACHE_TTL'), 300, minimum=0)
+HUNTING_QUERY_RESULT_RETENTION = _as_float(os.getenv('HUNTING_QUERY_RESULT_RETENTION'), 86400, minimum=0)
+HUNTING_QUERY_PAGE_SIZE = int(_as_float(os.getenv('HUNTING_QUERY_PAGE_SIZE'), 500, minimum=1))
+HUNTING_QUERY_MAX_WORKERS = int(_as_float(os.getenv('HUNTING_QUERY_MAX_WORKERS'), 2, minimum=1))
+HUNTING_QUERY_JOB_TIMEOUT = _as_float(os.getenv('HUNTING_QUERY_JOB_TIMEOUT'), 180, minimum=1)
+
+# MFA reset page: upstream lookups (groups, photo, methods) run concurrently on a
+# bounded pool; each call gets MFA_RESET_LOOKUP_TIMEOUT seconds before the page
+# renders without it.
+MFA_RESET_LOOKUP_MAX_WORKERS = int(_as_float(os.getenv('MFA_RESET_LOOKUP_MAX_WORKERS'), 8, minimum=1))
+MFA_RESET_LOOKUP_TIMEOUT = _as_float(os.getenv('MFA_RESET_LOOKUP_TIMEOUT'), 10.0, minimum=0.1)
+
+# Defender machine inventory, kept current by `manage.py sync_defender_machines`.
+# Lookups use local rows while the last sync (or the row's live refresh) is within
+# DEFENDER_MACHINE_MAX_AGE; misses are looked up live, at most
+# DEFENDER_MACHINE_MAX_LIVE_LOOKUPS per request on DEFENDER_MACHINE_LIVE_MAX_WORKERS threads.
+DEFENDER_MACHINE_MAX_AGE = _as_float(os.getenv('DEFENDER_MACHINE_MAX_AGE'), 3600, minimum=0)
+DEFENDER_MACHINE_SYNC_OVERLAP = _as_float(os.getenv('DEFENDER_MACHINE_SYNC_OVERLAP'), 300, minimum=0)
+DEFENDER_MACHINE_MAX_LIVE_LOOKUPS = int(_as_float(os.getenv('DEFENDER_MACHINE_MAX_LIVE_LOOKUPS'), 50, minimum=0))
+DEFENDER_MACHINE_LIVE_MAX_WORKERS = int(_as_float(os.getenv('DEFENDER_MACHINE_LIVE_MAX_WORKERS'), 4, minimum=1))
+DEFENDER_MACHINE_LOOKUP_MAX_NAMES = int(_as_float(os.getenv('DEFENDER_MACHINE_LOOKUP_MAX_NAMES'), 1000, minimum=1))
+
+# Bulk SCCM computer lookups: the largest accepted list (or OU). Names are sent to
+# SQL Server SCCM_BULK_CHUNK_SIZE at a time (read in sccm/scripts).
+SCCM_BULK_MAX_NAMES = int(_as_float(os.getenv('SCCM_BULK_MAX_NAMES'), 2000, minimum=1))
+
+# Local SCCM inventory, kept current by `manage.py sync_sccm_inventory`. Incremental
+# runs re-read SCCM_INVENTORY_SYNC_OVERLAP seconds before the LastHWScan watermark;
+# inventory queries return at most SCCM_INVENTORY_MAX_RESULTS rows.
+SCCM_INVENTORY_SYNC_OVERLAP = _as_float(os.getenv('SCCM_INVENTORY_SYNC_OVERLAP'), 3600, minimum=0)
+SCCM_INVENTORY_MAX_RESULTS = int(_as_float(os.getenv('SCCM_INVENTORY_MAX_RESULTS'), 5000, minimum=1))
+
+# Bulk MFA reset jobs: users processed concurrently (bounds parallel Graph
+# deletes) and the largest accepted list.
+MFA_BULK_RESET_MAX_WORKERS = int(_as_float(os.getenv('MFA_BULK_RESET_MAX_WORKERS'), 4, minimum=1))
+MFA_BULK_RESET_MAX_USERS = int(_as_float(os.getenv('MFA_BULK_RESET_MAX_USERS'), 500, minimum=1))
+
 # 'HOST': os.getenv('MYSQL_HOST'),
 
 # Allow configuring the admin URL slug centrally so it can be reused in
@@ -538,6 +674,24 @@ MEDIA_ROOT = _ensure_storage_dir(
     description='media',
 )
 
+# Microsoft Graph profile photos are cached on disk (shared by all workers on the
+# host) and served by URL; users without a photo are remembered for
+# PROFILE_PHOTO_NEGATIVE_TTL seconds.
+PROFILE_PHOTO_CACHE_DIR = _ensure_storage_dir(
+    'PROFILE_PHOTO_CACHE_DIR',
+    default_path=Path('/mnt/shared-project-data/django/profile-photo-cache'),
+    fallback_path=BASE_DIR / 'profile-photo-cache',
+    description='profile photo cache',
+)
+PROFILE_PHOTO_CACHE_MAX_BYTES = int(
+    _as_float(os.getenv('PROFILE_PHOTO_CACHE_MAX_BYTES'), 50 * 1024 * 1024, minimum=0)
+)
+PROFILE_PHOTO_CACHE_TTL = _as_float(os.getenv('PROFILE_PHOTO_CACHE_TTL'), 24 * 60 * 60, minimum=0)
+PROFILE_PHOTO_NEGATIVE_TTL = _as_float(os.getenv('PROFILE_PHOTO_NEGATIVE_TTL'), 6 * 60 * 60, minimum=0)
+PROFILE_PHOTO_BROWSER_MAX_AGE = int(_as_float(os.getenv('PROFILE_PHOTO_BROWSER_MAX_AGE'), 60 * 60, minimum=0))
+PROFILE_PHOTO_SIZE = os.getenv('PROFILE_PHOTO_SIZE', '240x240')
+PROFILE_PHOTO_AVATAR_SIZE = os.getenv('PROFILE_PHOTO_AVATAR_SIZE', '48x48')
+
 # Maybe this will be a fix in the future
 # # At the end of your settings.py
 # if DEBUG:
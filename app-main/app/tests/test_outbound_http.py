@@ -0,0 +1,85 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from utils.http_client import OutboundHTTPClient, UpstreamConfig
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures_left = 0
+
+    def do_GET(self):
+        cls = type(self)
+        if cls.failures_left:
+            cls.failures_left -= 1
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class OutboundHTTPClientTests(SimpleTestCase):
+    def setUp(self):
+        _Handler.failures_left = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        self.client = OutboundHTTPClient(lambda name: UpstreamConfig(timeout=5, max_retries=2, backoff_factor=0))
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connections_are_reused_per_upstream(self):
+        for _ in range(3):
+            self.assertEqual(self.client.request("hibp", "GET", self.url).status_code, 200)
+
+        metrics = self.client.metrics_snapshot()["hibp"]
+        self.assertEqual(metrics["requests"], 3)
+        self.assertEqual(metrics["connections_opened"], 1)
+        self.assertAlmostEqual(metrics["connection_reuse_rate"], 2 / 3, places=3)
+
+    def test_retries_are_counted(self):
+        _Handler.failures_left = 1
+
+        response = self.client.request("defender", "GET", self.url)
+
+        self.assertEqual(response.status_code, 200)
+        metrics = self.client.metrics_snapshot()["defender"]
+        self.assertEqual((metrics["requests"], metrics["retries"], metrics["errors"]), (1, 1, 0))
+
+    def test_status_retries_can_be_left_to_the_caller(self):
+        _Handler.failures_left = 1
+        client = OutboundHTTPClient(
+            lambda name: UpstreamConfig(timeout=5, max_retries=2, backoff_factor=0, retry_on_status=False)
+        )
+        self.addCleanup(client.close)
+
+        response = client.request("graph", "GET", self.url)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(client.metrics_snapshot()["graph"]["retries"], 0)
+
+
+class OutboundHTTPMetricsViewTests(TestCase):
+    def test_metrics_are_staff_only(self):
+        user = get_user_model().objects.create_user(username="viewer", password="pass")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse("outbound_http_metrics")).status_code, 403)
+
+        user.is_staff = True
+        user.save()
+        response = self.client.get(reverse("outbound_http_metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("upstreams", response.json())
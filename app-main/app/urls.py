@@ -19,7 +19,7 @@ from django.urls import path, include
 from django.views.generic.base import RedirectView
 from django.conf import settings
 from django.conf.urls.static import static
-from .views import msal_callback, msal_login, msal_director, msal_logout, health_check
+from .views import msal_callback, msal_login, msal_director, msal_logout, health_check, outbound_http_metrics_view
 from dotenv import load_dotenv
 from django.views.static import serve
 from django.urls import re_path
@@ -36,6 +36,7 @@ urlpatterns = [
     path("login-redirector/", msal_director, name="msal_login_redirector"),
     path("logout/", msal_logout, name="msal_logout"),
     path("healthz/", health_check, name="health_check"),
+    path("healthz/outbound-http/", outbound_http_metrics_view, name="outbound_http_metrics"),
 
     #  favicon.ico
     re_path(r'^favicon\.ico$', serve, {
@@ -63,7 +64,10 @@ urlpatterns = [
     path('', include('active_directory.urls')),
 
     # defender api
-    # path('', include('defender.urls')),
+    path('', include('defender.urls')),
+
+    # sccm api
+    path('', include('sccm.urls')),
 
     # openAPI documentation api -  you can just use /myview/swagger/?format=openapi instead
     # path('', include('openapi.urls')),
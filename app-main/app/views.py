@@ -5,7 +5,6 @@ import urllib.parse
 from urllib.parse import urlparse, urlunparse
 
 import msal
-import requests
 from requests import exceptions as requests_exceptions
 from django.conf import settings
 from django.contrib.auth import login, logout
@@ -21,6 +20,7 @@ from django.views.decorators.http import require_GET
 from msal import ConfidentialClientApplication
 
 from myview.models import ADGroupAssociation, UserLoginLog
+from utils.http_client import outbound_http_metrics, outbound_request
 
 logger = logging.getLogger(__name__)
 
@@ -202,7 +202,9 @@ def msal_callback(request):
         # Make the GET request to the Graph API to get user details
         graph_timeout = getattr(settings, 'AZURE_GRAPH_REQUEST_TIMEOUT', 10.0)
         try:
-            graph_response = requests.get(
+            graph_response = outbound_request(
+                "graph",
+                "GET",
                 graph_api_endpoint,
                 headers=headers,
                 timeout=graph_timeout,
@@ -678,3 +680,13 @@ def msal_logout(request):
 
 
 
+
+
+@require_GET
+@cache_control(no_cache=True, must_revalidate=True, no_store=True)
+def outbound_http_metrics_view(request):
+    """Per-upstream outbound HTTP metrics for this worker process (staff only)."""
+
+    if not (request.user.is_authenticated and request.user.is_staff):
+        return JsonResponse({"detail": "Forbidden"}, status=403)
+    return JsonResponse({"upstreams": outbound_http_metrics()})
@@ -0,0 +1,239 @@
+"""Local Defender for Endpoint machine inventory with live fallback.
+
+:func:`sync_machines` (run by ``manage.py sync_defender_machines``) pulls
+``/api/machines`` filtered on ``lastSeen`` newer than the stored watermark,
+so a run only transfers machines that checked in since the previous one.
+A full run re-reads everything and drops machines Defender no longer lists.
+
+:func:`lookup_machines` answers single and batch lookups from the table. A
+row counts as fresh when the last sync, or the row's own live refresh, is
+within ``DEFENDER_MACHINE_MAX_AGE`` seconds. Misses and stale rows are looked
+up live (bounded by ``DEFENDER_MACHINE_MAX_LIVE_LOOKUPS`` per call) and the
+answers are written back to the table.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import DefenderMachine, DefenderSyncState
+from .scripts.defender_apicall_getmachine import get_machine
+from .scripts.defender_apicall_listmachines import build_machines_url, iter_machine_pages
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "machines"
+
+STATUS_FOUND = "found"
+STATUS_NOT_FOUND = "not_found"
+STATUS_ERROR = "error"
+
+SOURCE_LOCAL = "local"
+SOURCE_LIVE = "live"
+
+
+@dataclass
+class SyncStats:
+    full: bool = False
+    pages: int = 0
+    upserted: int = 0
+    deleted: int = 0
+
+
+def normalize_dns_names(names: Iterable[str]) -> List[str]:
+    """Strip, lower-case and de-duplicate DNS names, keeping their order."""
+
+    return list(dict.fromkeys(str(name).strip().lower() for name in names if name and str(name).strip()))
+
+
+def _parse_last_seen(value) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = parse_datetime(str(value))
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def _build_row(machine: Dict, synced_at: datetime) -> Optional[DefenderMachine]:
+    machine_id = machine.get("id")
+    if not machine_id:
+        return None
+    computer_dns_name = machine.get("computerDnsName") or ""
+    return DefenderMachine(
+        machine_id=machine_id,
+        computer_dns_name=computer_dns_name,
+        computer_dns_name_key=computer_dns_name.lower(),
+        last_seen=_parse_last_seen(machine.get("lastSeen")),
+        attributes=machine,
+        synced_at=synced_at,
+    )
+
+
+def _upsert(machines: Iterable[Dict], synced_at: datetime) -> List[DefenderMachine]:
+    rows = {}
+    for machine in machines:
+        row = _build_row(machine, synced_at)
+        if row is not None:
+            rows[row.machine_id] = row
+    if rows:
+        DefenderMachine.objects.bulk_create(
+            list(rows.values()),
+            update_conflicts=True,
+            unique_fields=["machine_id"],
+            update_fields=["computer_dns_name", "computer_dns_name_key", "last_seen", "attributes", "synced_at"],
+        )
+    return list(rows.values())
+
+
+def sync_machines(*, full: bool = False) -> SyncStats:
+    """Pull machines seen since the watermark (or all machines) into the table."""
+
+    state, _ = DefenderSyncState.objects.get_or_create(name=STATE_NAME)
+    full = full or state.last_seen_watermark is None
+    started = timezone.now()
+    stats = SyncStats(full=full)
+
+    since = None
+    if not full:
+        # lastSeen is reported by the sensor; re-read a short overlap so
+        # late-arriving check-ins are not skipped.
+        overlap = getattr(settings, "DEFENDER_MACHINE_SYNC_OVERLAP", 300)
+        since = state.last_seen_watermark - timedelta(seconds=overlap)
+
+    watermark = state.last_seen_watermark
+    for machines in iter_machine_pages(build_machines_url(last_seen_after=since)):
+        rows = _upsert(machines, timezone.now())
+        stats.pages += 1
+        stats.upserted += len(rows)
+        seen = [row.last_seen for row in rows if row.last_seen is not None]
+        if seen:
+            watermark = max([watermark, *seen]) if watermark else max(seen)
+
+    if full:
+        stats.deleted = DefenderMachine.objects.filter(synced_at__lt=started).delete()[0]
+        state.last_full_sync_at = started
+
+    state.last_seen_watermark = watermark
+    state.last_synced_at = started
+    state.save()
+    logger.info(
+        "Synced Defender machines (%s): %d pages, %d upserted, %d deleted",
+        "full" if full else "incremental",
+        stats.pages,
+        stats.upserted,
+        stats.deleted,
+    )
+    return stats
+
+
+def _result(name: str, status: str, *, source: Optional[str] = None, row: Optional[DefenderMachine] = None, error: str = ""):
+    result = {"computerDnsName": name, "status": status, "source": source}
+    if row is not None:
+        result["syncedAt"] = row.synced_at.isoformat()
+        result["machine"] = row.attributes
+    if error:
+        result["error"] = error
+    return result
+
+
+def _live_lookup(name: str) -> Tuple[str, Optional[Dict], int, str]:
+    try:
+        data, status_code = get_machine(computer_dns_name=name)
+    except (requests.exceptions.RequestException, ValueError) as exc:
+        return name, None, 0, str(exc)
+    return name, data if isinstance(data, dict) else None, status_code, ""
+
+
+def _live_lookup_in_worker(name: str) -> Tuple[str, Optional[Dict], int, str]:
+    # The bearer token lookup touches the database from the pool thread.
+    close_old_connections()
+    try:
+        return _live_lookup(name)
+    finally:
+        close_old_connections()
+
+
+def lookup_machines(names: Iterable[str], *, max_age: Optional[float] = None, live_fallback: bool = True) -> List[Dict]:
+    """Return one result per DNS name, from the table where fresh, live otherwise."""
+
+    names = normalize_dns_names(names)
+    if not names:
+        return []
+    if max_age is None:
+        max_age = getattr(settings, "DEFENDER_MACHINE_MAX_AGE", 3600)
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=max_age)
+    last_sync = DefenderSyncState.objects.filter(name=STATE_NAME).values_list("last_synced_at", flat=True).first()
+    sync_is_fresh = last_sync is not None and last_sync >= cutoff
+
+    rows: Dict[str, DefenderMachine] = {}
+    for row in DefenderMachine.objects.filter(computer_dns_name_key__in=names).order_by(F("last_seen").asc(nulls_first=True)):
+        # Re-imaged machines show up under a new id; the latest check-in wins.
+        rows[row.computer_dns_name_key] = row
+
+    results: Dict[str, Dict] = {}
+    misses: List[str] = []
+    for name in names:
+        row = rows.get(name)
+        if row is not None and (sync_is_fresh or row.synced_at >= cutoff):
+            results[name] = _result(name, STATUS_FOUND, source=SOURCE_LOCAL, row=row)
+        else:
+            misses.append(name)
+
+    if not live_fallback:
+        misses_allowed: List[str] = []
+    else:
+        limit = getattr(settings, "DEFENDER_MACHINE_MAX_LIVE_LOOKUPS", 50)
+        misses_allowed = misses[:limit]
+    for name in misses[len(misses_allowed):]:
+        row = rows.get(name)
+        if row is not None:
+            # Better an outdated answer than none; callers see ``stale``.
+            results[name] = {**_result(name, STATUS_FOUND, source=SOURCE_LOCAL, row=row), "stale": True}
+        else:
+            error = "Live lookup limit reached" if live_fallback else "Not in the local inventory"
+            results[name] = _result(name, STATUS_ERROR, error=error)
+
+    if misses_allowed:
+        max_workers = max(1, min(getattr(settings, "DEFENDER_MACHINE_LIVE_MAX_WORKERS", 4), len(misses_allowed)))
+        if max_workers == 1:
+            answers = [_live_lookup(name) for name in misses_allowed]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="defender-lookup") as executor:
+                answers = list(executor.map(_live_lookup_in_worker, misses_allowed))
+
+        found = []
+        for name, data, status_code, error in answers:
+            if status_code == 200 and data and data.get("id"):
+                found.append((name, data))
+            elif status_code == 404:
+                results[name] = _result(name, STATUS_NOT_FOUND, source=SOURCE_LIVE)
+            elif name in rows:
+                results[name] = {**_result(name, STATUS_FOUND, source=SOURCE_LOCAL, row=rows[name]), "stale": True}
+            else:
+                results[name] = _result(
+                    name, STATUS_ERROR, source=SOURCE_LIVE, error=error or f"Defender returned status {status_code}"
+                )
+        live_rows = {row.machine_id: row for row in _upsert([data for _, data in found], timezone.now())}
+        for name, data in found:
+            results[name] = _result(name, STATUS_FOUND, source=SOURCE_LIVE, row=live_rows[data["id"]])
+
+    logger.debug(
+        "Defender machine lookup: %d names, %d local, %d live",
+        len(names),
+        len(names) - len(misses),
+        len(misses_allowed),
+    )
+    return [results[name] for name in names]
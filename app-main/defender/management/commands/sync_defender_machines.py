@@ -0,0 +1,35 @@
+"""Keep the local Defender machine inventory current."""
+
+import logging
+from django.core.management.base import BaseCommand, CommandError
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Pull machines seen since the last run from Defender /api/machines into the local inventory."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Re-read every machine and drop the ones Defender no longer lists.",
+        )
+
+    def handle(self, *args, **options):
+        from ...machines import sync_machines
+        from ...scripts.defender_apicall_listmachines import DefenderMachinesError
+
+        try:
+            stats = sync_machines(full=options["full"])
+        except DefenderMachinesError as exc:
+            logger.warning("Defender machine sync failed: %s", exc)
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Full' if stats.full else 'Incremental'} sync: {stats.pages} pages, "
+                f"{stats.upserted} machines updated, {stats.deleted} removed"
+            )
+        )
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DefenderMachine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('machine_id', models.CharField(max_length=64, unique=True)),
+                ('computer_dns_name', models.CharField(blank=True, max_length=255)),
+                ('computer_dns_name_key', models.CharField(blank=True, db_index=True, max_length=255)),
+                ('last_seen', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('attributes', models.JSONField(default=dict)),
+                ('synced_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Defender machine',
+                'verbose_name_plural': 'Defender machines',
+            },
+        ),
+        migrations.CreateModel(
+            name='DefenderSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('last_seen_watermark', models.DateTimeField(blank=True, null=True)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('last_full_sync_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Defender sync state',
+                'verbose_name_plural': 'Defender sync states',
+            },
+        ),
+    ]
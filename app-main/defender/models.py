@@ -1,3 +1,41 @@
 from django.db import models
 
-# Create your models here.
+
+class DefenderMachine(models.Model):
+    """Local copy of a Microsoft Defender for Endpoint machine record.
+
+    Kept current by the ``sync_defender_machines`` management command, which
+    reads ``/api/machines`` incrementally by ``lastSeen``; see
+    :mod:`defender.machines`.
+    """
+
+    machine_id = models.CharField(max_length=64, unique=True)
+    computer_dns_name = models.CharField(max_length=255, blank=True)
+    # Lower-cased DNS name for case-insensitive lookups.
+    computer_dns_name_key = models.CharField(max_length=255, blank=True, db_index=True)
+    last_seen = models.DateTimeField(null=True, blank=True, db_index=True)
+    attributes = models.JSONField(default=dict)
+    synced_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Defender machine"
+        verbose_name_plural = "Defender machines"
+
+    def __str__(self) -> str:
+        return self.computer_dns_name or self.machine_id
+
+
+class DefenderSyncState(models.Model):
+    """High-water mark of the last ``/api/machines`` sync."""
+
+    name = models.CharField(max_length=64, unique=True)
+    last_seen_watermark = models.DateTimeField(null=True, blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    last_full_sync_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Defender sync state"
+        verbose_name_plural = "Defender sync states"
+
+    def __str__(self) -> str:
+        return self.name
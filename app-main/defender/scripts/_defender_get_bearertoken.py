@@ -2,12 +2,13 @@ import logging
 import os
 from datetime import timedelta
 
-import requests
 from django.db import OperationalError, ProgrammingError, transaction
 from django.utils import timezone
 from dotenv import load_dotenv
 
 from graph.models import ServiceToken
+from graph.scripts._token_broker import TokenBroker, TokenGrant, apply_grant, coerce_grant, parse_expires_in
+from utils.http_client import outbound_request
 
 
 logger = logging.getLogger(__name__)
@@ -48,9 +49,12 @@ def _generate_new_token():
     }
 
     try:
-        response = requests.post(url, data=data, timeout=20)
+        response = outbound_request("defender", "POST", url, data=data, timeout=20)
         if response.status_code == 200:
-            return response.json().get("access_token")
+            payload = response.json()
+            token = payload.get("access_token")
+            if token:
+                return TokenGrant(token, parse_expires_in(payload, DEFAULT_TOKEN_TTL_SECONDS))
     except Exception:
         return None
 
@@ -78,12 +82,11 @@ def _get_token_record():
 
 
 def _refresh_token(token_obj):
-    new_token = _generate_new_token()
-    if not new_token:
+    grant = coerce_grant(_generate_new_token(), DEFAULT_TOKEN_TTL_SECONDS)
+    if not grant:
         return None
 
-    token_obj.access_token = new_token
-    token_obj.expires_at = timezone.now() + timedelta(seconds=DEFAULT_TOKEN_TTL_SECONDS)
+    apply_grant(token_obj, grant)
     if getattr(token_obj, "pk", None) is not None:
         try:
             token_obj.save(update_fields=["access_token", "expires_at", "updated_at"])
@@ -95,17 +98,20 @@ def _refresh_token(token_obj):
     return token_obj.access_token
 
 
-def _get_bearertoken():
-    token_obj = _get_token_record()
+_BROKER = TokenBroker(
+    ServiceToken.Service.DEFENDER,
+    load_record=_get_token_record,
+    refresh_record=_refresh_token,
+    min_validity_seconds=TOKEN_REFRESH_BUFFER_SECONDS,
+)
+
 
-    if token_obj.access_token and not token_obj.is_expired(buffer_seconds=TOKEN_REFRESH_BUFFER_SECONDS):
-        return token_obj.access_token
+def _get_bearertoken():
+    return _BROKER.get_token()
 
-    refreshed_token = _refresh_token(token_obj)
-    if refreshed_token:
-        return refreshed_token
 
-    return token_obj.access_token
+def _force_refresh_bearertoken():
+    return _BROKER.force_refresh()
 
 
 def run():
@@ -1,9 +1,12 @@
 
-import requests, json
+import json
+
+from utils.http_client import outbound_request
+
 from ._defender_get_bearertoken import _get_bearertoken
 
 
-def get_machine(*, computer_dns_name, select_parameters=None):
+def get_machine(*, computer_dns_name, select_parameters=None, timeout=20):
 
     # Microsoft api documentation
     # https://learn.microsoft.com/en-us/graph/api/user-get?view=graph-rest-1.0&tabs=http    
@@ -21,7 +24,7 @@ def get_machine(*, computer_dns_name, select_parameters=None):
     else:
         api_endpoint = f"https://api.securitycenter.microsoft.com/api/machines/{computer_dns_name}"
 
-    response = requests.get(api_endpoint, headers=headers)
+    response = outbound_request("defender", "GET", api_endpoint, headers=headers, timeout=timeout)
 
 
 
@@ -0,0 +1,68 @@
+"""Iterate Microsoft Defender for Endpoint ``/api/machines`` pages.
+
+https://learn.microsoft.com/en-us/defender-endpoint/api/get-machines
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import quote
+
+import requests
+
+from utils.http_client import outbound_request
+
+from ._defender_get_bearertoken import _get_bearertoken
+
+logger = logging.getLogger(__name__)
+
+MACHINES_URL = "https://api.securitycenter.microsoft.com/api/machines"
+# Largest page the API returns.
+MAX_PAGE_SIZE = 10000
+
+
+class DefenderMachinesError(RuntimeError):
+    """Raised when the machine list cannot be read."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def build_machines_url(*, last_seen_after: Optional[datetime] = None, page_size: int = MAX_PAGE_SIZE) -> str:
+    url = f"{MACHINES_URL}?$top={page_size}"
+    if last_seen_after is not None:
+        moment = last_seen_after.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        url += "&$filter=" + quote(f"lastSeen gt {moment}", safe="")
+    return url
+
+
+def iter_machine_pages(start_url: str, *, timeout: float = 60) -> Iterator[List[Dict]]:
+    """Yield the machines of each page, following ``@odata.nextLink``."""
+
+    token = _get_bearertoken()
+    if not token:
+        raise DefenderMachinesError("Failed to acquire access token")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    next_url: Optional[str] = start_url
+    while next_url:
+        try:
+            response = outbound_request("defender", "GET", next_url, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException as exc:
+            raise DefenderMachinesError(f"Defender machines request failed: {exc}") from exc
+
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        if response.status_code != 200 or not isinstance(data, dict):
+            raise DefenderMachinesError(
+                f"Defender machines request returned status {response.status_code}",
+                response.status_code,
+            )
+
+        yield data.get("value") or []
+        next_url = data.get("@odata.nextLink")
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+
+class MachineLookupSerializer(serializers.Serializer):
+    computer_dns_names = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        required=False,
+    )
+    ou = serializers.CharField(max_length=1024, required=False)
+    max_age = serializers.FloatField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        if bool(attrs.get("computer_dns_names")) == bool(attrs.get("ou")):
+            raise serializers.ValidationError("Provide either computer_dns_names or ou.")
+        return attrs
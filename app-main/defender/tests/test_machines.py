@@ -0,0 +1,125 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from defender.machines import STATE_NAME, lookup_machines, sync_machines
+from defender.models import DefenderMachine, DefenderSyncState
+from defender.views import MachineLookupView
+
+PC1 = {"id": "m1", "computerDnsName": "PC1.win.dtu.dk", "lastSeen": "2026-10-01T10:00:00.1234567Z", "healthStatus": "Active"}
+PC2 = {"id": "m2", "computerDnsName": "pc2.win.dtu.dk", "lastSeen": "2026-10-02T10:00:00Z", "healthStatus": "Inactive"}
+
+
+class DefenderMachineSyncTests(TestCase):
+    @mock.patch("defender.machines.iter_machine_pages")
+    def test_full_then_incremental_sync(self, pages):
+        pages.return_value = iter([[PC1], [PC2]])
+        stats = sync_machines()
+
+        self.assertTrue(stats.full)
+        self.assertNotIn("filter", pages.call_args.args[0])
+        state = DefenderSyncState.objects.get(name=STATE_NAME)
+        self.assertEqual(state.last_seen_watermark.isoformat(), "2026-10-02T10:00:00+00:00")
+
+        pages.return_value = iter([[{**PC1, "lastSeen": "2026-10-03T08:00:00Z", "healthStatus": "Inactive"}]])
+        stats = sync_machines()
+
+        self.assertFalse(stats.full)
+        self.assertIn("lastSeen%20gt%202026-10-02T09%3A55%3A00Z", pages.call_args.args[0])
+        self.assertEqual(DefenderMachine.objects.get(machine_id="m1").attributes["healthStatus"], "Inactive")
+        self.assertEqual(DefenderMachine.objects.count(), 2)
+
+
+@override_settings(DEFENDER_MACHINE_MAX_AGE=3600, DEFENDER_MACHINE_LIVE_MAX_WORKERS=1)
+class DefenderMachineLookupTests(TestCase):
+    def setUp(self):
+        with mock.patch("defender.machines.iter_machine_pages", return_value=iter([[PC1]])):
+            sync_machines()
+
+    @mock.patch("defender.machines.get_machine")
+    def test_fresh_rows_are_local_and_misses_go_live(self, get_machine):
+        get_machine.side_effect = lambda computer_dns_name: (PC2, 200) if computer_dns_name == "pc2.win.dtu.dk" else ({}, 404)
+
+        results = lookup_machines(["pc1.WIN.dtu.dk", "pc2.win.dtu.dk", "gone.win.dtu.dk"])
+
+        self.assertEqual(
+            [(r["status"], r["source"]) for r in results],
+            [("found", "local"), ("found", "live"), ("not_found", "live")],
+        )
+        self.assertEqual(get_machine.call_count, 2)
+        self.assertTrue(DefenderMachine.objects.filter(machine_id="m2").exists())
+
+    @mock.patch("defender.machines.get_machine", return_value=({"error": {}}, 500))
+    def test_stale_rows_are_refreshed_and_kept_on_failure(self, get_machine):
+        past = timezone.now() - timedelta(hours=2)
+        DefenderSyncState.objects.update(last_synced_at=past)
+        DefenderMachine.objects.update(synced_at=past)
+
+        result = lookup_machines(["pc1.win.dtu.dk"])[0]
+
+        get_machine.assert_called_once()
+        self.assertEqual((result["status"], result["source"], result["stale"]), ("found", "local", True))
+
+    @override_settings(DEFENDER_MACHINE_MAX_LIVE_LOOKUPS=0)
+    @mock.patch("defender.machines.get_machine")
+    def test_live_lookups_are_capped(self, get_machine):
+        result = lookup_machines(["new.win.dtu.dk"])[0]
+
+        get_machine.assert_not_called()
+        self.assertEqual(result["status"], "error")
+
+
+class MachineLookupViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="subit", password="pass")
+        self.factory = APIRequestFactory()
+
+    def _post(self, body, base_dns=None):
+        request = self.factory.post("/defender/v1.0/machines/lookup", body, format="json")
+        force_authenticate(request, user=self.user)
+        if base_dns:
+            request._ado_ou_base_dns = set(base_dns)
+        return MachineLookupView.as_view()(request)
+
+    @mock.patch("defender.views.lookup_machines", return_value=[{"computerDnsName": "pc1.win.dtu.dk", "status": "found"}])
+    @mock.patch("defender.views.list_ou_computers", return_value=[{"dNSHostName": "PC1.win.dtu.dk"}, {"dNSHostName": ""}])
+    def test_ou_lookup_within_scope(self, list_computers, lookup):
+        ou = "OU=Computers,OU=AIT,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk"
+
+        response = self._post({"ou": ou}, base_dns=["OU=AIT,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lookup.call_args.args[0], ["pc1.win.dtu.dk"])
+        self.assertEqual(response.data["summary"], {"found": 1})
+
+        denied = self._post({"ou": ou}, base_dns=["OU=Other,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk"])
+        self.assertEqual(denied.status_code, 403)
+
+    @mock.patch("defender.views.lookup_machines", return_value=[])
+    @mock.patch("defender.views.computers_within_ous", return_value={"pc1.win.dtu.dk"})
+    def test_names_outside_scope_are_denied(self, within, lookup):
+        response = self._post(
+            {"computer_dns_names": ["pc1.win.dtu.dk", "pc9.win.dtu.dk"]},
+            base_dns=["OU=AIT,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk"],
+        )
+
+        self.assertEqual(lookup.call_args.args[0], ["pc1.win.dtu.dk"])
+        self.assertEqual(response.data["results"], [{"computerDnsName": "pc9.win.dtu.dk", "status": "denied", "source": None}])
+
+    def test_requires_exactly_one_selector(self):
+        self.assertEqual(self._post({}).status_code, 400)
+
+    @override_settings(DEFENDER_MACHINE_LOOKUP_MAX_NAMES=2)
+    @mock.patch("defender.views.computers_within_ous")
+    def test_too_many_names_are_rejected_before_scoping(self, within):
+        response = self._post(
+            {"computer_dns_names": ["pc1.win.dtu.dk", "pc2.win.dtu.dk", "PC2.win.dtu.dk ", "pc3.win.dtu.dk"]},
+            base_dns=["OU=AIT,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk"],
+        )
+
+        self.assertEqual(response.status_code, 400)
+        within.assert_not_called()
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import hello_world
+
+from .views import GetMachineView, MachineLookupView
 
 
 urlpatterns = [
-    path('defender/v1.0/get-machine/', hello_world),
+    path('defender/v1.0/get-machine/<str:computer_dns_name>', GetMachineView.as_view()),
+    path('defender/v1.0/machines/lookup', MachineLookupView.as_view()),
 ]
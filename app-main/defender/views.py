@@ -1,4 +1,182 @@
-from django.http import HttpResponse
+"""Defender for Endpoint machine lookups served from the local inventory."""
 
-def hello_world(request, computer_dns_name):
-    return HttpResponse("Hello, World!")
\ No newline at end of file
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.response import Response
+
+from active_directory.services import list_ou_computers
+from myview.ou_scope import computers_within_ous, dn_within_ous
+from utils.api import SecuredAPIView
+
+from .machines import STATUS_FOUND, STATUS_NOT_FOUND, lookup_machines, normalize_dns_names
+from .serializers import MachineLookupSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def _limit_to_scope(request, names):
+    """Split names into those inside the caller's OU limiter scope and the rest."""
+
+    base_dns = getattr(request, "_ado_ou_base_dns", None)
+    if not base_dns:
+        return names, []
+    allowed = computers_within_ous(names, base_dns)
+    return [name for name in names if name in allowed], [name for name in names if name not in allowed]
+
+
+def _denied(name):
+    return {"computerDnsName": name, "status": "denied", "source": None}
+
+
+class GetMachineView(SecuredAPIView):
+    """Return one Defender machine by DNS name."""
+
+    authorization_header = openapi.Parameter(
+        "Authorization",
+        in_=openapi.IN_HEADER,
+        description="Required. Must be in the format ''.",
+        type=openapi.TYPE_STRING,
+        required=True,
+        default="",
+    )
+
+    computer_dns_name_path_param = openapi.Parameter(
+        "computer_dns_name",
+        in_=openapi.IN_PATH,
+        description="The machine's fully qualified DNS name.",
+        type=openapi.TYPE_STRING,
+        required=True,
+        default="DTU-5CG0469JZS.win.dtu.dk",
+    )
+
+    @swagger_auto_schema(
+        manual_parameters=[authorization_header, computer_dns_name_path_param],
+        operation_description="""
+Return the Microsoft Defender for Endpoint record for a machine.
+
+The answer comes from the local machine inventory when it is fresh (`source` is `local`), otherwise from
+Defender directly (`source` is `live`).
+
+Curl example:
+```
+curl -X 'GET' \\
+    'https://api.security.ait.dtu.dk/defender/v1.0/get-machine/DTU-5CG0469JZS.win.dtu.dk' \\
+    -H 'Authorization: Token YOUR_API_KEY'
+```
+""",
+        responses={
+            200: "Machine found",
+            403: "Error: Forbidden",
+            404: "Error: Not found",
+            502: "Error: Defender lookup failed",
+        },
+    )
+    def get(self, request, computer_dns_name: str) -> Response:
+        names = normalize_dns_names([computer_dns_name])
+        allowed, _denied_names = _limit_to_scope(request, names)
+        if not allowed:
+            return Response(
+                {"status": "error", "message": "Machine is outside your organizational unit scope."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        result = lookup_machines(allowed)[0]
+        if result["status"] == STATUS_FOUND:
+            return Response(result)
+        if result["status"] == STATUS_NOT_FOUND:
+            return Response({"status": "error", "message": "Machine not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"status": "error", "message": result.get("error", "")}, status=status.HTTP_502_BAD_GATEWAY)
+
+
+class MachineLookupView(SecuredAPIView):
+    """Look up many Defender machines at once, by DNS name or by AD OU."""
+
+    authorization_header = GetMachineView.authorization_header
+
+    request_body = openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "computer_dns_names": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_STRING),
+                example=["DTU-5CG0469JZS.win.dtu.dk"],
+            ),
+            "ou": openapi.Schema(
+                type=openapi.TYPE_STRING,
+                example="OU=Computers,OU=AIT,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+            ),
+            "max_age": openapi.Schema(
+                type=openapi.TYPE_NUMBER,
+                description="Accept local data up to this many seconds old.",
+            ),
+        },
+    )
+
+    @swagger_auto_schema(
+        manual_parameters=[authorization_header],
+        request_body=request_body,
+        operation_description="""
+Return Microsoft Defender for Endpoint records for a list of machines, or for every computer in an AD
+organizational unit. Send either `computer_dns_names` or `ou`.
+
+Machines are answered from the local inventory, which is synced incrementally from Defender. Only machines
+missing from it, or older than `max_age` seconds, are looked up live. Each result has a `status` of `found`,
+`not_found`, `denied` (outside your OU scope) or `error`, and a `source` of `local` or `live`. A result
+marked `stale` is older than `max_age` because the live lookup was skipped or failed.
+
+Curl example:
+```
+curl -X 'POST' \\
+    'https://api.security.ait.dtu.dk/defender/v1.0/machines/lookup' \\
+    -H 'Authorization: Token YOUR_API_KEY' \\
+    -H 'Content-Type: application/json' \\
+    -d '{"ou": "OU=Computers,OU=AIT,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk"}'
+```
+""",
+        responses={
+            200: "Lookup results",
+            400: "Error: Bad request",
+            403: "Error: Forbidden",
+        },
+    )
+    def post(self, request) -> Response:
+        serializer = MachineLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        base_dns = getattr(request, "_ado_ou_base_dns", None)
+
+        ou = data.get("ou")
+        if ou:
+            if base_dns and not dn_within_ous(ou, base_dns):
+                return Response(
+                    {"status": "error", "message": "The OU is outside your organizational unit scope."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            names = normalize_dns_names(computer["dNSHostName"] for computer in list_ou_computers(ou))
+        else:
+            names = normalize_dns_names(data["computer_dns_names"])
+
+        # Checked before scoping, which resolves every name through LDAP.
+        max_names = getattr(settings, "DEFENDER_MACHINE_LOOKUP_MAX_NAMES", 1000)
+        if len(names) > max_names:
+            return Response(
+                {"status": "error", "message": f"At most {max_names} machines can be looked up at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        denied = []
+        if not ou:
+            names, denied = _limit_to_scope(request, names)
+
+        results = lookup_machines(names, max_age=data.get("max_age"))
+        results.extend(_denied(name) for name in denied)
+        summary = {}
+        for result in results:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        return Response({"count": len(results), "summary": summary, "results": results})
@@ -0,0 +1,406 @@
+"""Advanced hunting queries: result cache, background jobs and cursor paging.
+
+Results are content addressed: the key is the SHA-256 of the KQL after
+:func:`normalize_kql` (comments removed, whitespace outside string literals
+collapsed), so the same alert-driven query sent by many webhooks runs once per
+``HUNTING_QUERY_CACHE_TTL`` seconds. Rows are stored as value lists in schema
+column order and split into zlib-compressed pages of
+``HUNTING_QUERY_PAGE_SIZE`` rows.
+
+Synchronous callers use :func:`run_cached_hunting_query`. Long queries go
+through :func:`submit_hunting_job`, which queues the query on a small thread
+pool with a longer ``HUNTING_QUERY_JOB_TIMEOUT``; callers poll the job and
+page through its rows with :func:`read_result_page`. When several workers
+need the same uncached query, a cache lock lets one of them run it while the
+others wait for the stored result. A leader that gets an error from Graph
+records it briefly so the waiting jobs fail with the same error instead of
+re-running the query; with ``HUNTING_QUERY_CACHE_TTL=0`` there is nothing to
+share and every job runs its own query.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import HuntingQueryJob, HuntingQueryResult, HuntingQueryResultPage
+from .scripts.graph_apicall_runhuntingquery import run_hunting_query
+
+logger = logging.getLogger(__name__)
+
+_LOCK_PREFIX = "graph:hunting:lock"
+_FAILURE_PREFIX = "graph:hunting:failure"
+_FAILURE_TTL_SECONDS = 30
+_FOLLOWER_POLL_SECONDS = 1.0
+
+
+def normalize_kql(query: str) -> str:
+    """Drop ``//`` comments and collapse whitespace outside string literals."""
+
+    text = query or ""
+    out: List[str] = []
+    pending_space = False
+    index, length = 0, len(text)
+    while index < length:
+        char = text[index]
+        if char in "\"'":
+            verbatim = bool(out) and out[-1] == "@" and not pending_space
+            end = index + 1
+            while end < length:
+                if text[end] == "\\" and not verbatim:
+                    end += 2
+                    continue
+                if text[end] == char:
+                    if verbatim and end + 1 < length and text[end + 1] == char:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            if pending_space and out:
+                out.append(" ")
+            pending_space = False
+            out.append(text[index:end + 1])
+            index = end + 1
+            continue
+        if text.startswith("//", index):
+            newline = text.find("\n", index)
+            index = length if newline == -1 else newline
+            pending_space = True
+            continue
+        if char.isspace():
+            pending_space = True
+            index += 1
+            continue
+        if pending_space and out:
+            out.append(" ")
+        pending_space = False
+        out.append(char)
+        index += 1
+    return "".join(out)
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(normalize_kql(query).encode("utf-8")).hexdigest()
+
+
+def _cache_ttl() -> float:
+    return getattr(settings, "HUNTING_QUERY_CACHE_TTL", 300)
+
+
+def _page_size() -> int:
+    return max(1, int(getattr(settings, "HUNTING_QUERY_PAGE_SIZE", 500)))
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+def _columns(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    schema = [column for column in payload.get("schema") or [] if isinstance(column, dict) and column.get("name")]
+    if schema:
+        return [{"name": column["name"], "type": column.get("type")} for column in schema]
+    names: Dict[str, None] = {}
+    for row in payload.get("results") or []:
+        names.update(dict.fromkeys(row))
+    return [{"name": name, "type": None} for name in names]
+
+
+def _compress(rows: List[List[Any]]) -> bytes:
+    return zlib.compress(json.dumps(rows, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def _decompress(data) -> List[List[Any]]:
+    return json.loads(zlib.decompress(bytes(data)).decode("utf-8"))
+
+
+def get_cached_result(digest: str) -> Optional[HuntingQueryResult]:
+    if _cache_ttl() <= 0:
+        return None
+    return (
+        HuntingQueryResult.objects.filter(query_hash=digest, expires_at__gt=timezone.now())
+        .order_by("-expires_at")
+        .first()
+    )
+
+
+def store_result(query: str, payload: Dict[str, Any]) -> HuntingQueryResult:
+    """Persist a successful ``runHuntingQuery`` payload and return its record."""
+
+    digest = query_hash(query)
+    columns = _columns(payload)
+    names = [column["name"] for column in columns]
+    rows = [[row.get(name) for name in names] for row in payload.get("results") or []]
+    size = _page_size()
+    pages = [_compress(rows[start:start + size]) for start in range(0, len(rows), size)]
+    now = timezone.now()
+
+    # Earlier results for the same query stay in place: jobs that point at them
+    # keep paging until the retention cleanup below removes them.
+    with transaction.atomic():
+        result = HuntingQueryResult.objects.create(
+            query_hash=digest,
+            query=query,
+            schema=columns,
+            row_count=len(rows),
+            page_size=size,
+            stored_bytes=sum(len(page) for page in pages),
+            expires_at=now + timedelta(seconds=max(0, _cache_ttl())),
+        )
+        HuntingQueryResultPage.objects.bulk_create(
+            [HuntingQueryResultPage(result=result, index=index, rows=page) for index, page in enumerate(pages)]
+        )
+
+    retention = getattr(settings, "HUNTING_QUERY_RESULT_RETENTION", 86400)
+    HuntingQueryResult.objects.filter(expires_at__lt=now - timedelta(seconds=retention)).delete()
+    return result
+
+
+def read_page(result: HuntingQueryResult, index: int) -> List[Dict[str, Any]]:
+    names = [column["name"] for column in result.schema]
+    page = HuntingQueryResultPage.objects.filter(result=result, index=index).only("rows").first()
+    if page is None:
+        return []
+    return [dict(zip(names, values)) for values in _decompress(page.rows)]
+
+
+def result_payload(result: HuntingQueryResult) -> Dict[str, Any]:
+    """Rebuild the ``{"schema", "results"}`` payload Graph returned."""
+
+    names = [column["name"] for column in result.schema]
+    rows: List[Dict[str, Any]] = []
+    for page in HuntingQueryResultPage.objects.filter(result=result).order_by("index"):
+        rows.extend(dict(zip(names, values)) for values in _decompress(page.rows))
+    schema = [{"name": column["name"], "type": column["type"]} for column in result.schema]
+    return {"schema": schema, "results": rows}
+
+
+# ---------------------------------------------------------------------------
+# Cursors
+# ---------------------------------------------------------------------------
+def encode_cursor(result: HuntingQueryResult, index: int) -> str:
+    raw = json.dumps({"h": result.query_hash[:16], "p": index}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(result: HuntingQueryResult, cursor: Optional[str]) -> int:
+    """Return the page index for ``cursor``; raises ``ValueError`` for foreign or malformed cursors."""
+
+    if not cursor:
+        return 0
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        index = int(data["p"])
+        digest = data["h"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+    if digest != result.query_hash[:16] or not 0 <= index < max(1, result.page_count):
+        raise ValueError("Invalid cursor.")
+    return index
+
+
+def read_result_page(result: HuntingQueryResult, cursor: Optional[str] = None) -> Dict[str, Any]:
+    index = decode_cursor(result, cursor)
+    next_index = index + 1
+    return {
+        "schema": result.schema,
+        "results": read_page(result, index),
+        "row_count": result.row_count,
+        "next_cursor": encode_cursor(result, next_index) if next_index < result.page_count else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Running queries
+# ---------------------------------------------------------------------------
+def _execute(query: str, timeout: float) -> Tuple[Any, int]:
+    response, status_code = run_hunting_query(query, timeout=timeout)
+    try:
+        payload = response.json()
+    except ValueError:
+        payload = {"error": getattr(response, "text", "")}
+    return payload, status_code
+
+
+def run_cached_hunting_query(query: str, *, timeout: float = 20) -> Tuple[Any, int]:
+    """Return ``(payload, status_code)``, serving fresh cached results without calling Graph."""
+
+    cached = get_cached_result(query_hash(query))
+    if cached is not None:
+        return result_payload(cached), 200
+
+    payload, status_code = _execute(query, timeout)
+    if status_code == 200 and isinstance(payload, dict) and _cache_ttl() > 0:
+        try:
+            store_result(query, payload)
+        except Exception:
+            logger.exception("Failed to cache hunting query result")
+    return payload, status_code
+
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_hunting_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "HUNTING_QUERY_MAX_WORKERS", 2),
+                    thread_name_prefix="hunting-query",
+                )
+    return _EXECUTOR
+
+
+def submit_hunting_job(*, requested_by, query: str) -> HuntingQueryJob:
+    """Create a job and queue it once the transaction commits.
+
+    A fresh cached result completes the job immediately.
+    """
+
+    digest = query_hash(query)
+    user = requested_by if getattr(requested_by, "is_authenticated", False) else None
+    cached = get_cached_result(digest)
+    if cached is not None:
+        now = timezone.now()
+        return HuntingQueryJob.objects.create(
+            requested_by=user,
+            query=query,
+            query_hash=digest,
+            status=HuntingQueryJob.Status.SUCCEEDED,
+            result=cached,
+            from_cache=True,
+            status_code=200,
+            started_at=now,
+            finished_at=now,
+        )
+
+    job = HuntingQueryJob.objects.create(requested_by=user, query=query, query_hash=digest)
+    transaction.on_commit(lambda: get_hunting_executor().submit(_run_in_worker, job.pk))
+    return job
+
+
+def _run_in_worker(job_id: int) -> None:
+    close_old_connections()
+    try:
+        run_hunting_job(job_id)
+    except Exception:
+        logger.exception("Hunting query job %s crashed", job_id)
+        HuntingQueryJob.objects.filter(pk=job_id).exclude(status=HuntingQueryJob.Status.SUCCEEDED).update(
+            status=HuntingQueryJob.Status.FAILED,
+            error={"message": "The hunting query job failed unexpectedly."},
+            finished_at=timezone.now(),
+        )
+    finally:
+        close_old_connections()
+
+
+def _wait_for_leader(digest: str, lock_key: str, deadline: float) -> Tuple[Optional[HuntingQueryResult], Any]:
+    """Poll until the leader stores a result, records a failure or releases the lock.
+
+    Returns ``(result, failure)``; both are ``None`` when the lock went away
+    without either, or the deadline passed.
+    """
+
+    failure_key = f"{_FAILURE_PREFIX}:{digest}"
+    while time.monotonic() < deadline:
+        time.sleep(_FOLLOWER_POLL_SECONDS)
+        # The leader stores its outcome before releasing the lock, so read the lock first.
+        lock_held = cache.get(lock_key) is not None
+        result = get_cached_result(digest)
+        if result is not None:
+            return result, None
+        failure = cache.get(failure_key)
+        if failure is not None:
+            return None, failure
+        if not lock_held:
+            break
+    return None, None
+
+
+def run_hunting_job(job_id: int) -> HuntingQueryJob:
+    job = HuntingQueryJob.objects.get(pk=job_id)
+    job.status = HuntingQueryJob.Status.RUNNING
+    job.started_at = timezone.now()
+    job.save(update_fields=["status", "started_at"])
+
+    timeout = getattr(settings, "HUNTING_QUERY_JOB_TIMEOUT", 180)
+    lock_key = f"{_LOCK_PREFIX}:{job.query_hash}"
+    failure_key = f"{_FAILURE_PREFIX}:{job.query_hash}"
+    result = get_cached_result(job.query_hash)
+    from_cache = result is not None
+    failure = None
+    leader = False
+    if result is None and _cache_ttl() > 0:
+        deadline = time.monotonic() + timeout
+        while True:
+            leader = cache.add(lock_key, job.pk, timeout=timeout)
+            if leader:
+                break
+            # Another worker is running the same query; wait for its outcome.
+            result, failure = _wait_for_leader(job.query_hash, lock_key, deadline)
+            if result is not None or failure is not None or time.monotonic() >= deadline:
+                break
+        from_cache = result is not None
+        if leader:
+            cache.delete(failure_key)
+
+    if result is not None:
+        job.status, job.result, job.from_cache, job.status_code = HuntingQueryJob.Status.SUCCEEDED, result, from_cache, 200
+    elif failure is not None:
+        job.status, (job.error, job.status_code) = HuntingQueryJob.Status.FAILED, failure
+    else:
+        try:
+            payload, status_code = _execute(job.query, timeout)
+            if status_code == 200 and isinstance(payload, dict):
+                job.status, job.result = HuntingQueryJob.Status.SUCCEEDED, store_result(job.query, payload)
+            else:
+                job.status, job.error = HuntingQueryJob.Status.FAILED, payload
+                if leader:
+                    cache.set(failure_key, (payload, status_code), timeout=_FAILURE_TTL_SECONDS)
+            job.status_code = status_code
+        finally:
+            if leader:
+                cache.delete(lock_key)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "from_cache", "status_code", "error", "finished_at"])
+    return job
+
+
+def serialize_job(job: HuntingQueryJob) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "id": job.pk,
+        "status": job.status,
+        "created": job.created_at,
+        "started": job.started_at,
+        "finished": job.finished_at,
+        "from_cache": job.from_cache,
+        "status_code": job.status_code,
+    }
+    if job.error is not None:
+        payload["error"] = job.error
+    if job.result is not None:
+        payload.update(
+            {
+                "schema": job.result.schema,
+                "row_count": job.result.row_count,
+                "page_count": job.result.page_count,
+                "results_url": f"/graph/v1.0/hunting-query/jobs/{job.pk}/results",
+            }
+        )
+    return payload
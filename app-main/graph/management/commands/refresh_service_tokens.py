@@ -20,9 +20,9 @@ class Command(BaseCommand):
         refreshed = []
 
         if service in (None, "graph"):
-            from ...scripts._graph_get_bearertoken import _get_bearertoken
+            from ...scripts._graph_get_bearertoken import _force_refresh_bearertoken
 
-            token = _get_bearertoken()
+            token = _force_refresh_bearertoken()
             if token:
                 refreshed.append("graph")
                 logger.info("Refreshed Microsoft Graph token.")
@@ -30,9 +30,9 @@ class Command(BaseCommand):
                 logger.warning("Failed to refresh Microsoft Graph token.")
 
         if service in (None, "defender"):
-            from ....defender.scripts._defender_get_bearertoken import _get_bearertoken
+            from defender.scripts._defender_get_bearertoken import _force_refresh_bearertoken
 
-            token = _get_bearertoken()
+            token = _force_refresh_bearertoken()
             if token:
                 refreshed.append("defender")
                 logger.info("Refreshed Microsoft Defender token.")
@@ -0,0 +1,35 @@
+"""Keep the local Entra ID user mirror current with Graph delta queries."""
+
+import logging
+from django.core.management.base import BaseCommand, CommandError
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Apply changes from Microsoft Graph /users/delta to the local user mirror."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignore the stored delta link and re-read every user.",
+        )
+
+    def handle(self, *args, **options):
+        from ...scripts.graph_apicall_usersdelta import UserDeltaError
+        from ...user_mirror import sync_user_mirror
+
+        try:
+            stats = sync_user_mirror(full=options["full"])
+        except UserDeltaError as exc:
+            logger.warning("Entra ID user sync failed: %s", exc)
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Full' if stats.full else 'Delta'} sync: {stats.pages} pages, "
+                f"{stats.upserted} users updated, {stats.deleted} removed"
+            )
+        )
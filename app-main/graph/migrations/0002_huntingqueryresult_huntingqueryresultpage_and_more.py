@@ -0,0 +1,72 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('graph', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HuntingQueryResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query_hash', models.CharField(max_length=64, unique=True)),
+                ('query', models.TextField()),
+                ('schema', models.JSONField(default=list)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('page_size', models.PositiveIntegerField()),
+                ('stored_bytes', models.PositiveIntegerField(default=0)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Hunting query result',
+                'verbose_name_plural': 'Hunting query results',
+            },
+        ),
+        migrations.CreateModel(
+            name='HuntingQueryResultPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField()),
+                ('rows', models.BinaryField()),
+                ('result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pages', to='graph.huntingqueryresult')),
+            ],
+            options={
+                'ordering': ['index'],
+            },
+        ),
+        migrations.CreateModel(
+            name='HuntingQueryJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.TextField()),
+                ('query_hash', models.CharField(db_index=True, max_length=64)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=16)),
+                ('from_cache', models.BooleanField(default=False)),
+                ('status_code', models.PositiveIntegerField(blank=True, null=True)),
+                ('error', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hunting_query_jobs', to=settings.AUTH_USER_MODEL)),
+                ('result', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='graph.huntingqueryresult')),
+            ],
+            options={
+                'verbose_name': 'Hunting query job',
+                'verbose_name_plural': 'Hunting query jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='huntingqueryresultpage',
+            constraint=models.UniqueConstraint(fields=('result', 'index'), name='unique_hunting_result_page'),
+        ),
+    ]
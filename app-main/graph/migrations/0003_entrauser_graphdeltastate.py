@@ -0,0 +1,43 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graph', '0002_huntingqueryresult_huntingqueryresultpage_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntraUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.CharField(max_length=64, unique=True)),
+                ('user_principal_name', models.CharField(blank=True, max_length=255)),
+                ('user_principal_name_key', models.CharField(blank=True, db_index=True, max_length=255)),
+                ('attributes', models.JSONField(default=dict)),
+                ('synced_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Entra ID user',
+                'verbose_name_plural': 'Entra ID users',
+            },
+        ),
+        migrations.CreateModel(
+            name='GraphDeltaState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('select', models.TextField(blank=True)),
+                ('delta_link', models.TextField(blank=True)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('last_full_sync_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Graph delta state',
+                'verbose_name_plural': 'Graph delta states',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graph', '0003_entrauser_graphdeltastate'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='huntingqueryresult',
+            name='query_hash',
+            field=models.CharField(db_index=True, max_length=64),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from datetime import timedelta
 
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
@@ -38,3 +39,129 @@ class ServiceToken(models.Model):
 
         buffer = timedelta(seconds=max(buffer_seconds, 0))
         return self.expires_at <= timezone.now() + buffer
+
+
+class HuntingQueryResult(models.Model):
+    """Cached result of an advanced hunting query, keyed by the normalised KQL.
+
+    Rows are stored as value lists in ``schema`` column order, split into
+    zlib-compressed pages (:class:`HuntingQueryResultPage`) so a cursor read
+    only decompresses the page it returns. Re-running a query adds a new row;
+    older rows stay readable by their jobs until the retention period ends.
+    """
+
+    query_hash = models.CharField(max_length=64, db_index=True)
+    query = models.TextField()
+    schema = models.JSONField(default=list)
+    row_count = models.PositiveIntegerField(default=0)
+    page_size = models.PositiveIntegerField()
+    stored_bytes = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Hunting query result"
+        verbose_name_plural = "Hunting query results"
+
+    def __str__(self) -> str:
+        return f"{self.query_hash[:12]} ({self.row_count} rows)"
+
+    @property
+    def page_count(self) -> int:
+        return (self.row_count + self.page_size - 1) // self.page_size if self.page_size else 0
+
+    def is_fresh(self) -> bool:
+        return self.expires_at > timezone.now()
+
+
+class HuntingQueryResultPage(models.Model):
+    result = models.ForeignKey(HuntingQueryResult, on_delete=models.CASCADE, related_name="pages")
+    index = models.PositiveIntegerField()
+    rows = models.BinaryField()
+
+    class Meta:
+        ordering = ["index"]
+        constraints = [
+            models.UniqueConstraint(fields=["result", "index"], name="unique_hunting_result_page"),
+        ]
+
+
+class HuntingQueryJob(models.Model):
+    """An advanced hunting query run in the background for one caller."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="hunting_query_jobs",
+        null=True,
+        blank=True,
+    )
+    query = models.TextField()
+    query_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    result = models.ForeignKey(
+        HuntingQueryResult,
+        on_delete=models.SET_NULL,
+        related_name="jobs",
+        null=True,
+        blank=True,
+    )
+    from_cache = models.BooleanField(default=False)
+    status_code = models.PositiveIntegerField(null=True, blank=True)
+    error = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Hunting query job"
+        verbose_name_plural = "Hunting query jobs"
+
+    def __str__(self) -> str:
+        return f"Hunting query job #{self.pk} ({self.get_status_display()})"
+
+
+class EntraUser(models.Model):
+    """Local mirror of stable Microsoft Entra ID user attributes.
+
+    Kept current by the ``sync_entra_users`` management command from
+    ``/users/delta``; see :mod:`graph.user_mirror`.
+    """
+
+    object_id = models.CharField(max_length=64, unique=True)
+    user_principal_name = models.CharField(max_length=255, blank=True)
+    # Lower-cased UPN for case-insensitive lookups.
+    user_principal_name_key = models.CharField(max_length=255, blank=True, db_index=True)
+    attributes = models.JSONField(default=dict)
+    synced_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Entra ID user"
+        verbose_name_plural = "Entra ID users"
+
+    def __str__(self) -> str:
+        return self.user_principal_name or self.object_id
+
+
+class GraphDeltaState(models.Model):
+    """Where the last delta round for a Graph collection ended."""
+
+    name = models.CharField(max_length=64, unique=True)
+    select = models.TextField(blank=True)
+    delta_link = models.TextField(blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    last_full_sync_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Graph delta state"
+        verbose_name_plural = "Graph delta states"
+
+    def __str__(self) -> str:
+        return self.name
@@ -0,0 +1,302 @@
+"""Asynchronous Microsoft Graph transport on ``httpx`` with HTTP/2.
+
+Graph calls share an ``httpx.AsyncClient`` with HTTP/2 enabled, so dozens of
+concurrent requests are multiplexed over a handful of TLS connections instead
+of queueing on (or growing) a per-thread connection pool.
+
+Two ways in:
+
+* async code (async views, batch jobs) awaits :func:`async_graph_request` or
+  :func:`gather_graph_requests`; each running event loop gets its own client.
+* synchronous code goes through :func:`graph_request_sync`, which runs the
+  request on a single background event loop shared by every thread in the
+  process. :func:`graph._http.graph_request` uses it when
+  ``GRAPH_HTTP2_ENABLED`` is on, so the existing helpers benefit unchanged.
+
+:func:`async_graph_request`, :func:`gather_graph_requests` and
+:func:`graph_request_many` take a token from the shared Graph rate limiter
+(:mod:`graph.scripts._rate_limit`) for every call, just like
+:func:`graph._http.graph_request`, feed each response back into it and retry
+throttled responses through it. The transport itself only retries connects.
+
+Transport errors are re-raised from the sync facade as the matching
+``requests`` exceptions so existing ``except RequestException`` handlers keep
+working.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import functools
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Iterable, List, Mapping, Optional, Sequence, Union
+
+import requests
+
+from ._http import _read_float, _read_int
+
+try:  # pragma: no cover - exercised implicitly when the dependency is present
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+try:  # pragma: no cover - HTTP/2 support is optional inside httpx
+    import h2  # noqa: F401
+
+    _HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    _HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_TIMEOUT = 20.0
+
+
+def async_transport_available() -> bool:
+    return httpx is not None
+
+
+def async_transport_enabled() -> bool:
+    raw_value = os.getenv("GRAPH_HTTP2_ENABLED")
+    enabled = True if raw_value is None else raw_value.strip().lower() in {"1", "true", "yes", "on"}
+    return enabled and async_transport_available()
+
+
+def _translate_error(exc: Exception) -> requests.exceptions.RequestException:
+    if httpx is not None and isinstance(exc, httpx.TimeoutException):
+        return requests.exceptions.Timeout(str(exc))
+    return requests.exceptions.ConnectionError(str(exc))
+
+
+class AsyncGraphTransport:
+    """HTTP/2 client pool plus a background loop for synchronous callers."""
+
+    def __init__(
+        self,
+        *,
+        max_connections: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        http2: Optional[bool] = None,
+        transport=None,
+    ):
+        if httpx is None:
+            raise RuntimeError("httpx is required for the asynchronous Graph transport")
+
+        self.max_connections = max_connections or max(1, _read_int("GRAPH_HTTP2_MAX_CONNECTIONS", 4))
+        self.max_retries = _read_int("GRAPH_HTTP_MAX_RETRIES", 1) if max_retries is None else max_retries
+        self.max_concurrency = max_concurrency or max(1, _read_int("GRAPH_ASYNC_MAX_CONCURRENCY", 32))
+        self.http2 = _HTTP2_AVAILABLE if http2 is None else (http2 and _HTTP2_AVAILABLE)
+        self._transport = transport
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_pid: Optional[int] = None
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+    def _client_for_running_loop(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=_read_float("GRAPH_HTTP2_KEEPALIVE_SECONDS", 60.0),
+            )
+            transport = self._transport or httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                limits=limits,
+                retries=self.max_retries,
+            )
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=limits,
+                transport=transport,
+                timeout=_DEFAULT_TIMEOUT,
+                follow_redirects=True,
+            )
+            self._clients[loop] = client
+        return client
+
+    async def request(self, method: str, url: str, **kwargs):
+        """Send one request on the current loop's shared client."""
+
+        return await self._client_for_running_loop().request(method.upper(), url, **kwargs)
+
+    async def gather(
+        self,
+        calls: Iterable[Mapping[str, Any]],
+        *,
+        limit: Optional[int] = None,
+        send: Optional[Callable[..., Awaitable[Any]]] = None,
+    ) -> List[Any]:
+        """Run ``calls`` concurrently; each is a mapping with ``method``, ``url`` and request kwargs.
+
+        Results keep the order of ``calls``; failures are returned as exception
+        instances instead of being raised. ``send`` replaces :meth:`request`
+        for each call.
+        """
+
+        semaphore = asyncio.Semaphore(limit or self.max_concurrency)
+        send = send or self.request
+
+        async def _one(call: Mapping[str, Any]):
+            options = dict(call)
+            method = options.pop("method", "GET")
+            url = options.pop("url")
+            async with semaphore:
+                return await send(method, url, **options)
+
+        return await asyncio.gather(*(_one(call) for call in calls), return_exceptions=True)
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    # ------------------------------------------------------------------
+    # Sync facade
+    # ------------------------------------------------------------------
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        pid = os.getpid()
+        if self._loop is not None and self._loop_pid == pid and self._loop_thread.is_alive():
+            return self._loop
+
+        with self._lock:
+            if self._loop is not None and self._loop_pid == pid and self._loop_thread.is_alive():
+                return self._loop
+            # A loop inherited through fork has no thread driving it; start over.
+            self._clients = weakref.WeakKeyDictionary()
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="graph-async-loop", daemon=True)
+            thread.start()
+            self._loop, self._loop_thread, self._loop_pid = loop, thread, pid
+            return loop
+
+    def run_sync(self, coroutine, timeout: Optional[float] = None):
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coroutine.close()
+            raise RuntimeError("run_sync() cannot be called from the Graph transport loop")
+        future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        return future.result(timeout)
+
+    def request_sync(self, method: str, url: str, **kwargs):
+        timeout = kwargs.get("timeout", _DEFAULT_TIMEOUT)
+        wait = None if timeout is None else float(timeout) * (self.max_retries + 1) + 5
+        try:
+            return self.run_sync(self.request(method, url, **kwargs), timeout=wait)
+        except httpx.HTTPError as exc:
+            raise _translate_error(exc) from exc
+
+    def gather_sync(
+        self,
+        calls: Sequence[Mapping[str, Any]],
+        *,
+        limit: Optional[int] = None,
+        send: Optional[Callable[..., Awaitable[Any]]] = None,
+    ) -> List[Any]:
+        results = self.run_sync(self.gather(calls, limit=limit, send=send))
+        return [
+            _translate_error(result) if isinstance(result, httpx.HTTPError) else result
+            for result in results
+        ]
+
+    def close(self) -> None:
+        loop = self._loop
+        if loop is None or self._loop_pid != os.getpid():
+            return
+        client = self._clients.get(loop)
+        if client is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(5)
+            except Exception:  # pragma: no cover - best effort at shutdown
+                logger.debug("Failed to close async Graph client", exc_info=True)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+_TRANSPORT: Optional[AsyncGraphTransport] = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def get_async_transport() -> AsyncGraphTransport:
+    global _TRANSPORT
+    if _TRANSPORT is None:
+        with _TRANSPORT_LOCK:
+            if _TRANSPORT is None:
+                _TRANSPORT = AsyncGraphTransport()
+                atexit.register(_TRANSPORT.close)
+    return _TRANSPORT
+
+
+async def _rate_limited_request(method: str, url: str, *, priority: Optional[str] = None, **kwargs):
+    """Send one request through the shared Graph rate limiter.
+
+    ``rate_limit_cost`` and the throttling retries work as for
+    :func:`graph._http.graph_request`. The limiter blocks while it waits for a
+    token, so it runs off the event loop.
+    """
+
+    rate_limit_cost = kwargs.pop("rate_limit_cost", 1)
+
+    from ._rate_limit import GraphRateLimited, get_rate_limiter, is_rate_limited_url, rate_limit_enabled, retry_delay
+
+    transport = get_async_transport()
+    limiter = get_rate_limiter() if rate_limit_enabled() and is_rate_limited_url(url) else None
+    retries = transport.max_retries
+    response = None
+    while True:
+        if limiter is not None:
+            try:
+                await asyncio.to_thread(limiter.acquire, rate_limit_cost, priority)
+            except GraphRateLimited:
+                if response is None:
+                    raise
+                return response
+
+        response = await transport.request(method, url, **kwargs)
+        if limiter is not None:
+            await asyncio.to_thread(limiter.observe, response)
+
+        delay = retry_delay(response) if retries else None
+        if delay is None:
+            return response
+        retries -= 1
+        if limiter is None or response.status_code != 429:
+            await asyncio.sleep(delay)
+
+
+async def async_graph_request(method: str, url: str, **kwargs):
+    return await _rate_limited_request(method, url, **kwargs)
+
+
+async def gather_graph_requests(calls: Iterable[Mapping[str, Any]], *, limit: Optional[int] = None):
+    return await get_async_transport().gather(calls, limit=limit, send=_rate_limited_request)
+
+
+def graph_request_sync(method: str, url: str, **kwargs):
+    return get_async_transport().request_sync(method, url, **kwargs)
+
+
+def graph_request_many(
+    calls: Sequence[Mapping[str, Any]], *, limit: Optional[int] = None
+) -> List[Union[Any, requests.exceptions.RequestException]]:
+    """Synchronously run many Graph calls concurrently over the shared connections."""
+
+    from ._rate_limit import current_priority
+
+    # The calls run on the transport loop, which does not see this thread's priority.
+    send = functools.partial(_rate_limited_request, priority=current_priority())
+    return get_async_transport().gather_sync(calls, limit=limit, send=send)
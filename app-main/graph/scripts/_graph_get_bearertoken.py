@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 
 from ..models import ServiceToken
 from ._http import graph_request
+from ._token_broker import TokenBroker, TokenGrant, apply_grant, coerce_grant, parse_expires_in
 
 
 logger = logging.getLogger(__name__)
@@ -55,7 +56,11 @@ _LAST_REFRESH_FAILURE_STATE = {"timestamp": float("-inf")}
 
 
 def _generate_new_token():
-    """Generate a new Microsoft Graph access token using client credentials."""
+    """Request a new Microsoft Graph access token using client credentials.
+
+    Returns a :class:`TokenGrant` carrying the ``expires_in`` reported by the
+    token endpoint, or ``None`` on failure.
+    """
 
     # Ensure environment variables are loaded before attempting the request.
     env_path = os.getenv("APP_ENV_FILE", "/usr/src/project/.devcontainer/.env")
@@ -98,7 +103,8 @@ def _generate_new_token():
             token = payload.get("access_token")
             if not token:
                 logger.error("Graph v2 token response missing access_token field")
-            return token
+                return None
+            return TokenGrant(token, parse_expires_in(payload, DEFAULT_TOKEN_TTL_SECONDS))
 
         logger.error(
             "Graph v2 token endpoint returned %s: %s",
@@ -119,7 +125,8 @@ def _generate_new_token():
             token_v1 = payload_v1.get("access_token")
             if not token_v1:
                 logger.error("Graph v1 token response missing access_token field")
-            return token_v1
+                return None
+            return TokenGrant(token_v1, parse_expires_in(payload_v1, DEFAULT_TOKEN_TTL_SECONDS))
 
         logger.error(
             "Graph v1 token endpoint returned %s: %s",
@@ -173,15 +180,14 @@ def _refresh_token(token_obj):
             )
             return None
 
-    new_token = _generate_new_token()
-    if not new_token:
+    grant = coerce_grant(_generate_new_token(), DEFAULT_TOKEN_TTL_SECONDS)
+    if not grant:
         if TOKEN_REFRESH_BACKOFF_SECONDS:
             _LAST_REFRESH_FAILURE_STATE["timestamp"] = now
         return None
 
     _LAST_REFRESH_FAILURE_STATE["timestamp"] = float("-inf")
-    token_obj.access_token = new_token
-    token_obj.expires_at = timezone.now() + timedelta(seconds=DEFAULT_TOKEN_TTL_SECONDS)
+    apply_grant(token_obj, grant)
 
     if getattr(token_obj, "pk", None) is not None:
         try:
@@ -195,20 +201,24 @@ def _refresh_token(token_obj):
     return token_obj.access_token
 
 
+_BROKER = TokenBroker(
+    ServiceToken.Service.GRAPH,
+    load_record=_get_token_record,
+    refresh_record=_refresh_token,
+    min_validity_seconds=TOKEN_REFRESH_BUFFER_SECONDS,
+)
+
+
 def _get_bearertoken():
-    """Return a valid Graph access token, refreshing if needed."""
+    """Return a valid Graph access token from the in-process broker."""
 
-    token_obj = _get_token_record()
+    return _BROKER.get_token()
 
-    if token_obj.access_token and not token_obj.is_expired(buffer_seconds=TOKEN_REFRESH_BUFFER_SECONDS):
-        return token_obj.access_token
 
-    refreshed_token = _refresh_token(token_obj)
-    if refreshed_token:
-        return refreshed_token
+def _force_refresh_bearertoken():
+    """Rotate the Graph token immediately and return the new value."""
 
-    # Fall back to whatever is stored even if expired when refresh fails.
-    return token_obj.access_token
+    return _BROKER.force_refresh()
 
 
 def run():
@@ -1,27 +1,28 @@
 """Utilities for configuring HTTP requests to Microsoft Graph.
 
-This module provides a shared :func:`graph_request` helper that wraps the
-`requests` library with a connection pool configured to enforce a bounded
-number of retries.  Without this, transient DNS or connectivity issues may
-cause the default urllib3 behaviour to retry several times before surfacing a
-``Max retries exceeded`` error.  By centralising the configuration we ensure
-that every Graph request honours the same retry policy and that the limits can
-be tuned through environment variables when necessary.
+This module provides a shared :func:`graph_request` helper. Requests go over
+the HTTP/2 transport in :mod:`graph.scripts._async_http` when it is enabled,
+otherwise over the ``graph`` upstream of the shared pooled client in
+:mod:`utils.http_client`, which enforces a bounded number of retries
+(``GRAPH_HTTP_MAX_RETRIES``/``GRAPH_HTTP_BACKOFF_FACTOR``). Either way the
+call is counted in the ``graph`` upstream metrics.
+
+Throttled responses (429/503 with ``Retry-After``) are not retried by the
+transports: :func:`graph_request` reports each one to the shared rate limiter
+and retries through it, up to the same number of retries.
 """
 
 from __future__ import annotations
 
 import os
-from functools import lru_cache
+import time
 
 import requests
 from requests import Response
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
 
-_DEFAULT_MAX_RETRIES = 1
-_DEFAULT_BACKOFF = 0.1
-_ALLOWED_METHODS = frozenset({"DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT"})
+from utils.http_client import get_http_client, get_upstream_config
+
+UPSTREAM = "graph"
 
 
 def _read_int(env_name: str, default: int) -> int:
@@ -50,34 +51,6 @@ def _read_float(env_name: str, default: float) -> float:
     return max(0.0, value)
 
 
-@lru_cache(maxsize=1)
-def _get_session() -> requests.Session:
-    """Return a cached ``requests.Session`` configured for Graph API calls."""
-
-    max_retries = _read_int("GRAPH_HTTP_MAX_RETRIES", _DEFAULT_MAX_RETRIES)
-    backoff_factor = _read_float("GRAPH_HTTP_BACKOFF_FACTOR", _DEFAULT_BACKOFF)
-
-    if max_retries == 0:
-        backoff_factor = 0.0
-
-    retry_config = Retry(
-        total=max_retries,
-        connect=max_retries,
-        read=max_retries,
-        status=max_retries,
-        allowed_methods=_ALLOWED_METHODS,
-        backoff_factor=backoff_factor,
-        respect_retry_after_header=True,
-        raise_on_status=False,
-    )
-
-    adapter = HTTPAdapter(max_retries=retry_config)
-    session = requests.Session()
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
-    return session
-
-
 def graph_request(method: str, url: str, *args, **kwargs) -> Response:
     """Send an HTTP request using the shared Graph session.
 
@@ -88,15 +61,73 @@ def graph_request(method: str, url: str, *args, **kwargs) -> Response:
     url:
         The request URL.
     *args, **kwargs:
-        Additional arguments forwarded to :meth:`requests.Session.request`.
+        Additional arguments forwarded to
+        :meth:`utils.http_client.OutboundHTTPClient.request`.
+        ``rate_limit_cost`` (default 1) is the number of rate limiter tokens
+        the request takes, e.g. the number of sub-requests in a ``$batch``.
 
     Returns
     -------
-    requests.Response
-        The HTTP response generated by the request.
+    requests.Response or httpx.Response
+        The HTTP response generated by the request. When
+        ``GRAPH_HTTP2_ENABLED`` is on (the default when ``httpx`` is
+        installed) the request is multiplexed over the shared HTTP/2 client in
+        :mod:`graph.scripts._async_http`; both response types expose the
+        ``status_code``/``headers``/``json()``/``text``/``content`` used here.
+
+    Raises
+    ------
+    graph.scripts._rate_limit.GraphRateLimited
+        When the shared Graph rate limiter has no capacity within the
+        caller's priority (see :func:`graph.scripts._rate_limit.graph_priority`).
     """
 
-    session = _get_session()
-    return session.request(method=method.upper(), url=url, *args, **kwargs)
+    rate_limit_cost = kwargs.pop("rate_limit_cost", 1)
+
+    from ._rate_limit import GraphRateLimited, get_rate_limiter, is_rate_limited_url, rate_limit_enabled, retry_delay
+
+    limiter = get_rate_limiter() if rate_limit_enabled() and is_rate_limited_url(url) else None
+    retries = get_upstream_config(UPSTREAM).max_retries
+    response = None
+    while True:
+        if limiter is not None:
+            try:
+                limiter.acquire(rate_limit_cost)
+            except GraphRateLimited:
+                # Retries only wait as long as the caller's priority allows.
+                if response is None:
+                    raise
+                return response
+
+        response = _send(method, url, *args, **kwargs)
+        if limiter is not None:
+            limiter.observe(response)
+
+        delay = retry_delay(response) if retries else None
+        if delay is None:
+            return response
+        retries -= 1
+        # A 429 blocks the shared bucket for Retry-After; anything else waits here.
+        if limiter is None or response.status_code != 429:
+            time.sleep(delay)
+
+
+def _send(method: str, url: str, *args, **kwargs) -> Response:
+    client = get_http_client()
+    if not args:
+        from ._async_http import async_transport_enabled, graph_request_sync
+
+        if async_transport_enabled():
+            metrics = client.metrics(UPSTREAM)
+            started = time.perf_counter()
+            try:
+                response = graph_request_sync(method, url, **kwargs)
+            except requests.exceptions.RequestException:
+                metrics.record(time.perf_counter() - started, error=True)
+                raise
+            metrics.record(time.perf_counter() - started)
+            return response
+
+    return client.request(UPSTREAM, method, url, *args, **kwargs)
 
 
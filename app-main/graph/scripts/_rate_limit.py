@@ -0,0 +1,334 @@
+"""Adaptive rate limiting shared by every worker that talks to Microsoft Graph.
+
+Graph throttles per application, but urllib3's ``Retry-After`` handling only
+pauses the worker that received the ``429``; every other gunicorn worker keeps
+sending requests into the throttle. :class:`GraphRateLimiter` puts one token
+bucket in front of all Graph traffic instead:
+
+* the bucket lives in Redis (``django_redis``) so all workers share it, and
+  falls back to an in-process bucket when no Redis cache is configured or
+  Redis is unavailable;
+* a ``429`` halves the refill rate (down to ``GRAPH_RATE_LIMIT_MIN_RATE``) and
+  blocks the bucket until ``Retry-After`` has passed; every successful
+  response adds ``GRAPH_RATE_LIMIT_RECOVERY`` requests/second back, up to
+  ``GRAPH_RATE_LIMIT_RATE``;
+* callers wait for a token according to their priority. Interactive requests
+  (the default) may use the whole bucket but only queue for
+  ``GRAPH_RATE_LIMIT_INTERACTIVE_MAX_WAIT`` seconds; batch requests (see
+  :func:`graph_priority`) leave ``GRAPH_RATE_LIMIT_BATCH_RESERVE`` of the burst
+  to interactive callers and may queue for longer. A caller that would have to
+  wait beyond its limit gets :class:`GraphRateLimited` straight away.
+
+Throttled responses are retried by the Graph request helpers rather than by
+the HTTP transports, so every ``429`` reaches the limiter (see
+:func:`retry_delay`).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from ._http import _read_float
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+
+_DEFAULT_RETRY_AFTER = 5.0
+# Statuses urllib3 retries when the response carries Retry-After.
+RETRY_AFTER_STATUSES = frozenset({413, 429, 503})
+# Upper bound on a single Retry-After wait so a bogus header cannot park a caller.
+_MAX_RETRY_AFTER = 60.0
+_KEY_TTL_SECONDS = 3600
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("graph_priority", default=PRIORITY_INTERACTIVE)
+
+
+class GraphRateLimited(requests.exceptions.RequestException):
+    """Raised when a request would have to wait longer than its priority allows."""
+
+    def __init__(self, retry_after: float, priority: str):
+        self.retry_after = retry_after
+        self.priority = priority
+        super().__init__(
+            f"Microsoft Graph rate limit reached; retry in {retry_after:.1f}s ({priority} priority)"
+        )
+
+
+class PriorityPolicy(NamedTuple):
+    reserve: float  # fraction of the burst this priority must leave untouched
+    max_wait: float  # seconds a caller may queue for a token
+
+
+@contextmanager
+def graph_priority(priority: str):
+    """Send the Graph requests made inside the block with ``priority``.
+
+    The priority is a context variable, so worker threads started inside the
+    block do not inherit it; enter the block in the worker itself.
+    """
+
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def parse_retry_after(value, default: float = _DEFAULT_RETRY_AFTER) -> float:
+    """Return the delay requested by a ``Retry-After`` header (seconds or HTTP date)."""
+
+    if value in (None, ""):
+        return default
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return default
+
+
+def retry_delay(response) -> Optional[float]:
+    """Return the seconds to wait before retrying ``response``, or ``None`` when it is final."""
+
+    if getattr(response, "status_code", None) not in RETRY_AFTER_STATUSES:
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is None:
+        return None
+    return min(parse_retry_after(retry_after), _MAX_RETRY_AFTER)
+
+
+class LocalBucketBackend:
+    """In-process bucket with the same arithmetic as the Redis script."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, float]] = {}
+
+    def _load(self, key, now, max_rate, burst):
+        state = self._state.get(key)
+        if state is None:
+            state = self._state[key] = {"tokens": burst, "ts": now, "rate": max_rate, "blocked": 0.0}
+        return state
+
+    def try_acquire(self, key, now, max_rate, burst, reserve, cost) -> float:
+        with self._lock:
+            state = self._load(key, now, max_rate, burst)
+            if now < state["blocked"]:
+                return state["blocked"] - now
+            rate = min(state["rate"], max_rate)
+            tokens = min(burst, state["tokens"] + max(0.0, now - state["ts"]) * rate)
+            state["ts"] = now
+            if tokens - cost >= reserve:
+                state["tokens"] = tokens - cost
+                return 0.0
+            state["tokens"] = tokens
+            return (reserve + cost - tokens) / rate
+
+    def report(self, key, now, max_rate, burst, min_rate, throttled, retry_after, recovery) -> float:
+        with self._lock:
+            state = self._load(key, now, max_rate, burst)
+            if throttled:
+                state["rate"] = max(min_rate, min(state["rate"], max_rate) / 2)
+                state["blocked"] = max(state["blocked"], now + retry_after)
+                # Tokens only start to refill once the block is over.
+                state["tokens"] = 0.0
+                state["ts"] = state["blocked"]
+            else:
+                state["rate"] = min(max_rate, state["rate"] + recovery)
+            return state["rate"]
+
+
+_ACQUIRE_SCRIPT = """
+local now, max_rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local reserve, cost, ttl = tonumber(ARGV[4]), tonumber(ARGV[5]), tonumber(ARGV[6])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'rate', 'blocked')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+local rate = math.min(tonumber(state[3]) or max_rate, max_rate)
+local blocked = tonumber(state[4]) or 0
+if now < blocked then
+    return tostring(blocked - now)
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens - cost >= reserve then
+    tokens = tokens - cost
+else
+    wait = (reserve + cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now), 'rate', tostring(rate))
+redis.call('EXPIRE', KEYS[1], ttl)
+return tostring(wait)
+"""
+
+_REPORT_SCRIPT = """
+local now, max_rate, burst, min_rate = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local throttled, retry_after, recovery, ttl = ARGV[5] == '1', tonumber(ARGV[6]), tonumber(ARGV[7]), tonumber(ARGV[8])
+local rate = math.min(tonumber(redis.call('HGET', KEYS[1], 'rate')) or max_rate, max_rate)
+if throttled then
+    rate = math.max(min_rate, rate / 2)
+    local blocked = math.max(tonumber(redis.call('HGET', KEYS[1], 'blocked')) or 0, now + retry_after)
+    redis.call('HSET', KEYS[1], 'rate', tostring(rate), 'blocked', tostring(blocked), 'tokens', '0', 'ts', tostring(blocked))
+else
+    rate = math.min(max_rate, rate + recovery)
+    redis.call('HSET', KEYS[1], 'rate', tostring(rate))
+end
+redis.call('EXPIRE', KEYS[1], ttl)
+return tostring(rate)
+"""
+
+
+class RedisBucketBackend:
+    """Bucket state in one Redis hash, updated atomically by Lua scripts."""
+
+    def __init__(self, client):
+        self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+        self._report = client.register_script(_REPORT_SCRIPT)
+
+    def try_acquire(self, key, now, max_rate, burst, reserve, cost) -> float:
+        return float(self._acquire(keys=[key], args=[now, max_rate, burst, reserve, cost, _KEY_TTL_SECONDS]))
+
+    def report(self, key, now, max_rate, burst, min_rate, throttled, retry_after, recovery) -> float:
+        args = [now, max_rate, burst, min_rate, 1 if throttled else 0, retry_after, recovery, _KEY_TTL_SECONDS]
+        return float(self._report(keys=[key], args=args))
+
+
+def _shared_backend():
+    """Return a Redis backend when the default cache is ``django_redis``."""
+
+    try:
+        from django.conf import settings
+
+        if not settings.CACHES.get("default", {}).get("BACKEND", "").startswith("django_redis"):
+            return None
+        from django_redis import get_redis_connection
+
+        return RedisBucketBackend(get_redis_connection("default"))
+    except Exception:
+        logger.warning("Graph rate limiter could not use Redis; falling back to a local bucket", exc_info=True)
+        return None
+
+
+class GraphRateLimiter:
+    def __init__(
+        self,
+        name: str = "graph",
+        *,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        recovery: Optional[float] = None,
+        policies: Optional[Dict[str, PriorityPolicy]] = None,
+        backend=None,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        self.key = f"graph:rate_limit:{name}"
+        self.rate = rate if rate is not None else max(0.1, _read_float("GRAPH_RATE_LIMIT_RATE", 50.0))
+        self.burst = burst if burst is not None else max(1.0, _read_float("GRAPH_RATE_LIMIT_BURST", self.rate * 2))
+        self.min_rate = min(self.rate, min_rate if min_rate is not None else max(0.1, _read_float("GRAPH_RATE_LIMIT_MIN_RATE", 2.0)))
+        self.recovery = recovery if recovery is not None else _read_float("GRAPH_RATE_LIMIT_RECOVERY", 0.1)
+        self.policies = policies or {
+            PRIORITY_INTERACTIVE: PriorityPolicy(0.0, _read_float("GRAPH_RATE_LIMIT_INTERACTIVE_MAX_WAIT", 2.0)),
+            PRIORITY_BATCH: PriorityPolicy(
+                min(0.9, _read_float("GRAPH_RATE_LIMIT_BATCH_RESERVE", 0.3)),
+                _read_float("GRAPH_RATE_LIMIT_BATCH_MAX_WAIT", 30.0),
+            ),
+        }
+        self._local = LocalBucketBackend()
+        self._backend = backend
+        self._backend_resolved = backend is not None
+        self._clock = clock
+        self._sleep = sleep
+
+    def _get_backend(self):
+        if not self._backend_resolved:
+            self._backend = _shared_backend()
+            self._backend_resolved = True
+        return self._backend or self._local
+
+    def _call(self, method: str, *args):
+        backend = self._get_backend()
+        try:
+            return getattr(backend, method)(self.key, *args)
+        except Exception:
+            if backend is self._local:
+                raise
+            logger.debug("Redis rate limiter unavailable; using the local bucket", exc_info=True)
+            return getattr(self._local, method)(self.key, *args)
+
+    def acquire(self, cost: float = 1, priority: Optional[str] = None) -> float:
+        """Take ``cost`` tokens, waiting as long as the priority allows. Returns the time waited."""
+
+        priority = priority or current_priority()
+        policy = self.policies.get(priority) or self.policies[PRIORITY_INTERACTIVE]
+        cost = min(float(cost), self.burst)
+        reserve = min(policy.reserve * self.burst, self.burst - cost)
+        started = self._clock()
+        while True:
+            now = self._clock()
+            wait = self._call("try_acquire", now, self.rate, self.burst, reserve, cost)
+            if wait <= 0:
+                return now - started
+            waited = now - started
+            if waited + wait > policy.max_wait:
+                raise GraphRateLimited(wait, priority)
+            self._sleep(wait)
+
+    def observe_throttle(self, retry_after: float) -> None:
+        rate = self._call(
+            "report", self._clock(), self.rate, self.burst, self.min_rate, True, retry_after, self.recovery
+        )
+        logger.warning("Microsoft Graph throttled us; pausing %.1fs and lowering the rate to %.1f/s", retry_after, rate)
+
+    def observe(self, response) -> None:
+        """Adapt the rate to a Graph response."""
+
+        status_code = getattr(response, "status_code", None)
+        if status_code == 429:
+            self.observe_throttle(parse_retry_after(response.headers.get("Retry-After")))
+        elif status_code is not None and status_code < 500 and self.recovery:
+            self._call("report", self._clock(), self.rate, self.burst, self.min_rate, False, 0, self.recovery)
+
+
+def rate_limit_enabled() -> bool:
+    raw_value = os.getenv("GRAPH_RATE_LIMIT_ENABLED")
+    return True if raw_value is None else raw_value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def is_rate_limited_url(url: str) -> bool:
+    hosts = os.getenv("GRAPH_RATE_LIMIT_HOSTS") or "graph.microsoft.com"
+    host = (urlsplit(url).hostname or "").lower()
+    return host in {entry.strip().lower() for entry in hosts.split(",") if entry.strip()}
+
+
+_LIMITER: Optional[GraphRateLimiter] = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> GraphRateLimiter:
+    global _LIMITER
+    if _LIMITER is None:
+        with _LIMITER_LOCK:
+            if _LIMITER is None:
+                _LIMITER = GraphRateLimiter()
+    return _LIMITER
@@ -0,0 +1,229 @@
+"""Process-local broker for service bearer tokens.
+
+Looking up a token used to mean a locked ``ServiceToken`` read on every Graph
+or Defender call. The broker keeps the current token in process memory and
+only goes back to the database when a worker starts (to adopt the persisted
+token) or when the token is rotated.
+
+Rotation happens in a background thread once ``SERVICE_TOKEN_REFRESH_RATIO``
+(default 80%) of the token lifetime reported by ``expires_in`` has elapsed, so
+callers never wait on the identity provider while a valid token exists. A
+short-lived lock in the Django cache elects one refresher across workers; the
+others re-read the rotated row from the database a moment later instead of
+requesting their own token.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, NamedTuple, Optional, Union
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _read_float(env_name: str, default: float, *, minimum: float = 0.0, maximum: Optional[float] = None) -> float:
+    raw_value = os.getenv(env_name)
+    try:
+        value = float(raw_value) if raw_value not in (None, "") else default
+    except (TypeError, ValueError):
+        value = default
+    value = max(minimum, value)
+    if maximum is not None:
+        value = min(maximum, value)
+    return value
+
+
+REFRESH_RATIO = _read_float("SERVICE_TOKEN_REFRESH_RATIO", 0.8, minimum=0.1, maximum=0.95)
+REFRESH_LOCK_SECONDS = _read_float("SERVICE_TOKEN_REFRESH_LOCK_SECONDS", 30.0, minimum=1.0)
+# How long a worker that lost the refresh election waits before re-reading the row.
+FOLLOWER_RETRY_SECONDS = _read_float("SERVICE_TOKEN_FOLLOWER_RETRY_SECONDS", 5.0, minimum=0.5)
+
+
+class TokenGrant(NamedTuple):
+    access_token: str
+    expires_in: int
+
+
+def coerce_grant(value: Union[TokenGrant, str, None], default_ttl: int) -> Optional[TokenGrant]:
+    """Normalise a token endpoint result into a :class:`TokenGrant`."""
+
+    if not value:
+        return None
+    if isinstance(value, TokenGrant):
+        return value
+    return TokenGrant(str(value), default_ttl)
+
+
+def parse_expires_in(payload: dict, default_ttl: int) -> int:
+    """Return ``expires_in`` from a token response, falling back to ``default_ttl``."""
+
+    try:
+        expires_in = int(payload.get("expires_in"))
+    except (TypeError, ValueError):
+        return default_ttl
+    return expires_in if expires_in > 0 else default_ttl
+
+
+def apply_grant(token_obj, grant: TokenGrant) -> None:
+    token_obj.access_token = grant.access_token
+    token_obj.expires_at = timezone.now() + timedelta(seconds=grant.expires_in)
+
+
+class TokenBroker:
+    """Serve a service token from memory and rotate it ahead of expiry.
+
+    ``load_record`` returns the persisted token row (or an ephemeral stand-in)
+    and ``refresh_record`` requests a new token, stores it on the row and
+    returns the access token, or ``None`` on failure.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        *,
+        load_record: Callable[[], object],
+        refresh_record: Callable[[object], Optional[str]],
+        min_validity_seconds: int = 120,
+        refresh_ratio: float = REFRESH_RATIO,
+    ):
+        self.service = service
+        self._load_record = load_record
+        self._refresh_record = refresh_record
+        self.min_validity_seconds = max(0, int(min_validity_seconds))
+        self.refresh_ratio = refresh_ratio
+        self._lock = threading.Lock()
+        self._token = ""
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._refresher: Optional[threading.Thread] = None
+        self._refresher_pid: Optional[int] = None
+
+    @property
+    def _lock_key(self) -> str:
+        return f"service_token:refresh_lock:{self.service}"
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get_token(self) -> str:
+        now = time.time()
+        token = self._token
+        if token and now < self._expires_at - self.min_validity_seconds:
+            if now >= self._refresh_at:
+                self._start_background_refresh()
+            return token
+
+        with self._lock:
+            now = time.time()
+            if self._token and now < self._expires_at - self.min_validity_seconds:
+                return self._token
+            self._rotate(force=False, wait_for_leader=False)
+            # Fall back to whatever we have even if expired when refresh fails.
+            return self._token
+
+    def force_refresh(self) -> str:
+        """Rotate the token now, regardless of its remaining lifetime."""
+
+        with self._lock:
+            self._rotate(force=True, wait_for_leader=False)
+            return self._token
+
+    def reset(self) -> None:
+        with self._lock:
+            self._token = ""
+            self._expires_at = 0.0
+            self._refresh_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _adopt(self, token_obj) -> None:
+        now = time.time()
+        expires_at = token_obj.expires_at.timestamp()
+        self._token = token_obj.access_token or ""
+        self._expires_at = expires_at
+        self._refresh_at = now + max(0.0, expires_at - now) * self.refresh_ratio
+
+    def _record_is_usable(self, token_obj) -> bool:
+        return bool(token_obj.access_token) and not token_obj.is_expired(buffer_seconds=self.min_validity_seconds)
+
+    def _acquire_leadership(self) -> bool:
+        try:
+            return bool(cache.add(self._lock_key, os.getpid(), timeout=REFRESH_LOCK_SECONDS))
+        except Exception:
+            logger.debug("Unable to take %s token refresh lock", self.service, exc_info=True)
+            return True
+
+    def _release_leadership(self) -> None:
+        try:
+            cache.delete(self._lock_key)
+        except Exception:
+            logger.debug("Unable to release %s token refresh lock", self.service, exc_info=True)
+
+    def _rotate(self, *, force: bool, wait_for_leader: bool) -> None:
+        """Adopt a newer persisted token or request a fresh one. Caller holds ``_lock``."""
+
+        is_leader = self._acquire_leadership()
+        try:
+            token_obj = self._load_record()
+
+            rotated_elsewhere = token_obj.access_token and token_obj.access_token != self._token
+            if not force and self._record_is_usable(token_obj) and (rotated_elsewhere or not self._token):
+                self._adopt(token_obj)
+                return
+
+            if not is_leader and wait_for_leader:
+                # Another worker is rotating the token; pick its result up shortly.
+                self._refresh_at = time.time() + FOLLOWER_RETRY_SECONDS
+                return
+
+            if self._refresh_record(token_obj):
+                self._adopt(token_obj)
+                logger.info("Rotated %s access token; valid until %s", self.service, token_obj.expires_at)
+            elif self._token:
+                self._refresh_at = time.time() + FOLLOWER_RETRY_SECONDS
+            elif token_obj.access_token:
+                self._adopt(token_obj)
+        finally:
+            if is_leader:
+                self._release_leadership()
+
+    def _start_background_refresh(self) -> None:
+        pid = os.getpid()
+        refresher = self._refresher
+        if refresher is not None and refresher.is_alive() and self._refresher_pid == pid:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if self._refresher is not None and self._refresher.is_alive() and self._refresher_pid == pid:
+                return
+            self._refresher_pid = pid
+            self._refresher = threading.Thread(
+                target=self._background_refresh,
+                name=f"{self.service}-token-refresh",
+                daemon=True,
+            )
+            self._refresher.start()
+        finally:
+            self._lock.release()
+
+    def _background_refresh(self) -> None:
+        try:
+            with self._lock:
+                if time.time() < self._refresh_at:
+                    return
+                self._rotate(force=False, wait_for_leader=True)
+        except Exception:
+            logger.exception("Background %s token refresh failed", self.service)
+            self._refresh_at = time.time() + FOLLOWER_RETRY_SECONDS
+        finally:
+            connection.close()
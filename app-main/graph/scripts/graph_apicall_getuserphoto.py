@@ -17,15 +17,33 @@ def _error_response(message: str, *, status: int = 503, code: str = "RequestErro
     return {"error": {"code": code, "message": message}}, status, None
 
 
-def get_user_photo(user_principal_name: str) -> Tuple[bytes | Dict[str, object], int, str | None]:
+# Sizes Microsoft Graph pre-renders; anything else is rejected by the service.
+PHOTO_SIZES = ("48x48", "64x64", "96x96", "120x120", "240x240", "360x360", "432x432", "504x504", "648x648")
+
+
+def build_photo_path(user_principal_name: str, size: str | None = None) -> str:
+    """Return the Graph path (relative to ``/v1.0``) for a user's photo."""
+
+    if size:
+        return f"/users/{user_principal_name}/photos/{size}/$value"
+    return f"/users/{user_principal_name}/photo/$value"
+
+
+def get_user_photo(user_principal_name: str, size: str | None = None) -> Tuple[bytes | Dict[str, object], int, str | None]:
     """Return the raw profile photo for ``user_principal_name``.
 
     The response mirrors the :mod:`graph.services` convention by returning a
     payload plus HTTP status code. On success the payload is raw image bytes.
     For errors the payload contains the parsed JSON response, falling back to a
     minimal structure when the service returns non-JSON data.
+
+    ``size`` selects one of the smaller pre-rendered variants (see
+    :data:`PHOTO_SIZES`); by default the full-size photo is returned.
     """
 
+    if size and size not in PHOTO_SIZES:
+        return _error_response(f"Unsupported photo size {size}", status=400, code="InvalidPhotoSize")
+
     token = _get_bearertoken()
     if not token:
         return _error_response("Failed to acquire access token", code="AuthTokenUnavailable")
@@ -35,7 +53,7 @@ def get_user_photo(user_principal_name: str) -> Tuple[bytes | Dict[str, object],
         "Accept": "image/*",
     }
 
-    url = f"https://graph.microsoft.com/v1.0/users/{user_principal_name}/photo/$value"
+    url = f"https://graph.microsoft.com/v1.0{build_photo_path(user_principal_name, size)}"
 
     try:
         response = graph_request("GET", url, headers=headers, timeout=20)
@@ -32,7 +32,7 @@ from ._http import graph_request
 dotenv_path = '/usr/src/project/.devcontainer/.env'
 load_dotenv(dotenv_path=dotenv_path)
 
-def run_hunting_query(query):
+def run_hunting_query(query, timeout=20):
 
 
 
@@ -51,7 +51,7 @@ def run_hunting_query(query):
     api_endpoint = "https://graph.microsoft.com/v1.0/security/runHuntingQuery"  # Replace with your actual endpoint
 
     # Make the request
-    response = graph_request("POST", api_endpoint, headers=headers, json={"Query": query}, timeout=20)
+    response = graph_request("POST", api_endpoint, headers=headers, json={"Query": query}, timeout=timeout)
 
     return response, response.status_code
 
@@ -0,0 +1,70 @@
+"""Iterate Microsoft Graph ``/users/delta`` pages.
+
+https://learn.microsoft.com/en-us/graph/api/user-delta?view=graph-rest-1.0
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+
+from ._graph_get_bearertoken import _get_bearertoken
+from ._http import graph_request
+
+logger = logging.getLogger(__name__)
+
+USERS_DELTA_URL = "https://graph.microsoft.com/v1.0/users/delta"
+
+
+class UserDeltaError(RuntimeError):
+    """Raised when a delta round cannot be completed."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class DeltaTokenExpired(UserDeltaError):
+    """The stored delta link is no longer accepted; a full sync is required."""
+
+
+def build_initial_url(select_fields: Sequence[str]) -> str:
+    return f"{USERS_DELTA_URL}?$select={','.join(select_fields)}"
+
+
+def iter_user_delta_pages(start_url: str, *, timeout: float = 60) -> Iterator[Tuple[List[Dict], Optional[str]]]:
+    """Yield ``(users, delta_link)`` for each page starting at ``start_url``.
+
+    ``delta_link`` is ``None`` until the final page, which carries the
+    ``@odata.deltaLink`` to resume from next time.
+    """
+
+    token = _get_bearertoken()
+    if not token:
+        raise UserDeltaError("Failed to acquire access token")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    next_url: Optional[str] = start_url
+    while next_url:
+        try:
+            response = graph_request("GET", next_url, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException as exc:
+            raise UserDeltaError(f"Microsoft Graph users delta request failed: {exc}") from exc
+
+        if response.status_code == 410:
+            raise DeltaTokenExpired("The users delta token has expired", 410)
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        if response.status_code != 200 or not isinstance(data, dict):
+            raise UserDeltaError(
+                f"Microsoft Graph users delta returned status {response.status_code}",
+                response.status_code,
+            )
+
+        delta_link = data.get("@odata.deltaLink")
+        yield data.get("value") or [], delta_link
+        next_url = data.get("@odata.nextLink")
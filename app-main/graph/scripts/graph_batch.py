@@ -0,0 +1,281 @@
+"""Microsoft Graph JSON batching.
+
+Packs up to 20 Graph sub-requests into one ``POST /$batch`` call and hands
+each sub-response back to its caller. Sub-requests answered with ``429`` are
+resent on their own after the largest ``Retry-After`` in the batch; every
+other status is returned as-is.
+
+https://learn.microsoft.com/en-us/graph/json-batching
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+from ._graph_get_bearertoken import _get_bearertoken
+from ._http import _read_float, _read_int, graph_request
+from ._rate_limit import get_rate_limiter, rate_limit_enabled
+from .graph_apicall_getuserphoto import build_photo_path
+
+logger = logging.getLogger(__name__)
+
+GRAPH_BATCH_URL = "https://graph.microsoft.com/v1.0/$batch"
+# Hard limit imposed by Microsoft Graph.
+MAX_BATCH_SIZE = 20
+
+_MAX_THROTTLE_RETRIES = _read_int("GRAPH_BATCH_MAX_RETRIES", 3)
+_MAX_RETRY_AFTER_SECONDS = _read_float("GRAPH_BATCH_MAX_RETRY_AFTER", 10.0)
+_DEFAULT_RETRY_AFTER_SECONDS = 1.0
+
+
+@dataclass
+class GraphBatchRequest:
+    """A single sub-request; ``url`` is relative to the Graph version root."""
+
+    id: str
+    url: str
+    method: str = "GET"
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Optional[object] = None
+
+    def as_payload(self) -> dict:
+        payload = {"id": self.id, "method": self.method.upper(), "url": self.url}
+        headers = dict(self.headers)
+        if self.body is not None:
+            payload["body"] = self.body
+            headers.setdefault("Content-Type", "application/json")
+        if headers:
+            payload["headers"] = headers
+        return payload
+
+
+@dataclass
+class GraphBatchResponse:
+    id: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: object = None
+
+    @property
+    def content_type(self) -> Optional[str]:
+        for key, value in self.headers.items():
+            if key.lower() == "content-type":
+                return value
+        return None
+
+    def retry_after(self) -> float:
+        for key, value in self.headers.items():
+            if key.lower() == "retry-after":
+                try:
+                    return max(0.0, float(value))
+                except (TypeError, ValueError):
+                    break
+        return _DEFAULT_RETRY_AFTER_SECONDS
+
+    def binary_body(self) -> Optional[bytes]:
+        """Return the decoded body of a binary sub-response (Graph base64-encodes it)."""
+
+        if isinstance(self.body, (bytes, bytearray)):
+            return bytes(self.body)
+        if isinstance(self.body, str):
+            try:
+                return base64.b64decode(self.body)
+            except (ValueError, TypeError):
+                return None
+        return None
+
+
+def _error(request_id: str, message: str, *, code: str = "RequestError", status: int = 503) -> GraphBatchResponse:
+    return GraphBatchResponse(request_id, status, {}, {"error": {"code": code, "message": message}})
+
+
+def _chunks(items: Sequence[GraphBatchRequest], size: int) -> Iterable[Sequence[GraphBatchRequest]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class GraphBatchClient:
+    def __init__(
+        self,
+        *,
+        max_retries: int = _MAX_THROTTLE_RETRIES,
+        max_retry_after: float = _MAX_RETRY_AFTER_SECONDS,
+        timeout: float = 20,
+        sleep=time.sleep,
+    ):
+        self.max_retries = max(0, int(max_retries))
+        self.max_retry_after = max(0.0, float(max_retry_after))
+        self.timeout = timeout
+        self._sleep = sleep
+
+    def execute(self, batch_requests: Sequence[GraphBatchRequest]) -> Dict[str, GraphBatchResponse]:
+        """Send ``batch_requests`` and return their responses keyed by request id."""
+
+        ids = [item.id for item in batch_requests]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Graph batch request ids must be unique")
+
+        results: Dict[str, GraphBatchResponse] = {}
+        if not batch_requests:
+            return results
+
+        token = _get_bearertoken()
+        if not token:
+            logger.warning("Unable to acquire Microsoft Graph token for batch request")
+            for item in batch_requests:
+                results[item.id] = _error(item.id, "Failed to acquire access token", code="AuthTokenUnavailable")
+            return results
+
+        for chunk in _chunks(list(batch_requests), MAX_BATCH_SIZE):
+            results.update(self._execute_chunk(chunk, token))
+        return results
+
+    def _execute_chunk(self, chunk: Sequence[GraphBatchRequest], token: str) -> Dict[str, GraphBatchResponse]:
+        results: Dict[str, GraphBatchResponse] = {}
+        pending: List[GraphBatchRequest] = list(chunk)
+        attempt = 0
+
+        while pending:
+            responses = self._post(pending, token)
+            throttled = [item for item in pending if responses[item.id].status == 429]
+            for item in pending:
+                results[item.id] = responses[item.id]
+
+            if not throttled or attempt >= self.max_retries:
+                break
+
+            attempt += 1
+            delay = min(self.max_retry_after, max(responses[item.id].retry_after() for item in throttled))
+            if rate_limit_enabled():
+                get_rate_limiter().observe_throttle(delay)
+            logger.info(
+                "Microsoft Graph throttled %s of %s batch sub-requests; retrying in %.1fs (attempt %s)",
+                len(throttled),
+                len(pending),
+                delay,
+                attempt,
+            )
+            if delay:
+                self._sleep(delay)
+            pending = throttled
+
+        return results
+
+    def _post(self, pending: Sequence[GraphBatchRequest], token: str) -> Dict[str, GraphBatchResponse]:
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+        payload = {"requests": [item.as_payload() for item in pending]}
+
+        try:
+            response = graph_request(
+                "POST",
+                GRAPH_BATCH_URL,
+                headers=headers,
+                json=payload,
+                timeout=self.timeout,
+                rate_limit_cost=len(pending),
+            )
+        except requests.exceptions.RequestException as exc:
+            logger.warning("Microsoft Graph batch request failed: %s", exc)
+            return {item.id: _error(item.id, str(exc)) for item in pending}
+
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            return {
+                item.id: GraphBatchResponse(item.id, 429, {"Retry-After": retry_after}, None)
+                for item in pending
+            }
+
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+
+        if response.status_code != 200 or not isinstance(data, dict):
+            logger.warning("Microsoft Graph batch endpoint returned %s", response.status_code)
+            body = data if isinstance(data, dict) else {"raw": response.text}
+            return {item.id: GraphBatchResponse(item.id, response.status_code, {}, body) for item in pending}
+
+        results: Dict[str, GraphBatchResponse] = {}
+        for entry in data.get("responses") or []:
+            request_id = str(entry.get("id"))
+            try:
+                status = int(entry.get("status"))
+            except (TypeError, ValueError):
+                status = 502
+            results[request_id] = GraphBatchResponse(
+                request_id,
+                status,
+                dict(entry.get("headers") or {}),
+                entry.get("body"),
+            )
+
+        for item in pending:
+            if item.id not in results:
+                results[item.id] = _error(item.id, "Missing sub-response in Microsoft Graph batch", status=502)
+        return results
+
+
+_CLIENT: Optional[GraphBatchClient] = None
+
+
+def get_batch_client() -> GraphBatchClient:
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = GraphBatchClient()
+    return _CLIENT
+
+
+def get_user_mfa_overview(
+    user_principal_name: str,
+    select_parameters: Optional[str] = None,
+    photo_size: Optional[str] = None,
+    *,
+    include_profile: bool = True,
+) -> dict:
+    """Load profile, photo and authentication methods for a user in one round trip.
+
+    Each entry mirrors the return value of its single-call counterpart:
+    ``profile`` and ``methods`` are ``(data, status)`` and ``photo`` is
+    ``(payload, status, content_type)``. With ``include_profile=False`` the
+    profile request is left out (the caller already has it cached).
+    """
+
+    profile_url = f"/users/{user_principal_name}"
+    if select_parameters:
+        profile_url = f"{profile_url}?{select_parameters}"
+
+    batch_requests = [
+        GraphBatchRequest("photo", build_photo_path(user_principal_name, photo_size), headers={"Accept": "image/*"}),
+        GraphBatchRequest("methods", f"/users/{user_principal_name}/authentication/methods"),
+    ]
+    if include_profile:
+        batch_requests.insert(0, GraphBatchRequest("profile", profile_url))
+
+    responses = get_batch_client().execute(batch_requests)
+
+    methods = responses["methods"]
+    photo = responses["photo"]
+
+    content_type = photo.content_type
+    if photo.status == 200 and content_type and content_type.startswith("image/"):
+        photo_result = (photo.binary_body(), photo.status, content_type)
+    else:
+        photo_result = (photo.body if isinstance(photo.body, dict) else {"raw": photo.body}, photo.status, content_type)
+
+    overview = {
+        "photo": photo_result,
+        "methods": (methods.body, methods.status),
+    }
+    if include_profile:
+        profile = responses["profile"]
+        overview["profile"] = (profile.body, profile.status)
+    return overview
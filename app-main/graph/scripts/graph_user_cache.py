@@ -0,0 +1,108 @@
+"""Read-through cache for Microsoft Graph user lookups.
+
+Entries are keyed by the user principal name and the normalised query string
+(``$select`` fields are order- and case-insensitive). Successful lookups live
+for ``GRAPH_USER_CACHE_TTL`` seconds and ``404`` responses for
+``GRAPH_USER_CACHE_NEGATIVE_TTL``; other statuses are never cached. Every
+user has a generation counter in the key so :func:`invalidate_user` drops all
+cached variants of that user at once, e.g. after an MFA method is deleted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "graph:user"
+
+
+def normalize_user_identifier(user_principal_name) -> str:
+    return str(user_principal_name or "").strip().lower()
+
+
+def normalize_select(select_parameters: Optional[str]) -> str:
+    """Return a canonical form of the query string passed to ``get_user``."""
+
+    raw = (select_parameters or "").strip().lstrip("?")
+    if not raw:
+        return ""
+    if "=" not in raw:
+        # ``GetUserView`` forwards the bare ``$select`` value.
+        return "raw:" + ",".join(sorted({field.strip().lower() for field in raw.split(",") if field.strip()}))
+
+    params = []
+    for name, value in parse_qsl(raw, keep_blank_values=True):
+        name = name.strip().lower()
+        if name == "$select":
+            value = ",".join(sorted({field.strip().lower() for field in value.split(",") if field.strip()}))
+        params.append((name, value))
+    return "&".join(f"{name}={value}" for name, value in sorted(params))
+
+
+def _generation_key(identifier: str) -> str:
+    digest = hashlib.sha1(identifier.encode("utf-8")).hexdigest()
+    return f"{_KEY_PREFIX}:gen:{digest}"
+
+
+def _entry_key(identifier: str, select_parameters: Optional[str], generation) -> str:
+    digest = hashlib.sha1(f"{identifier}|{normalize_select(select_parameters)}".encode("utf-8")).hexdigest()
+    return f"{_KEY_PREFIX}:{generation}:{digest}"
+
+
+def _ttls() -> Tuple[float, float]:
+    return (
+        getattr(settings, "GRAPH_USER_CACHE_TTL", 60),
+        getattr(settings, "GRAPH_USER_CACHE_NEGATIVE_TTL", 30),
+    )
+
+
+def get_cached_user(user_principal_name, select_parameters: Optional[str]):
+    """Return the cached ``(data, status_code)`` or ``None`` on a miss."""
+
+    identifier = normalize_user_identifier(user_principal_name)
+    if not identifier or not any(ttl > 0 for ttl in _ttls()):
+        return None
+    try:
+        generation = cache.get(_generation_key(identifier), 0)
+        return cache.get(_entry_key(identifier, select_parameters, generation))
+    except Exception:
+        logger.debug("Unable to read cached Graph user %s", identifier, exc_info=True)
+        return None
+
+
+def store_user(user_principal_name, select_parameters: Optional[str], data, status_code: int) -> None:
+    positive_ttl, negative_ttl = _ttls()
+    if status_code == 200:
+        ttl = positive_ttl
+    elif status_code == 404:
+        ttl = negative_ttl
+    else:
+        return
+
+    identifier = normalize_user_identifier(user_principal_name)
+    if not identifier or ttl <= 0:
+        return
+    try:
+        generation = cache.get(_generation_key(identifier), 0)
+        cache.set(_entry_key(identifier, select_parameters, generation), (data, status_code), timeout=ttl)
+    except Exception:
+        logger.debug("Unable to cache Graph user %s", identifier, exc_info=True)
+
+
+def invalidate_user(user_principal_name) -> None:
+    identifier = normalize_user_identifier(user_principal_name)
+    if not identifier:
+        return
+    positive_ttl, negative_ttl = _ttls()
+    try:
+        cache.set(_generation_key(identifier), time.time_ns(), timeout=max(positive_ttl, negative_ttl, 1) * 2)
+    except Exception:
+        logger.debug("Unable to invalidate cached Graph user %s", identifier, exc_info=True)
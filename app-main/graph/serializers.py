@@ -2,4 +2,10 @@ from rest_framework import serializers
 
 
 class QuerySerializer(serializers.Serializer):
-    Query = serializers.CharField()
\ No newline at end of file
+    Query = serializers.CharField()
+
+class BulkMfaResetSerializer(serializers.Serializer):
+    user_principal_names = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+    )
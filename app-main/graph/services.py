@@ -1,5 +1,7 @@
 # azure/services.py
-from .scripts.graph_apicall_runhuntingquery import run_hunting_query
+from django.conf import settings
+
+from .hunting import run_cached_hunting_query
 from .scripts.graph_apicall_getuser import get_user
 from .scripts.graph_apicall_getuserphoto import get_user_photo
 from .scripts.graph_apicall_listuserauthenticationmethods import (
@@ -9,14 +11,40 @@ from .scripts.graph_apicall_listusergroups import list_user_groups
 from .scripts.graph_apicall_deletemfa import microsoft_authentication_method
 from .scripts.graph_apicall_deletephone import phone_authentication_method
 from .scripts.graph_apicall_deletesoftwaremfa import delete_software_mfa_method  # Import the new method
+from .scripts.graph_batch import get_user_mfa_overview
+from .scripts.graph_user_cache import get_cached_user, invalidate_user, store_user
+from .user_mirror import get_mirrored_user
 
 
 def execute_hunting_query(query):
-    response, status_code = run_hunting_query(query)
-    return response.json(), status_code
+    """Run ``query``, serving identical queries from the hunting result cache."""
+
+    return run_cached_hunting_query(query)
+
+def _mirror_reads_enabled(use_mirror):
+    if use_mirror is None:
+        return getattr(settings, "GRAPH_USER_MIRROR_READS", False)
+    return use_mirror
+
+
+def _get_known_user(user_principal_name, select_parameters, use_mirror=None):
+    """Answer from the local user mirror (when enabled) or the lookup cache."""
+    if _mirror_reads_enabled(use_mirror):
+        mirrored = get_mirrored_user(user_principal_name, select_parameters)
+        if mirrored is not None:
+            return mirrored
+    return get_cached_user(user_principal_name, select_parameters)
+
+
+def execute_get_user(user_principal_name, select_parameters, *, use_mirror=None):
+    """Look a user up, preferring the mirror when ``use_mirror`` (or
+    ``GRAPH_USER_MIRROR_READS``) is set and it covers the selected fields."""
+    cached = _get_known_user(user_principal_name, select_parameters, use_mirror)
+    if cached is not None:
+        return cached
 
-def execute_get_user(user_principal_name, select_parameters):
     data, status_code = get_user(user_principal_name=user_principal_name, select_parameters=select_parameters)
+    store_user(user_principal_name, select_parameters, data, status_code)
     return data, status_code
 
 
@@ -29,21 +57,48 @@ def execute_list_user_groups(user_principal_name):
     return list_user_groups(user_principal_name)
 
 
-def execute_get_user_photo(user_principal_name):
-    return get_user_photo(user_principal_name)
+def execute_get_user_photo(user_principal_name, size=None):
+    return get_user_photo(user_principal_name, size)
+
+
+def execute_get_user_mfa_overview(user_principal_name, select_parameters=None, photo_size=None):
+    """Profile, photo and authentication methods in a single Graph $batch call.
+
+    A cached or mirrored profile is reused and left out of the batch.
+    """
+    cached_profile = _get_known_user(user_principal_name, select_parameters)
+    overview = get_user_mfa_overview(
+        user_principal_name,
+        select_parameters,
+        photo_size,
+        include_profile=cached_profile is None,
+    )
+    if cached_profile is not None:
+        overview["profile"] = cached_profile
+    else:
+        store_user(user_principal_name, select_parameters, *overview["profile"])
+    return overview
+
+
+def _invalidate_after_delete(azure_user_principal_id, status_code):
+    if status_code in (200, 202, 204):
+        invalidate_user(azure_user_principal_id)
 
 
 def execute_phone_authentication_method(azure_user_principal_id ,authentication_method_id):
     response, status_code = phone_authentication_method(azure_user_principal_id, authentication_method_id)
+    _invalidate_after_delete(azure_user_principal_id, status_code)
     # Response is empty and status code is 204
     return response, status_code
 
 
 def execute_microsoft_authentication_method(azure_user_principal_id ,authentication_method_id):
     response, status_code = microsoft_authentication_method(azure_user_principal_id, authentication_method_id)
+    _invalidate_after_delete(azure_user_principal_id, status_code)
     # Response is empty and status code is 204
     return response, status_code
 
 def execute_delete_software_mfa_method(azure_user_principal_id, authentication_method_id):
     response, status_code = delete_software_mfa_method(azure_user_principal_id, authentication_method_id)
+    _invalidate_after_delete(azure_user_principal_id, status_code)
     return response, status_code
\ No newline at end of file
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from unittest import mock
+
+import httpx
+import requests
+from django.test import SimpleTestCase
+
+from graph.scripts import _async_http
+from graph.scripts._async_http import AsyncGraphTransport
+from graph.scripts._rate_limit import PRIORITY_BATCH, graph_priority
+
+
+class AsyncGraphTransportTests(SimpleTestCase):
+    def setUp(self):
+        self.seen_threads = set()
+
+        def handler(request):
+            self.seen_threads.add(threading.current_thread().name)
+            if request.url.path == "/fail":
+                raise httpx.ConnectError("boom", request=request)
+            return httpx.Response(200, json={"path": request.url.path})
+
+        self.transport = AsyncGraphTransport(transport=httpx.MockTransport(handler), max_retries=0)
+        self.addCleanup(self.transport.close)
+
+    def test_sync_facade_runs_on_shared_loop(self):
+        response = self.transport.request_sync("get", "https://graph.example/v1.0/me", timeout=5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"path": "/v1.0/me"})
+        self.assertEqual(self.seen_threads, {"graph-async-loop"})
+
+    def test_sync_facade_translates_transport_errors(self):
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.transport.request_sync("GET", "https://graph.example/fail", timeout=5)
+
+    def test_gather_keeps_order_and_returns_failures(self):
+        calls = [{"method": "GET", "url": f"https://graph.example/{index}"} for index in range(10)]
+        calls.insert(3, {"url": "https://graph.example/fail"})
+
+        results = self.transport.gather_sync(calls, limit=4)
+
+        self.assertEqual(len(results), 11)
+        self.assertIsInstance(results[3], requests.exceptions.ConnectionError)
+        self.assertEqual(results[4].json(), {"path": "/3"})
+
+    def test_async_callers_use_their_own_loop(self):
+        async def run():
+            responses = await self.transport.gather(
+                [{"url": "https://graph.example/a"}, {"url": "https://graph.example/b"}]
+            )
+            await self.transport.aclose()
+            return [response.status_code for response in responses]
+
+        self.assertEqual(asyncio.run(run()), [200, 200])
+
+
+class AsyncGraphRateLimitTests(SimpleTestCase):
+    def setUp(self):
+        def handler(request):
+            status = 429 if request.url.path == "/v1.0/throttled" else 200
+            return httpx.Response(status, headers={"Retry-After": "0"} if status == 429 else {})
+
+        self.transport = AsyncGraphTransport(transport=httpx.MockTransport(handler), max_retries=0)
+        self.addCleanup(self.transport.close)
+        self.limiter = mock.Mock()
+        patches = [
+            mock.patch.object(_async_http, "get_async_transport", return_value=self.transport),
+            mock.patch("graph.scripts._rate_limit.get_rate_limiter", return_value=self.limiter),
+            mock.patch("graph.scripts._rate_limit.rate_limit_enabled", return_value=True),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_graph_request_many_takes_a_token_per_call(self):
+        calls = [
+            {"url": "https://graph.microsoft.com/v1.0/a"},
+            {"url": "https://graph.microsoft.com/v1.0/throttled"},
+            {"url": "https://graph.example/v1.0/other"},
+        ]
+
+        with graph_priority(PRIORITY_BATCH):
+            responses = _async_http.graph_request_many(calls)
+
+        self.assertEqual([response.status_code for response in responses], [200, 429, 200])
+        self.assertEqual(self.limiter.acquire.call_args_list, [mock.call(1, PRIORITY_BATCH)] * 2)
+        observed = sorted(call.args[0].status_code for call in self.limiter.observe.call_args_list)
+        self.assertEqual(observed, [200, 429])
+
+    def test_async_helpers_are_rate_limited(self):
+        async def run():
+            single = await _async_http.async_graph_request(
+                "GET", "https://graph.microsoft.com/v1.0/me", rate_limit_cost=3
+            )
+            many = await _async_http.gather_graph_requests([{"url": "https://graph.microsoft.com/v1.0/a"}])
+            await self.transport.aclose()
+            return [single, *many]
+
+        responses = asyncio.run(run())
+
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertEqual(self.limiter.acquire.call_args_list, [mock.call(3, None), mock.call(1, None)])
+        self.assertEqual(self.limiter.observe.call_count, 2)
+
+    def test_throttled_calls_are_retried_through_the_limiter(self):
+        statuses = iter([429, 200])
+
+        def handler(request):
+            status = next(statuses)
+            return httpx.Response(status, headers={"Retry-After": "2"} if status == 429 else {})
+
+        transport = AsyncGraphTransport(transport=httpx.MockTransport(handler), max_retries=1)
+        self.addCleanup(transport.close)
+
+        with mock.patch.object(_async_http, "get_async_transport", return_value=transport), mock.patch(
+            "graph.scripts._async_http.asyncio.sleep", new=mock.AsyncMock()
+        ) as sleep:
+            responses = _async_http.graph_request_many([{"url": "https://graph.microsoft.com/v1.0/users"}])
+
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(self.limiter.acquire.call_count, 2)
+        self.assertEqual([call.args[0].status_code for call in self.limiter.observe.call_args_list], [429, 200])
+        # The limiter holds the bucket for Retry-After, so the call does not sleep on its own.
+        sleep.assert_not_awaited()
@@ -0,0 +1,82 @@
+import base64
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from graph.scripts.graph_batch import GraphBatchClient, GraphBatchRequest, get_user_mfa_overview
+
+MODULE_PATH = "graph.scripts.graph_batch"
+
+
+def _batch_response(*entries, status=200):
+    response = mock.Mock(status_code=status, headers={})
+    response.json.return_value = {"responses": list(entries)}
+    return response
+
+
+class GraphBatchClientTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch(f"{MODULE_PATH}._get_bearertoken", return_value="token")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        limiter_patcher = mock.patch(f"{MODULE_PATH}.get_rate_limiter")
+        self.rate_limiter = limiter_patcher.start()
+        self.addCleanup(limiter_patcher.stop)
+        self.sleep = mock.Mock()
+        self.client = GraphBatchClient(max_retries=2, sleep=self.sleep)
+
+    def test_splits_into_chunks_of_twenty(self):
+        requests = [GraphBatchRequest(str(index), f"/users/{index}") for index in range(45)]
+
+        def reply(method, url, *, json, **kwargs):
+            return _batch_response(*({"id": item["id"], "status": 200, "body": {}} for item in json["requests"]))
+
+        with mock.patch(f"{MODULE_PATH}.graph_request", side_effect=reply) as graph_request:
+            results = self.client.execute(requests)
+
+        self.assertEqual([len(call.kwargs["json"]["requests"]) for call in graph_request.call_args_list], [20, 20, 5])
+        self.assertEqual(len(results), 45)
+
+    def test_only_throttled_sub_requests_are_retried(self):
+        first = _batch_response(
+            {"id": "a", "status": 200, "body": {"ok": True}},
+            {"id": "b", "status": 429, "headers": {"Retry-After": "2"}},
+            {"id": "c", "status": 404, "body": {"error": {}}},
+        )
+        second = _batch_response({"id": "b", "status": 200, "body": {"ok": "retried"}})
+
+        with mock.patch(f"{MODULE_PATH}.graph_request", side_effect=[first, second]) as graph_request:
+            results = self.client.execute(
+                [GraphBatchRequest("a", "/a"), GraphBatchRequest("b", "/b"), GraphBatchRequest("c", "/c")]
+            )
+
+        retried = graph_request.call_args_list[1].kwargs["json"]["requests"]
+        self.assertEqual([item["id"] for item in retried], ["b"])
+        self.sleep.assert_called_once_with(2.0)
+        self.assertEqual(results["b"].body, {"ok": "retried"})
+        self.assertEqual(results["c"].status, 404)
+
+    def test_gives_up_after_max_retries(self):
+        throttled = _batch_response({"id": "a", "status": 429, "headers": {"Retry-After": "1"}})
+
+        with mock.patch(f"{MODULE_PATH}.graph_request", return_value=throttled) as graph_request:
+            results = self.client.execute([GraphBatchRequest("a", "/a")])
+
+        self.assertEqual(graph_request.call_count, 3)
+        self.assertEqual(results["a"].status, 429)
+
+    def test_mfa_overview_maps_sub_responses(self):
+        image = b"\x89PNG"
+        reply = _batch_response(
+            {"id": "profile", "status": 200, "body": {"userPrincipalName": "alice@dtu.dk"}},
+            {"id": "photo", "status": 200, "headers": {"Content-Type": "image/png"}, "body": base64.b64encode(image).decode()},
+            {"id": "methods", "status": 200, "body": {"value": []}},
+        )
+
+        with mock.patch(f"{MODULE_PATH}.graph_request", return_value=reply) as graph_request:
+            overview = get_user_mfa_overview("alice@dtu.dk", "$select=id")
+
+        self.assertEqual(graph_request.call_count, 1)
+        self.assertEqual(overview["profile"], ({"userPrincipalName": "alice@dtu.dk"}, 200))
+        self.assertEqual(overview["photo"], (image, 200, "image/png"))
+        self.assertEqual(overview["methods"], ({"value": []}, 200))
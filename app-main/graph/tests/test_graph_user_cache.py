@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from graph import services
+from graph.scripts.graph_user_cache import normalize_select
+
+
+@override_settings(GRAPH_USER_CACHE_TTL=60, GRAPH_USER_CACHE_NEGATIVE_TTL=30)
+class GraphUserCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_select_is_normalised(self):
+        self.assertEqual(
+            normalize_select("$select=userPrincipalName,displayName"),
+            normalize_select("$select=DisplayName, userPrincipalName"),
+        )
+        self.assertNotEqual(normalize_select("displayName"), normalize_select("$select=displayName"))
+
+    @mock.patch("graph.scripts.graph_apicall_getuser._get_bearertoken")
+    @mock.patch("graph.services.get_user", return_value=({"id": "1"}, 200))
+    def test_hits_skip_graph_and_token_lookup(self, get_user, get_token):
+        first = services.execute_get_user("Alice@dtu.dk", "$select=id,displayName")
+        second = services.execute_get_user("alice@dtu.dk", "$select=displayName,id")
+
+        self.assertEqual(first, second)
+        get_user.assert_called_once()
+        get_token.assert_not_called()
+
+    @mock.patch("graph.services.get_user", return_value=({"error": {"code": "Request_ResourceNotFound"}}, 404))
+    def test_not_found_is_cached(self, get_user):
+        services.execute_get_user("typo@dtu.dk", None)
+        services.execute_get_user("typo@dtu.dk", None)
+
+        get_user.assert_called_once()
+
+    @mock.patch("graph.services.get_user", return_value=({"error": {}}, 503))
+    def test_errors_are_not_cached(self, get_user):
+        services.execute_get_user("alice@dtu.dk", None)
+        services.execute_get_user("alice@dtu.dk", None)
+
+        self.assertEqual(get_user.call_count, 2)
+
+    @mock.patch("graph.services.phone_authentication_method", return_value=(None, 204))
+    @mock.patch("graph.services.get_user", return_value=({"id": "1"}, 200))
+    def test_mfa_delete_invalidates_user(self, get_user, _delete):
+        services.execute_get_user("alice@dtu.dk", "$select=id")
+        services.execute_get_user("alice@dtu.dk", None)
+
+        services.execute_phone_authentication_method("alice@dtu.dk", "method-id")
+        services.execute_get_user("alice@dtu.dk", "$select=id")
+        services.execute_get_user("alice@dtu.dk", None)
+
+        self.assertEqual(get_user.call_count, 4)
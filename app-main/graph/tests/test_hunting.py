@@ -0,0 +1,190 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from graph import services
+from graph.hunting import get_cached_result, normalize_kql, query_hash, run_hunting_job, submit_hunting_job
+from graph.models import HuntingQueryJob, HuntingQueryResult
+from graph.views import HuntingQueryJobResultsView, HuntingQueryJobsView
+
+PAYLOAD = {
+    "schema": [{"name": "Name", "type": "String"}, {"name": "Count", "type": "Int64"}],
+    "results": [{"Name": f"row{index}", "Count": index} for index in range(5)],
+}
+
+
+def _graph_reply(payload=PAYLOAD, status_code=200):
+    return mock.Mock(json=mock.Mock(return_value=payload)), status_code
+
+
+class NormalizeKqlTests(TestCase):
+    def test_comments_and_whitespace_are_ignored_outside_strings(self):
+        self.assertEqual(
+            normalize_kql("// alert\nDeviceEvents\n|   where Name == 'a  //b'  // trailing\n| take 5"),
+            "DeviceEvents | where Name == 'a  //b' | take 5",
+        )
+        self.assertEqual(query_hash("T | take 1"), query_hash("T\n|\ttake 1 // note"))
+        self.assertNotEqual(query_hash("T | where A == 'x y'"), query_hash("T | where A == 'x  y'"))
+
+
+@override_settings(HUNTING_QUERY_CACHE_TTL=300, HUNTING_QUERY_PAGE_SIZE=2)
+class HuntingQueryCacheTests(TestCase):
+    @mock.patch("graph.hunting.run_hunting_query", return_value=_graph_reply())
+    def test_identical_queries_hit_the_cache(self, run_query):
+        first = services.execute_hunting_query("DeviceEvents | take 5")
+        second = services.execute_hunting_query("DeviceEvents\n| take 5 // webhook")
+
+        self.assertEqual(first, (PAYLOAD, 200))
+        self.assertEqual(second, (PAYLOAD, 200))
+        run_query.assert_called_once()
+        self.assertEqual(HuntingQueryResult.objects.get().pages.count(), 3)
+
+    @mock.patch("graph.hunting.run_hunting_query", return_value=_graph_reply({"error": {"code": "BadRequest"}}, 400))
+    def test_errors_are_not_cached(self, run_query):
+        services.execute_hunting_query("bad query")
+        services.execute_hunting_query("bad query")
+
+        self.assertEqual(run_query.call_count, 2)
+
+
+@override_settings(HUNTING_QUERY_CACHE_TTL=300, HUNTING_QUERY_PAGE_SIZE=2)
+class HuntingQueryJobTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="analyst", password="pass")
+        self.factory = APIRequestFactory()
+
+    def _results(self, job_id, cursor=None):
+        request = self.factory.get(f"/graph/v1.0/hunting-query/jobs/{job_id}/results", {"cursor": cursor} if cursor else {})
+        force_authenticate(request, user=self.user)
+        return HuntingQueryJobResultsView.as_view()(request, job_id=job_id)
+
+    @mock.patch("graph.hunting.run_hunting_query", return_value=_graph_reply())
+    def test_job_runs_in_background_and_pages_by_cursor(self, run_query):
+        request = self.factory.post("/graph/v1.0/hunting-query/jobs", {"Query": "DeviceEvents | take 5"}, format="json")
+        force_authenticate(request, user=self.user)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = HuntingQueryJobsView.as_view()(request)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], "queued")
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self._results(response.data["id"]).status_code, 409)
+
+        run_hunting_job(response.data["id"])
+
+        rows, cursor = [], None
+        while True:
+            page = self._results(response.data["id"], cursor)
+            self.assertEqual(page.status_code, 200)
+            rows.extend(page.data["results"])
+            cursor = page.data["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(rows, PAYLOAD["results"])
+        self.assertEqual(run_query.call_args.kwargs["timeout"], 180)
+
+    @mock.patch("graph.hunting.run_hunting_query", return_value=_graph_reply())
+    def test_cached_query_completes_immediately(self, run_query):
+        services.execute_hunting_query("DeviceEvents | take 5")
+
+        job = submit_hunting_job(requested_by=self.user, query="DeviceEvents  | take 5")
+
+        self.assertEqual(job.status, HuntingQueryJob.Status.SUCCEEDED)
+        self.assertTrue(job.from_cache)
+        run_query.assert_called_once()
+        self.assertEqual(self._results(job.pk, "not-a-cursor").status_code, 400)
+
+    @mock.patch("graph.hunting.run_hunting_query", return_value=_graph_reply())
+    def test_rerun_keeps_earlier_results_readable(self, run_query):
+        first = submit_hunting_job(requested_by=self.user, query="DeviceEvents | take 5")
+        run_hunting_job(first.pk)
+        HuntingQueryResult.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        second = submit_hunting_job(requested_by=self.user, query="DeviceEvents | take 5")
+        run_hunting_job(second.pk)
+
+        self.assertEqual(run_query.call_count, 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertNotEqual(first.result_id, second.result_id)
+        self.assertEqual(get_cached_result(first.query_hash), second.result)
+        self.assertEqual(self._results(first.pk).status_code, 200)
+        self.assertEqual(self._results(second.pk).status_code, 200)
+
+    @override_settings(HUNTING_QUERY_RESULT_RETENTION=60)
+    @mock.patch("graph.hunting.run_hunting_query", return_value=_graph_reply())
+    def test_results_past_retention_are_removed(self, run_query):
+        first = submit_hunting_job(requested_by=self.user, query="DeviceEvents | take 5")
+        run_hunting_job(first.pk)
+        HuntingQueryResult.objects.update(expires_at=timezone.now() - timedelta(seconds=120))
+
+        second = submit_hunting_job(requested_by=self.user, query="DeviceEvents | take 5")
+        run_hunting_job(second.pk)
+
+        self.assertEqual(HuntingQueryResult.objects.count(), 1)
+        self.assertEqual(self._results(first.pk).status_code, 410)
+
+
+@override_settings(HUNTING_QUERY_CACHE_TTL=300, HUNTING_QUERY_PAGE_SIZE=2)
+class HuntingQueryFollowerTests(TestCase):
+    QUERY = "DeviceEvents | take 5"
+
+    def setUp(self):
+        digest = query_hash(self.QUERY)
+        self.lock_key = f"graph:hunting:lock:{digest}"
+        self.failure_key = f"graph:hunting:failure:{digest}"
+        cache.delete_many([self.lock_key, self.failure_key])
+        self.addCleanup(cache.delete_many, [self.lock_key, self.failure_key])
+        # Another worker holds the lock for the same query.
+        cache.add(self.lock_key, 0)
+        self.job = HuntingQueryJob.objects.create(query=self.QUERY, query_hash=digest)
+
+    @mock.patch("graph.hunting.run_hunting_query", return_value=_graph_reply())
+    def test_follower_copies_the_leaders_failure(self, run_query):
+        def leader_fails(seconds):
+            cache.set(self.failure_key, ({"error": {"code": "BadRequest"}}, 400))
+            cache.delete(self.lock_key)
+
+        with mock.patch("graph.hunting.time.sleep", side_effect=leader_fails) as sleep:
+            job = run_hunting_job(self.job.pk)
+
+        self.assertEqual(job.status, HuntingQueryJob.Status.FAILED)
+        self.assertEqual((job.error, job.status_code), ({"error": {"code": "BadRequest"}}, 400))
+        sleep.assert_called_once()
+        run_query.assert_not_called()
+
+    @mock.patch("graph.hunting.run_hunting_query", return_value=_graph_reply())
+    def test_follower_takes_over_when_the_lock_is_released_without_an_outcome(self, run_query):
+        with mock.patch("graph.hunting.time.sleep", side_effect=lambda seconds: cache.delete(self.lock_key)) as sleep:
+            job = run_hunting_job(self.job.pk)
+
+        self.assertEqual(job.status, HuntingQueryJob.Status.SUCCEEDED)
+        sleep.assert_called_once()
+        run_query.assert_called_once()
+        self.assertIsNone(cache.get(self.lock_key))
+
+    @mock.patch("graph.hunting.run_hunting_query", return_value=_graph_reply({"error": {"code": "BadRequest"}}, 400))
+    def test_leader_failure_is_recorded_for_followers(self, run_query):
+        cache.delete(self.lock_key)
+
+        job = run_hunting_job(self.job.pk)
+
+        self.assertEqual(job.status, HuntingQueryJob.Status.FAILED)
+        self.assertEqual(cache.get(self.failure_key), ({"error": {"code": "BadRequest"}}, 400))
+        self.assertIsNone(cache.get(self.lock_key))
+
+    @override_settings(HUNTING_QUERY_CACHE_TTL=0)
+    @mock.patch("graph.hunting.run_hunting_query", return_value=_graph_reply())
+    def test_lock_is_skipped_without_a_cache(self, run_query):
+        with mock.patch("graph.hunting.time.sleep") as sleep:
+            job = run_hunting_job(self.job.pk)
+
+        self.assertEqual(job.status, HuntingQueryJob.Status.SUCCEEDED)
+        sleep.assert_not_called()
+        run_query.assert_called_once()
+        self.assertEqual(cache.get(self.lock_key), 0)
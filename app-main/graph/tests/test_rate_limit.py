@@ -0,0 +1,158 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from graph.scripts import _http
+from graph.scripts._rate_limit import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    GraphRateLimited,
+    GraphRateLimiter,
+    LocalBucketBackend,
+    PriorityPolicy,
+    graph_priority,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class GraphRateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = GraphRateLimiter(
+            rate=10,
+            burst=10,
+            min_rate=1,
+            recovery=1,
+            policies={
+                PRIORITY_INTERACTIVE: PriorityPolicy(0.0, 1.0),
+                PRIORITY_BATCH: PriorityPolicy(0.5, 5.0),
+            },
+            backend=LocalBucketBackend(),
+            clock=self.clock,
+            sleep=self.clock.sleep,
+        )
+
+    def test_batch_leaves_reserve_for_interactive_callers(self):
+        for _ in range(5):
+            self.assertEqual(self.limiter.acquire(priority=PRIORITY_BATCH), 0)
+
+        # The next batch request queues for a refill ...
+        self.assertAlmostEqual(self.limiter.acquire(priority=PRIORITY_BATCH), 0.1)
+        # ... while interactive requests still find tokens.
+        for _ in range(4):
+            self.assertEqual(self.limiter.acquire(priority=PRIORITY_INTERACTIVE), 0)
+
+    def test_throttle_blocks_and_halves_rate(self):
+        response = mock.Mock(status_code=429, headers={"Retry-After": "3"})
+        self.limiter.observe(response)
+
+        with self.assertRaises(GraphRateLimited) as raised:
+            self.limiter.acquire()
+        self.assertAlmostEqual(raised.exception.retry_after, 3)
+
+        with graph_priority(PRIORITY_BATCH):
+            waited = self.limiter.acquire()
+        # Retry-After, then refilling the batch reserve plus one token at the halved rate.
+        self.assertAlmostEqual(waited, 4.2)
+
+    def test_successes_recover_rate(self):
+        backend = self.limiter._backend
+        self.limiter.observe_throttle(0)
+        self.assertEqual(backend._state[self.limiter.key]["rate"], 5)
+
+        for _ in range(10):
+            self.limiter.observe(mock.Mock(status_code=200))
+        self.assertEqual(backend._state[self.limiter.key]["rate"], 10)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("7"), 7)
+        self.assertEqual(parse_retry_after(None, default=2), 2)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0)
+
+
+class GraphRequestRateLimitTests(SimpleTestCase):
+    @mock.patch("graph.scripts._http._send")
+    @mock.patch("graph.scripts._rate_limit.get_rate_limiter")
+    def test_only_graph_hosts_are_limited(self, get_limiter, send):
+        send.return_value = mock.Mock(status_code=200)
+
+        _http.graph_request("GET", "https://graph.microsoft.com/v1.0/$batch", rate_limit_cost=3)
+        _http.graph_request("POST", "https://login.microsoftonline.com/tenant/oauth2/v2.0/token")
+
+        get_limiter.return_value.acquire.assert_called_once_with(3)
+        get_limiter.return_value.observe.assert_called_once_with(send.return_value)
+        self.assertNotIn("rate_limit_cost", send.call_args_list[0].kwargs)
+
+
+class GraphRequestThrottleTests(SimpleTestCase):
+    URL = "https://graph.microsoft.com/v1.0/users"
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.backend = LocalBucketBackend()
+        self.limiter = GraphRateLimiter(
+            rate=10,
+            burst=10,
+            min_rate=1,
+            recovery=1,
+            policies={
+                PRIORITY_INTERACTIVE: PriorityPolicy(0.0, 1.0),
+                PRIORITY_BATCH: PriorityPolicy(0.0, 5.0),
+            },
+            backend=self.backend,
+            clock=self.clock,
+            sleep=self.clock.sleep,
+        )
+        patcher = mock.patch("graph.scripts._rate_limit.get_rate_limiter", return_value=self.limiter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.throttled = mock.Mock(status_code=429, headers={"Retry-After": "2"})
+        self.ok = mock.Mock(status_code=200, headers={})
+
+    @mock.patch("graph.scripts._http.time.sleep")
+    @mock.patch("graph.scripts._http._send")
+    def test_throttle_that_clears_on_retry_slows_the_bucket(self, send, sleep):
+        send.side_effect = [self.throttled, self.ok]
+
+        with graph_priority(PRIORITY_BATCH):
+            response = _http.graph_request("GET", self.URL)
+
+        self.assertIs(response, self.ok)
+        self.assertEqual(send.call_count, 2)
+        # Halved by the 429, then one recovery step for the 200.
+        self.assertEqual(self.backend._state[self.limiter.key]["rate"], 6)
+        # The retry waited on the shared bucket for Retry-After, not in a private sleep.
+        self.assertGreaterEqual(self.clock.now, 1002.0)
+        sleep.assert_not_called()
+
+    @mock.patch("graph.scripts._http._send")
+    def test_throttled_response_is_returned_when_the_priority_cannot_wait(self, send):
+        send.side_effect = [self.throttled, self.ok]
+
+        response = _http.graph_request("GET", self.URL)
+
+        self.assertIs(response, self.throttled)
+        send.assert_called_once()
+        self.assertEqual(self.backend._state[self.limiter.key]["rate"], 5)
+
+    @mock.patch("graph.scripts._http.time.sleep")
+    @mock.patch("graph.scripts._http._send")
+    @mock.patch("graph.scripts._rate_limit.rate_limit_enabled", return_value=False)
+    def test_throttled_response_is_retried_without_the_limiter(self, enabled, send, sleep):
+        send.side_effect = [self.throttled, self.ok]
+
+        response = _http.graph_request("GET", self.URL)
+
+        self.assertIs(response, self.ok)
+        sleep.assert_called_once_with(2.0)
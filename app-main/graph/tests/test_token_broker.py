@@ -0,0 +1,82 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from graph.scripts._token_broker import TokenBroker, TokenGrant, apply_grant, parse_expires_in
+
+
+class _Record:
+    def __init__(self, token="", ttl=-1):
+        self.access_token = token
+        self.expires_at = timezone.now() + timedelta(seconds=ttl)
+
+    def is_expired(self, *, buffer_seconds=0):
+        return self.expires_at <= timezone.now() + timedelta(seconds=buffer_seconds)
+
+
+class TokenBrokerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.record = _Record()
+        self.load = mock.Mock(side_effect=lambda: self.record)
+        self.grants = iter([TokenGrant("token-1", 3600), TokenGrant("token-2", 3600)])
+
+        def refresh(record):
+            apply_grant(record, next(self.grants))
+            return record.access_token
+
+        self.refresh = mock.Mock(side_effect=refresh)
+        self.broker = TokenBroker("graph", load_record=self.load, refresh_record=self.refresh, min_validity_seconds=60)
+
+    def _wait_for_refresher(self):
+        if self.broker._refresher is not None:
+            self.broker._refresher.join(timeout=5)
+
+    def test_warm_token_is_served_from_memory(self):
+        self.assertEqual(self.broker.get_token(), "token-1")
+        self.assertEqual(self.broker.get_token(), "token-1")
+
+        self.assertEqual(self.load.call_count, 1)
+        self.assertEqual(self.refresh.call_count, 1)
+
+    def test_worker_start_adopts_persisted_token(self):
+        self.record = _Record("stored", ttl=1800)
+
+        self.assertEqual(self.broker.get_token(), "stored")
+        self.refresh.assert_not_called()
+
+    def test_refreshes_in_background_after_refresh_ratio(self):
+        self.broker.get_token()
+        self.broker._refresh_at = 0
+
+        with mock.patch("graph.scripts._token_broker.connection"):
+            self.assertEqual(self.broker.get_token(), "token-1")
+            self._wait_for_refresher()
+
+        self.assertEqual(self.broker.get_token(), "token-2")
+        self.assertEqual(self.refresh.call_count, 2)
+
+    def test_follower_adopts_token_rotated_by_leader(self):
+        self.broker.get_token()
+        self.broker._refresh_at = 0
+        cache.add(self.broker._lock_key, "other-worker")
+        apply_grant(self.record, TokenGrant("rotated-elsewhere", 3600))
+
+        with mock.patch("graph.scripts._token_broker.connection"):
+            self.broker.get_token()
+            self._wait_for_refresher()
+
+        self.assertEqual(self.broker.get_token(), "rotated-elsewhere")
+        self.assertEqual(self.refresh.call_count, 1)
+
+    def test_expires_in_drives_refresh_schedule(self):
+        self.assertEqual(parse_expires_in({"expires_in": "599"}, 3600), 599)
+        self.assertEqual(parse_expires_in({}, 3600), 3600)
+
+        self.grants = iter([TokenGrant("short", 600)])
+        self.broker.get_token()
+        remaining = self.broker._refresh_at - self.broker._expires_at + 600
+        self.assertAlmostEqual(remaining, 480, delta=2)
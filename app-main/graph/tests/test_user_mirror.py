@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from graph import services
+from graph.models import EntraUser, GraphDeltaState
+from graph.scripts.graph_apicall_usersdelta import DeltaTokenExpired
+from graph.user_mirror import STATE_NAME, mirror_fields, sync_user_mirror
+
+ALICE = {"id": "1", "userPrincipalName": "Alice@example.com", "displayName": "Alice", "onPremisesImmutableId": "abc"}
+BOB = {"id": "2", "userPrincipalName": "bob@example.com", "displayName": "Bob"}
+
+
+def _pages(*pages):
+    return iter(pages)
+
+
+class UserMirrorSyncTests(TestCase):
+    @mock.patch("graph.user_mirror.iter_user_delta_pages")
+    def test_full_then_delta_sync(self, pages):
+        pages.return_value = _pages(([ALICE], None), ([BOB], "https://delta/1"))
+        stats = sync_user_mirror()
+
+        self.assertTrue(stats.full)
+        self.assertEqual(EntraUser.objects.count(), 2)
+        self.assertIn("$select=id,userPrincipalName", pages.call_args.args[0])
+        self.assertEqual(GraphDeltaState.objects.get(name=STATE_NAME).delta_link, "https://delta/1")
+
+        pages.return_value = _pages(
+            ([{"id": "1", "displayName": "Alice A."}, {"id": "2", "@removed": {"reason": "deleted"}}], "https://delta/2")
+        )
+        stats = sync_user_mirror()
+
+        self.assertFalse(stats.full)
+        self.assertEqual(pages.call_args.args[0], "https://delta/1")
+        alice = EntraUser.objects.get()
+        self.assertEqual(alice.attributes["displayName"], "Alice A.")
+        self.assertEqual(alice.attributes["onPremisesImmutableId"], "abc")
+        self.assertEqual(alice.user_principal_name_key, "alice@example.com")
+
+    @mock.patch("graph.user_mirror.iter_user_delta_pages")
+    def test_expired_delta_link_falls_back_to_full_sync(self, pages):
+        EntraUser.objects.create(
+            object_id="gone", user_principal_name="gone@example.com", attributes={}, synced_at=timezone.now()
+        )
+        GraphDeltaState.objects.create(name=STATE_NAME, select=",".join(mirror_fields()), delta_link="https://delta/old")
+
+        def fake_pages(url):
+            if url == "https://delta/old":
+                raise DeltaTokenExpired("expired", 410)
+            return _pages(([ALICE], "https://delta/new"))
+
+        pages.side_effect = fake_pages
+        stats = sync_user_mirror()
+
+        self.assertTrue(stats.full)
+        self.assertEqual(list(EntraUser.objects.values_list("object_id", flat=True)), ["1"])
+
+
+@override_settings(GRAPH_USER_MIRROR_READS=True, GRAPH_USER_MIRROR_MAX_AGE=3600, GRAPH_USER_CACHE_TTL=0)
+class MirroredGetUserTests(TestCase):
+    def setUp(self):
+        with mock.patch("graph.user_mirror.iter_user_delta_pages", return_value=_pages(([ALICE], "https://d"))):
+            sync_user_mirror()
+
+    @mock.patch("graph.services.get_user")
+    def test_covered_select_is_answered_locally(self, get_user):
+        data, status_code = services.execute_get_user("alice@EXAMPLE.com", "$select=onPremisesImmutableId,displayName")
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(data, {"onPremisesImmutableId": "abc", "displayName": "Alice"})
+        get_user.assert_not_called()
+
+    @mock.patch("graph.services.get_user", return_value=({"id": "1"}, 200))
+    def test_uncovered_or_disabled_lookups_go_to_graph(self, get_user):
+        services.execute_get_user("alice@example.com", "$select=signInActivity")
+        services.execute_get_user("alice@example.com", "$select=displayName&$expand=manager")
+        services.execute_get_user("alice@example.com", "displayName", use_mirror=False)
+        services.execute_get_user("unknown@example.com", "displayName")
+
+        self.assertEqual(get_user.call_count, 4)
+
+    @mock.patch("graph.services.get_user", return_value=({"id": "1"}, 200))
+    def test_stale_mirror_is_ignored(self, get_user):
+        with override_settings(GRAPH_USER_MIRROR_MAX_AGE=0):
+            GraphDeltaState.objects.update(last_synced_at="2000-01-01T00:00:00Z")
+            services.execute_get_user("alice@example.com", "displayName")
+
+        get_user.assert_called_once()
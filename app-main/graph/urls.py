@@ -5,7 +5,12 @@ from .views import (
     DeletePhoneView,
     DeleteSoftwareMfaView,
     GetUserView,
+    HuntingQueryJobResultsView,
+    HuntingQueryJobsView,
+    HuntingQueryJobView,
     ListUserAuthenticationMethodsView,
+    MfaBulkResetJobsView,
+    MfaBulkResetJobView,
 )
 
 urlpatterns = [
@@ -26,4 +31,9 @@ urlpatterns = [
         'graph/v1.0/users/<str:user_id__or__user_principalname>/software-authentication-methods/<str:software_oath_method_id>',
         DeleteSoftwareMfaView.as_view(),
     ),
+    path('graph/v1.0/hunting-query/jobs', HuntingQueryJobsView.as_view()),
+    path('graph/v1.0/hunting-query/jobs/<int:job_id>', HuntingQueryJobView.as_view()),
+    path('graph/v1.0/hunting-query/jobs/<int:job_id>/results', HuntingQueryJobResultsView.as_view()),
+    path('graph/v1.0/mfa-reset/bulk-jobs', MfaBulkResetJobsView.as_view()),
+    path('graph/v1.0/mfa-reset/bulk-jobs/<int:job_id>', MfaBulkResetJobView.as_view()),
 ]
@@ -0,0 +1,206 @@
+"""Local mirror of Microsoft Entra ID users, kept current with ``/users/delta``.
+
+:func:`sync_user_mirror` (run by ``manage.py sync_entra_users``) walks the
+delta feed from the stored delta link, so each run only transfers users that
+changed since the previous one. The first run, an expired delta link or a
+changed field list triggers a full round, after which users that were not
+seen are removed.
+
+:func:`get_mirrored_user` answers ``execute_get_user`` lookups whose fields
+are all mirrored, as long as the mirror was synced within
+``GRAPH_USER_MIRROR_MAX_AGE`` seconds. Users missing from the mirror are left
+to Graph, since they may have been created after the last sync.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EntraUser, GraphDeltaState
+from .scripts.graph_apicall_usersdelta import DeltaTokenExpired, build_initial_url, iter_user_delta_pages
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "users"
+
+# Properties Graph returns for a user when no $select is given.
+GRAPH_DEFAULT_USER_FIELDS = (
+    "businessPhones",
+    "displayName",
+    "givenName",
+    "id",
+    "jobTitle",
+    "mail",
+    "mobilePhone",
+    "officeLocation",
+    "preferredLanguage",
+    "surname",
+    "userPrincipalName",
+)
+
+DEFAULT_MIRROR_FIELDS = GRAPH_DEFAULT_USER_FIELDS + (
+    "accountEnabled",
+    "department",
+    "employeeId",
+    "onPremisesDistinguishedName",
+    "onPremisesImmutableId",
+    "onPremisesSamAccountName",
+)
+
+
+def mirror_fields() -> Tuple[str, ...]:
+    configured = getattr(settings, "GRAPH_USER_MIRROR_FIELDS", None) or DEFAULT_MIRROR_FIELDS
+    fields = {"id": None, "userPrincipalName": None}
+    fields.update(dict.fromkeys(field.strip() for field in configured if field.strip()))
+    return tuple(fields)
+
+
+@dataclass
+class SyncStats:
+    full: bool = False
+    pages: int = 0
+    upserted: int = 0
+    deleted: int = 0
+
+
+def _apply_page(users: Iterable[Dict], fields: Sequence[str], synced_at) -> Tuple[int, int]:
+    allowed = set(fields)
+    changed: Dict[str, Dict] = {}
+    removed: List[str] = []
+    for user in users:
+        object_id = user.get("id")
+        if not object_id:
+            continue
+        if "@removed" in user:
+            removed.append(object_id)
+            changed.pop(object_id, None)
+        else:
+            changed.setdefault(object_id, {}).update(
+                {key: value for key, value in user.items() if key in allowed}
+            )
+
+    existing = dict(
+        EntraUser.objects.filter(object_id__in=list(changed)).values_list("object_id", "attributes")
+    )
+    rows = []
+    for object_id, update in changed.items():
+        # Delta pages may only carry the properties that changed.
+        attributes = {**(existing.get(object_id) or {}), **update}
+        user_principal_name = attributes.get("userPrincipalName") or ""
+        rows.append(
+            EntraUser(
+                object_id=object_id,
+                user_principal_name=user_principal_name,
+                user_principal_name_key=user_principal_name.lower(),
+                attributes=attributes,
+                synced_at=synced_at,
+            )
+        )
+    if rows:
+        EntraUser.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["object_id"],
+            update_fields=["user_principal_name", "user_principal_name_key", "attributes", "synced_at"],
+        )
+    deleted = EntraUser.objects.filter(object_id__in=removed).delete()[0] if removed else 0
+    return len(rows), deleted
+
+
+def sync_user_mirror(*, full: bool = False) -> SyncStats:
+    """Apply the next delta round (or a full round) to the mirror."""
+
+    fields = mirror_fields()
+    select = ",".join(fields)
+    state, _ = GraphDeltaState.objects.get_or_create(name=STATE_NAME)
+    full = full or not state.delta_link or state.select != select
+    started = timezone.now()
+    stats = SyncStats(full=full)
+
+    start_url = build_initial_url(fields) if full else state.delta_link
+    delta_link = None
+    try:
+        for users, page_delta_link in iter_user_delta_pages(start_url):
+            upserted, deleted = _apply_page(users, fields, timezone.now())
+            stats.pages += 1
+            stats.upserted += upserted
+            stats.deleted += deleted
+            delta_link = page_delta_link or delta_link
+    except DeltaTokenExpired:
+        if full:
+            raise
+        logger.warning("Users delta link expired; running a full Entra ID user sync")
+        return sync_user_mirror(full=True)
+
+    if full:
+        stats.deleted += EntraUser.objects.filter(synced_at__lt=started).delete()[0]
+        state.last_full_sync_at = started
+
+    state.select = select
+    state.delta_link = delta_link or ""
+    state.last_synced_at = started
+    state.save()
+    logger.info(
+        "Synced Entra ID user mirror (%s): %d pages, %d upserted, %d deleted",
+        "full" if full else "delta",
+        stats.pages,
+        stats.upserted,
+        stats.deleted,
+    )
+    return stats
+
+
+def requested_fields(select_parameters: Optional[str]) -> Optional[List[str]]:
+    """Return the fields a ``get_user`` call asks for, or ``None`` if it uses other options."""
+
+    raw = (select_parameters or "").strip().lstrip("?")
+    if not raw:
+        return list(GRAPH_DEFAULT_USER_FIELDS)
+    if "=" not in raw:
+        # ``GetUserView`` forwards the bare ``$select`` value.
+        value = raw
+    else:
+        params = parse_qsl(raw, keep_blank_values=True)
+        if len(params) != 1 or params[0][0].strip().lower() != "$select":
+            return None
+        value = params[0][1]
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    return fields or None
+
+
+def mirror_is_fresh() -> bool:
+    max_age = getattr(settings, "GRAPH_USER_MIRROR_MAX_AGE", 3600)
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    return GraphDeltaState.objects.filter(name=STATE_NAME, last_synced_at__gte=cutoff).exists()
+
+
+def get_mirrored_user(user_principal_name, select_parameters: Optional[str]):
+    """Return ``(data, 200)`` from the mirror, or ``None`` when Graph has to answer."""
+
+    fields = requested_fields(select_parameters)
+    identifier = str(user_principal_name or "").strip()
+    if not fields or not identifier:
+        return None
+    mirrored = {field.lower(): field for field in mirror_fields()}
+    if any(field.lower() not in mirrored for field in fields):
+        return None
+    if not mirror_is_fresh():
+        return None
+
+    user = (
+        EntraUser.objects.filter(Q(user_principal_name_key=identifier.lower()) | Q(object_id=identifier))
+        .only("attributes")
+        .first()
+    )
+    if user is None:
+        return None
+    attributes = {key.lower(): value for key, value in user.attributes.items()}
+    return {mirrored[field.lower()]: attributes.get(field.lower()) for field in fields}, 200
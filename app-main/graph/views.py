@@ -10,9 +10,13 @@ from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.response import Response
 
+from myview.mfa_bulk_reset import create_bulk_reset_job, serialize_job, start_bulk_reset_job
+from myview.models import MFABulkResetJob
 from utils.api import SecuredAPIView
 
-from .serializers import QuerySerializer
+from .hunting import read_result_page, serialize_job as serialize_hunting_job, submit_hunting_job
+from .models import HuntingQueryJob
+from .serializers import BulkMfaResetSerializer, QuerySerializer
 from .services import (
     execute_delete_software_mfa_method,
     execute_get_user,
@@ -522,3 +526,221 @@ class HuntingQueryView(SecuredAPIView):
             )
 
         return Response(payload, status=status_code)
+
+
+def _get_visible_hunting_job(request, job_id: int) -> Optional[HuntingQueryJob]:
+    jobs = HuntingQueryJob.objects.select_related("result")
+    if not request.user.is_superuser:
+        jobs = jobs.filter(requested_by=request.user)
+    return jobs.filter(pk=job_id).first()
+
+
+class HuntingQueryJobsView(SecuredAPIView):
+    """Run a hunting query in the background."""
+
+    authorization_header = HuntingQueryView.authorization_header
+    content_type_parameter = HuntingQueryView.content_type_parameter
+
+    @swagger_auto_schema(
+        manual_parameters=[authorization_header, content_type_parameter],
+        request_body=HuntingQueryView.request_body,
+        operation_description="""
+Queue an advanced hunting query and return its job id straight away.
+
+Poll `/graph/v1.0/hunting-query/jobs/{job_id}` until the status is `succeeded` or `failed`, then page through the
+rows with `/graph/v1.0/hunting-query/jobs/{job_id}/results`. Identical queries (ignoring comments and whitespace)
+are answered from a cache for a few minutes, in which case the job is already `succeeded` in this response.
+""",
+        responses={
+            202: "Job accepted",
+            400: "Error: Bad request",
+        },
+    )
+    def post(self, request) -> Response:
+        serializer = QuerySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        job = submit_hunting_job(requested_by=request.user, query=serializer.validated_data["Query"])
+        response = Response(serialize_hunting_job(job), status=status.HTTP_202_ACCEPTED)
+        response["Location"] = f"/graph/v1.0/hunting-query/jobs/{job.pk}"
+        return response
+
+
+class HuntingQueryJobView(SecuredAPIView):
+    """Report the status of a hunting query job."""
+
+    authorization_header = HuntingQueryView.authorization_header
+
+    job_path_param = openapi.Parameter(
+        "job_id",
+        in_=openapi.IN_PATH,
+        description="The id returned when the job was created.",
+        type=openapi.TYPE_INTEGER,
+        required=True,
+        override=True,
+    )
+
+    @swagger_auto_schema(
+        manual_parameters=[authorization_header, job_path_param],
+        operation_description="Return the status, schema and row count of a hunting query job.",
+        responses={
+            200: "Job status",
+            404: "Error: Not found",
+        },
+    )
+    def get(self, request, job_id: int) -> Response:
+        job = _get_visible_hunting_job(request, job_id)
+        if job is None:
+            return Response({"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(serialize_hunting_job(job))
+
+
+class HuntingQueryJobResultsView(SecuredAPIView):
+    """Page through the rows of a finished hunting query job."""
+
+    authorization_header = HuntingQueryView.authorization_header
+    job_path_param = HuntingQueryJobView.job_path_param
+
+    cursor_param = openapi.Parameter(
+        "cursor",
+        in_=openapi.IN_QUERY,
+        description="Optional. The next_cursor value from the previous page.",
+        type=openapi.TYPE_STRING,
+        required=False,
+    )
+
+    @swagger_auto_schema(
+        manual_parameters=[authorization_header, job_path_param, cursor_param],
+        operation_description="""
+Return one page of rows. Pass the `next_cursor` of a page to get the following one; it is `null` on the last page.
+""",
+        responses={
+            200: "A page of results",
+            400: "Error: Invalid cursor",
+            404: "Error: Not found",
+            409: "Error: The job has not succeeded",
+            410: "Error: The results have been discarded",
+        },
+    )
+    def get(self, request, job_id: int) -> Response:
+        job = _get_visible_hunting_job(request, job_id)
+        if job is None:
+            return Response({"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        if job.status != HuntingQueryJob.Status.SUCCEEDED:
+            return Response(
+                {"error": f"The job is {job.status}.", "status": job.status},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if job.result is None:
+            return Response(
+                {"error": "The results have expired; submit the query again."},
+                status=status.HTTP_410_GONE,
+            )
+        try:
+            page = read_result_page(job.result, request.query_params.get("cursor"))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(page)
+
+
+class MfaBulkResetJobsView(SecuredAPIView):
+    """Start a background MFA reset for a list of users."""
+
+    authorization_header = openapi.Parameter(
+        "Authorization",
+        in_=openapi.IN_HEADER,
+        description="Required. Must be in the format ''.",
+        type=openapi.TYPE_STRING,
+        required=True,
+        default="",
+    )
+
+    request_body = openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=["user_principal_names"],
+        properties={
+            "user_principal_names": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_STRING),
+                example=["vicre-test01@dtudk.onmicrosoft.com"],
+            )
+        },
+    )
+
+    @swagger_auto_schema(
+        manual_parameters=[authorization_header],
+        request_body=request_body,
+        operation_description="""
+Delete every removable MFA method (Microsoft Authenticator, phone and software OATH) for a list of users.
+
+The reset runs as a background job and the response returns immediately with the job id. Each user is
+checked against the caller's organizational unit scope, exactly as on the MFA reset page; users outside
+the scope are reported as `denied`. Poll `/graph/v1.0/mfa-reset/bulk-jobs/{job_id}` for progress.
+
+Curl example:
+```
+curl -X 'POST' \
+    'https://api.security.ait.dtu.dk/graph/v1.0/mfa-reset/bulk-jobs' \
+    -H 'Authorization: Token YOUR_API_KEY' \
+    -H 'Content-Type: application/json' \
+    -d '{"user_principal_names": ["user1@dtu.dk", "user2@dtu.dk"]}'
+```
+""",
+        responses={
+            202: "Job accepted",
+            400: "Error: Bad request",
+        },
+    )
+    def post(self, request) -> Response:
+        serializer = BulkMfaResetSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            job = create_bulk_reset_job(
+                requested_by=request.user,
+                user_principal_names=serializer.validated_data["user_principal_names"],
+            )
+        except ValueError as exc:
+            return Response({"status": "error", "message": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        start_bulk_reset_job(job)
+        response = Response(serialize_job(job, include_items=False), status=status.HTTP_202_ACCEPTED)
+        response["Location"] = f"/graph/v1.0/mfa-reset/bulk-jobs/{job.pk}"
+        return response
+
+
+class MfaBulkResetJobView(SecuredAPIView):
+    """Report the per-user progress of a bulk MFA reset job."""
+
+    authorization_header = MfaBulkResetJobsView.authorization_header
+
+    job_path_param = openapi.Parameter(
+        "job_id",
+        in_=openapi.IN_PATH,
+        description="The id returned when the job was created.",
+        type=openapi.TYPE_INTEGER,
+        required=True,
+        override=True,
+    )
+
+    @swagger_auto_schema(
+        manual_parameters=[authorization_header, job_path_param],
+        operation_description="""
+Return the status of a bulk MFA reset job and the outcome for each user so far.
+
+Item statuses: `pending`, `succeeded`, `partial`, `nothing_to_do`, `denied` and `failed`. The job is done
+when its status is `completed` or `failed`. Only the user who started a job (or a superuser) can see it.
+""",
+        responses={
+            200: "Job progress",
+            404: "Error: Not found",
+        },
+    )
+    def get(self, request, job_id: int) -> Response:
+        jobs = MFABulkResetJob.objects.all()
+        if not request.user.is_superuser:
+            jobs = jobs.filter(requested_by=request.user)
+        job = jobs.filter(pk=job_id).first()
+        if job is None:
+            return Response({"status": "error", "message": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(serialize_job(job))
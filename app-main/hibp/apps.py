@@ -73,4 +73,7 @@ class HibpConfig(AppConfig):
             return
 
         if updated:
+            from myview.authz_cache import invalidate_authorization_cache
+
+            invalidate_authorization_cache()
             logger.info("Assigned AD OU limiter to %s HIBP endpoints during startup", updated)
@@ -7,10 +7,11 @@ from dataclasses import dataclass
 from typing import Mapping, MutableMapping
 from urllib.parse import urljoin
 
-import requests
 from django.conf import settings
 from requests import RequestException, Response
 
+from utils.http_client import outbound_request
+
 logger = logging.getLogger(__name__)
 
 
@@ -98,7 +99,7 @@ class HIBPClient:
 
         try:
             logger.debug("HIBP request url=%s params=%s", url, params)
-            response = requests.get(url, headers=request_headers, params=params, timeout=timeout)
+            response = outbound_request("hibp", "GET", url, headers=request_headers, params=params, timeout=timeout)
         except RequestException as exc:  # pragma: no cover - network failure
             logger.warning("HIBP request failed url=%s error=%s", url, exc)
             raise HIBPRequestError(str(exc)) from exc
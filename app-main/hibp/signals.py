@@ -11,6 +11,8 @@ from django.db.models.signals import post_save
 from django.db.utils import ConnectionDoesNotExist
 from django.dispatch import receiver
 
+from myview.authz_cache import invalidate_authorization_cache
+
 from .constants import HIBP_ENDPOINT_PATHS
 
 logger = logging.getLogger(__name__)
@@ -100,6 +102,8 @@ if Endpoint is not None:
             sender.objects.filter(pk=instance.pk, limiter_type__isnull=True).update(
                 limiter_type_id=limiter_type_id
             )
+            # QuerySet.update() bypasses post_save, so drop cached decisions explicitly.
+            invalidate_authorization_cache()
             logger.debug(
                 "Assigned default HIBP limiter to new endpoint pk=%s path=%s",
                 instance.pk,
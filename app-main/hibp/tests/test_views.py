@@ -4,7 +4,7 @@ from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIRequestFactory, force_authenticate
 import requests
@@ -69,6 +69,7 @@ class HibpViewTests(TestCase):
         self.assertEqual(django_response.content, b"5BAA6:10")
         self.assertEqual(django_response["Content-Type"], "text/plain")
 
+    @override_settings(HIBP_API_KEY="service-key", HIBP_CERT_API_KEY=None)
     def test_domain_view_filters_by_allowed_ou(self) -> None:
         payload = b'{"thin": ["gopro.com"], "s200464": ["overleaf.com"]}'
         response = self._create_response(200, payload, "application/json")
@@ -81,13 +82,20 @@ class HibpViewTests(TestCase):
         allowed_dn = "OU=SUS,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk"
         request._ado_ou_base_dns = {allowed_dn}
 
-        def ad_side_effect(base_dn, search_filter, search_attributes):
-            if base_dn == allowed_dn and "thin@dtu.dk" in search_filter:
-                return [{"userPrincipalName": "thin@dtu.dk"}]
-            return []
+        directory = {
+            "thin@dtu.dk": f"CN=thin,{allowed_dn}",
+            "s200464@dtu.dk": "CN=s200464,OU=Other,DC=win,DC=dtu,DC=dk",
+        }
+
+        def ad_side_effect(*, base_dn, search_filter, search_attributes, **kwargs):
+            return [
+                {"userPrincipalName": [upn], "distinguishedName": [dn]}
+                for upn, dn in directory.items()
+                if f"(userPrincipalName={upn})" in search_filter
+            ]
 
         with patch("hibp.views.HIBPClient.get", return_value=service_response):
-            with patch("hibp.views.execute_active_directory_query", side_effect=ad_side_effect):
+            with patch("active_directory.services.execute_active_directory_query", side_effect=ad_side_effect):
                 drf_response = StealerLogsByEmailDomainView.as_view()(request, domain="dtu.dk")
 
         self.assertEqual(drf_response.status_code, 200)
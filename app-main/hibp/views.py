@@ -5,7 +5,6 @@ from __future__ import annotations
 import logging
 from typing import Any, Dict
 
-from active_directory.services import execute_active_directory_query
 from django.conf import settings
 from django.http import HttpResponse
 from rest_framework import status
@@ -13,6 +12,7 @@ from rest_framework.response import Response
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
+from myview.ou_scope import principals_within_ous
 from utils.api import SecuredAPIView
 
 from .services import HIBPClient, HIBPConfigurationError, HIBPRequestError
@@ -187,21 +187,23 @@ class StealerLogsByEmailDomainView(BaseHIBPView):
         if not isinstance(base_dns, set):
             base_dns = set(base_dns)
 
-        filtered: Dict[str, Any] = {}
-        cache: Dict[str, bool] = {}
-
-        for identifier, entries in data.items():
+        principals: Dict[str, str] = {}
+        for identifier in data:
             principal = self._normalise_principal(identifier, domain)
-            if principal is None:
-                continue
+            if principal is not None:
+                principals[identifier] = principal
 
-            allowed = cache.get(principal)
-            if allowed is None:
-                allowed = self._principal_in_allowed_ou(principal, base_dns)
-                cache[principal] = allowed
+        try:
+            allowed_principals = principals_within_ous(set(principals.values()), base_dns)
+        except Exception:  # pragma: no cover - best effort
+            logger.warning("Failed to evaluate AD OU limiters for HIBP domain response", exc_info=True)
+            allowed_principals = set()
 
-            if allowed:
-                filtered[identifier] = entries
+        filtered: Dict[str, Any] = {
+            identifier: entries
+            for identifier, entries in data.items()
+            if principals.get(identifier) in allowed_principals
+        }
 
         removed = len(data) - len(filtered)
         if removed:
@@ -224,31 +226,6 @@ class StealerLogsByEmailDomainView(BaseHIBPView):
             return identifier.lower()
         return f"{identifier}@{domain}".lower()
 
-    def _principal_in_allowed_ou(self, user_principal_name: str, base_dns: set[str]) -> bool:
-        search_filter = f"(userPrincipalName={user_principal_name})"
-        for base_dn in base_dns:
-            if not base_dn:
-                continue
-            try:
-                result = execute_active_directory_query(
-                    base_dn=base_dn,
-                    search_filter=search_filter,
-                    search_attributes=["userPrincipalName"],
-                )
-            except Exception:  # pragma: no cover - best effort
-                logger.warning(
-                    "Failed to evaluate AD OU limiter for %s under %s",
-                    user_principal_name,
-                    base_dn,
-                    exc_info=True,
-                )
-                continue
-
-            if result:
-                return True
-
-        return False
-
 
 class StealerLogsByEmailView(BaseHIBPView):
     hibp_path_template = "api/v3/stealerlogsbyemail/{account}"
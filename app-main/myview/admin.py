@@ -1084,6 +1084,117 @@ except ImportError:
     pass
 
 
+try:
+    from .mfa_bulk_reset import create_bulk_reset_job, start_bulk_reset_job, validate_user_principal_names
+    from .models import MFABulkResetItem, MFABulkResetJob
+
+    class MFABulkResetJobForm(forms.ModelForm):
+        user_principal_names = forms.CharField(
+            label="User principal names",
+            widget=forms.Textarea(attrs={"rows": 12, "cols": 60}),
+            help_text="One user principal name per line (commas and semicolons also work).",
+        )
+
+        class Meta:
+            model = MFABulkResetJob
+            fields = ()
+
+        def clean_user_principal_names(self):
+            try:
+                return validate_user_principal_names(self.cleaned_data['user_principal_names'])
+            except ValueError as exc:
+                raise forms.ValidationError(str(exc)) from exc
+
+    class MFABulkResetItemInline(admin.TabularInline):
+        model = MFABulkResetItem
+        extra = 0
+        can_delete = False
+        fields = ('target_user_principal_name', 'status', 'methods_deleted', 'methods_failed', 'details', 'datetime_modified')
+        readonly_fields = fields
+
+        def has_add_permission(self, request, obj=None):
+            return False
+
+    @admin.register(MFABulkResetJob)
+    class MFABulkResetJobAdmin(admin.ModelAdmin):
+        list_display = ('id', 'datetime_created', 'requested_by_username', 'status', 'progress', 'datetime_finished')
+        list_filter = ('status', ('datetime_created', admin.DateFieldListFilter))
+        search_fields = ('requested_by_username', 'items__target_user_principal_name')
+        readonly_fields = ('requested_by_username', 'status', 'datetime_created', 'datetime_started', 'datetime_finished', 'details')
+        ordering = ('-datetime_created',)
+        actions = ['rerun_unsuccessful_users']
+        list_per_page = 50
+
+        def get_form(self, request, obj=None, **kwargs):
+            if obj is None:
+                kwargs['form'] = MFABulkResetJobForm
+            return super().get_form(request, obj, **kwargs)
+
+        def get_fields(self, request, obj=None):
+            if obj is None:
+                return ('user_principal_names',)
+            return self.readonly_fields
+
+        def get_readonly_fields(self, request, obj=None):
+            return self.readonly_fields if obj else ()
+
+        def get_inlines(self, request, obj):
+            return [MFABulkResetItemInline] if obj else []
+
+        def has_change_permission(self, request, obj=None):
+            # Allow viewing detail pages with read-only fields.
+            return True
+
+        def save_model(self, request, obj, form, change):
+            if change:
+                return
+            job = create_bulk_reset_job(
+                requested_by=request.user,
+                user_principal_names=form.cleaned_data['user_principal_names'],
+            )
+            obj.pk = job.pk
+            obj.refresh_from_db()
+            start_bulk_reset_job(job)
+
+        def progress(self, obj):
+            items = list(obj.items.values_list('status', flat=True))
+            done = sum(1 for status in items if status != MFABulkResetItem.Status.PENDING)
+            return f"{done}/{len(items)}"
+        progress.short_description = 'Processed'
+
+        @admin.action(description="Re-run failed and denied users as a new job")
+        def rerun_unsuccessful_users(self, request, queryset):
+            targets = list(
+                MFABulkResetItem.objects.filter(
+                    job__in=queryset,
+                    status__in=[
+                        MFABulkResetItem.Status.FAILED,
+                        MFABulkResetItem.Status.PARTIAL,
+                        MFABulkResetItem.Status.DENIED,
+                    ],
+                ).values_list('target_user_principal_name', flat=True)
+            )
+            if not targets:
+                self.message_user(request, "The selected jobs have no unsuccessful users.", level=messages.INFO)
+                return None
+            try:
+                job = create_bulk_reset_job(requested_by=request.user, user_principal_names=targets)
+            except ValueError as exc:
+                self.message_user(request, str(exc), level=messages.ERROR)
+                return None
+            start_bulk_reset_job(job)
+            self.message_user(
+                request,
+                _("Started bulk reset job #%(job)d for %(count)d user(s).") % {"job": job.pk, "count": job.items.count()},
+                level=messages.SUCCESS,
+            )
+            return None
+
+except ImportError:
+    print("MFABulkResetJob model is not available for registration in the admin site.")
+    pass
+
+
 def _register_utility_admin_urls():
     original_get_urls = admin.site.get_urls
 
@@ -16,6 +16,11 @@ class MyviewConfig(AppConfig):
 
     def ready(self):
         # Register hooks only; avoid touching the database during app initialization.
+        try:
+            from . import signals  # noqa: F401
+        except Exception:
+            logger.exception("Failed to import myview signal handlers")
+
         self._startup_lock = threading.Lock()
         self._startup_sync_in_progress = False
         self._startup_pending_aliases = set()
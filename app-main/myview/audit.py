@@ -0,0 +1,212 @@
+"""Buffered writer for high-volume audit rows.
+
+``APIRequestLog`` and ``UserActivityLog`` API entries are written on every
+request. Instead of one autocommit INSERT per row on the request thread, rows
+are queued in-process and a background thread persists them with
+``bulk_create`` once ``AUDIT_LOG_BATCH_SIZE`` rows are waiting or
+``AUDIT_LOG_FLUSH_INTERVAL`` seconds have passed. Pending rows are flushed at
+interpreter shutdown.
+
+When the queue is full ``AUDIT_LOG_OVERFLOW_POLICY`` decides what happens:
+
+``sync``
+    write the row immediately on the calling thread (default, never loses rows)
+``block``
+    wait up to ``AUDIT_LOG_ENQUEUE_TIMEOUT`` seconds for space, then write synchronously
+``drop``
+    discard the row and count it
+
+Note that ``datetime_created`` reflects the flush time, which trails the
+request by at most the flush interval.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_SYNC = "sync"
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP = "drop"
+
+
+class AuditLogSink:
+    def __init__(
+        self,
+        *,
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        overflow_policy: str = OVERFLOW_SYNC,
+        enqueue_timeout: float = 0.5,
+    ):
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.05, float(flush_interval))
+        self.overflow_policy = overflow_policy if overflow_policy in {OVERFLOW_SYNC, OVERFLOW_BLOCK, OVERFLOW_DROP} else OVERFLOW_SYNC
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, int(max_queue_size)))
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopping = threading.Event()
+        self.stats = {"queued": 0, "written": 0, "dropped": 0, "sync_writes": 0, "failed": 0}
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def record(self, instance):
+        """Queue an unsaved model instance for insertion."""
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(instance)
+        except queue.Full:
+            return self._handle_overflow(instance)
+
+        self.stats["queued"] += 1
+        return instance
+
+    def _handle_overflow(self, instance):
+        if self.overflow_policy == OVERFLOW_BLOCK:
+            try:
+                self._queue.put(instance, timeout=self.enqueue_timeout)
+                self.stats["queued"] += 1
+                return instance
+            except queue.Full:
+                pass
+
+        if self.overflow_policy == OVERFLOW_DROP:
+            self.stats["dropped"] += 1
+            logger.warning(
+                "Audit log queue full; dropped %s entry (%s dropped so far)",
+                type(instance).__name__,
+                self.stats["dropped"],
+            )
+            return None
+
+        self.stats["sync_writes"] += 1
+        instance.save()
+        return instance
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+    def _ensure_worker(self) -> None:
+        pid = os.getpid()
+        worker = self._worker
+        if worker is not None and worker.is_alive() and self._pid == pid:
+            return
+
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive() and self._pid == pid:
+                return
+            if self._pid != pid:
+                # Queued rows inherited through fork belong to the parent.
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._pid = pid
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._worker.start()
+
+    def _drain(self, batch: Optional[list] = None) -> list:
+        batch = batch if batch is not None else []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            deadline = time.monotonic() + self.flush_interval
+            batch = []
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                self._drain(batch)
+            if batch:
+                self._write(batch)
+                close_old_connections()
+        connection.close()
+
+    def _write(self, batch: list) -> None:
+        by_model = defaultdict(list)
+        for instance in batch:
+            by_model[type(instance)].append(instance)
+
+        for model, instances in by_model.items():
+            try:
+                model.objects.bulk_create(instances, batch_size=self.batch_size)
+                self.stats["written"] += len(instances)
+            except Exception:
+                self.stats["failed"] += len(instances)
+                logger.exception("Failed to write %s %s audit row(s)", len(instances), model.__name__)
+                connection.close()
+
+    def flush(self) -> None:
+        """Synchronously write everything currently queued."""
+
+        while True:
+            batch = self._drain()
+            if not batch:
+                return
+            self._write(batch)
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        worker = self._worker
+        if worker is not None and worker.is_alive() and self._pid == os.getpid():
+            worker.join(timeout=self.flush_interval + 5)
+        if self._pid == os.getpid():
+            self.flush()
+
+
+_SINK: Optional[AuditLogSink] = None
+_SINK_LOCK = threading.Lock()
+
+
+def get_audit_sink() -> Optional[AuditLogSink]:
+    """Return the process-wide sink, or ``None`` when buffering is disabled."""
+
+    global _SINK
+    if not getattr(settings, "AUDIT_LOG_ASYNC", False):
+        return None
+    if _SINK is None:
+        with _SINK_LOCK:
+            if _SINK is None:
+                _SINK = AuditLogSink(
+                    max_queue_size=getattr(settings, "AUDIT_LOG_QUEUE_SIZE", 10000),
+                    batch_size=getattr(settings, "AUDIT_LOG_BATCH_SIZE", 200),
+                    flush_interval=getattr(settings, "AUDIT_LOG_FLUSH_INTERVAL", 1.0),
+                    overflow_policy=getattr(settings, "AUDIT_LOG_OVERFLOW_POLICY", OVERFLOW_SYNC),
+                    enqueue_timeout=getattr(settings, "AUDIT_LOG_ENQUEUE_TIMEOUT", 0.5),
+                )
+                atexit.register(_SINK.shutdown)
+    return _SINK
+
+
+def record_audit_entry(instance):
+    """Persist an audit model instance through the sink, or immediately if disabled."""
+
+    sink = get_audit_sink()
+    if sink is None:
+        instance.save()
+        return instance
+    return sink.record(instance)
@@ -0,0 +1,57 @@
+"""Cached access control decisions for ``AccessControlMiddleware``.
+
+A decision records whether a user may call the endpoint(s) matching a path
+template and which limiter rule then applies (including the OU base DNs for
+AD OU limiters). Decisions live in the Django cache under a key that embeds
+a global authorisation version; signal handlers bump the version whenever
+endpoints, group memberships or limiters change, which orphans every cached
+decision at once.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .local_cache import bump_shared_version, read_shared_version
+
+logger = logging.getLogger(__name__)
+
+AUTHZ_VERSION_CACHE_KEY = "myview:authz_version"
+
+
+def authorization_version():
+    return read_shared_version(AUTHZ_VERSION_CACHE_KEY, 0)
+
+
+def invalidate_authorization_cache(**_kwargs) -> None:
+    bump_shared_version(AUTHZ_VERSION_CACHE_KEY)
+
+
+def _decision_key(user_id, endpoint_ids: Sequence[int], version) -> str:
+    endpoints = "-".join(str(endpoint_id) for endpoint_id in endpoint_ids)
+    return f"myview:authz:{version}:{user_id}:{endpoints}"
+
+
+def get_cached_decision(user_id, endpoint_ids: Sequence[int]) -> tuple[str, Optional[dict]]:
+    key = _decision_key(user_id, endpoint_ids, authorization_version())
+    try:
+        return key, cache.get(key)
+    except Exception:
+        logger.debug("Unable to read cached authorisation decision", exc_info=True)
+        return key, None
+
+
+def store_decision(key: str, decision: dict) -> None:
+    timeout = getattr(
+        settings,
+        "AUTHZ_DECISION_CACHE_TIMEOUT",
+        getattr(settings, "AD_GROUP_CACHE_TIMEOUT", 15 * 60),
+    )
+    try:
+        cache.set(key, decision, timeout=timeout)
+    except Exception:
+        logger.debug("Unable to cache authorisation decision", exc_info=True)
@@ -0,0 +1,137 @@
+"""Precompiled router resolving request paths to ``Endpoint`` rows.
+
+Endpoint templates such as ``/graph/v1.0/get-user/{user}`` are loaded once
+per process into a segment trie. Resolving a request path walks one node per
+path segment instead of compiling and testing a regex for every endpoint the
+user can reach. The trie is rebuilt after Endpoint save/delete signals.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Iterable, Optional
+
+from .local_cache import VersionedLocalValue
+
+logger = logging.getLogger(__name__)
+
+_ROUTER_VERSION_CACHE_KEY = "myview:endpoint_router_version"
+_PLACEHOLDER = re.compile(r"\{[^}]*\}")
+
+# Everything below this prefix is served by the same documentation endpoint.
+DOCUMENTATION_PREFIX = "/openapi/v1.0/documentation/"
+
+
+def _split_path(path: str) -> list[str]:
+    return [segment for segment in (path or "").split("/") if segment]
+
+
+class _RouteNode:
+    __slots__ = ("literal", "wildcard", "patterns", "endpoint_ids")
+
+    def __init__(self):
+        self.literal: dict[str, _RouteNode] = {}
+        self.wildcard: Optional[_RouteNode] = None
+        # Segments that mix literal text and placeholders, e.g. ``{id}.json``.
+        self.patterns: list[tuple[re.Pattern, _RouteNode]] = []
+        self.endpoint_ids: list[int] = []
+
+
+class EndpointRouter:
+    def __init__(self, endpoints: Iterable[tuple[int, str]] = ()):
+        self._root = _RouteNode()
+        self._prefix_ids: list[int] = []
+        self._size = 0
+        for endpoint_id, path in endpoints:
+            self.add(endpoint_id, path)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, endpoint_id: int, path: str) -> None:
+        if not path:
+            return
+        self._size += 1
+
+        if path.startswith(DOCUMENTATION_PREFIX):
+            self._prefix_ids.append(endpoint_id)
+
+        node = self._root
+        for segment in _split_path(path):
+            if _PLACEHOLDER.fullmatch(segment):
+                if node.wildcard is None:
+                    node.wildcard = _RouteNode()
+                node = node.wildcard
+            elif _PLACEHOLDER.search(segment):
+                regex = "".join(
+                    "[^/]+" if _PLACEHOLDER.fullmatch(part) else re.escape(part)
+                    for part in re.split(r"(\{[^}]*\})", segment)
+                    if part
+                )
+                for pattern, child in node.patterns:
+                    if pattern.pattern == regex:
+                        node = child
+                        break
+                else:
+                    child = _RouteNode()
+                    node.patterns.append((re.compile(regex), child))
+                    node = child
+            else:
+                node = node.literal.setdefault(segment, _RouteNode())
+        node.endpoint_ids.append(endpoint_id)
+
+    def match(self, path: str) -> list[int]:
+        """Return ids of endpoints matching ``path``; literal routes come first."""
+
+        matches: list[int] = []
+        seen: set[int] = set()
+        self._walk(self._root, _split_path(path), 0, matches, seen)
+
+        if self._prefix_ids and (path or "").startswith(DOCUMENTATION_PREFIX):
+            for endpoint_id in self._prefix_ids:
+                if endpoint_id not in seen:
+                    seen.add(endpoint_id)
+                    matches.append(endpoint_id)
+        return matches
+
+    def _walk(self, node: _RouteNode, segments: list[str], index: int, matches: list[int], seen: set[int]) -> None:
+        if index == len(segments):
+            for endpoint_id in node.endpoint_ids:
+                if endpoint_id not in seen:
+                    seen.add(endpoint_id)
+                    matches.append(endpoint_id)
+            return
+
+        segment = segments[index]
+        child = node.literal.get(segment)
+        if child is not None:
+            self._walk(child, segments, index + 1, matches, seen)
+        for pattern, child in node.patterns:
+            if pattern.fullmatch(segment):
+                self._walk(child, segments, index + 1, matches, seen)
+        if node.wildcard is not None:
+            self._walk(node.wildcard, segments, index + 1, matches, seen)
+
+
+def _build_router() -> EndpointRouter:
+    from .models import Endpoint
+
+    router = EndpointRouter(Endpoint.objects.values_list("id", "path"))
+    logger.debug("Built endpoint router with %s routes", len(router))
+    return router
+
+
+_ROUTER = VersionedLocalValue(
+    _ROUTER_VERSION_CACHE_KEY,
+    _build_router,
+    interval_setting="ENDPOINT_ROUTER_VERSION_CHECK_SECONDS",
+)
+
+
+def get_endpoint_router() -> EndpointRouter:
+    return _ROUTER.get()
+
+
+def invalidate_endpoint_router(**_kwargs) -> None:
+    _ROUTER.invalidate()
@@ -0,0 +1,75 @@
+"""Run independent upstream lookups concurrently with per-call deadlines.
+
+Page views that aggregate several Graph/LDAP calls submit them to a shared,
+bounded thread pool and then collect each result by name. A lookup that
+misses its deadline is reported as timed out so the page can render whatever
+did arrive; the worker is left to finish in the background.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_lookup_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "MFA_RESET_LOOKUP_MAX_WORKERS", 8),
+                    thread_name_prefix="upstream-lookup",
+                )
+    return _EXECUTOR
+
+
+class LookupResult(NamedTuple):
+    value: Any = None
+    error: Optional[BaseException] = None
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.timed_out
+
+
+def _run_in_worker(fn: Callable, args: tuple, kwargs: dict):
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+class LookupFanout:
+    def __init__(self, *, timeout: Optional[float] = None, executor: Optional[ThreadPoolExecutor] = None):
+        self.timeout = timeout if timeout is not None else getattr(settings, "MFA_RESET_LOOKUP_TIMEOUT", 10.0)
+        self._executor = executor or get_lookup_executor()
+        self._calls: Dict[str, Tuple[Future, float]] = {}
+
+    def submit(self, name: str, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> None:
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        future = self._executor.submit(_run_in_worker, fn, args, kwargs)
+        self._calls[name] = (future, deadline)
+
+    def result(self, name: str) -> LookupResult:
+        future, deadline = self._calls[name]
+        try:
+            return LookupResult(value=future.result(timeout=max(0.0, deadline - time.monotonic())))
+        except FutureTimeoutError:
+            logger.warning("Upstream lookup %r exceeded its deadline", name)
+            return LookupResult(timed_out=True)
+        except Exception as exc:
+            return LookupResult(error=exc)
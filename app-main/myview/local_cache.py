@@ -0,0 +1,76 @@
+"""Per-process values that are rebuilt when a shared version marker changes.
+
+Signal handlers call :meth:`VersionedLocalValue.invalidate`, which drops the
+local copy and publishes a new version in the Django cache. Other worker
+processes compare their version with the shared one at most every
+``check_interval`` seconds and rebuild on mismatch.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def read_shared_version(cache_key: str, default=None):
+    try:
+        return cache.get(cache_key, default)
+    except Exception:
+        logger.debug("Unable to read shared version %s", cache_key, exc_info=True)
+        return default
+
+
+def bump_shared_version(cache_key: str):
+    version = time.time_ns()
+    try:
+        cache.set(cache_key, version, None)
+    except Exception:
+        logger.debug("Unable to publish shared version %s", cache_key, exc_info=True)
+    return version
+
+
+class VersionedLocalValue(Generic[T]):
+    def __init__(self, cache_key: str, builder: Callable[[], T], *, interval_setting: str, default_interval: float = 5.0):
+        self.cache_key = cache_key
+        self._builder = builder
+        self._interval_setting = interval_setting
+        self._default_interval = default_interval
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def get(self) -> T:
+        interval = getattr(settings, self._interval_setting, self._default_interval)
+        now = time.monotonic()
+        with self._lock:
+            value = self._value
+            if value is not None and now - self._checked_at < interval:
+                return value
+
+        version = read_shared_version(self.cache_key, self._version)
+        with self._lock:
+            if self._value is not None and version == self._version:
+                self._checked_at = now
+                return self._value
+
+        value = self._builder()
+        with self._lock:
+            self._value = value
+            self._version = version
+            self._checked_at = now
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
+        bump_shared_version(self.cache_key)
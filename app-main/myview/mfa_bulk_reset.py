@@ -0,0 +1,352 @@
+"""Background MFA resets for a list of users.
+
+:func:`create_bulk_reset_job` stores an ``MFABulkResetJob`` with one
+``MFABulkResetItem`` per user principal name and :func:`start_bulk_reset_job`
+runs it on a daemon thread once the transaction commits. Callers poll the job
+(see :func:`serialize_job`) for per-user progress.
+
+The runner applies the same OU scope rules as the MFA reset page
+(:class:`myview.mfa_scope.MFAResetScope`) for the user who requested the job.
+Each target user is handled by one task on a pool of
+``MFA_BULK_RESET_MAX_WORKERS`` threads, which bounds the number of concurrent
+Graph deletes. Workers only talk to Graph and Active Directory; the
+coordinating thread owns every database write, updating items as they finish
+and writing the ``MFAResetAttempt``/``MFAResetRecord`` audit rows in batches
+with ``bulk_create``.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+from requests import RequestException
+
+from graph import services as graph_services
+from graph.scripts._rate_limit import PRIORITY_BATCH, graph_priority
+
+from .mfa_scope import MFAResetScope, extract_user_distinguished_name
+from .models import MFABulkResetItem, MFABulkResetJob, MFAResetAttempt, MFAResetRecord
+
+logger = logging.getLogger(__name__)
+
+DELETABLE_METHOD_SERVICES = {
+    "#microsoft.graph.microsoftAuthenticatorAuthenticationMethod": "execute_microsoft_authentication_method",
+    "#microsoft.graph.phoneAuthenticationMethod": "execute_phone_authentication_method",
+    "#microsoft.graph.softwareOathAuthenticationMethod": "execute_delete_software_mfa_method",
+}
+
+PROFILE_SELECT = "$select=userPrincipalName,onPremisesDistinguishedName"
+
+# Audit rows are flushed once this many are buffered, and when the job ends.
+AUDIT_FLUSH_SIZE = 200
+
+_SPLIT_PATTERN = re.compile(r"[\s,;]+")
+
+
+def normalize_user_principal_names(values) -> List[str]:
+    """Split, trim and de-duplicate (case-insensitively) a list of UPNs."""
+
+    if isinstance(values, str):
+        values = [values]
+    seen = set()
+    result = []
+    for value in values or ():
+        for candidate in _SPLIT_PATTERN.split(str(value or "")):
+            candidate = candidate.strip()
+            if candidate and candidate.lower() not in seen:
+                seen.add(candidate.lower())
+                result.append(candidate)
+    return result
+
+
+def validate_user_principal_names(values) -> List[str]:
+    """Normalise ``values``; raises ``ValueError`` for an empty or oversized list."""
+
+    targets = normalize_user_principal_names(values)
+    if not targets:
+        raise ValueError("Provide at least one user principal name.")
+    max_users = getattr(settings, "MFA_BULK_RESET_MAX_USERS", 500)
+    if len(targets) > max_users:
+        raise ValueError(f"A bulk reset is limited to {max_users} users; {len(targets)} were given.")
+    return targets
+
+
+def create_bulk_reset_job(*, requested_by, user_principal_names: Iterable[str]) -> MFABulkResetJob:
+    """Persist a queued job with one pending item per user."""
+
+    targets = validate_user_principal_names(user_principal_names)
+
+    username = requested_by.get_username() if getattr(requested_by, "is_authenticated", False) else ""
+    with transaction.atomic():
+        job = MFABulkResetJob.objects.create(
+            requested_by=requested_by if username else None,
+            requested_by_username=username,
+        )
+        MFABulkResetItem.objects.bulk_create(
+            [MFABulkResetItem(job=job, target_user_principal_name=target) for target in targets]
+        )
+    return job
+
+
+def start_bulk_reset_job(job: MFABulkResetJob) -> None:
+    """Run ``job`` on a background thread after the current transaction commits."""
+
+    def _start():
+        threading.Thread(
+            target=_run_in_thread,
+            args=(job.pk,),
+            name=f"mfa-bulk-reset-{job.pk}",
+            daemon=True,
+        ).start()
+
+    transaction.on_commit(_start)
+
+
+def _run_in_thread(job_id: int) -> None:
+    close_old_connections()
+    try:
+        run_bulk_reset_job(job_id)
+    except Exception:
+        logger.exception("MFA bulk reset job %s crashed", job_id)
+    finally:
+        close_old_connections()
+
+
+@dataclass
+class _UserOutcome:
+    status: str
+    details: str = ""
+    profile: Optional[dict] = None
+    limiter: object = None
+    deleted: List[Tuple[str, str]] = field(default_factory=list)
+    failed: List[Tuple[str, str, str]] = field(default_factory=list)
+
+
+def _graph_error(data, status_code) -> str:
+    if isinstance(data, dict):
+        error = data.get("error")
+        if isinstance(error, dict):
+            code, message = error.get("code"), error.get("message")
+            if code and message:
+                return f"{code}: {message}"
+            if message or code:
+                return message or code
+    return f"Microsoft Graph returned status {status_code}."
+
+
+def _response_error(response, status_code) -> str:
+    try:
+        data = response.json()
+    except (AttributeError, ValueError):
+        data = None
+    return _graph_error(data, status_code)
+
+
+def _reset_user(user_principal_name: str, scope: MFAResetScope) -> _UserOutcome:
+    """Check scope, list and delete the removable methods of one user (runs in a worker).
+
+    Graph calls go out at batch priority so interactive resets on the MFA
+    page are served first when the shared Graph rate limit is tight.
+    """
+
+    with graph_priority(PRIORITY_BATCH):
+        Status = MFABulkResetItem.Status
+        try:
+            profile, status_code = graph_services.execute_get_user(user_principal_name, PROFILE_SELECT)
+            if status_code == 404:
+                return _UserOutcome(Status.FAILED, "User not found in Microsoft Entra ID.")
+            if status_code != 200:
+                return _UserOutcome(Status.FAILED, _graph_error(profile, status_code))
+
+            authorized, limiter = scope.authorize(
+                user_principal_name, extract_user_distinguished_name(profile)
+            )
+            if not authorized:
+                return _UserOutcome(Status.DENIED, scope.denied_message(user_principal_name), profile)
+
+            data, status_code = graph_services.execute_list_user_authentication_methods(user_principal_name)
+            if status_code != 200 or not isinstance(data, dict):
+                return _UserOutcome(Status.FAILED, _graph_error(data, status_code), profile, limiter)
+        except RequestException as exc:
+            return _UserOutcome(Status.FAILED, f"Unable to contact Microsoft Graph: {exc}")
+
+        outcome = _UserOutcome(Status.SUCCEEDED, profile=profile, limiter=limiter)
+        for method in data.get("value", []):
+            method_id = method.get("id", "")
+            method_type = method.get("@odata.type", "")
+            service_name = DELETABLE_METHOD_SERVICES.get(method_type)
+            if not service_name:
+                continue
+            try:
+                response, status_code = getattr(graph_services, service_name)(user_principal_name, method_id)
+            except RequestException as exc:
+                outcome.failed.append((method_id, method_type, f"Unable to contact Microsoft Graph: {exc}"))
+                continue
+            if status_code in (200, 202, 204):
+                outcome.deleted.append((method_id, method_type))
+            else:
+                outcome.failed.append((method_id, method_type, _response_error(response, status_code)))
+
+        if not outcome.deleted and not outcome.failed:
+            outcome.status = Status.NOTHING_TO_DO
+            outcome.details = "No removable authentication methods were found."
+        elif outcome.failed:
+            outcome.status = Status.PARTIAL if outcome.deleted else Status.FAILED
+            outcome.details = " ; ".join(error for _, _, error in outcome.failed)
+        return outcome
+
+
+class _AuditBuffer:
+    """Collects audit rows from finished users and writes them with ``bulk_create``."""
+
+    def __init__(self, performed_by):
+        self.performed_by = performed_by
+        self._attempts: List[MFAResetAttempt] = []
+        self._records: List[Tuple[MFAResetRecord, MFAResetAttempt]] = []
+
+    def _attempt(self, target, was_successful, method_id="", method_type="", details=""):
+        attempt = MFAResetAttempt.build_attempt(
+            performed_by=self.performed_by,
+            target_user_principal_name=target,
+            reset_type=MFAResetAttempt.ResetType.BULK,
+            was_successful=was_successful,
+            method_id=method_id,
+            method_type=method_type,
+            details=details,
+        )
+        self._attempts.append(attempt)
+        return attempt
+
+    def add(self, target: str, outcome: _UserOutcome) -> None:
+        if not outcome.deleted and not outcome.failed:
+            self._attempt(target, False, details=outcome.details)
+            return
+
+        last_success = None
+        for method_id, method_type in outcome.deleted:
+            last_success = self._attempt(target, True, method_id, method_type)
+        for method_id, method_type, error in outcome.failed:
+            self._attempt(target, False, method_id, method_type, error)
+
+        if last_success is not None:
+            record = MFAResetRecord.build_success(
+                performed_by=self.performed_by,
+                target_user_principal_name=target,
+                reset_type=MFAResetAttempt.ResetType.BULK,
+                client=outcome.limiter,
+                client_label=MFAResetScope.client_label(outcome.profile, outcome.limiter),
+            )
+            self._records.append((record, last_success))
+
+        if len(self._attempts) >= AUDIT_FLUSH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        attempts, records = self._attempts, self._records
+        self._attempts, self._records = [], []
+        try:
+            MFAResetAttempt.objects.bulk_create(attempts)
+            for record, attempt in records:
+                # Backends that cannot return primary keys from bulk inserts
+                # leave the link empty rather than failing the batch.
+                record.attempt = attempt if attempt.pk else None
+            MFAResetRecord.objects.bulk_create([record for record, _ in records])
+        except Exception:
+            logger.exception("Failed to write %d MFA bulk reset audit rows", len(attempts) + len(records))
+
+
+def run_bulk_reset_job(job, *, max_workers: Optional[int] = None) -> MFABulkResetJob:
+    """Process the pending items of ``job`` (an instance or primary key) synchronously."""
+
+    if not isinstance(job, MFABulkResetJob):
+        job = MFABulkResetJob.objects.select_related("requested_by").get(pk=job)
+
+    job.status = MFABulkResetJob.Status.RUNNING
+    job.datetime_started = timezone.now()
+    job.save(update_fields=["status", "datetime_started", "datetime_modified"])
+
+    items = list(job.items.filter(status=MFABulkResetItem.Status.PENDING))
+    audit = _AuditBuffer(job.requested_by or job.requested_by_username)
+    try:
+        if job.requested_by is None:
+            raise RuntimeError("The user who requested this job no longer exists.")
+        scope = MFAResetScope(job.requested_by)
+        # Resolve the limiters here: workers must not touch the database.
+        scope.limiters()
+
+        workers = max_workers or getattr(settings, "MFA_BULK_RESET_MAX_WORKERS", 4)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"mfa-bulk-reset-{job.pk}") as pool:
+            futures = {
+                pool.submit(_reset_user, item.target_user_principal_name, scope): item
+                for item in items
+            }
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as exc:
+                    logger.exception("MFA bulk reset failed for %s", item.target_user_principal_name)
+                    outcome = _UserOutcome(MFABulkResetItem.Status.FAILED, f"Unexpected error: {exc}")
+
+                item.status = outcome.status
+                item.methods_deleted = len(outcome.deleted)
+                item.methods_failed = len(outcome.failed)
+                item.details = outcome.details
+                item.save(update_fields=["status", "methods_deleted", "methods_failed", "details", "datetime_modified"])
+                audit.add(item.target_user_principal_name, outcome)
+    except Exception as exc:
+        logger.exception("MFA bulk reset job %s failed", job.pk)
+        job.items.filter(status=MFABulkResetItem.Status.PENDING).update(
+            status=MFABulkResetItem.Status.FAILED,
+            details="The job stopped before this user was processed.",
+            datetime_modified=timezone.now(),
+        )
+        job.status = MFABulkResetJob.Status.FAILED
+        job.details = str(exc)
+    else:
+        job.status = MFABulkResetJob.Status.COMPLETED
+    finally:
+        audit.flush()
+
+    job.datetime_finished = timezone.now()
+    job.save(update_fields=["status", "details", "datetime_finished", "datetime_modified"])
+    return job
+
+
+def serialize_job(job: MFABulkResetJob, *, include_items: bool = True) -> dict:
+    counts = dict(job.items.values_list("status").annotate(total=Count("id")).order_by())
+    total = sum(counts.values())
+    payload = {
+        "id": job.pk,
+        "status": job.status,
+        "requested_by": job.requested_by_username,
+        "created": job.datetime_created,
+        "started": job.datetime_started,
+        "finished": job.datetime_finished,
+        "details": job.details,
+        "total": total,
+        "processed": total - counts.get(MFABulkResetItem.Status.PENDING, 0),
+        "counts": {status: counts.get(status, 0) for status in MFABulkResetItem.Status.values},
+    }
+    if include_items:
+        payload["items"] = [
+            {
+                "user_principal_name": item.target_user_principal_name,
+                "status": item.status,
+                "methods_deleted": item.methods_deleted,
+                "methods_failed": item.methods_failed,
+                "details": item.details,
+                "updated": item.datetime_modified,
+            }
+            for item in job.items.all()
+        ]
+    return payload
@@ -0,0 +1,181 @@
+"""OU scope rules for MFA resets.
+
+The MFA reset page and background bulk reset jobs both decide whether a
+staff member may reset a target user with :class:`MFAResetScope`. A user is
+unrestricted when they are a superuser or hold a ``no_limit`` grant on one of
+the MFA reset endpoints; otherwise the target has to live below one of the
+``ADOrganizationalUnitLimiter`` OUs assigned to their AD groups.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from .models import ADGroupAssociation, ADOrganizationalUnitLimiter, Endpoint
+from .ou_scope import get_ou_containment_engine, normalize_dn, principal_matching_base_dns
+
+logger = logging.getLogger(__name__)
+
+MFA_RESET_REQUIRED_ENDPOINTS = [
+    {'method': 'GET', 'path': '/graph/v1.0/get-user/{user}'},
+    {'method': 'GET', 'path': '/graph/v1.0/list/{user_id__or__user_principalname}/authentication-methods'},
+    {'method': 'DELETE', 'path': '/graph/v1.0/users/{user_id__or__user_principalname}/microsoft-authentication-methods/{microsoft_authenticator_method_id}'},
+    {'method': 'DELETE', 'path': '/graph/v1.0/users/{user_id__or__user_principalname}/phone-authentication-methods/{phone_authenticator_method_id}'},
+    {'method': 'DELETE', 'path': '/graph/v1.0/users/{user_id__or__user_principalname}/software-authentication-methods/{software_oath_method_id}'},
+    {'method': 'GET', 'path': '/active-directory/v1.0/query'},
+]
+
+
+def extract_user_distinguished_name(profile_data) -> str:
+    if isinstance(profile_data, dict):
+        dn = profile_data.get("onPremisesDistinguishedName")
+        if dn:
+            return str(dn).strip()
+    return ""
+
+
+class MFAResetScope:
+    """The set of users ``user`` may reset MFA for. Lookups are memoised per instance."""
+
+    def __init__(self, user, required_endpoints=None):
+        self.user = user
+        self.required_endpoints = (
+            MFA_RESET_REQUIRED_ENDPOINTS if required_endpoints is None else required_endpoints
+        )
+        self._unrestricted = None
+        self._limiters = None
+
+    def _user_group_ids(self):
+        return list(self.user.ad_group_members.values_list("id", flat=True))
+
+    def is_unrestricted(self) -> bool:
+        if getattr(self.user, "is_superuser", False):
+            return True
+        if self._unrestricted is not None:
+            return self._unrestricted
+
+        endpoint_requirements = {
+            (entry["method"].upper(), entry["path"]) for entry in self.required_endpoints
+        }
+        user_group_ids = self._user_group_ids() if endpoint_requirements else []
+        self._unrestricted = False
+        if user_group_ids:
+            endpoints = Endpoint.objects.filter(ad_groups__in=user_group_ids, no_limit=True).distinct()
+            self._unrestricted = any(
+                ((endpoint.method or "").upper(), endpoint.path or "") in endpoint_requirements
+                for endpoint in endpoints
+            )
+        return self._unrestricted
+
+    def limiters(self):
+        """Return ``None`` when unrestricted, otherwise the user's OU limiters."""
+
+        if self.is_unrestricted():
+            return None
+        if self._limiters is None:
+            user_group_ids = self._user_group_ids()
+            if not user_group_ids:
+                self._limiters = []
+            else:
+                self._limiters = list(
+                    ADOrganizationalUnitLimiter.objects.filter(ad_groups__in=user_group_ids).distinct()
+                )
+        return self._limiters
+
+    def allowed_labels(self):
+        limiters = self.limiters()
+        if limiters is None:
+            return ()
+        labels = {
+            str(getattr(limiter, "canonical_name", "") or "").strip() for limiter in limiters
+        }
+        return tuple(sorted(filter(None, labels), key=str.lower))
+
+    def _limiters_by_dn(self, limiters):
+        limiters_by_dn = {}
+        for limiter in limiters or ():
+            dn = normalize_dn(getattr(limiter, "distinguished_name", ""))
+            if dn:
+                limiters_by_dn.setdefault(dn, limiter)
+        return limiters_by_dn
+
+    def matching_limiter(self, distinguished_name):
+        """Match a known distinguished name against the user's limiters."""
+
+        limiters = self.limiters()
+        if not limiters or not distinguished_name:
+            return None
+        limiters_by_dn = self._limiters_by_dn(limiters)
+        matched = get_ou_containment_engine().matching_base_dns(distinguished_name, limiters_by_dn)
+        return limiters_by_dn[matched[0]] if matched else None
+
+    def directory_matching_limiter(self, user_principal_name, limiters=None):
+        """Resolve the principal's DN in Active Directory and match it against ``limiters``."""
+
+        limiters_by_dn = self._limiters_by_dn(self.limiters() if limiters is None else limiters)
+        if not limiters_by_dn or not user_principal_name:
+            return None
+
+        try:
+            matched = principal_matching_base_dns(user_principal_name, limiters_by_dn)
+        except Exception:
+            logger.exception("Failed to verify OU scope for %s", user_principal_name)
+            return None
+
+        return limiters_by_dn[matched[0]] if matched else None
+
+    def authorize(self, user_principal_name, distinguished_name=""):
+        """Return ``(authorized, matching_limiter)`` for a target user."""
+
+        limiters = self.limiters()
+        if limiters is None:
+            return True, None
+        if not limiters:
+            return False, None
+
+        limiter = self.matching_limiter(distinguished_name)
+        if limiter is None:
+            limiter = self.directory_matching_limiter(user_principal_name, limiters)
+        return limiter is not None, limiter
+
+    def denied_message(self, user_principal_name) -> str:
+        if self.limiters() is None:
+            return f"You are not permitted to manage MFA for {user_principal_name}."
+
+        allowed_labels = self.allowed_labels()
+        if not allowed_labels:
+            return (
+                "You are not assigned to any organizational units that allow MFA resets, "
+                f"so you cannot manage MFA for {user_principal_name}."
+            )
+
+        readable_labels = ", ".join(allowed_labels)
+        return (
+            f"You can only manage MFA for users within these organizational units: {readable_labels}. "
+            f"{user_principal_name} is outside your scope."
+        )
+
+    @staticmethod
+    def client_label(profile_raw, client_limiter) -> str:
+        if client_limiter:
+            label = getattr(client_limiter, "canonical_name", "") or ""
+            if label:
+                return label
+            fallback_dn = getattr(client_limiter, "distinguished_name", "") or ""
+            if fallback_dn:
+                return fallback_dn
+
+        distinguished_name = extract_user_distinguished_name(profile_raw or {})
+        if not distinguished_name:
+            return ""
+
+        try:
+            canonical = ADGroupAssociation._dn_to_canonical(distinguished_name)
+        except Exception:  # pragma: no cover - defensive
+            logger.debug(
+                "Unable to convert distinguished name %s to canonical form",
+                distinguished_name,
+            )
+            canonical = ""
+
+        return canonical or distinguished_name
@@ -17,6 +17,9 @@ from django.shortcuts import redirect
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework.authtoken.models import Token
 
+from .audit import record_audit_entry
+from .authz_cache import get_cached_decision, store_decision
+from .endpoint_router import get_endpoint_router
 from .models import (
     ADGroupAssociation,
     ADOrganizationalUnitLimiter,
@@ -120,7 +123,7 @@ class AccessControlMiddleware(MiddlewareMixin):
     # ------------------------------------------------------------------
     def _authenticate_by_token(self, request, token: str) -> bool:
         try:
-            user = Token.objects.get(key=token).user
+            user = Token.objects.select_related("user").get(key=token).user
         except Token.DoesNotExist:
             logger.info("Invalid token access attempt path=%s", request.path)
             return False
@@ -201,28 +204,42 @@ class AccessControlMiddleware(MiddlewareMixin):
         return Endpoint.objects.filter(ad_groups__in=user_ad_groups)
 
     def is_user_authorized_for_resource(self, endpoint: Endpoint, request) -> bool:
-        if endpoint.no_limit:
-            return True
+        return self._apply_resource_rule(self._resolve_resource_rule(endpoint, request), request)
 
-        if request.user.username == "vicre":
-            path = request.path or ""
-            if "vicre-test01@dtudk.onmicrosoft.com" in path or "itsecurity@dtu.dk" in path:
-                return True
+    def _resolve_resource_rule(self, endpoint: Endpoint, request) -> dict:
+        """Describe the limiter rule guarding ``endpoint`` for this user in a cacheable form."""
+
+        if endpoint.no_limit:
+            return {"rule": "allow"}
 
         if not endpoint.limiter_type:
-            return False
+            return {"rule": "deny"}
 
         model_class = endpoint.limiter_type.content_type.model_class()
         limiters = model_class.objects.all()
         user_groups = request.user.ad_group_members.all()
 
         if model_class == IPLimiter:
-            return self._handle_ip_limiter(limiters, user_groups, request)
+            allowed = self._handle_ip_limiter(limiters, user_groups, request)
+            return {"rule": "allow" if allowed else "deny"}
 
         if model_class == ADOrganizationalUnitLimiter:
-            return self._handle_ad_ou_limiter(limiters, user_groups, request)
+            return {"rule": "ad_ou", "base_dns": self._get_ad_ou_base_dns(limiters, user_groups)}
 
         logger.warning("No limiter handler registered for %s", model_class.__name__)
+        return {"rule": "deny"}
+
+    def _apply_resource_rule(self, rule: dict, request) -> bool:
+        if rule["rule"] == "allow":
+            return True
+
+        if request.user.username == "vicre":
+            path = request.path or ""
+            if "vicre-test01@dtudk.onmicrosoft.com" in path or "itsecurity@dtu.dk" in path:
+                return True
+
+        if rule["rule"] == "ad_ou":
+            return self._authorize_ad_ou_principal(rule["base_dns"], request)
         return False
 
     def _handle_ip_limiter(self, limiters, user_groups, request) -> bool:
@@ -241,69 +258,118 @@ class AccessControlMiddleware(MiddlewareMixin):
             existing = set(existing)
 
         for limiter in limiters:
-            distinguished_name = getattr(limiter, "distinguished_name", "")
+            distinguished_name = getattr(limiter, "distinguished_name", limiter)
             if distinguished_name:
                 existing.add(distinguished_name)
 
         request._ado_ou_base_dns = existing
 
-    def _handle_ad_ou_limiter(self, limiters, user_groups, request) -> bool:
+    def _get_ad_ou_base_dns(self, limiters, user_groups) -> list[str]:
+        """Return OU base DNs reachable through limiters that share a group with the user."""
+
+        base_dns: list[str] = []
         for limiter in limiters:
             if not limiter.ad_groups.filter(id__in=user_groups).exists():
                 continue
 
-            match = re.search(r"([^\/@]+@[^\/]+)", request.path or "")
-            user_principal_name = match.group() if match else None
-
             ad_ou_limiters_qs = ADOrganizationalUnitLimiter.objects.filter(ad_groups__in=limiter.ad_groups.all()).distinct()
-            ad_ou_limiters = list(ad_ou_limiters_qs)
-            self._record_ad_ou_limiters(request, ad_ou_limiters)
+            for distinguished_name in ad_ou_limiters_qs.values_list("distinguished_name", flat=True):
+                if distinguished_name and distinguished_name not in base_dns:
+                    base_dns.append(distinguished_name)
+        return base_dns
 
-            if user_principal_name is None:
-                logger.debug(
-                    "AD OU limiter matched for request %s without principal; defaulting to membership authorisation",
-                    request.path,
-                )
-                return True
+    def _authorize_ad_ou_principal(self, base_dns, request) -> bool:
+        if not base_dns:
+            return False
 
-            from active_directory.services import execute_active_directory_query
+        self._record_ad_ou_limiters(request, base_dns)
 
-            for ad_ou_limiter in ad_ou_limiters:
-                base_dn = ad_ou_limiter.distinguished_name
-                search_filter = f"(userPrincipalName={user_principal_name})"
-                results = execute_active_directory_query(
-                    base_dn=base_dn,
-                    search_filter=search_filter,
-                    search_attributes=["userPrincipalName"],
-                )
-                if results:
-                    logger.info(
-                        "AD OU limiter authorised principal=%s limiter=%s path=%s",
-                        user_principal_name,
-                        ad_ou_limiter.distinguished_name,
-                        request.path,
-                    )
-                    return True
+        match = re.search(r"([^\/@]+@[^\/]+)", request.path or "")
+        user_principal_name = match.group() if match else None
+
+        if user_principal_name is None:
+            logger.debug(
+                "AD OU limiter matched for request %s without principal; defaulting to membership authorisation",
+                request.path,
+            )
+            return True
+
+        from .ou_scope import principal_matching_base_dns
+
+        matched = principal_matching_base_dns(user_principal_name, base_dns)
+        if matched:
+            logger.info(
+                "AD OU limiter authorised principal=%s limiter=%s path=%s",
+                user_principal_name,
+                matched[0],
+                request.path,
+            )
+            return True
         return False
 
+    def _handle_ad_ou_limiter(self, limiters, user_groups, request) -> bool:
+        return self._authorize_ad_ou_principal(self._get_ad_ou_base_dns(limiters, user_groups), request)
+
     def is_user_authorized_for_endpoint(self, request, normalised_path: str) -> Tuple[bool, Optional[Endpoint]]:
         if request.user.is_superuser:
             return True, None
 
+        return self._authorize_endpoint_candidates(
+            request, get_endpoint_router().match(normalised_path)
+        )
+
+    def _authorize_endpoint_candidates(self, request, candidate_ids) -> Tuple[bool, Optional[Endpoint]]:
+        if not candidate_ids:
+            return False, None
+
         cache_key = f"user_ad_groups_{request.user.id}"
         user_ad_groups = cache.get(cache_key)
         if user_ad_groups is None:
             self.set_user_ad_groups_cache(request.user)
             user_ad_groups = request.user.ad_group_members.all()
 
-        endpoints = self.get_user_authorized_endpoints(user_ad_groups)
+        endpoints = (
+            self.get_user_authorized_endpoints(user_ad_groups)
+            .filter(id__in=candidate_ids)
+            .select_related("limiter_type__content_type")
+            .distinct()
+        )
+        endpoints_by_id = {endpoint.id: endpoint for endpoint in endpoints}
 
-        for endpoint in endpoints.prefetch_related("ad_groups").distinct():
-            if self.compare_paths(endpoint.path, normalised_path):
+        for endpoint_id in candidate_ids:
+            endpoint = endpoints_by_id.get(endpoint_id)
+            if endpoint is not None:
                 return True, endpoint
 
         return False, None
 
+    def get_authorization_decision(self, request, normalised_path: str) -> dict:
+        """Return the cached (or freshly computed) decision for this user and path.
+
+        ``endpoint`` is ``False`` when no endpoint grants access; otherwise
+        ``resource`` holds the limiter rule to apply to the concrete request.
+        """
+
+        if request.user.is_superuser:
+            return {"endpoint": True, "resource": {"rule": "allow"}}
+
+        candidate_ids = get_endpoint_router().match(normalised_path)
+        if not candidate_ids:
+            return {"endpoint": False, "resource": None}
+
+        decision_key, decision = get_cached_decision(request.user.id, candidate_ids)
+        if decision is not None:
+            return decision
+
+        authorised, endpoint = self._authorize_endpoint_candidates(request, candidate_ids)
+        if not authorised or endpoint is None:
+            decision = {"endpoint": False, "resource": None}
+        else:
+            decision = {"endpoint": True, "resource": self._resolve_resource_rule(endpoint, request)}
+
+        store_decision(decision_key, decision)
+        return decision
+
     @staticmethod
     def set_user_ad_groups_cache(user) -> None:
         if user.username == "admin":
@@ -396,7 +462,7 @@ class AccessControlMiddleware(MiddlewareMixin):
             else:
                 auth_type = APIRequestLog.AUTH_TYPE_ANONYMOUS
 
-            APIRequestLog.objects.create(
+            record_audit_entry(APIRequestLog(
                 user=request.user if getattr(request.user, "is_authenticated", False) else None,
                 method=request.method,
                 path=request.path,
@@ -408,7 +474,7 @@ class AccessControlMiddleware(MiddlewareMixin):
                 auth_type=auth_type,
                 auth_token=token_value,
                 action=action,
-            )
+            ))
         except Exception:  # pragma: no cover - logging should never raise
             logger.warning("Failed to record API request log entry.", exc_info=True)
 
@@ -457,15 +523,15 @@ class AccessControlMiddleware(MiddlewareMixin):
                             self.set_user_ad_groups_cache(request.user)
                     response = self.get_response(request)
                 elif request.user.is_authenticated:
-                    authorised, endpoint = self.is_user_authorized_for_endpoint(request, normalised_path)
-                    if not authorised:
+                    decision = self.get_authorization_decision(request, normalised_path)
+                    if not decision["endpoint"]:
                         action = "endpoint_forbidden"
                         response = JsonResponse(
                             {"message": "Access denied. You are not authorized to access this endpoint."},
                             status=403,
                         )
                     else:
-                        has_resource_access = endpoint is None or self.is_user_authorized_for_resource(endpoint, request)
+                        has_resource_access = self._apply_resource_rule(decision["resource"], request)
                         if has_resource_access:
                             action = "authorized"
                             response = self.get_response(request)
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('myview', '0009_mfaresetrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MFABulkResetJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datetime_created', models.DateTimeField(auto_now_add=True)),
+                ('datetime_modified', models.DateTimeField(auto_now=True)),
+                ('requested_by_username', models.CharField(blank=True, max_length=150)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=16)),
+                ('datetime_started', models.DateTimeField(blank=True, null=True)),
+                ('datetime_finished', models.DateTimeField(blank=True, null=True)),
+                ('details', models.TextField(blank=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mfa_bulk_reset_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'MFA bulk reset job',
+                'verbose_name_plural': 'MFA bulk reset jobs',
+                'ordering': ['-datetime_created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MFABulkResetItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datetime_created', models.DateTimeField(auto_now_add=True)),
+                ('datetime_modified', models.DateTimeField(auto_now=True)),
+                ('target_user_principal_name', models.EmailField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('succeeded', 'Succeeded'), ('partial', 'Partially succeeded'), ('nothing_to_do', 'No removable methods'), ('denied', 'Outside OU scope'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('methods_deleted', models.PositiveIntegerField(default=0)),
+                ('methods_failed', models.PositiveIntegerField(default=0)),
+                ('details', models.TextField(blank=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='myview.mfabulkresetjob')),
+            ],
+            options={
+                'verbose_name': 'MFA bulk reset item',
+                'verbose_name_plural': 'MFA bulk reset items',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -18,6 +18,8 @@ import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Tuple
 
+from .audit import record_audit_entry
+
 logger = logging.getLogger(__name__)
 
 
@@ -168,7 +170,7 @@ class UserActivityLog(BaseModel):
             extra=extra,
         )
         payload["event_type"] = cls.EventType.API_REQUEST
-        return cls.objects.create(**payload)
+        return record_audit_entry(cls(**payload))
 
 
 
@@ -241,7 +243,13 @@ class MFAResetAttempt(BaseModel):
         )
 
     @classmethod
-    def log_attempt(
+    def log_attempt(cls, **kwargs):
+        attempt = cls.build_attempt(**kwargs)
+        attempt.save()
+        return attempt
+
+    @classmethod
+    def build_attempt(
         cls,
         *,
         performed_by,
@@ -252,6 +260,8 @@ class MFAResetAttempt(BaseModel):
         method_type="",
         details="",
     ):
+        """Return an unsaved attempt, e.g. for ``bulk_create``."""
+
         user = performed_by if getattr(performed_by, "is_authenticated", False) else None
         username = ""
         if getattr(performed_by, "is_authenticated", False):
@@ -259,7 +269,7 @@ class MFAResetAttempt(BaseModel):
         elif performed_by:
             username = str(performed_by)
 
-        return cls.objects.create(
+        return cls(
             performed_by=user,
             performed_by_username=username,
             target_user_principal_name=target_user_principal_name,
@@ -315,7 +325,13 @@ class MFAResetRecord(BaseModel):
         )
 
     @classmethod
-    def log_success(
+    def log_success(cls, **kwargs):
+        record = cls.build_success(**kwargs)
+        record.save()
+        return record
+
+    @classmethod
+    def build_success(
         cls,
         *,
         performed_by,
@@ -337,7 +353,7 @@ class MFAResetRecord(BaseModel):
         elif performed_by:
             username = str(performed_by)
 
-        return cls.objects.create(
+        return cls(
             attempt=attempt,
             performed_by=user,
             performed_by_username=username,
@@ -351,6 +367,68 @@ class MFAResetRecord(BaseModel):
         )
 
 
+class MFABulkResetJob(BaseModel):
+    """A background MFA reset for a list of users; see ``myview.mfa_bulk_reset``."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", _("Queued")
+        RUNNING = "running", _("Running")
+        COMPLETED = "completed", _("Completed")
+        FAILED = "failed", _("Failed")
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="mfa_bulk_reset_jobs",
+        null=True,
+        blank=True,
+    )
+    requested_by_username = models.CharField(max_length=150, blank=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    datetime_started = models.DateTimeField(null=True, blank=True)
+    datetime_finished = models.DateTimeField(null=True, blank=True)
+    details = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-datetime_created"]
+        verbose_name = "MFA bulk reset job"
+        verbose_name_plural = "MFA bulk reset jobs"
+
+    def __str__(self):
+        return f"MFA bulk reset #{self.pk} by {self.requested_by_username or 'unknown'} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in {self.Status.COMPLETED, self.Status.FAILED}
+
+
+class MFABulkResetItem(BaseModel):
+    """Progress of one target user inside an :class:`MFABulkResetJob`."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        SUCCEEDED = "succeeded", _("Succeeded")
+        PARTIAL = "partial", _("Partially succeeded")
+        NOTHING_TO_DO = "nothing_to_do", _("No removable methods")
+        DENIED = "denied", _("Outside OU scope")
+        FAILED = "failed", _("Failed")
+
+    job = models.ForeignKey(MFABulkResetJob, on_delete=models.CASCADE, related_name="items")
+    target_user_principal_name = models.EmailField(max_length=255)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    methods_deleted = models.PositiveIntegerField(default=0)
+    methods_failed = models.PositiveIntegerField(default=0)
+    details = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name = "MFA bulk reset item"
+        verbose_name_plural = "MFA bulk reset items"
+
+    def __str__(self):
+        return f"{self.target_user_principal_name} ({self.get_status_display()})"
+
+
 class BugReportAttachment(BaseModel):
     """Files attached to bug reports."""
 
@@ -874,7 +952,12 @@ class ADGroupAssociation(BaseModel):
         base_dn = "DC=win,DC=dtu,DC=dk"
         search_filter = f"(sAMAccountName={username})"
         search_attributes = ['memberOf']
-        result = execute_active_directory_query(base_dn=base_dn, search_filter=search_filter, search_attributes=search_attributes)
+        result = execute_active_directory_query(
+            base_dn=base_dn,
+            search_filter=search_filter,
+            search_attributes=search_attributes,
+            cache_profile='member_of',
+        )
 
         if result and 'memberOf' in result[0]:
             ad_groups = set(result[0]['memberOf'])
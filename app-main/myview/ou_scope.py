@@ -0,0 +1,347 @@
+"""Organizational unit containment checks for AD OU limiters.
+
+Authorisation used to ask Active Directory "does this principal live under
+base DN X?" once per limiter. Instead we resolve the principal's
+distinguishedName once (through the cached AD query layer) and answer
+containment in memory against a suffix trie of all
+``ADOrganizationalUnitLimiter.distinguished_name`` values.
+
+The trie is rebuilt lazily whenever a limiter is saved or deleted. The
+rebuild marker is shared through the Django cache so every worker notices.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from django.conf import settings
+from ldap3.utils.conv import escape_filter_chars
+
+from .local_cache import VersionedLocalValue
+
+logger = logging.getLogger(__name__)
+
+_TRIE_VERSION_CACHE_KEY = "myview:ou_limiter_trie_version"
+
+
+def split_dn(distinguished_name: str | None) -> tuple[str, ...]:
+    """Return normalised RDN components of a DN, honouring escaped commas."""
+
+    if not distinguished_name:
+        return ()
+
+    components = []
+    current = []
+    escaped = False
+    for char in str(distinguished_name):
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == "\\":
+            current.append(char)
+            escaped = True
+        elif char == ",":
+            components.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    components.append("".join(current))
+
+    normalised = []
+    for component in components:
+        key, sep, value = component.strip().partition("=")
+        if not sep:
+            continue
+        normalised.append(f"{key.strip().lower()}={value.strip().lower()}")
+    return tuple(normalised)
+
+
+def normalize_dn(distinguished_name: str | None) -> str:
+    return ",".join(split_dn(distinguished_name))
+
+
+class _TrieNode:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.terminal: Optional[str] = None
+
+
+class DNSuffixTrie:
+    """Trie keyed on DN components from the root (``dc=dk``) downwards."""
+
+    def __init__(self, distinguished_names: Iterable[str] = ()):
+        self._root = _TrieNode()
+        self._size = 0
+        for dn in distinguished_names:
+            self.add(dn)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, distinguished_name: str) -> None:
+        components = split_dn(distinguished_name)
+        if not components:
+            return
+        node = self._root
+        for component in reversed(components):
+            node = node.children.setdefault(component, _TrieNode())
+        if node.terminal is None:
+            self._size += 1
+        node.terminal = ",".join(components)
+
+    def __contains__(self, distinguished_name: object) -> bool:
+        node = self._root
+        for component in reversed(split_dn(distinguished_name if isinstance(distinguished_name, str) else None)):
+            node = node.children.get(component)
+            if node is None:
+                return False
+        return node is not self._root and node.terminal is not None
+
+    def containing(self, distinguished_name: str | None) -> list[str]:
+        """Return normalised DNs in the trie that contain ``distinguished_name``.
+
+        Results are ordered from the closest (deepest) ancestor outwards. A DN
+        counts as containing itself.
+        """
+
+        matches = []
+        node = self._root
+        for component in reversed(split_dn(distinguished_name)):
+            node = node.children.get(component)
+            if node is None:
+                break
+            if node.terminal is not None:
+                matches.append(node.terminal)
+        matches.reverse()
+        return matches
+
+
+class OUContainmentEngine:
+    """Process-local view of all limiter OUs with cross-worker invalidation."""
+
+    def __init__(self):
+        self._trie = VersionedLocalValue(
+            _TRIE_VERSION_CACHE_KEY,
+            self._build_trie,
+            interval_setting="AD_OU_TRIE_VERSION_CHECK_SECONDS",
+        )
+
+    @staticmethod
+    def _build_trie() -> DNSuffixTrie:
+        from .models import ADOrganizationalUnitLimiter
+
+        trie = DNSuffixTrie(ADOrganizationalUnitLimiter.objects.values_list("distinguished_name", flat=True))
+        logger.debug("Rebuilt OU limiter trie with %s entries", len(trie))
+        return trie
+
+    def trie(self) -> DNSuffixTrie:
+        return self._trie.get()
+
+    def invalidate(self) -> None:
+        self._trie.invalidate()
+
+    def matching_base_dns(self, distinguished_name: str | None, base_dns: Iterable[str]) -> list[str]:
+        """Return the normalised entries of ``base_dns`` that contain the DN."""
+
+        wanted = {normalize_dn(dn) for dn in base_dns if dn}
+        wanted.discard("")
+        if not wanted or not distinguished_name:
+            return []
+
+        trie = self.trie()
+        matches = [dn for dn in trie.containing(distinguished_name) if dn in wanted]
+
+        # Base DNs that are not (yet) stored as limiters still get an exact
+        # component-wise suffix comparison; the trie already answered the rest.
+        unknown = [base for base in wanted if base not in trie]
+        if unknown:
+            components = split_dn(distinguished_name)
+            for base in unknown:
+                base_components = split_dn(base)
+                if components[-len(base_components):] == base_components:
+                    matches.append(base)
+        return matches
+
+    def is_within(self, distinguished_name: str | None, base_dns: Iterable[str]) -> bool:
+        return bool(self.matching_base_dns(distinguished_name, base_dns))
+
+
+_ENGINE = OUContainmentEngine()
+
+
+def get_ou_containment_engine() -> OUContainmentEngine:
+    return _ENGINE
+
+
+def invalidate_ou_limiter_trie(**_kwargs) -> None:
+    _ENGINE.invalidate()
+
+
+def resolve_principal_dn(user_principal_name: str | None) -> str:
+    """Return the distinguishedName for a UPN, or an empty string if unknown."""
+
+    if not user_principal_name:
+        return ""
+
+    from active_directory.services import execute_active_directory_query
+
+    base_dn = getattr(settings, "AD_OU_SCOPE_SEARCH_BASE", "DC=win,DC=dtu,DC=dk")
+    results = execute_active_directory_query(
+        base_dn=base_dn,
+        search_filter=f"(userPrincipalName={escape_filter_chars(user_principal_name.strip())})",
+        search_attributes=["distinguishedName"],
+        limit=1,
+        cache_profile="upn_probe",
+    )
+    if not results:
+        return ""
+
+    return _first_value(results[0].get("distinguishedName"))
+
+
+def _first_value(value) -> str:
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else ""
+    return str(value or "").strip()
+
+
+def _resolve_principal_chunk(base_dn: str, principals: list[str]) -> dict[str, str]:
+    from active_directory.services import execute_active_directory_query
+
+    clauses = "".join(f"(userPrincipalName={escape_filter_chars(upn)})" for upn in principals)
+    results = execute_active_directory_query(
+        base_dn=base_dn,
+        search_filter=f"(|{clauses})",
+        search_attributes=["userPrincipalName", "distinguishedName"],
+        limit=len(principals),
+    )
+
+    resolved = {}
+    for entry in results or ():
+        upn = _first_value(entry.get("userPrincipalName")).lower()
+        dn = _first_value(entry.get("distinguishedName"))
+        if upn and dn:
+            resolved[upn] = dn
+    return resolved
+
+
+def resolve_principal_dns(user_principal_names: Iterable[str]) -> dict[str, str]:
+    """Resolve many UPNs to distinguishedNames with chunked OR filters.
+
+    Chunks are queried concurrently (bounded by ``AD_BULK_RESOLVE_MAX_WORKERS``).
+    Keys are lower-cased UPNs; principals that are not found are omitted.
+    """
+
+    principals = sorted({upn.strip().lower() for upn in user_principal_names if upn and upn.strip()})
+    if not principals:
+        return {}
+
+    base_dn = getattr(settings, "AD_OU_SCOPE_SEARCH_BASE", "DC=win,DC=dtu,DC=dk")
+    chunk_size = max(1, int(getattr(settings, "AD_BULK_RESOLVE_CHUNK_SIZE", 100)))
+    max_workers = max(1, int(getattr(settings, "AD_BULK_RESOLVE_MAX_WORKERS", 4)))
+    chunks = [principals[i:i + chunk_size] for i in range(0, len(principals), chunk_size)]
+
+    resolved: dict[str, str] = {}
+    if len(chunks) == 1 or max_workers == 1:
+        for chunk in chunks:
+            resolved.update(_resolve_principal_chunk(base_dn, chunk))
+        return resolved
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)), thread_name_prefix="ad-upn-resolve") as executor:
+        for chunk_result in executor.map(lambda chunk: _resolve_principal_chunk(base_dn, chunk), chunks):
+            resolved.update(chunk_result)
+
+    logger.debug(
+        "Resolved %s of %s principal(s) in %s chunk(s)",
+        len(resolved),
+        len(principals),
+        len(chunks),
+    )
+    return resolved
+
+
+def principals_within_ous(user_principal_names: Iterable[str], base_dns: Iterable[str]) -> set[str]:
+    """Return the lower-cased UPNs that live under any of ``base_dns``."""
+
+    allowed_trie = DNSuffixTrie(dn for dn in base_dns if dn)
+    if not len(allowed_trie):
+        return set()
+
+    return {
+        upn
+        for upn, dn in resolve_principal_dns(user_principal_names).items()
+        if allowed_trie.containing(dn)
+    }
+
+
+def dn_within_ous(distinguished_name: str | None, base_dns: Iterable[str]) -> bool:
+    """Return whether ``distinguished_name`` is one of ``base_dns`` or below one."""
+
+    return bool(DNSuffixTrie(dn for dn in base_dns if dn).containing(distinguished_name))
+
+
+def computers_within_ous(
+    dns_host_names: Iterable[str],
+    base_dns: Iterable[str],
+    *,
+    attribute: str = "dNSHostName",
+) -> set[str]:
+    """Return the lower-cased computer DNS names that live under any of ``base_dns``.
+
+    ``attribute="name"`` matches NetBIOS computer names instead.
+    """
+
+    allowed_trie = DNSuffixTrie(dn for dn in base_dns if dn)
+    if not len(allowed_trie):
+        return set()
+
+    from active_directory.services import resolve_computer_dns
+
+    return {
+        name
+        for name, dn in resolve_computer_dns(dns_host_names, attribute=attribute).items()
+        if allowed_trie.containing(dn)
+    }
+
+
+def principal_matching_base_dns(
+    user_principal_name: str | None,
+    base_dns: Iterable[str],
+    *,
+    distinguished_name: str | None = None,
+) -> list[str]:
+    """Return base DNs containing the principal, resolving its DN at most once."""
+
+    base_dns = [dn for dn in base_dns if dn]
+    if not base_dns:
+        return []
+
+    engine = get_ou_containment_engine()
+    if distinguished_name:
+        matches = engine.matching_base_dns(distinguished_name, base_dns)
+        if matches:
+            return matches
+
+    resolved = resolve_principal_dn(user_principal_name)
+    if not resolved or normalize_dn(resolved) == normalize_dn(distinguished_name):
+        return []
+    return engine.matching_base_dns(resolved, base_dns)
+
+
+def principal_within_ous(
+    user_principal_name: str | None,
+    base_dns: Iterable[str],
+    *,
+    distinguished_name: str | None = None,
+) -> bool:
+    return bool(
+        principal_matching_base_dns(
+            user_principal_name,
+            base_dns,
+            distinguished_name=distinguished_name,
+        )
+    )
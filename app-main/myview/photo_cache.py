@@ -0,0 +1,160 @@
+"""Disk cache for Microsoft Graph profile photos.
+
+Photos are stored once per (user, size) under ``PROFILE_PHOTO_CACHE_DIR`` so
+every worker on the host shares them, and the directory is pruned oldest-first
+whenever it grows beyond ``PROFILE_PHOTO_CACHE_MAX_BYTES``. Users without a
+photo get a zero-byte marker that expires after
+``PROFILE_PHOTO_NEGATIVE_TTL`` seconds so they are not looked up on every page
+view. Pages link to :class:`myview.views.ProfilePhotoView` instead of
+inlining the image, letting browsers reuse it via ``ETag``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MISSING = "missing"
+
+
+class CachedPhoto(NamedTuple):
+    content: bytes
+    content_type: str
+    etag: str
+
+
+def _cache_name(user_principal_name: str, size: str) -> str:
+    normalized = f"{(user_principal_name or '').strip().lower()}|{size or 'full'}"
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class ProfilePhotoCache:
+    def __init__(self, directory, *, max_bytes: int, ttl: float, negative_ttl: float):
+        self.directory = Path(directory)
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._prune_lock = threading.Lock()
+
+    def _paths(self, user_principal_name: str, size: str) -> tuple[Path, Path, Path]:
+        name = _cache_name(user_principal_name, size)
+        return (
+            self.directory / f"{name}.img",
+            self.directory / f"{name}.json",
+            self.directory / f"{name}.none",
+        )
+
+    def _is_fresh(self, path: Path, ttl: float) -> bool:
+        try:
+            return time.time() - path.stat().st_mtime < ttl
+        except OSError:
+            return False
+
+    def get(self, user_principal_name: str, size: str):
+        """Return a :class:`CachedPhoto`, :data:`MISSING`, or ``None`` when unknown."""
+
+        image_path, meta_path, missing_path = self._paths(user_principal_name, size)
+        if self._is_fresh(missing_path, self.negative_ttl):
+            return MISSING
+        if not self._is_fresh(image_path, self.ttl):
+            return None
+        try:
+            meta = json.loads(meta_path.read_text())
+            content = image_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return CachedPhoto(content, meta.get("content_type") or "image/jpeg", meta.get("etag") or "")
+
+    def store(self, user_principal_name: str, size: str, content: bytes, content_type: str) -> CachedPhoto:
+        image_path, meta_path, missing_path = self._paths(user_principal_name, size)
+        etag = '"%s"' % hashlib.sha1(content).hexdigest()
+        photo = CachedPhoto(content, content_type, etag)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._atomic_write(meta_path, json.dumps({"content_type": content_type, "etag": etag}).encode("utf-8"))
+            self._atomic_write(image_path, content)
+            missing_path.unlink(missing_ok=True)
+        except OSError:
+            logger.warning("Unable to cache profile photo in %s", self.directory, exc_info=True)
+            return photo
+        self._prune()
+        return photo
+
+    def store_missing(self, user_principal_name: str, size: str) -> None:
+        image_path, meta_path, missing_path = self._paths(user_principal_name, size)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            missing_path.touch()
+            image_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+        except OSError:
+            logger.warning("Unable to record missing profile photo in %s", self.directory, exc_info=True)
+
+    def _atomic_write(self, path: Path, content: bytes) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(content)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    def _prune(self) -> None:
+        if not self.max_bytes or not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            entries = []
+            total = 0
+            for path in self.directory.glob("*.img"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()
+            for _mtime, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                path.with_suffix(".json").unlink(missing_ok=True)
+                total -= size
+        except OSError:
+            logger.warning("Unable to prune profile photo cache %s", self.directory, exc_info=True)
+        finally:
+            self._prune_lock.release()
+
+
+_CACHE: Optional[ProfilePhotoCache] = None
+
+
+def get_photo_cache() -> ProfilePhotoCache:
+    global _CACHE
+    directory = getattr(settings, "PROFILE_PHOTO_CACHE_DIR", None) or os.path.join(tempfile.gettempdir(), "profile-photos")
+    if _CACHE is None or str(_CACHE.directory) != str(directory):
+        _CACHE = ProfilePhotoCache(
+            directory,
+            max_bytes=getattr(settings, "PROFILE_PHOTO_CACHE_MAX_BYTES", 50 * 1024 * 1024),
+            ttl=getattr(settings, "PROFILE_PHOTO_CACHE_TTL", 24 * 60 * 60),
+            negative_ttl=getattr(settings, "PROFILE_PHOTO_NEGATIVE_TTL", 6 * 60 * 60),
+        )
+    return _CACHE
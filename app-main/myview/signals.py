@@ -1,10 +1,80 @@
-# from django.db.models.signals import post_save, post_delete
-# from django.dispatch import receiver
-# from .models import UserProfile, Endpoint, EndpointPermission
-# from django.core.cache import cache
-
-# # Invalidate or update cache when a UserProfile is updated
-# @receiver([post_save, post_delete], sender=UserProfile)
-# def update_user_cache(sender, instance, **kwargs):
-#     cache_key = f"user_{instance.user.id}_access"
-#     cache.delete(cache_key)
\ No newline at end of file
+"""Signal handlers keeping in-process authorisation caches in sync."""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .authz_cache import invalidate_authorization_cache
+from .endpoint_router import invalidate_endpoint_router
+from .models import (
+    ADGroupAssociation,
+    ADOrganizationalUnitLimiter,
+    Endpoint,
+    IPLimiter,
+    LimiterType,
+)
+from .ou_scope import invalidate_ou_limiter_trie
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=ADOrganizationalUnitLimiter,
+    dispatch_uid="myview_invalidate_ou_limiter_trie",
+)
+def _invalidate_ou_limiter_trie(sender, **kwargs):
+    invalidate_ou_limiter_trie()
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=Endpoint,
+    dispatch_uid="myview_invalidate_endpoint_router",
+)
+def _invalidate_endpoint_router(sender, **kwargs):
+    invalidate_endpoint_router()
+
+
+_AUTHORIZATION_MODELS = (
+    Endpoint,
+    ADOrganizationalUnitLimiter,
+    IPLimiter,
+    LimiterType,
+)
+
+_AUTHORIZATION_RELATIONS = (
+    Endpoint.ad_groups.through,
+    ADGroupAssociation.members.through,
+    ADOrganizationalUnitLimiter.ad_groups.through,
+    IPLimiter.ad_groups.through,
+)
+
+
+def _invalidate_authorization(sender, **kwargs):
+    if kwargs.get("action", "post_").startswith("post_"):
+        invalidate_authorization_cache()
+
+
+for _model in _AUTHORIZATION_MODELS:
+    post_save.connect(
+        _invalidate_authorization,
+        sender=_model,
+        dispatch_uid=f"myview_authz_save_{_model._meta.label_lower}",
+    )
+    post_delete.connect(
+        _invalidate_authorization,
+        sender=_model,
+        dispatch_uid=f"myview_authz_delete_{_model._meta.label_lower}",
+    )
+
+# Deleting a group cascades through its relations without m2m_changed.
+post_delete.connect(
+    _invalidate_authorization,
+    sender=ADGroupAssociation,
+    dispatch_uid="myview_authz_delete_myview.adgroupassociation",
+)
+
+for _relation in _AUTHORIZATION_RELATIONS:
+    m2m_changed.connect(
+        _invalidate_authorization,
+        sender=_relation,
+        dispatch_uid=f"myview_authz_m2m_{_relation._meta.label_lower}",
+    )
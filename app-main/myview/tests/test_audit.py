@@ -0,0 +1,46 @@
+from django.test import TestCase
+
+from myview.audit import OVERFLOW_DROP, OVERFLOW_SYNC, AuditLogSink
+from myview.models import APIRequestLog, UserActivityLog
+
+
+class _IdleSink(AuditLogSink):
+    """Sink without a writer thread so tests control when rows are flushed."""
+
+    def _ensure_worker(self):
+        pass
+
+
+class AuditLogSinkTests(TestCase):
+    def _entry(self, path="/graph/v1.0/get-user/alice"):
+        return APIRequestLog(method="GET", path=path, status_code=200)
+
+    def test_flush_bulk_writes_queued_rows_per_model(self):
+        sink = _IdleSink(max_queue_size=10, batch_size=2, flush_interval=1)
+        for index in range(3):
+            sink.record(self._entry(f"/path/{index}"))
+        sink.record(UserActivityLog(event_type=UserActivityLog.EventType.API_REQUEST, username="alice"))
+
+        self.assertEqual(APIRequestLog.objects.count(), 0)
+        sink.flush()
+
+        self.assertEqual(APIRequestLog.objects.count(), 3)
+        self.assertEqual(UserActivityLog.objects.count(), 1)
+        self.assertEqual(sink.stats["written"], 4)
+
+    def test_overflow_sync_writes_inline(self):
+        sink = _IdleSink(max_queue_size=1, batch_size=10, flush_interval=1, overflow_policy=OVERFLOW_SYNC)
+        sink.record(self._entry())
+        sink.record(self._entry())
+
+        self.assertEqual(APIRequestLog.objects.count(), 1)
+        self.assertEqual(sink.stats["sync_writes"], 1)
+
+    def test_overflow_drop_discards_rows(self):
+        sink = _IdleSink(max_queue_size=1, batch_size=10, flush_interval=1, overflow_policy=OVERFLOW_DROP)
+        sink.record(self._entry())
+        self.assertIsNone(sink.record(self._entry()))
+
+        sink.flush()
+        self.assertEqual(APIRequestLog.objects.count(), 1)
+        self.assertEqual(sink.stats["dropped"], 1)
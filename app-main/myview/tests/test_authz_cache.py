@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from myview.endpoint_router import invalidate_endpoint_router
+from myview.middleware import AccessControlMiddleware
+from myview.models import ADGroupAssociation, ADOrganizationalUnitLimiter, Endpoint, LimiterType
+
+
+@override_settings(ENDPOINT_ROUTER_VERSION_CHECK_SECONDS=60)
+class AuthorizationDecisionCacheTests(TestCase):
+    path = "/graph/v1.0/get-user/alice@dtu.dk"
+
+    def setUp(self):
+        cache.clear()
+        invalidate_endpoint_router()
+        self.user = get_user_model().objects.create_user(username="tester", password="pass")
+        self.group = ADGroupAssociation.objects.create(
+            canonical_name="win.dtu.dk/Groups/api-users",
+            distinguished_name="CN=api-users,OU=Groups,DC=win,DC=dtu,DC=dk",
+        )
+        self.group.members.add(self.user)
+        cache.set(f"user_ad_groups_{self.user.id}", [self.group.id])
+
+        limiter_type, _ = LimiterType.objects.get_or_create(
+            content_type=ContentType.objects.get_for_model(ADOrganizationalUnitLimiter),
+            defaults={"name": "AD Organizational Unit Limiter"},
+        )
+        self.limiter = ADOrganizationalUnitLimiter.objects.create(
+            canonical_name="win.dtu.dk/DTUBaseUsers/SUS",
+            distinguished_name="OU=SUS,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+        )
+        self.limiter.ad_groups.add(self.group)
+        self.endpoint = Endpoint.objects.create(
+            path="/graph/v1.0/get-user/{user}",
+            method="get",
+            limiter_type=limiter_type,
+        )
+        self.endpoint.ad_groups.add(self.group)
+        self.middleware = AccessControlMiddleware(lambda request: None)
+
+    def _decide(self):
+        request = RequestFactory().get(self.path)
+        request.user = self.user
+        return self.middleware.get_authorization_decision(request, self.middleware.normalize_path(self.path))
+
+    def test_warm_decision_runs_no_queries(self):
+        decision = self._decide()
+        self.assertEqual(
+            decision,
+            {
+                "endpoint": True,
+                "resource": {"rule": "ad_ou", "base_dns": [self.limiter.distinguished_name]},
+            },
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._decide(), decision)
+
+    def test_membership_change_invalidates_decisions(self):
+        self.assertTrue(self._decide()["endpoint"])
+
+        self.endpoint.ad_groups.remove(self.group)
+
+        self.assertFalse(self._decide()["endpoint"])
+
+    def test_limiter_group_change_invalidates_base_dns(self):
+        self._decide()
+
+        self.limiter.ad_groups.clear()
+
+        self.assertEqual(self._decide()["resource"], {"rule": "ad_ou", "base_dns": []})
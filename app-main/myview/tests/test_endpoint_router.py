@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from myview.endpoint_router import EndpointRouter, get_endpoint_router, invalidate_endpoint_router
+from myview.middleware import AccessControlMiddleware
+from myview.models import ADGroupAssociation, Endpoint
+
+
+class EndpointRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = EndpointRouter(
+            [
+                (1, "/graph/v1.0/get-user/{user}"),
+                (2, "/graph/v1.0/get-user/me"),
+                (3, "/hibp/v3/breach/{name}.json"),
+                (4, "/openapi/v1.0/documentation/"),
+                (5, "/active-directory/v1.0/query"),
+            ]
+        )
+
+    def test_literal_routes_win_over_placeholders(self):
+        self.assertEqual(self.router.match("/graph/v1.0/get-user/me/"), [2, 1])
+        self.assertEqual(self.router.match("/graph/v1.0/get-user/alice@dtu.dk/"), [1])
+
+    def test_placeholders_inside_a_segment(self):
+        self.assertEqual(self.router.match("/hibp/v3/breach/Adobe.json/"), [3])
+        self.assertEqual(self.router.match("/hibp/v3/breach/Adobe/"), [])
+
+    def test_placeholders_do_not_span_segments(self):
+        self.assertEqual(self.router.match("/graph/v1.0/get-user/a/b/"), [])
+
+    def test_literal_dots_are_not_wildcards(self):
+        self.assertEqual(self.router.match("/active-directory/v1X0/query/"), [])
+
+    def test_documentation_prefix_matches_subpaths(self):
+        self.assertEqual(self.router.match("/openapi/v1.0/documentation/swagger.json/"), [4])
+
+
+@override_settings(ENDPOINT_ROUTER_VERSION_CHECK_SECONDS=0)
+class EndpointAuthorizationTests(TestCase):
+    def setUp(self):
+        invalidate_endpoint_router()
+        self.user = get_user_model().objects.create_user(username="tester", password="pass")
+        self.group = ADGroupAssociation.objects.create(
+            canonical_name="win.dtu.dk/Groups/api-users",
+            distinguished_name="CN=api-users,OU=Groups,DC=win,DC=dtu,DC=dk",
+        )
+        self.group.members.add(self.user)
+        cache.set(f"user_ad_groups_{self.user.id}", [self.group.id])
+        self.addCleanup(cache.delete, f"user_ad_groups_{self.user.id}")
+        self.middleware = AccessControlMiddleware(lambda request: None)
+
+    def _authorise(self, path):
+        request = RequestFactory().get(path)
+        request.user = self.user
+        return self.middleware.is_user_authorized_for_endpoint(request, self.middleware.normalize_path(path))
+
+    def test_router_is_rebuilt_after_endpoint_changes(self):
+        self.assertEqual(self._authorise("/graph/v1.0/get-user/alice@dtu.dk"), (False, None))
+
+        endpoint = Endpoint.objects.create(path="/graph/v1.0/get-user/{user}", method="get")
+        endpoint.ad_groups.add(self.group)
+
+        self.assertEqual(self._authorise("/graph/v1.0/get-user/alice@dtu.dk"), (True, endpoint))
+
+        endpoint.delete()
+        self.assertEqual(get_endpoint_router().match("/graph/v1.0/get-user/alice@dtu.dk/"), [])
+
+    def test_endpoint_without_user_group_is_denied(self):
+        Endpoint.objects.create(path="/graph/v1.0/get-user/{user}", method="get")
+
+        self.assertEqual(self._authorise("/graph/v1.0/get-user/alice@dtu.dk"), (False, None))
@@ -0,0 +1,41 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from myview.fanout import LookupFanout
+
+
+class LookupFanoutTests(SimpleTestCase):
+    def test_lookups_run_concurrently(self):
+        fanout = LookupFanout(timeout=5)
+        started = time.monotonic()
+        for name in ("groups", "photo", "methods"):
+            fanout.submit(name, time.sleep, 0.2)
+
+        results = [fanout.result(name) for name in ("groups", "photo", "methods")]
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_slow_lookup_times_out_without_blocking_others(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        fanout = LookupFanout(timeout=5)
+        fanout.submit("slow", release.wait, timeout=0.1)
+        fanout.submit("fast", lambda: "done")
+
+        slow = fanout.result("slow")
+        fast = fanout.result("fast")
+
+        self.assertTrue(slow.timed_out)
+        self.assertEqual(fast.value, "done")
+
+    def test_errors_are_captured(self):
+        fanout = LookupFanout(timeout=1)
+        fanout.submit("broken", lambda: 1 / 0)
+
+        result = fanout.result("broken")
+
+        self.assertFalse(result.ok)
+        self.assertIsInstance(result.error, ZeroDivisionError)
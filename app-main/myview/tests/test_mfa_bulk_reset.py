@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from graph.views import MfaBulkResetJobsView, MfaBulkResetJobView
+from myview.mfa_bulk_reset import create_bulk_reset_job, run_bulk_reset_job
+from myview.models import MFABulkResetItem, MFABulkResetJob, MFAResetAttempt, MFAResetRecord
+
+AUTHENTICATOR = "#microsoft.graph.microsoftAuthenticatorAuthenticationMethod"
+PHONE = "#microsoft.graph.phoneAuthenticationMethod"
+PASSWORD = "#microsoft.graph.passwordAuthenticationMethod"
+
+
+def _methods(*types):
+    return {"value": [{"id": f"m{index}", "@odata.type": odata_type} for index, odata_type in enumerate(types)]}, 200
+
+
+@mock.patch(
+    "graph.services.execute_get_user",
+    return_value=({"onPremisesDistinguishedName": "CN=x,OU=Users,DC=win,DC=dtu,DC=dk"}, 200),
+)
+class BulkResetRunnerTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(username="admin", password="pass")
+
+    @mock.patch("graph.services.execute_microsoft_authentication_method", return_value=(None, 204))
+    @mock.patch("graph.services.execute_list_user_authentication_methods", return_value=_methods(AUTHENTICATOR, PASSWORD))
+    def test_deletes_removable_methods_and_bulk_writes_audit(self, _list, delete, _get_user):
+        job = create_bulk_reset_job(requested_by=self.admin, user_principal_names="a@dtu.dk\nb@dtu.dk, A@dtu.dk")
+
+        run_bulk_reset_job(job.pk, max_workers=2)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, MFABulkResetJob.Status.COMPLETED)
+        self.assertEqual(
+            list(job.items.values_list("status", "methods_deleted")),
+            [(MFABulkResetItem.Status.SUCCEEDED, 1)] * 2,
+        )
+        self.assertEqual(delete.call_count, 2)
+        self.assertEqual(MFAResetAttempt.objects.filter(was_successful=True, reset_type="bulk").count(), 2)
+        self.assertEqual(MFAResetRecord.objects.count(), 2)
+
+    @mock.patch("graph.services.execute_phone_authentication_method")
+    @mock.patch("graph.services.execute_microsoft_authentication_method", return_value=(None, 204))
+    @mock.patch("graph.services.execute_list_user_authentication_methods", return_value=_methods(AUTHENTICATOR, PHONE))
+    def test_failed_delete_marks_item_partial(self, _list, _delete, delete_phone, _get_user):
+        delete_phone.return_value = (mock.Mock(json=lambda: {"error": {"code": "Forbidden", "message": "nope"}}), 403)
+        job = create_bulk_reset_job(requested_by=self.admin, user_principal_names=["a@dtu.dk"])
+
+        run_bulk_reset_job(job)
+
+        item = job.items.get()
+        self.assertEqual(item.status, MFABulkResetItem.Status.PARTIAL)
+        self.assertEqual((item.methods_deleted, item.methods_failed), (1, 1))
+        self.assertIn("Forbidden: nope", item.details)
+
+    @mock.patch("graph.services.execute_list_user_authentication_methods")
+    def test_targets_outside_ou_scope_are_denied(self, list_methods, _get_user):
+        staff = get_user_model().objects.create_user(username="staff", password="pass")
+        job = create_bulk_reset_job(requested_by=staff, user_principal_names=["a@dtu.dk"])
+
+        run_bulk_reset_job(job)
+
+        item = job.items.get()
+        self.assertEqual(item.status, MFABulkResetItem.Status.DENIED)
+        list_methods.assert_not_called()
+        self.assertFalse(MFAResetAttempt.objects.get().was_successful)
+
+
+class BulkResetApiTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="staff", password="pass")
+        self.factory = APIRequestFactory()
+
+    @mock.patch("graph.views.start_bulk_reset_job")
+    def test_create_returns_job_and_poll_reports_items(self, start):
+        request = self.factory.post(
+            "/graph/v1.0/mfa-reset/bulk-jobs",
+            {"user_principal_names": ["a@dtu.dk", "b@dtu.dk"]},
+            format="json",
+        )
+        force_authenticate(request, user=self.user)
+        response = MfaBulkResetJobsView.as_view()(request)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["total"], 2)
+        start.assert_called_once()
+
+        request = self.factory.get(response["Location"])
+        force_authenticate(request, user=self.user)
+        progress = MfaBulkResetJobView.as_view()(request, job_id=response.data["id"])
+
+        self.assertEqual(progress.status_code, 200)
+        self.assertEqual([item["status"] for item in progress.data["items"]], ["pending", "pending"])
+
+    def test_other_users_jobs_are_hidden(self):
+        other = get_user_model().objects.create_user(username="other", password="pass")
+        job = create_bulk_reset_job(requested_by=other, user_principal_names=["a@dtu.dk"])
+
+        request = self.factory.get(f"/graph/v1.0/mfa-reset/bulk-jobs/{job.pk}")
+        force_authenticate(request, user=self.user)
+
+        self.assertEqual(MfaBulkResetJobView.as_view()(request, job_id=job.pk).status_code, 404)
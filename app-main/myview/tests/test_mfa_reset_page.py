@@ -0,0 +1,43 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from myview.views import MFAResetPageView
+
+PROFILE = {"userPrincipalName": "bob@dtu.dk", "onPremisesDistinguishedName": "CN=bob,OU=SUS,DC=win,DC=dtu,DC=dk"}
+
+
+@mock.patch.object(MFAResetPageView, "_get_reset_history_entries", return_value=[])
+@mock.patch.object(MFAResetPageView, "_get_allowed_ou_labels", return_value=[])
+@mock.patch.object(MFAResetPageView, "user_has_mfa_reset_access", return_value=True)
+@mock.patch.object(MFAResetPageView, "_load_user_overview", return_value={"methods": ({"value": []}, 200)})
+@mock.patch.object(MFAResetPageView, "_fetch_user_groups", return_value=[])
+class MFAResetPageLookupTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="staff", password="pass")
+
+    def _get(self):
+        request = RequestFactory().get("/myview/mfa-reset/", {"userPrincipalName": "bob@dtu.dk"})
+        request.user = self.user
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        with mock.patch("myview.views.render", return_value=HttpResponse()) as render:
+            MFAResetPageView.as_view()(request)
+        return render.call_args.args[2]
+
+    def test_groups_are_not_looked_up_for_targets_outside_the_ou_scope(self, fetch_groups, *_):
+        with mock.patch.object(MFAResetPageView, "_check_target_ou_access", return_value=(False, PROFILE, None)):
+            context = self._get()
+
+        fetch_groups.assert_not_called()
+        self.assertEqual(context["user_groups"], [])
+
+    def test_groups_are_looked_up_once_the_target_is_authorized(self, fetch_groups, *_):
+        with mock.patch.object(MFAResetPageView, "_check_target_ou_access", return_value=(True, PROFILE, None)):
+            context = self._get()
+
+        fetch_groups.assert_called_once_with("bob@dtu.dk")
+        self.assertTrue(context["no_methods"])
@@ -0,0 +1,139 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from myview import ou_scope
+from myview.models import ADOrganizationalUnitLimiter
+
+
+class DNSuffixTrieTests(SimpleTestCase):
+    def test_containing_returns_ancestors_deepest_first(self):
+        trie = ou_scope.DNSuffixTrie(
+            [
+                "OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+                "OU=SUS,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+                "OU=BIO,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+            ]
+        )
+
+        self.assertEqual(
+            trie.containing("CN=Alice,OU=Users,OU=sus,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk"),
+            [
+                "ou=sus,ou=dtubaseusers,dc=win,dc=dtu,dc=dk",
+                "ou=dtubaseusers,dc=win,dc=dtu,dc=dk",
+            ],
+        )
+        self.assertEqual(trie.containing("CN=Bob,OU=XSUS,DC=win,DC=dtu,DC=dk"), [])
+
+    def test_escaped_commas_stay_inside_a_component(self):
+        self.assertEqual(
+            ou_scope.split_dn(r"CN=Doe\, Jane,OU=SUS,DC=dk"),
+            (r"cn=doe\, jane", "ou=sus", "dc=dk"),
+        )
+
+
+@override_settings(AD_OU_TRIE_VERSION_CHECK_SECONDS=0)
+class OUContainmentEngineTests(TestCase):
+    def setUp(self):
+        ou_scope.invalidate_ou_limiter_trie()
+
+    def test_trie_is_rebuilt_when_limiters_change(self):
+        engine = ou_scope.get_ou_containment_engine()
+        dn = "CN=Alice,OU=SUS,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk"
+        self.assertEqual(engine.trie().containing(dn), [])
+
+        ADOrganizationalUnitLimiter.objects.create(
+            canonical_name="win.dtu.dk/DTUBaseUsers/SUS",
+            distinguished_name="OU=SUS,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+        )
+
+        self.assertEqual(
+            engine.trie().containing(dn),
+            ["ou=sus,ou=dtubaseusers,dc=win,dc=dtu,dc=dk"],
+        )
+
+    def test_fallback_honours_escaped_commas(self):
+        engine = ou_scope.get_ou_containment_engine()
+        base = r"OU=Smith\, John,DC=dtu,DC=dk"
+
+        self.assertEqual(
+            engine.matching_base_dns(r"CN=x,OU=Smith\, John,DC=dtu,DC=dk", [base]),
+            [ou_scope.normalize_dn(base)],
+        )
+
+    def test_trie_and_fallback_base_dns_are_matched_together(self):
+        engine = ou_scope.get_ou_containment_engine()
+        for name in ("SUS", "BIO"):
+            ADOrganizationalUnitLimiter.objects.create(
+                canonical_name=f"win.dtu.dk/DTUBaseUsers/{name}",
+                distinguished_name=f"OU={name},OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+            )
+        wanted = [
+            "OU=SUS,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+            "OU=BIO,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+            "OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+            "OU=Staff,DC=win,DC=dtu,DC=dk",
+        ]
+
+        matched = engine.matching_base_dns("CN=Alice,OU=BIO,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk", wanted)
+
+        # BIO comes from the trie, DTUBaseUsers from the fallback; SUS and Staff do not contain Alice.
+        self.assertCountEqual(
+            matched,
+            ["ou=bio,ou=dtubaseusers,dc=win,dc=dtu,dc=dk", "ou=dtubaseusers,dc=win,dc=dtu,dc=dk"],
+        )
+
+    def test_principal_is_resolved_once_for_all_limiters(self):
+        base_dns = [
+            "OU=BIO,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+            "OU=SUS,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+        ]
+
+        with patch(
+            "active_directory.services.execute_active_directory_query",
+            return_value=[{"distinguishedName": ["CN=Alice,OU=SUS,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk"]}],
+        ) as query:
+            matched = ou_scope.principal_matching_base_dns("alice@dtu.dk", base_dns)
+
+        self.assertEqual(matched, ["ou=sus,ou=dtubaseusers,dc=win,dc=dtu,dc=dk"])
+        query.assert_called_once()
+        self.assertEqual(query.call_args.kwargs["search_filter"], "(userPrincipalName=alice@dtu.dk)")
+
+    def test_known_distinguished_name_skips_directory_lookup(self):
+        with patch("active_directory.services.execute_active_directory_query") as query:
+            allowed = ou_scope.principal_within_ous(
+                "alice@dtu.dk",
+                ["OU=SUS,DC=win,DC=dtu,DC=dk"],
+                distinguished_name="CN=Alice,OU=SUS,DC=win,DC=dtu,DC=dk",
+            )
+
+        self.assertTrue(allowed)
+        query.assert_not_called()
+
+
+class BulkPrincipalResolutionTests(SimpleTestCase):
+    @override_settings(AD_BULK_RESOLVE_CHUNK_SIZE=2, AD_BULK_RESOLVE_MAX_WORKERS=2)
+    def test_principals_are_resolved_in_chunked_or_filters(self):
+        directory = {
+            "a@dtu.dk": "CN=a,OU=SUS,DC=win,DC=dtu,DC=dk",
+            "b@dtu.dk": "CN=b,OU=BIO,DC=win,DC=dtu,DC=dk",
+            "c@dtu.dk": "CN=c,OU=Users,OU=SUS,DC=win,DC=dtu,DC=dk",
+        }
+
+        def _query(*, search_filter, **kwargs):
+            return [
+                {"userPrincipalName": [upn.upper()], "distinguishedName": [dn]}
+                for upn, dn in directory.items()
+                if f"(userPrincipalName={upn})" in search_filter
+            ]
+
+        with patch("active_directory.services.execute_active_directory_query", side_effect=_query) as query:
+            allowed = ou_scope.principals_within_ous(
+                ["A@dtu.dk", "b@dtu.dk", "c@dtu.dk", "missing@dtu.dk"],
+                ["OU=SUS,DC=win,DC=dtu,DC=dk"],
+            )
+
+        self.assertEqual(allowed, {"a@dtu.dk", "c@dtu.dk"})
+        self.assertEqual(query.call_count, 2)
+        for call in query.call_args_list:
+            self.assertTrue(call.kwargs["search_filter"].startswith("(|"))
@@ -0,0 +1,126 @@
+import tempfile
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from myview.models import ADGroupAssociation, ADOrganizationalUnitLimiter
+from myview.photo_cache import MISSING, ProfilePhotoCache
+from myview.views import ProfilePhotoView
+
+
+class ProfilePhotoCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = ProfilePhotoCache(directory.name, max_bytes=25, ttl=60, negative_ttl=60)
+
+    def test_store_and_get_round_trip(self):
+        stored = self.cache.store("Alice@dtu.dk", "48x48", b"image", "image/png")
+
+        cached = self.cache.get("alice@dtu.dk", "48x48")
+
+        self.assertEqual(cached, stored)
+        self.assertTrue(cached.etag)
+        self.assertIsNone(self.cache.get("alice@dtu.dk", "96x96"))
+
+    def test_negative_results_are_cached(self):
+        self.cache.store_missing("bob@dtu.dk", "48x48")
+
+        self.assertIs(self.cache.get("bob@dtu.dk", "48x48"), MISSING)
+
+    def test_cache_is_bounded_by_bytes(self):
+        for index in range(4):
+            self.cache.store(f"user{index}@dtu.dk", "48x48", b"x" * 10, "image/png")
+
+        remaining = [self.cache.get(f"user{index}@dtu.dk", "48x48") for index in range(4)]
+        self.assertLessEqual(sum(len(photo.content) for photo in remaining if photo), 25)
+        self.assertIsNotNone(remaining[-1])
+
+
+class ProfilePhotoViewTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(PROFILE_PHOTO_CACHE_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        patcher = mock.patch.object(ProfilePhotoView, "user_has_mfa_reset_access", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Superusers have an unrestricted MFA reset scope.
+        self.user = get_user_model().objects.create_user(username="staff", password="pass", is_superuser=True)
+        self.view = ProfilePhotoView.as_view()
+
+    def _get(self, upn, user=None, sig=None, **headers):
+        params = {"size": "48x48", **({"sig": sig} if sig else {})}
+        request = RequestFactory().get("/mfa-reset/photo/", params, **headers)
+        request.user = user or self.user
+        return self.view(request, user_principal_name=upn)
+
+    def _limited_user(self):
+        group = ADGroupAssociation.objects.create(
+            canonical_name="win.dtu.dk/Groups/MFA-SUS", distinguished_name="CN=MFA-SUS,OU=Groups,DC=win,DC=dtu,DC=dk"
+        )
+        limiter = ADOrganizationalUnitLimiter.objects.create(
+            canonical_name="win.dtu.dk/DTUBaseUsers/SUS",
+            distinguished_name="OU=SUS,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+        )
+        limiter.ad_groups.add(group)
+        limited_user = get_user_model().objects.create_user(username="limited", password="pass")
+        group.members.add(limited_user)
+        return limited_user
+
+    def _other_limited_user(self):
+        user = get_user_model().objects.create_user(username="limited-2", password="pass")
+        ADGroupAssociation.objects.get().members.add(user)
+        return user
+
+    @mock.patch("myview.views.execute_get_user_photo", return_value=(b"jpeg-bytes", 200, "image/jpeg"))
+    def test_photo_is_fetched_once_and_revalidated_by_etag(self, get_photo):
+        first = self._get("alice@dtu.dk")
+        second = self._get("alice@dtu.dk", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.content, b"jpeg-bytes")
+        self.assertIn("max-age", first["Cache-Control"])
+        self.assertEqual(second.status_code, 304)
+        get_photo.assert_called_once_with("alice@dtu.dk", "48x48")
+
+    @mock.patch("myview.views.execute_get_user_photo", return_value=({"error": {}}, 404, "application/json"))
+    def test_missing_photo_is_negatively_cached(self, get_photo):
+        self.assertEqual(self._get("nobody@dtu.dk").status_code, 404)
+        self.assertEqual(self._get("nobody@dtu.dk").status_code, 404)
+
+        get_photo.assert_called_once()
+
+    @mock.patch("myview.views.execute_get_user_photo", return_value=(b"jpeg-bytes", 200, "image/jpeg"))
+    def test_target_outside_ou_scope_is_forbidden(self, get_photo):
+        limited_user = self._limited_user()
+
+        with mock.patch("myview.mfa_scope.principal_matching_base_dns", return_value=[]) as matching:
+            response = self._get("bob@dtu.dk", user=limited_user)
+
+        self.assertEqual(response.status_code, 403)
+        matching.assert_called_once()
+        get_photo.assert_not_called()
+
+    @mock.patch("myview.views.execute_get_user_photo", return_value=(b"jpeg-bytes", 200, "image/jpeg"))
+    def test_url_signed_for_the_viewer_skips_the_scope_check(self, get_photo):
+        limited_user = self._limited_user()
+        url = ProfilePhotoView.build_url("staff@dtu.dk", "48x48", viewer=limited_user)
+        signature = parse_qs(urlsplit(url).query)["sig"][0]
+
+        with mock.patch("myview.mfa_scope.principal_matching_base_dns", return_value=[]) as matching:
+            signed = self._get("staff@dtu.dk", user=limited_user, sig=signature)
+            other_viewer = self._get("staff@dtu.dk", user=self._other_limited_user(), sig=signature)
+            other_target = self._get("bob@dtu.dk", user=limited_user, sig=signature)
+
+        self.assertEqual(signed.status_code, 200)
+        self.assertEqual(other_viewer.status_code, 403)
+        self.assertEqual(other_target.status_code, 403)
+        self.assertEqual(matching.call_count, 2)
+        get_photo.assert_called_once_with("staff@dtu.dk", "48x48")
@@ -66,10 +66,11 @@ except ImportError:
 
 
 try:
-   from .views import MFAResetPageView
+   from .views import MFAResetPageView, ProfilePhotoView
 
    urlpatterns += [
       path('mfa-reset/', MFAResetPageView.as_view(), name='mfa-reset'),
+      path('mfa-reset/photo/<str:user_principal_name>/', ProfilePhotoView.as_view(), name='profile-photo'),
       path('mfa-reset/user/<str:user_principal_id>/delete-authentication/<str:authentication_id>/', MFAResetPageView.as_view(), name='delete-auth-method'),
    ]
 
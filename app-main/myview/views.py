@@ -2,19 +2,21 @@ import json
 import logging
 import os
 import subprocess
-import base64
 import logging
 from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 from urllib.parse import urlencode
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden, JsonResponse
+from django.core import signing
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from django.utils.dateparse import parse_datetime
 from django.utils.decorators import method_decorator
 from django.views import View
@@ -24,15 +26,19 @@ from rest_framework.authtoken.models import Token
 from requests import RequestException
 from ldap3.utils.conv import escape_filter_chars
 
+from graph.scripts.graph_apicall_getuserphoto import PHOTO_SIZES
 from graph.services import (
     execute_delete_software_mfa_method,
     execute_get_user,
+    execute_get_user_mfa_overview,
     execute_get_user_photo,
     execute_list_user_authentication_methods,
     execute_microsoft_authentication_method,
     execute_phone_authentication_method,
 )
 
+from .fanout import LookupFanout
+from .mfa_scope import MFA_RESET_REQUIRED_ENDPOINTS, MFAResetScope, extract_user_distinguished_name
 from .forms import (
     BugReportForm,
     DeleteAllAuthenticationMethodsForm,
@@ -41,14 +47,13 @@ from .forms import (
     MfaResetLookupForm,
 )
 from .models import (
-    ADOrganizationalUnitLimiter,
-    ADGroupAssociation,
     BugReport,
     BugReportAttachment,
     Endpoint,
     MFAResetAttempt,
     MFAResetRecord,
 )
+from .photo_cache import MISSING, get_photo_cache
 from active_directory.services import execute_active_directory_query
 
 logger = logging.getLogger(__name__)
@@ -74,14 +79,7 @@ class BaseView(View):
     require_login = True  # By default, require login for all views inheriting from BaseView
     base_template = "myview/base.html"
     _git_info_cache: tuple[str, str, str] | None = None
-    MFA_RESET_REQUIRED_ENDPOINTS = [
-        {'method': 'GET', 'path': '/graph/v1.0/get-user/{user}'},
-        {'method': 'GET', 'path': '/graph/v1.0/list/{user_id__or__user_principalname}/authentication-methods'},
-        {'method': 'DELETE', 'path': '/graph/v1.0/users/{user_id__or__user_principalname}/microsoft-authentication-methods/{microsoft_authenticator_method_id}'},
-        {'method': 'DELETE', 'path': '/graph/v1.0/users/{user_id__or__user_principalname}/phone-authentication-methods/{phone_authenticator_method_id}'},
-        {'method': 'DELETE', 'path': '/graph/v1.0/users/{user_id__or__user_principalname}/software-authentication-methods/{software_oath_method_id}'},
-        {'method': 'GET', 'path': '/active-directory/v1.0/query'},
-    ]
+    MFA_RESET_REQUIRED_ENDPOINTS = MFA_RESET_REQUIRED_ENDPOINTS
 
 
     def user_has_mfa_reset_access(self):
@@ -648,59 +646,19 @@ class MFAResetPageView(BaseView):
     )
     USER_PROFILE_SELECT = f"$select={USER_PROFILE_SELECT_FIELDS}"
 
-    def _user_has_unrestricted_ou_scope(self):
-        if getattr(self.request.user, "is_superuser", False):
-            return True
-        if hasattr(self, "_unrestricted_ou_scope_cache"):
-            return self._unrestricted_ou_scope_cache
-
-        endpoint_requirements = {
-            (entry["method"].upper(), entry["path"])
-            for entry in self.MFA_RESET_REQUIRED_ENDPOINTS
-        }
-        if not endpoint_requirements:
-            return False
-
-        user_group_ids = list(
-            self.request.user.ad_group_members.values_list("id", flat=True)
-        )
-        if not user_group_ids:
-            return False
-
-        endpoints = (
-            Endpoint.objects.filter(ad_groups__in=user_group_ids, no_limit=True)
-            .distinct()
-        )
-        for endpoint in endpoints:
-            method = (endpoint.method or "").upper()
-            path = endpoint.path or ""
-            if (method, path) in endpoint_requirements:
-                self._unrestricted_ou_scope_cache = True
-                return True
+    @property
+    def _ou_scope(self):
+        if not hasattr(self, "_ou_scope_cache"):
+            self._ou_scope_cache = MFAResetScope(
+                self.request.user, self.MFA_RESET_REQUIRED_ENDPOINTS
+            )
+        return self._ou_scope_cache
 
-        self._unrestricted_ou_scope_cache = False
-        return False
+    def _user_has_unrestricted_ou_scope(self):
+        return self._ou_scope.is_unrestricted()
 
     def _get_user_ou_limiters(self):
-        if getattr(self.request.user, "is_superuser", False):
-            return None
-        if self._user_has_unrestricted_ou_scope():
-            return None
-        if not hasattr(self, "_user_ou_limiters_cache"):
-            user_group_ids = list(
-                self.request.user.ad_group_members.values_list("id", flat=True)
-            )
-            if not user_group_ids:
-                self._user_ou_limiters_cache = []
-            else:
-                limiters = (
-                    ADOrganizationalUnitLimiter.objects.filter(
-                        ad_groups__in=user_group_ids
-                    )
-                    .distinct()
-                )
-                self._user_ou_limiters_cache = list(limiters)
-        return self._user_ou_limiters_cache
+        return self._ou_scope.limiters()
 
     def _get_allowed_ou_dns(self):
         limiters = self._get_user_ou_limiters()
@@ -715,189 +673,46 @@ class MFAResetPageView(BaseView):
         return distinguished_names
 
     def _get_allowed_ou_labels(self):
-        limiters = self._get_user_ou_limiters()
-        if limiters is None:
-            return ()
-        labels = []
-        for limiter in limiters:
-            label = getattr(limiter, "canonical_name", "") or ""
-            label = str(label).strip()
-            if label:
-                labels.append(label)
-        return tuple(sorted(set(labels), key=str.lower))
+        return self._ou_scope.allowed_labels()
 
     @staticmethod
     def _extract_user_distinguished_name(profile_data):
-        if isinstance(profile_data, dict):
-            dn = profile_data.get("onPremisesDistinguishedName")
-            if dn:
-                return str(dn).strip()
-        return ""
+        return extract_user_distinguished_name(profile_data)
 
     def _normalize_dn(self, value: str | None) -> str:
         if not value:
             return ""
         return str(value).strip().lower()
 
-    def _directory_scope_check(self, user_principal_name, limiters):
-        if not user_principal_name:
-            return False
-
-        for limiter in limiters or ():
-            base_dn = getattr(limiter, "distinguished_name", "") or ""
-            base_dn = base_dn.strip()
-            if not base_dn:
-                continue
-            try:
-                result = execute_active_directory_query(
-                    base_dn=base_dn,
-                    search_filter=f"(userPrincipalName={user_principal_name})",
-                    search_attributes=["distinguishedName"],
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to verify OU scope for %s under %s",
-                    user_principal_name,
-                    base_dn,
-                )
-                continue
-            if result:
-                return True
-        return False
-
     def _is_target_in_scope(self, user_principal_name, distinguished_name):
         cache_key = (user_principal_name or "").strip().lower()
         if not hasattr(self, "_target_ou_scope_cache"):
             self._target_ou_scope_cache = {}
-        if cache_key in self._target_ou_scope_cache:
-            return self._target_ou_scope_cache[cache_key]
-
-        limiters = self._get_user_ou_limiters()
-        if limiters is None:
-            self._target_ou_scope_cache[cache_key] = True
-            return True
-        if not limiters:
-            self._target_ou_scope_cache[cache_key] = False
-            return False
-
-        dn_normalized = self._normalize_dn(distinguished_name)
-        if dn_normalized:
-            for limiter in limiters:
-                allowed_dn = self._normalize_dn(getattr(limiter, "distinguished_name", ""))
-                if allowed_dn and dn_normalized.endswith(allowed_dn):
-                    self._target_ou_scope_cache[cache_key] = True
-                    return True
-
-        in_scope = self._directory_scope_check(user_principal_name, limiters)
-        self._target_ou_scope_cache[cache_key] = in_scope
-        return in_scope
+        if cache_key not in self._target_ou_scope_cache:
+            authorized, _ = self._ou_scope.authorize(user_principal_name, distinguished_name)
+            self._target_ou_scope_cache[cache_key] = authorized
+        return self._target_ou_scope_cache[cache_key]
 
     def _build_ou_denied_message(self, user_principal_name):
-        limiters = self._get_user_ou_limiters()
-        if limiters is None:
-            return (
-                f"You are not permitted to manage MFA for {user_principal_name}."
-            )
-
-        allowed_labels = self._get_allowed_ou_labels()
-        if not allowed_labels:
-            return (
-                "You are not assigned to any organizational units that allow MFA resets, "
-                f"so you cannot manage MFA for {user_principal_name}."
-            )
+        return self._ou_scope.denied_message(user_principal_name)
 
-        readable_labels = ", ".join(allowed_labels)
-        return (
-            f"You can only manage MFA for users within these organizational units: {readable_labels}. "
-            f"{user_principal_name} is outside your scope."
-        )
-
-    def _check_target_ou_access(self, user_principal_name):
-        profile_raw = self._fetch_user_profile(user_principal_name)
+    def _check_target_ou_access(self, user_principal_name, profile_result=None):
+        profile_raw = self._fetch_user_profile(user_principal_name, profile_result)
         distinguished_name = self._extract_user_distinguished_name(profile_raw)
         authorized = self._is_target_in_scope(user_principal_name, distinguished_name)
         matching_limiter = None
 
         if authorized:
-            matching_limiter = self._resolve_matching_limiter(distinguished_name)
+            matching_limiter = self._ou_scope.matching_limiter(distinguished_name)
             if matching_limiter is None:
-                matching_limiter = self._find_limiter_via_directory_lookup(
+                matching_limiter = self._ou_scope.directory_matching_limiter(
                     user_principal_name
                 )
 
         return authorized, profile_raw, matching_limiter
 
-    def _resolve_matching_limiter(self, distinguished_name):
-        limiters = self._get_user_ou_limiters()
-        if limiters is None or not limiters:
-            return None
-
-        dn_normalized = self._normalize_dn(distinguished_name)
-        if not dn_normalized:
-            return None
-
-        for limiter in limiters:
-            allowed_dn = self._normalize_dn(
-                getattr(limiter, "distinguished_name", "")
-            )
-            if allowed_dn and dn_normalized.endswith(allowed_dn):
-                return limiter
-
-        return None
-
-    def _find_limiter_via_directory_lookup(self, user_principal_name):
-        limiters = self._get_user_ou_limiters()
-        if limiters is None or not limiters:
-            return None
-
-        for limiter in limiters:
-            base_dn = getattr(limiter, "distinguished_name", "") or ""
-            base_dn = base_dn.strip()
-            if not base_dn:
-                continue
-
-            try:
-                result = execute_active_directory_query(
-                    base_dn=base_dn,
-                    search_filter=f"(userPrincipalName={user_principal_name})",
-                    search_attributes=["distinguishedName"],
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to verify OU scope for %s under %s",
-                    user_principal_name,
-                    base_dn,
-                )
-                continue
-
-            if result:
-                return limiter
-
-        return None
-
     def _determine_client_label(self, profile_raw, client_limiter):
-        if client_limiter:
-            label = getattr(client_limiter, "canonical_name", "") or ""
-            if label:
-                return label
-            fallback_dn = getattr(client_limiter, "distinguished_name", "") or ""
-            if fallback_dn:
-                return fallback_dn
-
-        distinguished_name = self._extract_user_distinguished_name(profile_raw or {})
-        if not distinguished_name:
-            return ""
-
-        try:
-            canonical = ADGroupAssociation._dn_to_canonical(distinguished_name)
-        except Exception:  # pragma: no cover - defensive
-            logger.debug(
-                "Unable to convert distinguished name %s to canonical form",
-                distinguished_name,
-            )
-            canonical = ""
-
-        return canonical or distinguished_name
+        return MFAResetScope.client_label(profile_raw, client_limiter)
 
     def _log_reset_record(
         self,
@@ -964,7 +779,15 @@ class MFAResetPageView(BaseView):
                 if cache_key in photo_cache:
                     photo_url = photo_cache[cache_key]
                 else:
-                    photo_url = self._resolve_user_photo(upn) if upn else None
+                    # Staff who performed resets are usually outside the viewer's
+                    # OU scope, so their avatars use viewer-signed URLs.
+                    photo_url = (
+                        self._resolve_user_photo(
+                            upn, size=settings.PROFILE_PHOTO_AVATAR_SIZE, viewer=self.request.user
+                        )
+                        if upn
+                        else None
+                    )
                     photo_cache[cache_key] = photo_url
 
             client_label = record.client_label or ""
@@ -1010,9 +833,10 @@ class MFAResetPageView(BaseView):
         if user_principal_name:
             profile_raw = None
             target_authorized = True
+            overview = self._load_user_overview(user_principal_name)
             try:
                 target_authorized, profile_raw, _ = self._check_target_ou_access(
-                    user_principal_name
+                    user_principal_name, profile_result=overview.get("profile")
                 )
             except GraphAPIError as exc:
                 target_authorized = False
@@ -1024,27 +848,43 @@ class MFAResetPageView(BaseView):
                     )
 
             if target_authorized and profile_raw is not None:
+                # Only look up group memberships for targets the caller may see.
+                # The LDAP lookup runs while the photo and methods are read from
+                # the Graph batch on this thread.
+                lookups = LookupFanout()
+                lookups.submit("groups", self._fetch_user_groups, user_principal_name)
+
                 user_profile = self._transform_user_profile(profile_raw)
+                employee_id = user_profile.get("employee_id") if user_profile else None
 
                 try:
-                    groups_raw = self._fetch_user_groups(user_principal_name)
-                except GraphAPIError as exc:
-                    messages.error(request, str(exc))
-                else:
-                    user_groups = self._transform_user_groups(groups_raw)
-
-                user_photo_url = self._resolve_user_photo(
-                    user_principal_name,
-                    user_profile.get("employee_id") if user_profile else None,
-                )
+                    user_photo_url = self._resolve_user_photo(
+                        user_principal_name, employee_id, photo_result=overview.get("photo")
+                    )
+                except Exception:  # pragma: no cover - defensive
+                    logger.exception("Failed to resolve profile photo for %s", user_principal_name)
+                    user_photo_url = self._build_dtubasen_photo_url(employee_id) if employee_id else None
 
                 try:
-                    data = self._fetch_authentication_methods(user_principal_name)
-                    auth_methods = self._transform_methods(data)
+                    auth_methods = self._transform_methods(
+                        self._fetch_authentication_methods(
+                            user_principal_name, methods_result=overview.get("methods")
+                        )
+                    )
                     no_methods = not auth_methods
                 except GraphAPIError as exc:
                     messages.error(request, str(exc))
 
+                groups = lookups.result("groups")
+                if groups.ok:
+                    user_groups = self._transform_user_groups(groups.value)
+                elif groups.timed_out:
+                    messages.warning(
+                        request, "Group memberships took too long to load and are not shown."
+                    )
+                else:
+                    messages.error(request, str(groups.error))
+
                 bulk_delete_form = self.bulk_delete_form_class(
                     initial={"user_principal_name": user_principal_name}
                 )
@@ -1378,11 +1218,33 @@ class MFAResetPageView(BaseView):
         query = urlencode({"userPrincipalName": user_principal_name})
         return redirect(f"{reverse('mfa-reset')}?{query}")
 
-    def _fetch_user_profile(self, user_principal_name):
-        data, status_code = execute_get_user(
-            user_principal_name=user_principal_name,
-            select_parameters=self.USER_PROFILE_SELECT,
-        )
+    def _load_user_overview(self, user_principal_name):
+        """Fetch profile, photo and methods in one Graph $batch round trip.
+
+        Returns an empty dict when the batch call fails so that callers fall
+        back to the individual requests.
+        """
+
+        try:
+            return execute_get_user_mfa_overview(
+                user_principal_name,
+                self.USER_PROFILE_SELECT,
+                photo_size=settings.PROFILE_PHOTO_SIZE,
+            )
+        except Exception:
+            logger.exception(
+                "Batched Microsoft Graph lookup failed for %s", user_principal_name
+            )
+            return {}
+
+    def _fetch_user_profile(self, user_principal_name, profile_result=None):
+        if profile_result is not None:
+            data, status_code = profile_result
+        else:
+            data, status_code = execute_get_user(
+                user_principal_name=user_principal_name,
+                select_parameters=self.USER_PROFILE_SELECT,
+            )
 
         if status_code != 200:
             error_detail = self._extract_graph_error(data)
@@ -1643,44 +1505,51 @@ class MFAResetPageView(BaseView):
         groups.sort(key=lambda item: str(item.get("display_name") or "").casefold())
         return groups
 
-    def _resolve_user_photo(self, user_principal_name, employee_id=None):
-        try:
-            payload, status_code, content_type = execute_get_user_photo(
-                user_principal_name
-            )
-        except Exception:  # pragma: no cover - defensive
-            logger.exception(
-                "Unexpected error while retrieving profile photo for %s",
-                user_principal_name,
-            )
-            payload = None
-            status_code = None
-            content_type = None
+    def _resolve_user_photo(self, user_principal_name, employee_id=None, photo_result=None, size=None, viewer=None):
+        """Return a URL for the user's photo without inlining the image.
 
-        if status_code == 200 and isinstance(payload, (bytes, bytearray)):
-            mime_type = (
-                content_type if content_type and content_type.startswith("image/") else "image/jpeg"
-            )
-            encoded = base64.b64encode(payload).decode("ascii")
-            return f"data:{mime_type};base64,{encoded}"
-
-        if status_code and status_code not in {200, 404}:
-            error_detail = ""
-            if isinstance(payload, dict):
-                error_detail = self._extract_graph_error(payload)
-            if error_detail:
-                logger.warning(
-                    "Unable to retrieve profile photo for %s: %s (status %s)",
-                    user_principal_name,
-                    error_detail,
-                    status_code,
-                )
-            else:
-                logger.warning(
-                    "Unable to retrieve profile photo for %s (status %s)",
-                    user_principal_name,
-                    status_code,
+        A Graph result that is already at hand (from the lookup batch) primes
+        the photo cache; otherwise only the cache is consulted and unknown
+        users are left for :class:`ProfilePhotoView` to fetch on demand.
+        With ``viewer`` the URL is signed for that user (see
+        :meth:`ProfilePhotoView.build_url`).
+        """
+
+        size = size or settings.PROFILE_PHOTO_SIZE
+        photo_cache = get_photo_cache()
+
+        if photo_result is None:
+            if photo_cache.get(user_principal_name, size) is not MISSING:
+                return ProfilePhotoView.build_url(user_principal_name, size, viewer=viewer)
+        else:
+            payload, status_code, content_type = photo_result
+
+            if status_code == 200 and isinstance(payload, (bytes, bytearray)):
+                mime_type = (
+                    content_type if content_type and content_type.startswith("image/") else "image/jpeg"
                 )
+                photo_cache.store(user_principal_name, size, bytes(payload), mime_type)
+                return ProfilePhotoView.build_url(user_principal_name, size, viewer=viewer)
+
+            if status_code == 404:
+                photo_cache.store_missing(user_principal_name, size)
+            elif status_code:
+                error_detail = ""
+                if isinstance(payload, dict):
+                    error_detail = self._extract_graph_error(payload)
+                if error_detail:
+                    logger.warning(
+                        "Unable to retrieve profile photo for %s: %s (status %s)",
+                        user_principal_name,
+                        error_detail,
+                        status_code,
+                    )
+                else:
+                    logger.warning(
+                        "Unable to retrieve profile photo for %s (status %s)",
+                        user_principal_name,
+                        status_code,
+                    )
 
         if employee_id:
             return self._build_dtubasen_photo_url(employee_id)
@@ -1722,11 +1591,14 @@ class MFAResetPageView(BaseView):
 
         return distinguished_name
 
-    def _fetch_authentication_methods(self, user_principal_name):
+    def _fetch_authentication_methods(self, user_principal_name, methods_result=None):
         try:
-            data, status_code = execute_list_user_authentication_methods(
-                user_principal_name
-            )
+            if methods_result is not None:
+                data, status_code = methods_result
+            else:
+                data, status_code = execute_list_user_authentication_methods(
+                    user_principal_name
+                )
         except RequestException as exc:
             raise GraphAPIError(f"Unable to contact Microsoft Graph: {exc}") from exc
         except Exception as exc:  # pragma: no cover - defensive
@@ -1877,6 +1749,112 @@ class MFAResetPageView(BaseView):
 
 
 
+
+
+class ProfilePhotoView(BaseView):
+    """Serve cached Microsoft Graph profile photos by URL."""
+
+    # Served with status 404 so browsers still render something in <img> tags.
+    PLACEHOLDER_SVG = (
+        b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64">'
+        b'<rect width="64" height="64" fill="#e9ecef"/>'
+        b'<circle cx="32" cy="24" r="12" fill="#adb5bd"/>'
+        b'<path d="M10 60c2-14 12-20 22-20s20 6 22 20z" fill="#adb5bd"/></svg>'
+    )
+
+    SIGNATURE_SALT = "myview.profile-photo"
+
+    @classmethod
+    def _signature(cls, viewer, user_principal_name):
+        value = f"{viewer.pk}:{user_principal_name.lower()}"
+        return signing.Signer(salt=cls.SIGNATURE_SALT).signature(value)
+
+    @classmethod
+    def build_url(cls, user_principal_name, size, *, viewer=None):
+        """Return the photo URL; with ``viewer`` it carries a signature that
+        lets that user see the photo without the OU scope check (used for
+        people a page already shows them, such as the reset history)."""
+
+        url = reverse("profile-photo", kwargs={"user_principal_name": user_principal_name})
+        params = {"size": size}
+        if viewer is not None:
+            params["sig"] = cls._signature(viewer, user_principal_name)
+        return f"{url}?{urlencode(params)}"
+
+    def _photo_response(self, content, content_type, *, status=200, max_age=None, etag=None):
+        response = HttpResponse(content, content_type=content_type, status=status)
+        max_age = settings.PROFILE_PHOTO_BROWSER_MAX_AGE if max_age is None else max_age
+        response["Cache-Control"] = f"private, max-age={max_age}"
+        if etag:
+            response["ETag"] = etag
+        return response
+
+    def get(self, request, user_principal_name, **kwargs):
+        if not self.user_has_mfa_reset_access():
+            return HttpResponseForbidden("You do not have access to this resource.")
+
+        size = request.GET.get("size") or settings.PROFILE_PHOTO_SIZE
+        if size not in PHOTO_SIZES:
+            return HttpResponse("Unsupported photo size.", status=400)
+
+        # Same OU scope as the MFA reset page, checked before the cache or Graph
+        # so out-of-scope users cannot probe which accounts exist. URLs signed
+        # for this viewer were handed out by a page that already shows the user.
+        signature = request.GET.get("sig")
+        if signature and constant_time_compare(signature, self._signature(request.user, user_principal_name)):
+            authorized = True
+        else:
+            authorized, _ = MFAResetScope(request.user, self.MFA_RESET_REQUIRED_ENDPOINTS).authorize(
+                user_principal_name
+            )
+        if not authorized:
+            return self._photo_response(self.PLACEHOLDER_SVG, "image/svg+xml", status=403, max_age=0)
+
+        photo_cache = get_photo_cache()
+        cached = photo_cache.get(user_principal_name, size)
+
+        if cached is None:
+            try:
+                payload, status_code, content_type = execute_get_user_photo(
+                    user_principal_name, size
+                )
+            except Exception:  # pragma: no cover - defensive
+                logger.exception(
+                    "Unexpected error while retrieving profile photo for %s",
+                    user_principal_name,
+                )
+                payload, status_code, content_type = None, None, None
+
+            if status_code == 200 and isinstance(payload, (bytes, bytearray)):
+                mime_type = (
+                    content_type if content_type and content_type.startswith("image/") else "image/jpeg"
+                )
+                cached = photo_cache.store(user_principal_name, size, bytes(payload), mime_type)
+            elif status_code == 404:
+                photo_cache.store_missing(user_principal_name, size)
+                cached = MISSING
+            else:
+                logger.warning(
+                    "Unable to retrieve profile photo for %s (status %s)",
+                    user_principal_name,
+                    status_code,
+                )
+                return self._photo_response(
+                    self.PLACEHOLDER_SVG, "image/svg+xml", status=502, max_age=0
+                )
+
+        if cached is MISSING:
+            return self._photo_response(
+                self.PLACEHOLDER_SVG,
+                "image/svg+xml",
+                status=404,
+                max_age=min(settings.PROFILE_PHOTO_BROWSER_MAX_AGE, settings.PROFILE_PHOTO_NEGATIVE_TTL),
+            )
+
+        if request.headers.get("If-None-Match") == cached.etag:
+            return self._photo_response(b"", cached.content_type, status=304, etag=cached.etag)
+
+        return self._photo_response(cached.content, cached.content_type, etag=cached.etag)
 
 
 class ActiveDirectoryCopilotView(BaseView):
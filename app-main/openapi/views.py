@@ -6,13 +6,14 @@ import logging
 import os
 from typing import Any, Mapping
 
-import requests
 from django.http import JsonResponse
 from requests import RequestException
 from rest_framework.views import APIView
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
+from utils.http_client import outbound_request
+
 logger = logging.getLogger(__name__)
 
 _DEFAULT_SPEC_URL = "http://localhost:6081/myview/swagger/?format=openapi"
@@ -47,7 +48,7 @@ def _load_openapi_spec() -> Mapping[str, Any]:
     """Fetch and parse the OpenAPI specification from the configured endpoint."""
 
     try:
-        response = requests.get(OPENAPI_SPEC_URL, timeout=OPENAPI_SPEC_TIMEOUT)
+        response = outbound_request("openapi", "GET", OPENAPI_SPEC_URL, timeout=OPENAPI_SPEC_TIMEOUT)
         response.raise_for_status()
     except RequestException as exc:
         logger.warning("Unable to fetch OpenAPI spec from %s: %s", OPENAPI_SPEC_URL, exc)
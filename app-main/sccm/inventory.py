@@ -0,0 +1,400 @@
+"""Local SCCM inventory snapshot with a software index.
+
+:func:`sync_inventory` (run by ``manage.py sync_sccm_inventory``) copies
+clients, their BitLocker/TPM state and installed software into local tables.
+Incremental runs only read clients whose ``LastHWScan`` is newer than the
+stored watermark and replace those clients' software; a full run re-reads
+everything and drops clients SCCM no longer lists.
+
+Software is stored once per normalised product name/publisher
+(:class:`~sccm.models.SCCMSoftwareProduct`) with one row per installation,
+so :func:`software_exposure` and :func:`compliance_report` are answered from
+indexed local queries without touching the SCCM SQL server.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from myview.ou_scope import normalize_dn
+
+from .models import SCCMComputer, SCCMInstalledSoftware, SCCMInventorySyncState, SCCMSoftwareProduct
+from .scripts.sccm_get_computer_info import normalize_computer_name
+from .scripts.sccm_inventory import iter_inventory_software, iter_inventory_systems
+from .scripts.sccm_pool import pooled_connection
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "inventory"
+
+_DELETE_CHUNK_SIZE = 500
+_TRADEMARKS = str.maketrans("", "", "®™©")
+_PUBLISHER_SUFFIXES = frozenset(
+    {"inc", "incorporated", "corp", "corporation", "co", "company", "llc", "ltd", "limited", "gmbh", "ag", "sa", "bv", "ab", "as", "aps", "plc"}
+)
+
+
+@dataclass
+class SyncStats:
+    full: bool = False
+    computers: int = 0
+    installs: int = 0
+    products_created: int = 0
+    deleted: int = 0
+
+
+def normalize_product_name(name, version="") -> str:
+    """Case-fold and collapse a product name, dropping a trailing copy of its version."""
+
+    key = " ".join(str(name or "").translate(_TRADEMARKS).casefold().split())
+    version = str(version or "").strip().casefold()
+    if version and key.endswith(" " + version):
+        key = key[: -len(version) - 1].rstrip()
+    return key[:512]
+
+
+def normalize_publisher(publisher) -> str:
+    """Case-fold a publisher and drop company suffixes ("Microsoft Corporation" -> "microsoft")."""
+
+    value = re.sub(r"[./,]", "", str(publisher or "").translate(_TRADEMARKS).casefold())
+    words = re.sub(r"[^\w&]+", " ", value).split()
+    while len(words) > 1 and words[-1] in _PUBLISHER_SUFFIXES:
+        words.pop()
+    return " ".join(words)[:255]
+
+
+def version_key(version) -> str:
+    """Return a key that sorts versions numerically as plain strings ("9.1" < "10.0")."""
+
+    parts = re.findall(r"\d+|[a-z]+", str(version or "").casefold())[:8]
+    return ".".join(part.zfill(10) if part.isdigit() else part for part in parts)[:255]
+
+
+def _aware(value):
+    # SCCM stores LastHWScan as naive UTC.
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return value
+
+
+def _as_bool(value) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+
+def _text(value, max_length: int) -> str:
+    return str(value or "").strip()[:max_length]
+
+
+def _build_computer(row: Dict, synced_at) -> SCCMComputer:
+    distinguished_name = _text(row.get("Distinguished_Name0"), 1024)
+    return SCCMComputer(
+        resource_id=row["ResourceID"],
+        name=_text(row.get("Netbios_Name0"), 255),
+        name_key=normalize_computer_name(row.get("Netbios_Name0"))[:255],
+        distinguished_name=distinguished_name,
+        distinguished_name_key=normalize_dn(distinguished_name)[:1024],
+        operating_system=_text(row.get("OSCaption"), 255),
+        os_version=_text(row.get("OSVersion"), 64),
+        last_hw_scan=_aware(row.get("LastHWScan")),
+        bitlocker_protection=row.get("ProtectionStatus"),
+        bitlocker_compliant=_as_bool(row.get("BitlockerCompliant")),
+        encryption_method=row.get("EncryptionMethod"),
+        tpm_activated=_as_bool(row.get("TpmActivated")),
+        tpm_enabled=_as_bool(row.get("TpmEnabled")),
+        tpm_owned=_as_bool(row.get("TpmOwned")),
+        synced_at=synced_at,
+    )
+
+
+_COMPUTER_UPDATE_FIELDS = [
+    "name",
+    "name_key",
+    "distinguished_name",
+    "distinguished_name_key",
+    "operating_system",
+    "os_version",
+    "last_hw_scan",
+    "bitlocker_protection",
+    "bitlocker_compliant",
+    "encryption_method",
+    "tpm_activated",
+    "tpm_enabled",
+    "tpm_owned",
+    "synced_at",
+]
+
+
+def _upsert_computers(rows: Iterable[Dict], synced_at) -> List[SCCMComputer]:
+    # The joined views can repeat a client; the last row wins.
+    computers = {row["ResourceID"]: _build_computer(row, synced_at) for row in rows if row.get("ResourceID") is not None}
+    if computers:
+        SCCMComputer.objects.bulk_create(
+            list(computers.values()),
+            update_conflicts=True,
+            unique_fields=["resource_id"],
+            update_fields=_COMPUTER_UPDATE_FIELDS,
+        )
+    return list(computers.values())
+
+
+class _ProductIndex:
+    """Maps normalised (name, publisher) keys to product ids, creating missing products."""
+
+    def __init__(self):
+        self._ids: Dict[Tuple[str, str], int] = {
+            (name_key, publisher_key): pk
+            for pk, name_key, publisher_key in SCCMSoftwareProduct.objects.values_list("pk", "name_key", "publisher_key")
+        }
+        self.created = 0
+
+    def resolve(self, rows: Iterable[Dict]) -> Dict[Tuple[str, str], int]:
+        missing = {}
+        for row in rows:
+            key = (normalize_product_name(row["ProductName0"], row.get("ProductVersion0")), normalize_publisher(row.get("Publisher0")))
+            if key[0] and key not in self._ids and key not in missing:
+                missing[key] = SCCMSoftwareProduct(
+                    name=_text(row["ProductName0"], 512),
+                    publisher=_text(row.get("Publisher0"), 512),
+                    name_key=key[0],
+                    publisher_key=key[1],
+                )
+        if missing:
+            SCCMSoftwareProduct.objects.bulk_create(list(missing.values()), ignore_conflicts=True)
+            name_keys = {name_key for name_key, _ in missing}
+            for pk, name_key, publisher_key in SCCMSoftwareProduct.objects.filter(name_key__in=name_keys).values_list(
+                "pk", "name_key", "publisher_key"
+            ):
+                self._ids[(name_key, publisher_key)] = pk
+            self.created += len(missing)
+        return self._ids
+
+
+def _replace_software(sccmdbh, since, computer_ids: Dict[int, int], full: bool) -> Tuple[int, int]:
+    if full:
+        SCCMInstalledSoftware.objects.all().delete()
+    else:
+        pks = list(computer_ids.values())
+        for start in range(0, len(pks), _DELETE_CHUNK_SIZE):
+            SCCMInstalledSoftware.objects.filter(computer_id__in=pks[start:start + _DELETE_CHUNK_SIZE]).delete()
+
+    products = _ProductIndex()
+    installs = 0
+    for rows in iter_inventory_software(sccmdbh, since):
+        ids = products.resolve(rows)
+        batch = {}
+        for row in rows:
+            computer_id = computer_ids.get(row["ResourceID"])
+            version = _text(row.get("ProductVersion0"), 255)
+            key = (normalize_product_name(row["ProductName0"], version), normalize_publisher(row.get("Publisher0")))
+            if computer_id is None or key not in ids:
+                # Clients that reported after the system read are picked up next run.
+                continue
+            batch[(computer_id, ids[key], version)] = SCCMInstalledSoftware(
+                computer_id=computer_id,
+                product_id=ids[key],
+                version=version,
+                version_key=version_key(version),
+            )
+        SCCMInstalledSoftware.objects.bulk_create(list(batch.values()))
+        installs += len(batch)
+    return installs, products.created
+
+
+def sync_inventory(*, full: bool = False) -> SyncStats:
+    """Copy clients with a newer hardware scan (or all clients) into the local tables."""
+
+    state, _ = SCCMInventorySyncState.objects.get_or_create(name=STATE_NAME)
+    full = full or state.last_hw_scan_watermark is None
+    started = timezone.now()
+    stats = SyncStats(full=full)
+
+    since = None
+    if not full:
+        # Scans are stamped by the client and land a little out of order.
+        overlap = getattr(settings, "SCCM_INVENTORY_SYNC_OVERLAP", 3600)
+        since = timezone.make_naive(state.last_hw_scan_watermark - timedelta(seconds=overlap), dt_timezone.utc)
+
+    watermark = state.last_hw_scan_watermark
+    with pooled_connection() as sccmdbh, transaction.atomic():
+        computer_ids: Dict[int, int] = {}
+        for rows in iter_inventory_systems(sccmdbh, since):
+            computers = _upsert_computers(rows, timezone.now())
+            stats.computers += len(computers)
+            computer_ids.update((computer.resource_id, None) for computer in computers)
+            scans = [computer.last_hw_scan for computer in computers if computer.last_hw_scan is not None]
+            if scans:
+                watermark = max([watermark, *scans]) if watermark else max(scans)
+
+        # bulk_create only sets primary keys on upserted rows from Django 5.0.
+        resource_ids = list(computer_ids)
+        for start in range(0, len(resource_ids), _DELETE_CHUNK_SIZE):
+            computer_ids.update(
+                SCCMComputer.objects.filter(resource_id__in=resource_ids[start:start + _DELETE_CHUNK_SIZE]).values_list(
+                    "resource_id", "pk"
+                )
+            )
+
+        stats.installs, stats.products_created = _replace_software(sccmdbh, since, computer_ids, full)
+
+        if full:
+            stats.deleted = SCCMComputer.objects.filter(synced_at__lt=started).delete()[1].get(SCCMComputer._meta.label, 0)
+            SCCMSoftwareProduct.objects.filter(installs__isnull=True).delete()
+            state.last_full_sync_at = started
+
+        state.last_hw_scan_watermark = watermark
+        state.last_synced_at = started
+        state.save()
+
+    logger.info(
+        "Synced SCCM inventory (%s): %d computers, %d installs, %d new products, %d removed",
+        "full" if full else "incremental",
+        stats.computers,
+        stats.installs,
+        stats.products_created,
+        stats.deleted,
+    )
+    return stats
+
+
+def last_synced_at():
+    return SCCMInventorySyncState.objects.filter(name=STATE_NAME).values_list("last_synced_at", flat=True).first()
+
+
+def within_ous_q(base_dns: Iterable[str], prefix: str = "") -> Q:
+    """Return a filter for computers at or below any of ``base_dns``."""
+
+    field = f"{prefix}distinguished_name_key"
+    query = Q(pk__in=[])
+    for dn in base_dns:
+        key = normalize_dn(dn)
+        if key:
+            query |= Q(**{field: key}) | Q(**{f"{field}__endswith": f",{key}"})
+    return query
+
+
+def _max_results(limit: Optional[int]) -> int:
+    return limit or getattr(settings, "SCCM_INVENTORY_MAX_RESULTS", 5000)
+
+
+def software_exposure(
+    product: str,
+    *,
+    publisher: Optional[str] = None,
+    below_version: Optional[str] = None,
+    base_dns: Optional[Iterable[str]] = None,
+    limit: Optional[int] = None,
+) -> Dict:
+    """Return the machines with a matching product installed, optionally below a version.
+
+    ``product`` and ``publisher`` match as substrings of the normalised keys.
+    ``base_dns`` restricts the answer to computers under those OUs.
+    """
+
+    products = SCCMSoftwareProduct.objects.filter(name_key__contains=normalize_product_name(product))
+    if publisher:
+        products = products.filter(publisher_key__contains=normalize_publisher(publisher))
+
+    installs = SCCMInstalledSoftware.objects.filter(product__in=products)
+    if below_version:
+        installs = installs.filter(version_key__lt=version_key(below_version))
+    if base_dns is not None:
+        installs = installs.filter(within_ous_q(base_dns, "computer__"))
+
+    limit = _max_results(limit)
+    rows = list(
+        installs.order_by("computer__name_key", "product__name_key", "version_key").values(
+            "computer__resource_id", "computer__name", "product__name", "product__publisher", "version"
+        )[: limit + 1]
+    )
+    products_found = (
+        installs.values("product__name", "product__publisher")
+        .annotate(machines=Count("computer", distinct=True))
+        .order_by("-machines", "product__name")
+    )
+    return {
+        "machines": installs.values("computer").distinct().count(),
+        "truncated": len(rows) > limit,
+        "products": [
+            {"name": item["product__name"], "publisher": item["product__publisher"], "machines": item["machines"]}
+            for item in products_found
+        ],
+        "results": [
+            {
+                "resource_id": row["computer__resource_id"],
+                "computer_name": row["computer__name"],
+                "product": row["product__name"],
+                "publisher": row["product__publisher"],
+                "version": row["version"],
+            }
+            for row in rows[:limit]
+        ],
+    }
+
+
+def _non_compliance_reasons(computer: SCCMComputer, stale_before) -> List[str]:
+    reasons = []
+    if computer.bitlocker_protection != 1:
+        reasons.append("bitlocker_off")
+    if computer.bitlocker_compliant is False:
+        reasons.append("bitlocker_noncompliant")
+    if computer.tpm_enabled is None:
+        reasons.append("tpm_missing")
+    elif not (computer.tpm_activated and computer.tpm_enabled and computer.tpm_owned):
+        reasons.append("tpm_not_ready")
+    if computer.last_hw_scan is None or computer.last_hw_scan < stale_before:
+        reasons.append("stale_inventory")
+    return reasons
+
+
+def compliance_report(
+    *,
+    base_dns: Optional[Iterable[str]] = None,
+    stale_days: int = 30,
+    limit: Optional[int] = None,
+) -> Dict:
+    """Summarise BitLocker, TPM and inventory freshness, listing non-compliant computers."""
+
+    stale_before = timezone.now() - timedelta(days=stale_days)
+    tpm_not_ready = Q(tpm_activated=False) | Q(tpm_enabled=False) | Q(tpm_owned=False)
+    checks = {
+        "bitlocker_off": ~Q(bitlocker_protection=1),
+        "bitlocker_noncompliant": Q(bitlocker_compliant=False),
+        "tpm_missing": Q(tpm_enabled__isnull=True),
+        "tpm_not_ready": Q(tpm_enabled__isnull=False) & tpm_not_ready,
+        "stale_inventory": Q(last_hw_scan__isnull=True) | Q(last_hw_scan__lt=stale_before),
+    }
+
+    computers = SCCMComputer.objects.all()
+    if base_dns is not None:
+        computers = computers.filter(within_ous_q(base_dns))
+
+    summary = computers.aggregate(computers=Count("pk"), **{name: Count("pk", filter=check) for name, check in checks.items()})
+    any_check = Q(pk__in=[])
+    for check in checks.values():
+        any_check |= check
+
+    limit = _max_results(limit)
+    non_compliant = list(computers.filter(any_check).order_by("name_key")[: limit + 1])
+    return {
+        "summary": summary,
+        "truncated": len(non_compliant) > limit,
+        "non_compliant": [
+            {
+                "resource_id": computer.resource_id,
+                "computer_name": computer.name,
+                "distinguished_name": computer.distinguished_name,
+                "last_hw_scan": computer.last_hw_scan,
+                "reasons": _non_compliance_reasons(computer, stale_before),
+            }
+            for computer in non_compliant[:limit]
+        ],
+    }
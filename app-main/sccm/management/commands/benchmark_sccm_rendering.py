@@ -0,0 +1,88 @@
+"""Compare ComputerInfoSerializer with the fast SCCM rendering path."""
+
+import datetime
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from ...rendering import SECTION_SERIALIZERS, get_row_plan, render_json
+from ...scripts.sccm_get_computer_info import _rows_as_dicts
+
+_SAMPLE_VALUES = {
+    serializers.IntegerField: lambda i: i,
+    serializers.DateTimeField: lambda i: datetime.datetime(2024, 1, 1, 8, 30) + datetime.timedelta(minutes=i),
+    serializers.DateField: lambda i: None if i % 3 else "20240101",
+    serializers.CharField: lambda i: f"value {i}",
+}
+
+
+class _Cursor:
+    def __init__(self, description, rows):
+        self.description = description
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+def sample_result_set(section, rows):
+    """Return ``(description, rows)`` shaped like a pyodbc result set for ``section``."""
+
+    description, factories = [], []
+    for name, field in SECTION_SERIALIZERS[section]().fields.items():
+        field_class = next(cls for cls in _SAMPLE_VALUES if isinstance(field, cls))
+        factory = _SAMPLE_VALUES[field_class]
+        description.append((name, type(factory(0)), None, None, None, None, True))
+        factories.append(factory)
+    return description, [tuple(factory(i) for factory in factories) for i in range(rows)]
+
+
+def render_with_serializers(result_sets):
+    data = {
+        section: SECTION_SERIALIZERS[section](_rows_as_dicts(_Cursor(*result_sets[section])), many=True).data
+        for section in result_sets
+    }
+    return JSONRenderer().render(data)
+
+
+def render_fast(result_sets):
+    return render_json(
+        {section: get_row_plan(section, description).render(rows) for section, (description, rows) in result_sets.items()}
+    )
+
+
+class Command(BaseCommand):
+    help = "Time ComputerInfoSerializer against the precomputed-converter rendering path on synthetic software lists."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000, help="Rows per software list (default 2000).")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per path (default 20).")
+
+    def handle(self, *args, **options):
+        result_sets = {
+            section: sample_result_set(section, options["rows"])
+            for section in ("v_gs_computer_system", "v_add_remove_programs")
+        }
+        if json.loads(render_with_serializers(result_sets)) != json.loads(render_fast(result_sets)):
+            self.stderr.write(self.style.ERROR("Fast rendering does not match the serializer output"))
+            return
+
+        timings = {}
+        for label, render in (("serializer", render_with_serializers), ("fast", render_fast)):
+            runs = []
+            for _ in range(max(1, options["repeat"])):
+                started = time.perf_counter()
+                render(result_sets)
+                runs.append(time.perf_counter() - started)
+            timings[label] = statistics.median(runs)
+            self.stdout.write(f"{label:>10}: median {timings[label] * 1000:.1f} ms, best {min(runs) * 1000:.1f} ms")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{options['rows']} rows per list: fast path is {timings['serializer'] / timings['fast']:.1f}x faster"
+            )
+        )
@@ -0,0 +1,37 @@
+"""Keep the local SCCM inventory snapshot current."""
+
+import logging
+
+import pyodbc
+from django.core.management.base import BaseCommand, CommandError
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Copy SCCM clients with a newer hardware scan, their BitLocker/TPM state and software into the local inventory."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Re-read every client and drop the ones SCCM no longer lists.",
+        )
+
+    def handle(self, *args, **options):
+        from ...inventory import sync_inventory
+        from ...scripts.sccm_pool import SCCMPoolError
+
+        try:
+            stats = sync_inventory(full=options["full"])
+        except (SCCMPoolError, pyodbc.Error) as exc:
+            logger.warning("SCCM inventory sync failed: %s", exc)
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Full' if stats.full else 'Incremental'} sync: {stats.computers} computers, "
+                f"{stats.installs} installs, {stats.products_created} new products, {stats.deleted} removed"
+            )
+        )
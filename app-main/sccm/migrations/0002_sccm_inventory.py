@@ -0,0 +1,97 @@
+# Generated by Django 4.2.25 on 2026-10-18 13:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sccm', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SCCMComputer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource_id', models.IntegerField(unique=True)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('name_key', models.CharField(blank=True, db_index=True, max_length=255)),
+                ('distinguished_name', models.CharField(blank=True, max_length=1024)),
+                ('distinguished_name_key', models.CharField(blank=True, max_length=1024)),
+                ('operating_system', models.CharField(blank=True, max_length=255)),
+                ('os_version', models.CharField(blank=True, max_length=64)),
+                ('last_hw_scan', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('bitlocker_protection', models.IntegerField(blank=True, null=True)),
+                ('bitlocker_compliant', models.BooleanField(blank=True, null=True)),
+                ('encryption_method', models.IntegerField(blank=True, null=True)),
+                ('tpm_activated', models.BooleanField(blank=True, null=True)),
+                ('tpm_enabled', models.BooleanField(blank=True, null=True)),
+                ('tpm_owned', models.BooleanField(blank=True, null=True)),
+                ('synced_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'SCCM computer',
+                'verbose_name_plural': 'SCCM computers',
+            },
+        ),
+        migrations.CreateModel(
+            name='SCCMInstalledSoftware',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(blank=True, max_length=255)),
+                ('version_key', models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                'verbose_name': 'SCCM installed software',
+                'verbose_name_plural': 'SCCM installed software',
+            },
+        ),
+        migrations.CreateModel(
+            name='SCCMInventorySyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('last_hw_scan_watermark', models.DateTimeField(blank=True, null=True)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('last_full_sync_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'SCCM inventory sync state',
+                'verbose_name_plural': 'SCCM inventory sync states',
+            },
+        ),
+        migrations.CreateModel(
+            name='SCCMSoftwareProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=512)),
+                ('publisher', models.CharField(blank=True, max_length=512)),
+                ('name_key', models.CharField(db_index=True, max_length=512)),
+                ('publisher_key', models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                'verbose_name': 'SCCM software product',
+                'verbose_name_plural': 'SCCM software products',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sccmsoftwareproduct',
+            constraint=models.UniqueConstraint(fields=('name_key', 'publisher_key'), name='sccm_software_product_unique_key'),
+        ),
+        migrations.AddField(
+            model_name='sccminstalledsoftware',
+            name='computer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='software', to='sccm.sccmcomputer'),
+        ),
+        migrations.AddField(
+            model_name='sccminstalledsoftware',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='installs', to='sccm.sccmsoftwareproduct'),
+        ),
+        migrations.AddIndex(
+            model_name='sccminstalledsoftware',
+            index=models.Index(fields=['product', 'version_key'], name='sccm_install_product_version'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from ._endpoints import ou_limited_endpoints
+
+
+ENDPOINTS = [
+    ("/sccm/computer/v1-0-1/bulk/", "post"),
+    ("/sccm/computer/v1-0-1/{computer_name}/", "get"),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('myview', '0010_mfabulkresetjob_mfabulkresetitem'),
+        ('sccm', '0002_sccm_inventory'),
+    ]
+
+    operations = [
+        migrations.RunPython(ou_limited_endpoints(ENDPOINTS), migrations.RunPython.noop),
+    ]
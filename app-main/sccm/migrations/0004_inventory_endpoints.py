@@ -0,0 +1,20 @@
+from django.db import migrations
+
+from ._endpoints import ou_limited_endpoints
+
+
+ENDPOINTS = [
+    ("/sccm/inventory/v1-0-0/software/", "get"),
+    ("/sccm/inventory/v1-0-0/compliance/", "get"),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sccm', '0003_computer_info_endpoints'),
+    ]
+
+    operations = [
+        migrations.RunPython(ou_limited_endpoints(ENDPOINTS), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+"""Helpers shared by the SCCM data migrations that register API endpoints.
+
+The endpoint refresh in ``myview.apps`` only creates ``Endpoint`` rows without
+a limiter, which the access control middleware denies. The SCCM endpoints are
+registered up front with the AD OU limiter so callers are scoped to their
+organizational units as soon as groups are assigned.
+"""
+
+
+def ou_limited_endpoints(endpoints):
+    """Return a ``RunPython`` callable that registers ``(path, method)`` pairs."""
+
+    def register(apps, schema_editor):
+        ContentType = apps.get_model("contenttypes", "ContentType")
+        LimiterType = apps.get_model("myview", "LimiterType")
+        Endpoint = apps.get_model("myview", "Endpoint")
+        limiter_model = apps.get_model("myview", "ADOrganizationalUnitLimiter")
+        using = schema_editor.connection.alias
+
+        content_type, _ = ContentType.objects.using(using).get_or_create(
+            app_label="myview", model="adorganizationalunitlimiter"
+        )
+        limiter_type = LimiterType.objects.using(using).filter(content_type=content_type).first()
+        if limiter_type is None:
+            limiter_type, _ = LimiterType.objects.using(using).get_or_create(
+                name=str(limiter_model._meta.verbose_name),
+                defaults={
+                    "content_type": content_type,
+                    "description": "This model represents an AD organizational unit limiter.",
+                },
+            )
+
+        for path, method in endpoints:
+            endpoint, created = Endpoint.objects.using(using).get_or_create(
+                path=path, defaults={"method": method, "limiter_type": limiter_type}
+            )
+            # Keep limiters an administrator already chose.
+            if not created and endpoint.limiter_type_id is None and not endpoint.no_limit:
+                endpoint.limiter_type = limiter_type
+                endpoint.save(update_fields=["limiter_type"])
+
+    return register
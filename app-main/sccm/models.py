@@ -6,3 +6,96 @@ class Item(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class SCCMComputer(models.Model):
+    """Local snapshot of an SCCM client, with its BitLocker and TPM state.
+
+    Kept current by the ``sync_sccm_inventory`` management command, which
+    reads machines whose hardware inventory changed since the last run; see
+    :mod:`sccm.inventory`.
+    """
+
+    resource_id = models.IntegerField(unique=True)
+    name = models.CharField(max_length=255, blank=True)
+    # Upper-cased NetBIOS name for case-insensitive lookups.
+    name_key = models.CharField(max_length=255, blank=True, db_index=True)
+    distinguished_name = models.CharField(max_length=1024, blank=True)
+    # Normalised DN (see myview.ou_scope.normalize_dn) for OU suffix filters.
+    distinguished_name_key = models.CharField(max_length=1024, blank=True)
+    operating_system = models.CharField(max_length=255, blank=True)
+    os_version = models.CharField(max_length=64, blank=True)
+    last_hw_scan = models.DateTimeField(null=True, blank=True, db_index=True)
+    # v_GS_ENCRYPTABLE_VOLUME.ProtectionStatus0 for C: (0 off, 1 on, 2 unknown).
+    bitlocker_protection = models.IntegerField(null=True, blank=True)
+    bitlocker_compliant = models.BooleanField(null=True, blank=True)
+    encryption_method = models.IntegerField(null=True, blank=True)
+    tpm_activated = models.BooleanField(null=True, blank=True)
+    tpm_enabled = models.BooleanField(null=True, blank=True)
+    tpm_owned = models.BooleanField(null=True, blank=True)
+    synced_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "SCCM computer"
+        verbose_name_plural = "SCCM computers"
+
+    def __str__(self) -> str:
+        return self.name or str(self.resource_id)
+
+
+class SCCMSoftwareProduct(models.Model):
+    """One normalised product name/publisher pair.
+
+    Together with :class:`SCCMInstalledSoftware` this is the inverted index
+    from software to the machines that have it installed.
+    """
+
+    name = models.CharField(max_length=512)
+    publisher = models.CharField(max_length=512, blank=True)
+    name_key = models.CharField(max_length=512, db_index=True)
+    publisher_key = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        verbose_name = "SCCM software product"
+        verbose_name_plural = "SCCM software products"
+        constraints = [
+            models.UniqueConstraint(fields=["name_key", "publisher_key"], name="sccm_software_product_unique_key"),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class SCCMInstalledSoftware(models.Model):
+    computer = models.ForeignKey(SCCMComputer, on_delete=models.CASCADE, related_name="software")
+    product = models.ForeignKey(SCCMSoftwareProduct, on_delete=models.CASCADE, related_name="installs")
+    version = models.CharField(max_length=255, blank=True)
+    # Zero-padded version (see sccm.inventory.version_key) so "below version"
+    # is a plain string comparison the index can serve.
+    version_key = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        verbose_name = "SCCM installed software"
+        verbose_name_plural = "SCCM installed software"
+        indexes = [
+            models.Index(fields=["product", "version_key"], name="sccm_install_product_version"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product} {self.version}".strip()
+
+
+class SCCMInventorySyncState(models.Model):
+    """High-water mark of the last SCCM inventory sync."""
+
+    name = models.CharField(max_length=64, unique=True)
+    last_hw_scan_watermark = models.DateTimeField(null=True, blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    last_full_sync_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "SCCM inventory sync state"
+        verbose_name_plural = "SCCM inventory sync states"
+
+    def __str__(self) -> str:
+        return self.name
@@ -0,0 +1,168 @@
+"""Fast rendering of SCCM result sets to JSON.
+
+A workstation can have thousands of software rows. Passing each row through
+``ComputerInfoSerializer`` costs a DRF field lookup, ``get_attribute`` call
+and ``to_representation`` call per value. A :class:`RowPlan` does that work
+once per result set: it reads ``cursor.description``, picks a converter for
+each output column and then only runs those converters over the raw rows.
+
+The plans for the software lists follow the serializers' declared fields and
+formats, so their output matches the serializer's. ``v_r_system`` is rendered column for column because
+``VRSystemSerializer`` does not match the system query.
+
+:func:`render_json` encodes with ``orjson`` when it is installed and falls
+back to the standard library.
+"""
+
+from __future__ import annotations
+
+import datetime
+import decimal
+import json
+import threading
+import zoneinfo
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import AddRemoveProgramsSerializer, GSComputerSystemSerializer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+Converter = Optional[Callable[[object], object]]
+
+SECTION_SERIALIZERS = {
+    "v_r_system": None,
+    "v_add_remove_programs": AddRemoveProgramsSerializer,
+    "v_gs_computer_system": GSComputerSystemSerializer,
+}
+
+_json_default = JSONEncoder().default
+
+
+def _datetime_converter(field: serializers.DateTimeField) -> Callable[[object], object]:
+    """Return ``field.to_representation`` without the per-value settings lookups."""
+
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or not isinstance(field_timezone, zoneinfo.ZoneInfo):
+        return field.to_representation
+
+    def convert(value):
+        if isinstance(value, str):
+            return value
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=field_timezone)
+        else:
+            value = value.astimezone(field_timezone)
+        value = value.isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return convert
+
+
+def _field_converter(field: serializers.Field, type_code) -> Converter:
+    if isinstance(field, serializers.IntegerField):
+        return None if type_code is int else int
+    if isinstance(field, serializers.CharField):
+        return None if type_code is str else str
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_converter(field)
+    return field.to_representation
+
+
+_DEFAULT_DATETIME_FIELD = serializers.DateTimeField()
+
+
+def _plain_value(value):
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, datetime.datetime):
+        return _DEFAULT_DATETIME_FIELD.to_representation(value)
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return _json_default(value)
+
+
+def _column_converter(type_code) -> Converter:
+    if type_code in (str, int, float, bool):
+        return None
+    if type_code is datetime.datetime:
+        return _datetime_converter(_DEFAULT_DATETIME_FIELD)
+    if type_code is decimal.Decimal:
+        return float
+    # Unknown or missing type codes are dispatched per value.
+    return _plain_value
+
+
+class RowPlan:
+    """Column selection and converters for one result set."""
+
+    __slots__ = ("names", "indexes", "converters")
+
+    def __init__(self, description: Sequence[Sequence], serializer_class=None):
+        columns = [column[0] for column in description]
+        type_codes = [column[1] if len(column) > 1 else None for column in description]
+
+        if serializer_class is None:
+            self.names = columns
+            self.indexes = list(range(len(columns)))
+            self.converters = [_column_converter(type_code) for type_code in type_codes]
+            return
+
+        self.names, self.indexes, self.converters = [], [], []
+        for name, field in serializer_class().fields.items():
+            if name not in columns:
+                if field.required:
+                    raise KeyError(f"Result set has no column for field `{name}` on `{serializer_class.__name__}`")
+                continue
+            index = columns.index(name)
+            self.names.append(name)
+            self.indexes.append(index)
+            self.converters.append(_field_converter(field, type_codes[index]))
+
+    def render(self, rows) -> List[Dict]:
+        names = self.names
+        columns = list(zip(self.indexes, self.converters))
+        return [
+            dict(
+                zip(
+                    names,
+                    [row[i] if convert is None or row[i] is None else convert(row[i]) for i, convert in columns],
+                )
+            )
+            for row in rows
+        ]
+
+
+_PLANS: Dict[Tuple, RowPlan] = {}
+_PLANS_LOCK = threading.Lock()
+
+
+def get_row_plan(section: str, description: Sequence[Sequence]) -> RowPlan:
+    """Return the cached plan for a section and result-set shape."""
+
+    key = (section, tuple((column[0], column[1] if len(column) > 1 else None) for column in description))
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = RowPlan(description, SECTION_SERIALIZERS.get(section))
+        with _PLANS_LOCK:
+            _PLANS.setdefault(key, plan)
+    return plan
+
+
+def read_rendered_rows(section: str, cursor) -> List[Dict]:
+    """Row reader for :mod:`sccm.scripts.sccm_get_computer_info` that returns JSON-ready dicts."""
+
+    return get_row_plan(section, cursor.description).render(cursor.fetchall())
+
+
+def render_json(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -1,71 +1,31 @@
-import pyodbc
-import os
 import json
+import logging
+import os
+from itertools import groupby
+
+import pyodbc
 
 # Load .env file
 # Import load_dotenv
 from dotenv import load_dotenv
-load_dotenv()
-
-
-def get_computer_info(computer_name):
-    # load env variables SCCM_USERNAME and SCCM_PASSWORD
-    sccm_username = os.getenv("SCCM_USERNAME")
-    sccm_password = os.getenv("SCCM_PASSWORD")
-
-
-    final_dict = {
-        "v_r_system": {},
-        "v_add_remove_programs": [],
-        "v_gs_computer_system": [],
-
-    }
-    row_dict = {}
-
-    # Connection string
-    connection_string = (
-        r'DRIVER=/opt/microsoft/msodbcsql18/lib64/libmsodbcsql-18.3.so.2.1;'
-        'SERVER=ait-pcmdb01.win.dtu.dk,1433;'
-        'TrustServerCertificate=yes;'
-        f'UID={sccm_username};'
-        f'PWD={sccm_password}'
-    )
-
-    # Connect to the SCCM database
-    try:
-        sccmdbh = pyodbc.connect(connection_string)
-    except pyodbc.Error as e:
-        print(f"Error connecting to the SCCM database: {e}")
-        exit()
-
-    # Execute the USE statement
-    try:
-        sccmdbh.execute("USE CM_P01")
-    except pyodbc.Error as e:
-        print(f"Error executing USE statement: {e}")
-        return None, f"Internal server error"        
-
-
-    # Find the resourceID of the computer
-    try:
-        sql = "SELECT ResourceID FROM v_R_System WHERE Netbios_Name0=?"
-        cursor = sccmdbh.execute(sql, computer_name)
-        row = cursor.fetchone()
-        if row is None:
-            return None, f"No computer found with name {computer_name}"
-        resource_id = row[0]
-    except pyodbc.Error as e:
-        print(f"Error: executing SQL statement: {e}")
-        return None, f"Internal server error"
-    
-
 
+from .sccm_pool import SCCMPoolError, pooled_connection
 
+load_dotenv()
 
+logger = logging.getLogger(__name__)
 
 
+# The statements below key on @ResourceID, which SQL_COMPUTER_INFO_BATCH
+# resolves once from the computer name.
+SQL_FIND_RESOURCE_ID = """
+DECLARE @ResourceID int = (SELECT TOP 1 ResourceID FROM v_R_System WHERE Netbios_Name0 = ?);
+SELECT @ResourceID AS ResourceID;
+IF @ResourceID IS NULL RETURN;
+"""
 
-    sql_statement_1 = """
+# ``{resource_id}`` is the ResourceID expression the system query keys on.
+SQL_SYSTEM_TEMPLATE = """
 SELECT  DISTINCT TOP 1
 SYS.ResourceID,
 SYS.Name0 DeviceName, 
@@ -144,73 +104,17 @@ LEFT OUTER JOIN v_GS_WORKSTATION_STATUS WS ON CHCS.ResourceID = WS.ResourceID
 LEFT JOIN v_GS_TPM TPM ON EV.ResourceID = TPM.ResourceID 
 LEFT JOIN v_GS_BITLOCKER_DETAILS BD ON BD.ResourceID = FCM.ResourceID AND BD.DriveLetter0 = 'C:'
 LEFT join v_UserMachineRelationship VUMR on SYS.ResourceID=VUMR.MachineResourceID 
-WHERE EV.DriveLetter0 = 'C:' AND SYS.Name0 LIKE ('%' + ? + '%')
+WHERE EV.DriveLetter0 = 'C:' AND SYS.ResourceID = {resource_id}
 AND OS.Caption0 NOT LIKE '\%Server%'
 ORDER BY SYS.Name0
 """
 
-    # Execute the SQL statement1
-    try:
-
-        
-        cursor = sccmdbh.execute(sql_statement_1, resource_id)
-        row = cursor.fetchone()
-        
-        columns = [column[0] for column in cursor.description]
-
-        # Check if the row is None and return an appropriate error message
-        if row is None:
-            return None, f"No computer found with name {resource_id}"
-
-
-    except pyodbc.Error as e:
-        print(f"Error: executing SQL statement: {e}")
-        return None, f"Internal server error"
-
-    row_dict = dict(zip(columns, row))
-    final_dict["v_r_system"] = row_dict
-    
-
-
-
-
-    
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+SQL_SYSTEM = SQL_SYSTEM_TEMPLATE.format(resource_id="@ResourceID")
 
-
-
-
-    sql_statement_2 = """
+# ``{filter}`` restricts VRS (v_R_System) to the wanted machines. The software
+# views are inner joined so a machine without software yields no rows rather
+# than one null-filled row, in single and bulk lookups alike.
+SQL_ADD_REMOVE_PROGRAMS_TEMPLATE = """
 
     -- v_Add_Remove_Programs: This view contains information about software that has been discovered from the "Add or Remove Programs" data on a client computer.
     SELECT
@@ -227,117 +131,19 @@ ORDER BY SYS.Name0
 
     FROM 
         V_R_System VRS 
-        LEFT JOIN v_Add_Remove_Programs AS ARP ON ARP.ResourceID=VRS.ResourceID
+        JOIN v_Add_Remove_Programs AS ARP ON ARP.ResourceID=VRS.ResourceID
         
 
     WHERE
-        VRS.ResourceID=?
+        {filter}
 
 
 
     """
 
+SQL_ADD_REMOVE_PROGRAMS = SQL_ADD_REMOVE_PROGRAMS_TEMPLATE.format(filter="VRS.ResourceID = @ResourceID")
 
-    # Execute the SQL statement2
-    try:
-
-        cursor2 = sccmdbh.execute(sql_statement_2, resource_id)
-        
-        
-        columns2 = [column[0] for column in cursor2.description]
-
-        rows2 = cursor2.fetchall()
-
-        # Check if the row is None and return an appropriate error message
-        if rows2 is None:
-            return None, f"No computer found with resource_id {resource_id}"
-        
-        # Convert each row to dictionary and append to the list
-        for row2 in rows2:
-            row_dict2 = dict(zip(columns2, row2))
-            final_dict["v_add_remove_programs"].append(row_dict2)
-
-
-        
-
-    
-    except pyodbc.Error as e:
-        print(f"Error: executing SQL statement: {e}")
-        return None, f"Internal server error"
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-    sql_statement_3 = """
+SQL_INSTALLED_SOFTWARE_TEMPLATE = """
 
     -- v_GS_INSTALLED_SOFTWARE: This view provides details about installed software discovered by the hardware inventory client agent.
 
@@ -377,168 +183,190 @@ GIS.VersionMajor0,
 GIS.VersionMinor0
 FROM 
 V_R_System VRS 
-LEFT JOIN v_GS_INSTALLED_SOFTWARE AS GIS ON GIS.ResourceID=VRS.ResourceID
+JOIN v_GS_INSTALLED_SOFTWARE AS GIS ON GIS.ResourceID=VRS.ResourceID
 WHERE 
-	VRS.ResourceID=?
+	{filter}
     """
 
+SQL_INSTALLED_SOFTWARE = SQL_INSTALLED_SOFTWARE_TEMPLATE.format(filter="VRS.ResourceID = @ResourceID")
+
+# One round trip: the ResourceID, then the system, Add/Remove Programs and
+# installed software result sets, read in turn with ``cursor.nextset()``.
+SQL_COMPUTER_INFO_BATCH = "SET NOCOUNT ON;\n" + ";\n".join(
+    [SQL_FIND_RESOURCE_ID.strip().rstrip(";"), SQL_SYSTEM.strip(), SQL_ADD_REMOVE_PROGRAMS.strip(), SQL_INSTALLED_SOFTWARE.strip()]
+) + ";"
+
+# Bulk lookups load the requested names (a JSON array parameter, expanded
+# with OPENJSON) into #sccm_targets, then join every view against that table,
+# so a chunk of machines costs one round trip instead of one per machine.
+# Software rows come back ordered by ResourceID and are grouped in Python.
+_BULK_TARGET_FILTER = "VRS.ResourceID IN (SELECT ResourceID FROM #sccm_targets)"
+
+SQL_BULK_LOAD_TARGETS = """
+IF OBJECT_ID('tempdb..#sccm_targets') IS NOT NULL DROP TABLE #sccm_targets;
+CREATE TABLE #sccm_targets (ResourceID int PRIMARY KEY, ComputerName nvarchar(256) NOT NULL);
+INSERT INTO #sccm_targets (ResourceID, ComputerName)
+SELECT ResourceID, Netbios_Name0 FROM (
+    SELECT SYS.ResourceID, SYS.Netbios_Name0,
+           ROW_NUMBER() OVER (PARTITION BY SYS.Netbios_Name0 ORDER BY SYS.ResourceID DESC) AS NameRank
+    FROM v_R_System SYS
+    JOIN OPENJSON(?) WITH (Name nvarchar(256) '$') N ON SYS.Netbios_Name0 = N.Name
+) Ranked
+WHERE NameRank = 1;
+SELECT ResourceID, ComputerName FROM #sccm_targets
+"""
 
-    # Execute the SQL statement3
+SQL_BULK_COMPUTER_INFO_BATCH = "SET NOCOUNT ON;\n" + ";\n".join(
+    [
+        SQL_BULK_LOAD_TARGETS.strip(),
+        "SELECT S.* FROM #sccm_targets T CROSS APPLY ("
+        + SQL_SYSTEM_TEMPLATE.format(resource_id="T.ResourceID").strip()
+        + ") S",
+        SQL_ADD_REMOVE_PROGRAMS_TEMPLATE.format(filter=_BULK_TARGET_FILTER).strip()
+        + "\nORDER BY ARP.ResourceID",
+        SQL_INSTALLED_SOFTWARE_TEMPLATE.format(filter=_BULK_TARGET_FILTER).strip()
+        + "\nORDER BY GIS.ResourceID",
+        "DROP TABLE #sccm_targets",
+    ]
+) + ";"
+
+
+def _bulk_chunk_size():
     try:
-
-        cursor3 = sccmdbh.execute(sql_statement_3, resource_id)
-        
-        
-        columns3 = [column[0] for column in cursor3.description]
-
-        rows3 = cursor3.fetchall()
-
-        # Check if the row is None and return an appropriate error message
-        if rows3 is None:
-            return None, f"No computer found with resource_id {resource_id}"
-        
-        # Convert each row to dictionary and append to the list
-        for row3 in rows3:
-            row_dict3 = dict(zip(columns3, row3))
-            final_dict["v_gs_computer_system"].append(row_dict3)
-
-
-        
-
-    
-    except pyodbc.Error as e:
-        print(f"Error: executing SQL statement: {e}")
-        return None, f"Internal server error"
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        return max(1, int(os.getenv("SCCM_BULK_CHUNK_SIZE", "200")))
+    except ValueError:
+        return 200
 
 
+def normalize_computer_name(name):
+    """Return the upper-cased NetBIOS name for a host name or FQDN."""
 
+    return str(name or "").strip().split(".", 1)[0].upper()
 
 
+def _rows_as_dicts(cursor):
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 
+def _read_rows(section, cursor):
+    """Default row reader: plain dicts of the raw column values.
 
+    ``section`` names the result set (``v_r_system``, ``v_add_remove_programs``
+    or ``v_gs_computer_system``) so other readers, such as
+    :func:`sccm.rendering.read_rendered_rows`, can shape each one.
+    """
 
+    return _rows_as_dicts(cursor)
 
 
+def _query_computer_info(sccmdbh, computer_name, read_rows=_read_rows):
+    final_dict = {
+        "v_r_system": {},
+        "v_add_remove_programs": [],
+        "v_gs_computer_system": [],
+    }
 
+    cursor = sccmdbh.execute(SQL_COMPUTER_INFO_BATCH, computer_name)
+    try:
+        row = cursor.fetchone()
+        if row is None or row[0] is None:
+            return None, f"No computer found with name {computer_name}"
 
+        cursor.nextset()
+        systems = read_rows("v_r_system", cursor)
+        if not systems:
+            return None, f"No computer found with name {computer_name}"
+        final_dict["v_r_system"] = systems[0]
+
+        cursor.nextset()
+        final_dict["v_add_remove_programs"] = read_rows("v_add_remove_programs", cursor)
+        cursor.nextset()
+        final_dict["v_gs_computer_system"] = read_rows("v_gs_computer_system", cursor)
+    finally:
+        # Discards any unread result sets before the connection goes back to the pool.
+        cursor.close()
     return final_dict, None
 
 
+def get_computer_info(computer_name, *, read_rows=_read_rows):
+    """Return ``(computer_info, error)`` for a computer, borrowing a pooled connection."""
 
+    try:
+        with pooled_connection() as sccmdbh:
+            return _query_computer_info(sccmdbh, computer_name, read_rows)
+    except SCCMPoolError as e:
+        logger.warning("Error connecting to the SCCM database: %s", e)
+    except pyodbc.Error as e:
+        logger.warning("Error executing SCCM SQL statement: %s", e)
+    return None, "Internal server error"
 
 
+def _query_computer_info_bulk(sccmdbh, computer_names, read_rows=_read_rows):
+    """Return ``{NETBIOS_NAME: computer_info}`` for the names SCCM knows."""
 
+    cursor = sccmdbh.execute(SQL_BULK_COMPUTER_INFO_BATCH, json.dumps(computer_names))
+    try:
+        targets = {resource_id: name for resource_id, name in cursor.fetchall()}
+        cursor.nextset()
+        systems = {row["ResourceID"]: row for row in read_rows("v_r_system", cursor)}
+        cursor.nextset()
+        programs = {
+            key: list(rows)
+            for key, rows in groupby(read_rows("v_add_remove_programs", cursor), key=lambda row: row["ResourceID"])
+        }
+        cursor.nextset()
+        software = {
+            key: list(rows)
+            for key, rows in groupby(read_rows("v_gs_computer_system", cursor), key=lambda row: row["ResourceID"])
+        }
+    finally:
+        cursor.close()
+
+    found = {}
+    for resource_id, name in targets.items():
+        if resource_id not in systems:
+            # Filtered out by the system query (servers, no C: drive ...), as in the single lookup.
+            continue
+        found[normalize_computer_name(name)] = {
+            "v_r_system": systems[resource_id],
+            "v_add_remove_programs": programs.get(resource_id, []),
+            "v_gs_computer_system": software.get(resource_id, []),
+        }
+    return found
+
+
+def iter_computer_info(computer_names, *, chunk_size=None, read_rows=_read_rows):
+    """Yield ``(computer_name, computer_info, error)`` for each name, in order.
+
+    Names are looked up ``SCCM_BULK_CHUNK_SIZE`` at a time, one round trip per
+    chunk. The pooled connection is returned before a chunk's results are
+    yielded, so a slow consumer does not hold it.
+    """
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    names = list(dict.fromkeys(filter(None, (normalize_computer_name(name) for name in computer_names))))
+    chunk_size = chunk_size or _bulk_chunk_size()
+    for start in range(0, len(names), chunk_size):
+        chunk = names[start:start + chunk_size]
+        error = None
+        found = {}
+        try:
+            with pooled_connection() as sccmdbh:
+                found = _query_computer_info_bulk(sccmdbh, chunk, read_rows)
+        except SCCMPoolError as e:
+            logger.warning("Error connecting to the SCCM database: %s", e)
+            error = "Internal server error"
+        except pyodbc.Error as e:
+            logger.warning("Error executing SCCM SQL statement: %s", e)
+            error = "Internal server error"
+
+        for name in chunk:
+            if error:
+                yield name, None, error
+            elif name in found:
+                yield name, found[name], None
+            else:
+                yield name, None, f"No computer found with name {name}"
 
 
 def run():
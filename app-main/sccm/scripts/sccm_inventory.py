@@ -0,0 +1,83 @@
+"""Streaming reads of the SCCM views copied into the local inventory.
+
+Both queries take an optional ``LastHWScan`` watermark. Without one they read
+every client; with one they only read clients whose hardware inventory (and so
+their installed software) was reported after it. Rows are fetched in batches
+so a full read never sits in memory at once.
+"""
+
+import os
+
+# ``{filter}`` restricts WS (v_GS_WORKSTATION_STATUS).
+SQL_INVENTORY_SYSTEMS_TEMPLATE = """
+SELECT
+SYS.ResourceID,
+SYS.Netbios_Name0,
+SYS.Distinguished_Name0,
+OS.Caption0 AS OSCaption,
+OS.Version0 AS OSVersion,
+WS.LastHWScan,
+EV.ProtectionStatus0 AS ProtectionStatus,
+BD.Compliant0 AS BitlockerCompliant,
+BD.EncryptionMethod0 AS EncryptionMethod,
+TPM.IsActivated_InitialValue0 AS TpmActivated,
+TPM.IsEnabled_InitialValue0 AS TpmEnabled,
+TPM.IsOwned_InitialValue0 AS TpmOwned
+FROM v_R_System SYS
+LEFT JOIN v_GS_WORKSTATION_STATUS WS ON WS.ResourceID = SYS.ResourceID
+LEFT JOIN v_GS_OPERATING_SYSTEM OS ON OS.ResourceID = SYS.ResourceID
+LEFT JOIN v_GS_ENCRYPTABLE_VOLUME EV ON EV.ResourceID = SYS.ResourceID AND EV.DriveLetter0 = 'C:'
+LEFT JOIN v_GS_BITLOCKER_DETAILS BD ON BD.ResourceID = SYS.ResourceID AND BD.DriveLetter0 = 'C:'
+LEFT JOIN v_GS_TPM TPM ON TPM.ResourceID = SYS.ResourceID
+WHERE {filter}
+"""
+
+SQL_INVENTORY_SOFTWARE_TEMPLATE = """
+SELECT
+GIS.ResourceID,
+GIS.ProductName0,
+GIS.Publisher0,
+GIS.ProductVersion0
+FROM v_GS_INSTALLED_SOFTWARE GIS
+JOIN v_GS_WORKSTATION_STATUS WS ON WS.ResourceID = GIS.ResourceID
+WHERE {filter} AND GIS.ProductName0 IS NOT NULL
+"""
+
+_FULL_FILTER = "1 = 1"
+_INCREMENTAL_FILTER = "WS.LastHWScan > ?"
+
+
+def _fetch_size():
+    try:
+        return max(1, int(os.getenv("SCCM_INVENTORY_FETCH_SIZE", "5000")))
+    except ValueError:
+        return 5000
+
+
+def _iter_query(sccmdbh, template, since):
+    if since is None:
+        cursor = sccmdbh.execute(template.format(filter=_FULL_FILTER))
+    else:
+        cursor = sccmdbh.execute(template.format(filter=_INCREMENTAL_FILTER), since)
+    try:
+        columns = [column[0] for column in cursor.description]
+        fetch_size = _fetch_size()
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield [dict(zip(columns, row)) for row in rows]
+    finally:
+        cursor.close()
+
+
+def iter_inventory_systems(sccmdbh, since=None):
+    """Yield batches of client rows (system, BitLocker and TPM state)."""
+
+    return _iter_query(sccmdbh, SQL_INVENTORY_SYSTEMS_TEMPLATE, since)
+
+
+def iter_inventory_software(sccmdbh, since=None):
+    """Yield batches of installed-software rows."""
+
+    return _iter_query(sccmdbh, SQL_INVENTORY_SOFTWARE_TEMPLATE, since)
@@ -0,0 +1,239 @@
+"""Process-wide pool of ``pyodbc`` connections to the SCCM database.
+
+Opening a connection to the SCCM SQL Server costs a TCP connect, a TLS
+handshake and a login. The pool keeps a few open connections per worker
+process and hands them out one caller at a time, so lookups reuse a session
+instead of leaking a new one per request. The site database is selected in
+the connection string, so no ``USE`` round trip is needed.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+import pyodbc
+
+from utils.env import get_float_env, get_int_env
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_DRIVER = "/opt/microsoft/msodbcsql18/lib64/libmsodbcsql-18.3.so.2.1"
+_DEFAULT_SERVER = "ait-pcmdb01.win.dtu.dk,1433"
+_DEFAULT_DATABASE = "CM_P01"
+
+# Errors after which a connection cannot be trusted any more. Other
+# ``pyodbc.Error`` subclasses (bad SQL, constraint errors) leave it usable.
+_BROKEN_CONNECTION_ERRORS = (pyodbc.OperationalError, pyodbc.InterfaceError)
+
+
+def build_connection_string() -> str:
+    """Return the ODBC connection string for the SCCM site database."""
+
+    return (
+        f"DRIVER={os.getenv('SCCM_ODBC_DRIVER', _DEFAULT_DRIVER)};"
+        f"SERVER={os.getenv('SCCM_SERVER', _DEFAULT_SERVER)};"
+        f"DATABASE={os.getenv('SCCM_DATABASE', _DEFAULT_DATABASE)};"
+        "TrustServerCertificate=yes;"
+        f"UID={os.getenv('SCCM_USERNAME')};"
+        f"PWD={os.getenv('SCCM_PASSWORD')}"
+    )
+
+
+class SCCMPoolError(Exception):
+    """Raised when the pool cannot provide a connection."""
+
+
+class _PooledConnection:
+    __slots__ = ("connection", "created_at", "last_used_at", "uses")
+
+    def __init__(self, connection):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used_at = now
+        self.uses = 0
+
+
+class SCCMConnectionPool:
+    """Thread-safe pool of ``pyodbc`` connections.
+
+    At most ``max_size`` connections exist at any time; callers wait up to
+    ``borrow_timeout`` seconds for one to become available. Idle connections
+    are checked with ``SELECT 1`` before reuse and recycled once they have
+    served ``max_uses`` borrows or exceed ``max_lifetime`` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int,
+        borrow_timeout: float,
+        health_check_interval: float,
+        max_lifetime: float,
+        max_uses: int,
+        connect_timeout: int = 10,
+        query_timeout: int = 0,
+        connection_factory: Optional[Callable[[], object]] = None,
+    ):
+        self.max_size = max(1, int(max_size))
+        self.borrow_timeout = borrow_timeout
+        self.health_check_interval = health_check_interval
+        self.max_lifetime = max_lifetime
+        self.max_uses = max_uses
+        self.connect_timeout = connect_timeout
+        self.query_timeout = query_timeout
+        self._connection_factory = connection_factory or self._default_connection_factory
+        self._idle: deque[_PooledConnection] = deque()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    # ------------------------------------------------------------------
+    # Connection lifecycle
+    # ------------------------------------------------------------------
+    def _default_connection_factory(self):
+        # The lookups only read, so autocommit avoids holding a transaction
+        # open while the connection sits idle in the pool.
+        connection = pyodbc.connect(build_connection_string(), timeout=self.connect_timeout, autocommit=True)
+        if self.query_timeout:
+            connection.timeout = self.query_timeout
+        return connection
+
+    def _open(self) -> _PooledConnection:
+        try:
+            return _PooledConnection(self._connection_factory())
+        except pyodbc.Error as exc:
+            raise SCCMPoolError(f"Error connecting to the SCCM database: {exc}") from exc
+
+    @staticmethod
+    def _close(pooled: _PooledConnection) -> None:
+        try:
+            pooled.connection.close()
+        except Exception:
+            logger.debug("Ignoring error while closing pooled SCCM connection", exc_info=True)
+
+    def _is_usable(self, pooled: _PooledConnection) -> bool:
+        now = time.monotonic()
+        if self.max_lifetime and now - pooled.created_at >= self.max_lifetime:
+            return False
+        if self.max_uses and pooled.uses >= self.max_uses:
+            return False
+
+        if self.health_check_interval and now - pooled.last_used_at >= self.health_check_interval:
+            try:
+                pooled.connection.execute("SELECT 1").fetchone()
+            except pyodbc.Error:
+                return False
+        return True
+
+    def _reset_after_fork(self) -> None:
+        # Sockets inherited from a parent process must not be shared.
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        with self._lock:
+            if pid == self._pid:
+                return
+            self._idle.clear()
+            self._slots = threading.BoundedSemaphore(self.max_size)
+            self._pid = pid
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def acquire(self) -> _PooledConnection:
+        self._reset_after_fork()
+
+        if not self._slots.acquire(timeout=self.borrow_timeout):
+            raise SCCMPoolError(f"Timed out after {self.borrow_timeout}s waiting for an SCCM database connection")
+
+        try:
+            while True:
+                with self._lock:
+                    pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    pooled = self._open()
+                elif not self._is_usable(pooled):
+                    self._close(pooled)
+                    continue
+                pooled.uses += 1
+                return pooled
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, pooled: _PooledConnection, *, discard: bool = False) -> None:
+        try:
+            if discard:
+                self._close(pooled)
+                return
+            pooled.last_used_at = time.monotonic()
+            with self._lock:
+                self._idle.append(pooled)
+        finally:
+            try:
+                self._slots.release()
+            except ValueError:
+                # Slot bookkeeping was reset by a fork while this connection was out.
+                pass
+
+    @contextmanager
+    def connection(self) -> Iterator[object]:
+        """Borrow a connection; it is discarded if a connection-level error escapes."""
+
+        pooled = self.acquire()
+        discard = False
+        try:
+            yield pooled.connection
+        except _BROKEN_CONNECTION_ERRORS:
+            discard = True
+            raise
+        finally:
+            self.release(pooled, discard=discard)
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for pooled in idle:
+            self._close(pooled)
+
+    @property
+    def idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+
+_POOL: Optional[SCCMConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_connection_pool() -> SCCMConnectionPool:
+    """Return the process-wide connection pool, creating it on first use."""
+
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = SCCMConnectionPool(
+                    max_size=get_int_env('SCCM_POOL_SIZE', 4, minimum=1),
+                    borrow_timeout=get_float_env('SCCM_POOL_TIMEOUT', 10.0, minimum=0.1),
+                    health_check_interval=get_float_env('SCCM_POOL_HEALTH_CHECK_SECONDS', 30.0, minimum=0.0),
+                    max_lifetime=get_float_env('SCCM_POOL_MAX_LIFETIME', 900.0, minimum=0.0),
+                    max_uses=get_int_env('SCCM_POOL_MAX_USES', 500, minimum=0),
+                    connect_timeout=get_int_env('SCCM_CONNECT_TIMEOUT', 10, minimum=0),
+                    query_timeout=get_int_env('SCCM_QUERY_TIMEOUT', 60, minimum=0),
+                )
+    return _POOL
+
+
+def pooled_connection():
+    """Shortcut for ``get_connection_pool().connection()``."""
+
+    return get_connection_pool().connection()
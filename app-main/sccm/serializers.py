@@ -89,3 +89,29 @@ class ComputerInfoSerializer(serializers.Serializer):
     v_add_remove_programs = AddRemoveProgramsSerializer(many=True)
 
 
+
+
+class ComputerInfoBulkRequestSerializer(serializers.Serializer):
+    computer_names = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        required=False,
+    )
+    ou = serializers.CharField(max_length=1024, required=False)
+
+    def validate(self, attrs):
+        if bool(attrs.get("computer_names")) == bool(attrs.get("ou")):
+            raise serializers.ValidationError("Provide either computer_names or ou.")
+        return attrs
+
+
+class SoftwareExposureQuerySerializer(serializers.Serializer):
+    product = serializers.CharField(min_length=2, max_length=255)
+    publisher = serializers.CharField(max_length=255, required=False)
+    below_version = serializers.CharField(max_length=255, required=False)
+    ou = serializers.CharField(max_length=1024, required=False)
+
+
+class ComplianceQuerySerializer(serializers.Serializer):
+    ou = serializers.CharField(max_length=1024, required=False)
+    stale_days = serializers.IntegerField(min_value=1, max_value=3650, required=False, default=30)
@@ -0,0 +1,167 @@
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from myview.models import ADOrganizationalUnitLimiter, Endpoint
+
+from sccm.scripts import sccm_get_computer_info
+from sccm.scripts.sccm_get_computer_info import SQL_BULK_COMPUTER_INFO_BATCH, iter_computer_info
+from sccm.scripts.sccm_pool import SCCMPoolError
+from sccm.rendering import read_rendered_rows
+from sccm.views import SCCMBulkComputerInfoView, SCCMViewSet_1_0_1
+
+from .test_sccm_computer_info import _FakeCursor
+
+
+def _bulk_cursor():
+    return _FakeCursor(
+        [
+            (["ResourceID", "ComputerName"], [(1, "PC1"), (2, "PC2")]),
+            (["ResourceID", "DeviceName"], [(1, "PC1"), (2, "PC2")]),
+            (["ResourceID", "DisplayName0"], [(1, "7-Zip"), (1, "Firefox"), (2, "Edge")]),
+            (["ResourceID", "ProductName0"], [(2, "Edge")]),
+        ]
+    )
+
+
+class BulkComputerInfoTests(SimpleTestCase):
+    def _patch_pool(self, connection):
+        @contextmanager
+        def fake_pooled_connection():
+            yield connection
+
+        return mock.patch.object(sccm_get_computer_info, "pooled_connection", fake_pooled_connection)
+
+    def test_batch_is_set_based(self):
+        self.assertEqual(SQL_BULK_COMPUTER_INFO_BATCH.count("?"), 1)
+        self.assertIn("OPENJSON(?)", SQL_BULK_COMPUTER_INFO_BATCH)
+        self.assertIn("CROSS APPLY", SQL_BULK_COMPUTER_INFO_BATCH)
+        self.assertNotIn("@ResourceID", SQL_BULK_COMPUTER_INFO_BATCH)
+
+    def test_groups_rows_per_machine_in_request_order(self):
+        cursor = _bulk_cursor()
+        connection = mock.Mock(execute=mock.Mock(return_value=cursor))
+
+        with self._patch_pool(connection):
+            results = list(iter_computer_info(["pc2.win.dtu.dk", "PC1", "missing", "pc1"]))
+
+        connection.execute.assert_called_once_with(SQL_BULK_COMPUTER_INFO_BATCH, json.dumps(["PC2", "PC1", "MISSING"]))
+        self.assertEqual([name for name, _, _ in results], ["PC2", "PC1", "MISSING"])
+        pc2, pc1, missing = (info for _, info, _ in results)
+        self.assertEqual([row["DisplayName0"] for row in pc1["v_add_remove_programs"]], ["7-Zip", "Firefox"])
+        self.assertEqual(pc1["v_gs_computer_system"], [])
+        self.assertEqual(pc2["v_r_system"], {"ResourceID": 2, "DeviceName": "PC2"})
+        self.assertIsNone(missing)
+        self.assertEqual(results[2][2], "No computer found with name MISSING")
+        self.assertTrue(cursor.closed)
+
+    def test_one_round_trip_per_chunk(self):
+        connection = mock.Mock(execute=mock.Mock(side_effect=lambda *_: _bulk_cursor()))
+
+        with self._patch_pool(connection):
+            list(iter_computer_info(["PC1", "PC2", "PC3"], chunk_size=2))
+
+        self.assertEqual(connection.execute.call_count, 2)
+
+    def test_pool_error_reported_per_name(self):
+        with mock.patch.object(sccm_get_computer_info, "pooled_connection", side_effect=SCCMPoolError("down")):
+            results = list(iter_computer_info(["PC1", "PC2"]))
+
+        self.assertEqual(results, [("PC1", None, "Internal server error"), ("PC2", None, "Internal server error")])
+
+
+class BulkComputerInfoViewTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = get_user_model().objects.create_user(username="sccm-bulk", password="x")
+
+    def _post(self, data, base_dns=None):
+        request = self.factory.post("/sccm/computer/v1-0-1/bulk/", data, format="json")
+        force_authenticate(request, user=self.user)
+        if base_dns:
+            request._ado_ou_base_dns = base_dns
+        response = SCCMBulkComputerInfoView.as_view()(request)
+        if response.streaming:
+            return response, [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        return response, None
+
+    def test_streams_one_line_per_computer(self):
+        def fake_iter(names, **kwargs):
+            yield "PC1", {"v_r_system": {"LastHWScan": datetime(2024, 1, 2)}, "v_add_remove_programs": [], "v_gs_computer_system": []}, None
+            yield "PC2", None, "No computer found with name PC2"
+
+        with mock.patch("sccm.views.iter_computer_info", side_effect=fake_iter):
+            response, lines = self._post({"computer_names": ["pc1", "pc2.win.dtu.dk"]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual([line["status"] for line in lines], ["found", "not_found"])
+        self.assertEqual(lines[0]["v_r_system"]["LastHWScan"], "2024-01-02T00:00:00")
+
+    def test_ou_is_resolved_through_active_directory(self):
+        computers = [{"name": "PC1", "dNSHostName": "pc1.win.dtu.dk", "distinguishedName": "CN=PC1,OU=A,DC=x"}]
+        with mock.patch("sccm.views.list_ou_computers", return_value=computers) as list_ou, mock.patch(
+            "sccm.views.iter_computer_info", return_value=iter([("PC1", None, "No computer found with name PC1")])
+        ) as iter_info:
+            response, lines = self._post({"ou": "OU=A,DC=x"})
+
+        list_ou.assert_called_once_with("OU=A,DC=x")
+        iter_info.assert_called_once_with(["PC1"], read_rows=read_rendered_rows)
+        self.assertEqual(len(lines), 1)
+
+    def test_names_outside_ou_scope_are_denied(self):
+        with mock.patch("sccm.views.computers_within_ous", return_value={"pc1"}) as within, mock.patch(
+            "sccm.views.iter_computer_info", return_value=iter([("PC1", None, "Internal server error")])
+        ) as iter_info:
+            response, lines = self._post({"computer_names": ["PC1", "PC2"]}, base_dns=["OU=A,DC=x"])
+
+        within.assert_called_once_with(["PC1", "PC2"], ["OU=A,DC=x"], attribute="name")
+        iter_info.assert_called_once_with(["PC1"], read_rows=read_rendered_rows)
+        self.assertEqual([(line["computer_name"], line["status"]) for line in lines], [("PC1", "error"), ("PC2", "denied")])
+
+    def test_ou_outside_scope_is_forbidden(self):
+        response, _ = self._post({"ou": "OU=B,DC=x"}, base_dns=["OU=A,DC=x"])
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(SCCM_BULK_MAX_NAMES=1)
+    def test_rejects_too_many_names(self):
+        response, _ = self._post({"computer_names": ["PC1", "PC2"]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_names_or_ou(self):
+        response, _ = self._post({})
+        self.assertEqual(response.status_code, 400)
+
+
+class ComputerInfoRoutingTests(TestCase):
+    def test_routes_are_served_by_the_project_urlconf(self):
+        self.assertIs(resolve("/sccm/computer/v1-0-1/bulk/").func.view_class, SCCMBulkComputerInfoView)
+        match = resolve("/sccm/computer/v1-0-1/PC1/")
+        self.assertIs(match.func.cls, SCCMViewSet_1_0_1)
+        self.assertEqual(match.kwargs, {"computer_name": "PC1"})
+
+    def test_endpoints_are_limited_by_organizational_unit(self):
+        for path in ("/sccm/computer/v1-0-1/bulk/", "/sccm/computer/v1-0-1/{computer_name}/"):
+            endpoint = Endpoint.objects.get(path=path)
+            self.assertIs(endpoint.limiter_type.content_type.model_class(), ADOrganizationalUnitLimiter)
+            self.assertFalse(endpoint.no_limit)
+
+    def test_single_computer_outside_ou_scope_is_forbidden(self):
+        request = APIRequestFactory().get("/sccm/computer/v1-0-1/pc2.win.dtu.dk/")
+        force_authenticate(request, user=get_user_model().objects.create_user(username="sccm-single", password="x"))
+        request._ado_ou_base_dns = {"OU=A,DC=x"}
+
+        with mock.patch("sccm.views.computers_within_ous", return_value=set()) as within, mock.patch(
+            "sccm.views.get_computer_info"
+        ) as get_info:
+            response = SCCMViewSet_1_0_1.as_view({"get": "get_computerinfo"})(request, computer_name="pc2.win.dtu.dk")
+
+        self.assertEqual(response.status_code, 403)
+        within.assert_called_once_with(["PC2"], {"OU=A,DC=x"}, attribute="name")
+        get_info.assert_not_called()
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from sccm.scripts.sccm_get_computer_info import (
+    SQL_ADD_REMOVE_PROGRAMS_TEMPLATE,
+    SQL_COMPUTER_INFO_BATCH,
+    SQL_INSTALLED_SOFTWARE_TEMPLATE,
+    _query_computer_info,
+)
+
+
+class _FakeCursor:
+    """Replays ``(columns, rows)`` result sets the way pyodbc exposes them."""
+
+    def __init__(self, result_sets):
+        self._result_sets = list(result_sets)
+        self._index = 0
+        self.closed = False
+
+    @property
+    def description(self):
+        return [(name,) for name in self._result_sets[self._index][0]]
+
+    def fetchone(self):
+        rows = self._result_sets[self._index][1]
+        return rows[0] if rows else None
+
+    def fetchall(self):
+        return list(self._result_sets[self._index][1])
+
+    def nextset(self):
+        self._index += 1
+        return self._index < len(self._result_sets)
+
+    def close(self):
+        self.closed = True
+
+
+class ComputerInfoBatchTests(SimpleTestCase):
+    def test_single_round_trip_keyed_on_resource_id(self):
+        self.assertNotIn("LIKE ('%' + ?", SQL_COMPUTER_INFO_BATCH)
+        self.assertEqual(SQL_COMPUTER_INFO_BATCH.count("?"), 1)
+        self.assertEqual(SQL_COMPUTER_INFO_BATCH.count("= @ResourceID"), 3)
+
+    def test_software_views_are_inner_joined(self):
+        # A LEFT JOIN returns one null-filled row for a machine without
+        # software; the bulk batch reports such machines with no rows.
+        for template in (SQL_ADD_REMOVE_PROGRAMS_TEMPLATE, SQL_INSTALLED_SOFTWARE_TEMPLATE):
+            self.assertNotIn("LEFT JOIN", template)
+        self.assertNotIn("LEFT JOIN v_Add_Remove_Programs", SQL_COMPUTER_INFO_BATCH)
+        self.assertNotIn("LEFT JOIN v_GS_INSTALLED_SOFTWARE", SQL_COMPUTER_INFO_BATCH)
+
+    def test_result_sets_are_read_in_order(self):
+        cursor = _FakeCursor(
+            [
+                (["ResourceID"], [(42,)]),
+                (["ResourceID", "DeviceName"], [(42, "PC1")]),
+                (["ResourceID", "DisplayName0"], [(42, "7-Zip"), (42, "Firefox")]),
+                (["ResourceID", "ProductName0"], [(42, "7-Zip")]),
+            ]
+        )
+        connection = mock.Mock(execute=mock.Mock(return_value=cursor))
+
+        info, error = _query_computer_info(connection, "PC1")
+
+        self.assertIsNone(error)
+        connection.execute.assert_called_once_with(SQL_COMPUTER_INFO_BATCH, "PC1")
+        self.assertEqual(info["v_r_system"], {"ResourceID": 42, "DeviceName": "PC1"})
+        self.assertEqual([row["DisplayName0"] for row in info["v_add_remove_programs"]], ["7-Zip", "Firefox"])
+        self.assertEqual(info["v_gs_computer_system"], [{"ResourceID": 42, "ProductName0": "7-Zip"}])
+        self.assertTrue(cursor.closed)
+
+    def test_unknown_computer(self):
+        cursor = _FakeCursor([(["ResourceID"], [(None,)])])
+        connection = mock.Mock(execute=mock.Mock(return_value=cursor))
+
+        info, error = _query_computer_info(connection, "NOPE")
+
+        self.assertIsNone(info)
+        self.assertEqual(error, "No computer found with name NOPE")
+        self.assertTrue(cursor.closed)
@@ -0,0 +1,181 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from myview.models import ADOrganizationalUnitLimiter, Endpoint
+
+from sccm.inventory import (
+    STATE_NAME,
+    compliance_report,
+    normalize_product_name,
+    normalize_publisher,
+    software_exposure,
+    sync_inventory,
+    version_key,
+)
+from sccm.models import SCCMComputer, SCCMInstalledSoftware, SCCMInventorySyncState, SCCMSoftwareProduct
+from sccm.views import SCCMComplianceView, SCCMSoftwareExposureView
+
+# SCCM hands back naive UTC datetimes.
+RECENT = (timezone.now() - timedelta(days=1)).replace(tzinfo=None)
+
+
+def _system(resource_id, name, ou="OU=A,DC=x", **extra):
+    return {
+        "ResourceID": resource_id,
+        "Netbios_Name0": name,
+        "Distinguished_Name0": f"CN={name},{ou}",
+        "OSCaption": "Microsoft Windows 11 Enterprise",
+        "OSVersion": "10.0.22631",
+        "LastHWScan": RECENT,
+        "ProtectionStatus": 1,
+        "BitlockerCompliant": 1,
+        "EncryptionMethod": 7,
+        "TpmActivated": 1,
+        "TpmEnabled": 1,
+        "TpmOwned": 1,
+        **extra,
+    }
+
+
+def _software(resource_id, name, publisher, version):
+    return {"ResourceID": resource_id, "ProductName0": name, "Publisher0": publisher, "ProductVersion0": version}
+
+
+@contextmanager
+def _fake_connection():
+    yield object()
+
+
+def _sync(systems, software, **kwargs):
+    with mock.patch("sccm.inventory.pooled_connection", _fake_connection), mock.patch(
+        "sccm.inventory.iter_inventory_systems", return_value=iter([systems])
+    ) as iter_systems, mock.patch("sccm.inventory.iter_inventory_software", return_value=iter([software])):
+        stats = sync_inventory(**kwargs)
+    return stats, iter_systems
+
+
+class NormalizationTests(SimpleTestCase):
+    def test_product_and_publisher_keys(self):
+        self.assertEqual(normalize_product_name("Mozilla  Firefox® 115.0", "115.0"), "mozilla firefox")
+        self.assertEqual(normalize_publisher("Microsoft Corporation"), normalize_publisher("microsoft corp."))
+        self.assertEqual(normalize_publisher("Netcompany A/S"), "netcompany")
+
+    def test_version_key_orders_numerically(self):
+        self.assertLess(version_key("9.1"), version_key("10.0"))
+        self.assertLess(version_key("115.0"), version_key("115.0.1"))
+        self.assertLess(version_key("1.2.3"), version_key("1.10"))
+
+
+class InventorySyncTests(TestCase):
+    def test_full_then_incremental_sync(self):
+        stats, iter_systems = _sync(
+            [_system(1, "PC1"), _system(2, "PC2", TpmOwned=0)],
+            [
+                _software(1, "Mozilla Firefox (x64 en-US)", "Mozilla", "115.0"),
+                _software(2, "Mozilla Firefox (x64 en-US)", "Mozilla", "128.0"),
+                _software(2, "7-Zip 23.01", "Igor Pavlov", "23.01"),
+            ],
+        )
+
+        self.assertTrue(stats.full)
+        self.assertIsNone(iter_systems.call_args.args[1])
+        self.assertEqual((stats.computers, stats.installs, stats.products_created), (2, 3, 2))
+        state = SCCMInventorySyncState.objects.get(name=STATE_NAME)
+        self.assertIsNotNone(state.last_hw_scan_watermark)
+
+        rescan = RECENT + timedelta(hours=2)
+        stats, iter_systems = _sync(
+            [_system(2, "PC2", LastHWScan=rescan)],
+            [_software(2, "Mozilla Firefox (x64 en-US)", "Mozilla", "129.0")],
+        )
+
+        self.assertFalse(stats.full)
+        self.assertEqual(iter_systems.call_args.args[1], RECENT - timedelta(hours=1))
+        self.assertEqual(
+            sorted(SCCMInstalledSoftware.objects.values_list("computer__name", "version")),
+            [("PC1", "115.0"), ("PC2", "129.0")],
+        )
+        self.assertEqual(SCCMComputer.objects.count(), 2)
+
+    def test_full_sync_prunes_missing_computers_and_products(self):
+        _sync([_system(1, "PC1"), _system(2, "PC2")], [_software(2, "7-Zip", "Igor Pavlov", "23.01")])
+        stats, _ = _sync([_system(1, "PC1")], [], full=True)
+
+        self.assertEqual(stats.deleted, 1)
+        self.assertEqual(list(SCCMComputer.objects.values_list("name", flat=True)), ["PC1"])
+        self.assertFalse(SCCMSoftwareProduct.objects.exists())
+
+
+class InventoryQueryTests(TestCase):
+    def setUp(self):
+        _sync(
+            [
+                _system(1, "PC1"),
+                _system(2, "PC2", ou="OU=B,DC=x", ProtectionStatus=0),
+                _system(3, "PC3", TpmEnabled=None, TpmActivated=None, TpmOwned=None, LastHWScan=None),
+            ],
+            [
+                _software(1, "Mozilla Firefox", "Mozilla", "115.0"),
+                _software(2, "Mozilla Firefox", "Mozilla", "128.0"),
+                _software(3, "Mozilla Firefox ESR", "Mozilla Foundation", "9.1"),
+                _software(3, "7-Zip", "Igor Pavlov", "23.01"),
+            ],
+        )
+
+    def test_software_exposure_below_version(self):
+        result = software_exposure("firefox", below_version="120")
+
+        self.assertEqual([row["computer_name"] for row in result["results"]], ["PC1", "PC3"])
+        self.assertEqual(result["machines"], 2)
+        self.assertFalse(result["truncated"])
+
+    def test_software_exposure_scoped_to_ou(self):
+        result = software_exposure("FIREFOX", publisher="mozilla", base_dns=["ou=b,dc=x"])
+        self.assertEqual([row["computer_name"] for row in result["results"]], ["PC2"])
+
+    def test_compliance_report(self):
+        result = compliance_report()
+
+        self.assertEqual(result["summary"]["computers"], 3)
+        self.assertEqual(result["summary"]["bitlocker_off"], 1)
+        self.assertEqual(result["summary"]["tpm_missing"], 1)
+        self.assertEqual(
+            {row["computer_name"]: row["reasons"] for row in result["non_compliant"]},
+            {"PC2": ["bitlocker_off"], "PC3": ["tpm_missing", "stale_inventory"]},
+        )
+
+    def test_views_respect_ou_scope(self):
+        factory = APIRequestFactory()
+        user = get_user_model().objects.create_user(username="sccm-inventory", password="x")
+
+        request = factory.get("/sccm/inventory/v1-0-0/software/", {"product": "firefox"})
+        force_authenticate(request, user=user)
+        request._ado_ou_base_dns = ["OU=A,DC=x"]
+        response = SCCMSoftwareExposureView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["computer_name"] for row in response.data["results"]], ["PC1", "PC3"])
+
+        request = factory.get("/sccm/inventory/v1-0-0/compliance/", {"ou": "OU=B,DC=x"})
+        force_authenticate(request, user=user)
+        request._ado_ou_base_dns = ["OU=A,DC=x"]
+        response = SCCMComplianceView.as_view()(request)
+        self.assertEqual(response.status_code, 403)
+
+
+class InventoryRoutingTests(TestCase):
+    def test_routes_are_served_by_the_project_urlconf(self):
+        self.assertIs(resolve("/sccm/inventory/v1-0-0/software/").func.view_class, SCCMSoftwareExposureView)
+        self.assertIs(resolve("/sccm/inventory/v1-0-0/compliance/").func.view_class, SCCMComplianceView)
+
+    def test_endpoints_are_limited_by_organizational_unit(self):
+        for path in ("/sccm/inventory/v1-0-0/software/", "/sccm/inventory/v1-0-0/compliance/"):
+            endpoint = Endpoint.objects.get(path=path)
+            self.assertIs(endpoint.limiter_type.content_type.model_class(), ADOrganizationalUnitLimiter)
+            self.assertFalse(endpoint.no_limit)
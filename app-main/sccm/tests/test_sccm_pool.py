@@ -0,0 +1,100 @@
+from unittest import mock
+
+import pyodbc
+from django.test import SimpleTestCase
+
+from sccm.scripts import sccm_get_computer_info as computer_info_module
+from sccm.scripts.sccm_pool import SCCMConnectionPool, SCCMPoolError, build_connection_string
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.fail_ping = False
+
+    def execute(self, sql, *params):
+        if self.fail_ping:
+            raise pyodbc.OperationalError("08S01", "Communication link failure")
+        return mock.Mock(fetchone=mock.Mock(return_value=(1,)))
+
+    def close(self):
+        self.closed = True
+
+
+def _make_pool(factory, **overrides):
+    options = {
+        "max_size": 2,
+        "borrow_timeout": 0.05,
+        "health_check_interval": 0,
+        "max_lifetime": 0,
+        "max_uses": 0,
+        "connection_factory": factory,
+    }
+    options.update(overrides)
+    return SCCMConnectionPool(**options)
+
+
+class SCCMConnectionPoolTests(SimpleTestCase):
+    def test_connections_are_reused(self):
+        factory = mock.Mock(side_effect=_FakeConnection)
+        pool = _make_pool(factory)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(factory.call_count, 1)
+
+    def test_borrow_times_out_when_pool_exhausted(self):
+        pool = _make_pool(_FakeConnection, max_size=1)
+
+        pool.acquire()
+        with self.assertRaises(SCCMPoolError):
+            pool.acquire()
+
+    def test_connections_are_recycled_after_max_uses(self):
+        factory = mock.Mock(side_effect=_FakeConnection)
+        pool = _make_pool(factory, max_uses=2)
+
+        seen = []
+        for _ in range(3):
+            with pool.connection() as connection:
+                seen.append(connection)
+
+        self.assertIs(seen[0], seen[1])
+        self.assertIsNot(seen[1], seen[2])
+        self.assertTrue(seen[0].closed)
+
+    def test_dead_idle_connection_is_replaced(self):
+        factory = mock.Mock(side_effect=_FakeConnection)
+        pool = _make_pool(factory, health_check_interval=30)
+
+        with pool.connection() as first:
+            first.fail_ping = True
+        pool._idle[0].last_used_at -= 60
+        with pool.connection() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.closed)
+
+    def test_broken_connection_is_discarded(self):
+        pool = _make_pool(_FakeConnection)
+
+        with self.assertRaises(pyodbc.OperationalError):
+            with pool.connection():
+                raise pyodbc.OperationalError("08S01", "Communication link failure")
+
+        self.assertEqual(pool.idle_count, 0)
+
+    def test_database_is_selected_in_connection_string(self):
+        with mock.patch.dict("os.environ", {"SCCM_DATABASE": "CM_TST"}):
+            self.assertIn("DATABASE=CM_TST;", build_connection_string())
+
+
+class GetComputerInfoTests(SimpleTestCase):
+    @mock.patch.object(computer_info_module, "pooled_connection", side_effect=SCCMPoolError("down"))
+    def test_connection_failure_is_reported_not_fatal(self, _pooled):
+        self.assertEqual(computer_info_module.get_computer_info("PC1"), (None, "Internal server error"))
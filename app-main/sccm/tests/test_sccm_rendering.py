@@ -0,0 +1,64 @@
+import datetime
+import decimal
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from sccm.management.commands.benchmark_sccm_rendering import render_fast, render_with_serializers, sample_result_set
+from sccm.rendering import get_row_plan
+from sccm.views import SCCMViewSet_1_0_1
+
+
+class RowPlanTests(SimpleTestCase):
+    def test_software_lists_match_the_serializers(self):
+        result_sets = {}
+        for section in ("v_gs_computer_system", "v_add_remove_programs"):
+            description, rows = sample_result_set(section, 5)
+            # A NULL in every column exercises the serializers' None handling.
+            rows.append(tuple(None for _ in description))
+            result_sets[section] = (description, rows)
+
+        self.assertEqual(json.loads(render_fast(result_sets)), json.loads(render_with_serializers(result_sets)))
+
+    def test_system_row_is_converted_by_column_type(self):
+        description = [
+            ("ResourceID", int),
+            ("DeviceName", str),
+            ("SystemDriveSize", decimal.Decimal),
+            ("LastHWScan", datetime.datetime),
+        ]
+        plan = get_row_plan("v_r_system", description)
+
+        [row] = plan.render([(42, "PC1", decimal.Decimal("512.5"), datetime.datetime(2024, 7, 1, 12, 0))])
+
+        self.assertEqual(
+            row,
+            {"ResourceID": 42, "DeviceName": "PC1", "SystemDriveSize": 512.5, "LastHWScan": "2024-07-01T12:00:00+02:00"},
+        )
+        self.assertIs(get_row_plan("v_r_system", description), plan)
+
+    def test_missing_required_column_is_an_error(self):
+        with self.assertRaises(KeyError):
+            get_row_plan("v_add_remove_programs", [("ResourceID", int)])
+
+
+class ComputerInfoViewTests(TestCase):
+    def test_renders_with_the_fast_path(self):
+        info = {
+            "v_r_system": {"ResourceID": 42, "DeviceName": "PC1"},
+            "v_add_remove_programs": [{"ResourceID": 42, "DisplayName0": "7-Zip"}],
+            "v_gs_computer_system": [],
+        }
+        request = APIRequestFactory().get("/sccm/computer/v1-0-1/PC1/")
+        force_authenticate(request, user=get_user_model().objects.create_user(username="sccm-render", password="x"))
+
+        with mock.patch("sccm.views.get_computer_info", return_value=(info, None)) as get_info:
+            response = SCCMViewSet_1_0_1.as_view({"get": "get_computerinfo"})(request, computer_name="PC1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(list(json.loads(response.content)), ["v_r_system", "v_gs_computer_system", "v_add_remove_programs"])
+        self.assertIn("read_rows", get_info.call_args.kwargs)
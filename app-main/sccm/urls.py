@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SCCMViewSet_1_0_1
+from .views import SCCMViewSet_1_0_1, SCCMBulkComputerInfoView, SCCMComplianceView, SCCMSoftwareExposureView
 
 # router = DefaultRouter()
 
 urlpatterns = [
     # path('', include(router.urls)),
+    path('sccm/computer/v1-0-1/bulk/', SCCMBulkComputerInfoView.as_view()),
     path('sccm/computer/v1-0-1/<str:computer_name>/', SCCMViewSet_1_0_1.as_view({'get': 'get_computerinfo'})),
+    path('sccm/inventory/v1-0-0/software/', SCCMSoftwareExposureView.as_view()),
+    path('sccm/inventory/v1-0-0/compliance/', SCCMComplianceView.as_view()),
 ]
 
@@ -1,8 +1,21 @@
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from .models import Item
-from .serializers import ItemSerializer, ComputerInfoSerializer
-from sccm.scripts.sccm_get_computer_info import get_computer_info
+from .serializers import (
+    ItemSerializer,
+    ComputerInfoSerializer,
+    ComputerInfoBulkRequestSerializer,
+    ComplianceQuerySerializer,
+    SoftwareExposureQuerySerializer,
+)
+from .inventory import compliance_report, last_synced_at, software_exposure
+from .rendering import read_rendered_rows, render_json
+from sccm.scripts.sccm_get_computer_info import get_computer_info, iter_computer_info, normalize_computer_name
+from active_directory.services import list_ou_computers
+from myview.ou_scope import computers_within_ous, dn_within_ous
+from utils.api import SecuredAPIView
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
@@ -38,6 +51,7 @@ class SCCMViewSet_1_0_1(viewsets.ViewSet):
         responses={
             200: ComputerInfoSerializer(),
             400: 'Error: Computer name must be provided.',
+            403: 'Error: Forbidden',
             404: 'Error: No computer found with given name',
             500: 'Error: Internal server error'
         },
@@ -55,9 +69,15 @@ class SCCMViewSet_1_0_1(viewsets.ViewSet):
             return Response({"error": "Computer name must be provided."}, status=status.HTTP_400_BAD_REQUEST)
         
         # control if user has access
-        
+        base_dns = getattr(request, "_ado_ou_base_dns", None)
+        if base_dns and not computers_within_ous([normalize_computer_name(computer_name)], base_dns, attribute="name"):
+            return Response(
+                {"error": "The computer is outside your organizational unit scope."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
         # Get the computer info
-        computer_info, error = get_computer_info(computer_name)
+        computer_info, error = get_computer_info(computer_name, read_rows=read_rendered_rows)
 
         # if error startswith "No computer found with name"
         if error:
@@ -65,20 +85,215 @@ class SCCMViewSet_1_0_1(viewsets.ViewSet):
                 return Response({"error": error}, status=status.HTTP_404_NOT_FOUND)
             elif error.startswith("Internal server error"):
                 return Response({"error": error}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
 
-        v_r_system = computer_info["v_r_system"]
-        v_add_remove_programs = computer_info["v_add_remove_programs"]
-        v_gs_computer_system = computer_info["v_gs_computer_system"]
-
-    
+        # Rows are already rendered field by field (see sccm.rendering); keep
+        # ComputerInfoSerializer's key order.
         computer_info = {
-            "v_r_system": v_r_system,
-            "v_add_remove_programs": v_add_remove_programs,
-            "v_gs_computer_system": v_gs_computer_system
+            "v_r_system": computer_info["v_r_system"],
+            "v_gs_computer_system": computer_info["v_gs_computer_system"],
+            "v_add_remove_programs": computer_info["v_add_remove_programs"],
         }
+        return HttpResponse(render_json(computer_info), content_type="application/json")
+
+
+class SCCMBulkComputerInfoView(SecuredAPIView):
+    """Stream SCCM computer information for many machines as NDJSON."""
+
+    request_body = openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "computer_names": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_STRING),
+                example=["DTU-CND1363SBJ"],
+            ),
+            "ou": openapi.Schema(
+                type=openapi.TYPE_STRING,
+                example="OU=Computers,OU=AIT,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk",
+            ),
+        },
+    )
+
+    @swagger_auto_schema(
+        manual_parameters=[SCCMViewSet_1_0_1.header_parameter],
+        request_body=request_body,
+        operation_description="""
+        Retrieve computer information for a list of computers, or for every computer in an AD
+        organizational unit. Send either `computer_names` (NetBIOS names or FQDNs) or `ou`.
+
+        The response is NDJSON (`application/x-ndjson`): one line per computer, written as soon as its
+        batch has been read from SCCM. Each line has `computer_name` and a `status` of `found`,
+        `not_found`, `denied` (outside your OU scope) or `error`; found computers carry the
+        `v_r_system`, `v_add_remove_programs` and `v_gs_computer_system` rows read from SCCM.
+
+        Curl example: \n
+        \t curl --location 'http://api.security.ait.dtu.dk/sccm/computer/v1-0-1/bulk/'
+        \t\t  --header 'Authorization:\<token\>' --header 'Content-Type: application/json'
+        \t\t  --data '{"computer_names": ["DTU-CND1363SBJ"]}'
+        """,
+        responses={
+            200: 'NDJSON stream, one computer per line',
+            400: 'Error: Bad request',
+            403: 'Error: Forbidden',
+        },
+    )
+    def post(self, request):
+        serializer = ComputerInfoBulkRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        base_dns = getattr(request, "_ado_ou_base_dns", None)
+
+        denied = []
+        ou = data.get("ou")
+        if ou:
+            if base_dns and not dn_within_ous(ou, base_dns):
+                return Response(
+                    {"error": "The OU is outside your organizational unit scope."},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            names = [computer["name"] for computer in list_ou_computers(ou)]
+        else:
+            names = data["computer_names"]
+        names = list(dict.fromkeys(filter(None, (normalize_computer_name(name) for name in names))))
+
+        max_names = getattr(settings, "SCCM_BULK_MAX_NAMES", 2000)
+        if len(names) > max_names:
+            return Response(
+                {"error": f"At most {max_names} computers can be looked up at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if base_dns and not ou:
+            allowed = computers_within_ous(names, base_dns, attribute="name")
+            denied = [name for name in names if name.lower() not in allowed]
+            names = [name for name in names if name.lower() in allowed]
+
+        response = StreamingHttpResponse(self._stream_ndjson(names, denied), content_type="application/x-ndjson")
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @staticmethod
+    def _stream_ndjson(names, denied):
+        for name, computer_info, error in iter_computer_info(names, read_rows=read_rendered_rows):
+            if computer_info is not None:
+                line = {"computer_name": name, "status": "found", **computer_info}
+            elif error.startswith("No computer found with name"):
+                line = {"computer_name": name, "status": "not_found", "error": error}
+            else:
+                line = {"computer_name": name, "status": "error", "error": error}
+            yield render_json(line) + b"\n"
+        for name in denied:
+            yield render_json({"computer_name": name, "status": "denied"}) + b"\n"
+
+
+def _inventory_scope(request, ou):
+    """Return ``(base_dns, error_response)`` for an inventory query.
+
+    An explicit ``ou`` must lie within the caller's OU limiter scope; without
+    one the query is limited to that scope (``None`` means unrestricted).
+    """
+
+    base_dns = getattr(request, "_ado_ou_base_dns", None)
+    if ou:
+        if base_dns and not dn_within_ous(ou, base_dns):
+            return None, Response(
+                {"error": "The OU is outside your organizational unit scope."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return [ou], None
+    return (list(base_dns) if base_dns else None), None
+
+
+_ou_query_param = openapi.Parameter(
+    'ou',
+    in_=openapi.IN_QUERY,
+    description="Only include computers in this AD organizational unit (or below it).",
+    type=openapi.TYPE_STRING,
+    required=False,
+)
 
 
-        serializer = ComputerInfoSerializer(computer_info)
-        # serializer = ComputerInfoSerializer(computer_info)
-        return Response(serializer.data)
+class SCCMSoftwareExposureView(SecuredAPIView):
+    """Which machines have a product installed, answered from the local inventory."""
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            SCCMViewSet_1_0_1.header_parameter,
+            openapi.Parameter('product', in_=openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                              description="Part of the product name, e.g. `firefox`."),
+            openapi.Parameter('publisher', in_=openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                              description="Part of the publisher name, e.g. `mozilla`."),
+            openapi.Parameter('below_version', in_=openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                              description="Only installations older than this version, e.g. `128.0`."),
+            _ou_query_param,
+        ],
+        operation_description="""
+        List the computers that have a product installed, optionally only below a version.
+
+        Answered from the local SCCM inventory (`synced_at` is the last sync), not from SCCM itself.
+        Product and publisher match case-insensitively anywhere in the name.
+
+        Curl example: \n
+        \t curl --location 'http://api.security.ait.dtu.dk/sccm/inventory/v1-0-0/software/?product=firefox&below_version=128.0'
+        \t\t  --header 'Authorization:\<token\>'
+        """,
+        responses={
+            200: 'Matching products and installations',
+            400: 'Error: Bad request',
+            403: 'Error: Forbidden',
+        },
+    )
+    def get(self, request):
+        serializer = SoftwareExposureQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        base_dns, error = _inventory_scope(request, data.get("ou"))
+        if error:
+            return error
+
+        result = software_exposure(
+            data["product"],
+            publisher=data.get("publisher"),
+            below_version=data.get("below_version"),
+            base_dns=base_dns,
+        )
+        return Response({"synced_at": last_synced_at(), **result})
+
+
+class SCCMComplianceView(SecuredAPIView):
+    """BitLocker, TPM and inventory freshness, answered from the local inventory."""
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            SCCMViewSet_1_0_1.header_parameter,
+            _ou_query_param,
+            openapi.Parameter('stale_days', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False,
+                              description="A hardware scan older than this many days counts as stale (default 30)."),
+        ],
+        operation_description="""
+        Summarise BitLocker protection, TPM readiness and hardware inventory age, and list the computers that
+        fail any check with their `reasons` (`bitlocker_off`, `bitlocker_noncompliant`, `tpm_missing`,
+        `tpm_not_ready`, `stale_inventory`).
+
+        Answered from the local SCCM inventory (`synced_at` is the last sync), not from SCCM itself.
+
+        Curl example: \n
+        \t curl --location 'http://api.security.ait.dtu.dk/sccm/inventory/v1-0-0/compliance/?ou=OU=Computers,OU=AIT,OU=DTUBaseUsers,DC=win,DC=dtu,DC=dk'
+        \t\t  --header 'Authorization:\<token\>'
+        """,
+        responses={
+            200: 'Compliance summary and non-compliant computers',
+            400: 'Error: Bad request',
+            403: 'Error: Forbidden',
+        },
+    )
+    def get(self, request):
+        serializer = ComplianceQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        base_dns, error = _inventory_scope(request, data.get("ou"))
+        if error:
+            return error
+
+        result = compliance_report(base_dns=base_dns, stale_days=data["stale_days"])
+        return Response({"synced_at": last_synced_at(), **result})
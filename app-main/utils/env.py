@@ -0,0 +1,44 @@
+"""Numeric settings read straight from the environment.
+
+Used by the connection pools in ``active_directory`` and ``sccm``, which are
+configured from environment variables rather than Django settings so the
+scripts also work outside a configured Django process.
+"""
+
+from __future__ import annotations
+
+import os
+
+
+def get_int_env(name: str, default: int, *, minimum: int | None = None) -> int:
+    """Return an integer from the environment variable with optional clamping."""
+
+    value = os.getenv(name)
+    if value is None:
+        result = default
+    else:
+        try:
+            result = int(value)
+        except (TypeError, ValueError):
+            result = default
+
+    if minimum is not None and result < minimum:
+        return minimum
+    return result
+
+
+def get_float_env(name: str, default: float, *, minimum: float | None = None) -> float:
+    """Return a float from the environment variable with optional clamping."""
+
+    value = os.getenv(name)
+    if value is None:
+        result = default
+    else:
+        try:
+            result = float(value)
+        except (TypeError, ValueError):
+            result = default
+
+    if minimum is not None and result < minimum:
+        return minimum
+    return result
@@ -0,0 +1,237 @@
+"""Shared, pooled HTTP client for outbound calls to upstream services.
+
+Each named upstream (``graph``, ``defender``, ``hibp``, ``openapi``) gets one
+``requests.Session`` for the whole process, with its own pool size, default
+timeout and retry/backoff policy, so keep-alive connections are reused across
+requests instead of a fresh TCP/TLS handshake per call. urllib3 keeps a
+separate pool per host inside each session.
+
+Configuration comes from ``settings.OUTBOUND_HTTP_UPSTREAMS`` (see
+``app/settings.py``); unknown upstreams and scripts running without Django
+settings use :data:`DEFAULT_UPSTREAM_CONFIG`.
+
+Per-upstream metrics (requests, errors, retries, latency and the share of
+requests served on a reused connection) are available from
+:func:`outbound_http_metrics`.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Mapping, Optional
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util import Retry
+
+logger = logging.getLogger(__name__)
+
+_ALLOWED_METHODS = frozenset({"DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT"})
+
+
+@dataclass(frozen=True)
+class UpstreamConfig:
+    pool_maxsize: int = 10
+    timeout: float = 15.0
+    max_retries: int = 1
+    backoff_factor: float = 0.1
+    # Retry 413/429/503 responses that carry Retry-After. Callers that apply
+    # their own throttling (Graph's rate limiter) turn this off.
+    retry_on_status: bool = True
+
+
+DEFAULT_UPSTREAM_CONFIG = UpstreamConfig()
+
+
+def get_upstream_config(name: str) -> UpstreamConfig:
+    from django.conf import settings
+
+    overrides: Mapping[str, object] = {}
+    if settings.configured:
+        overrides = (getattr(settings, "OUTBOUND_HTTP_UPSTREAMS", None) or {}).get(name) or {}
+    return UpstreamConfig(**{**DEFAULT_UPSTREAM_CONFIG.__dict__, **overrides})
+
+
+@dataclass
+class UpstreamMetrics:
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    pooled_attempts: int = 0
+    connections_opened: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, latency: float, *, error: bool = False, retries: int = 0, pooled: bool = False) -> None:
+        """Count one request; ``pooled`` requests went through a tracked session."""
+        with self._lock:
+            self.requests += 1
+            self.pooled_attempts += (1 + retries) if pooled else 0
+            self.errors += int(error)
+            self.retries += retries
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            reuse_rate = None
+            if self.pooled_attempts:
+                reuse_rate = round(max(0.0, 1 - self.connections_opened / self.pooled_attempts), 4)
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "connections_opened": self.connections_opened,
+                "connection_reuse_rate": reuse_rate,
+                "avg_latency_ms": round(self.total_latency / self.requests * 1000, 1) if self.requests else None,
+                "max_latency_ms": round(self.max_latency * 1000, 1),
+            }
+
+
+def _counting_pool_classes(on_new_connection: Callable[[], None]):
+    """Connection pool classes that report each new connection they open."""
+
+    class _HTTPPool(HTTPConnectionPool):
+        def _new_conn(self):
+            on_new_connection()
+            return super()._new_conn()
+
+    class _HTTPSPool(HTTPSConnectionPool):
+        def _new_conn(self):
+            on_new_connection()
+            return super()._new_conn()
+
+    return {"http": _HTTPPool, "https": _HTTPSPool}
+
+
+class _UpstreamAdapter(HTTPAdapter):
+    def __init__(self, metrics: UpstreamMetrics, **kwargs):
+        self._metrics = metrics
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pool_classes(self._metrics.record_connection)
+
+
+class OutboundHTTPClient:
+    """Process-wide registry of pooled sessions, one per upstream."""
+
+    def __init__(self, config_loader: Callable[[str], UpstreamConfig] = get_upstream_config):
+        self._config_loader = config_loader
+        self._sessions: Dict[str, requests.Session] = {}
+        self._configs: Dict[str, UpstreamConfig] = {}
+        self._metrics: Dict[str, UpstreamMetrics] = {}
+        self._lock = threading.Lock()
+
+    def metrics(self, upstream: str) -> UpstreamMetrics:
+        with self._lock:
+            return self._metrics.setdefault(upstream, UpstreamMetrics())
+
+    def session(self, upstream: str) -> requests.Session:
+        session = self._sessions.get(upstream)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self._sessions.get(upstream)
+            if session is None:
+                config = self._config_loader(upstream)
+                metrics = self._metrics.setdefault(upstream, UpstreamMetrics())
+                session = self._build_session(config, metrics)
+                logger.debug("Created pooled HTTP session for upstream %s: %s", upstream, config)
+                self._configs[upstream] = config
+                self._sessions[upstream] = session
+        return session
+
+    @staticmethod
+    def _build_session(config: UpstreamConfig, metrics: UpstreamMetrics) -> requests.Session:
+        backoff_factor = config.backoff_factor if config.max_retries else 0.0
+        retry_config = Retry(
+            total=config.max_retries,
+            connect=config.max_retries,
+            read=config.max_retries,
+            status=config.max_retries if config.retry_on_status else 0,
+            allowed_methods=_ALLOWED_METHODS,
+            backoff_factor=backoff_factor,
+            respect_retry_after_header=config.retry_on_status,
+            raise_on_status=False,
+        )
+        adapter = _UpstreamAdapter(
+            metrics,
+            pool_connections=4,
+            pool_maxsize=config.pool_maxsize,
+            max_retries=retry_config,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def request(self, upstream: str, method: str, url: str, *args, **kwargs) -> Response:
+        """Send a request on the upstream's pooled session.
+
+        ``timeout`` defaults to the upstream's configured timeout; any other
+        arguments are passed to :meth:`requests.Session.request`.
+        """
+
+        session = self.session(upstream)
+        kwargs.setdefault("timeout", self._configs.get(upstream, DEFAULT_UPSTREAM_CONFIG).timeout)
+        metrics = self.metrics(upstream)
+        started = time.perf_counter()
+        try:
+            response = session.request(method.upper(), url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            metrics.record(time.perf_counter() - started, error=True, pooled=True)
+            raise
+        retries = getattr(getattr(response.raw, "retries", None), "history", None) or ()
+        metrics.record(time.perf_counter() - started, retries=len(retries), pooled=True)
+        return response
+
+    def get(self, upstream: str, url: str, **kwargs) -> Response:
+        return self.request(upstream, "GET", url, **kwargs)
+
+    def post(self, upstream: str, url: str, **kwargs) -> Response:
+        return self.request(upstream, "POST", url, **kwargs)
+
+    def metrics_snapshot(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            items = list(self._metrics.items())
+        return {name: metrics.snapshot() for name, metrics in sorted(items)}
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+            self._configs = {}
+        for session in sessions.values():
+            session.close()
+
+
+_client: Optional[OutboundHTTPClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> OutboundHTTPClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OutboundHTTPClient()
+    return _client
+
+
+def outbound_request(upstream: str, method: str, url: str, **kwargs) -> Response:
+    return get_http_client().request(upstream, method, url, **kwargs)
+
+
+def outbound_http_metrics() -> Dict[str, Dict[str, object]]:
+    return get_http_client().metrics_snapshot()
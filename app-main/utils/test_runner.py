@@ -0,0 +1,21 @@
+"""Test runner that keeps audit log writes on the request thread.
+
+With ``AUDIT_LOG_ASYNC`` on, audit rows are written by a background thread on
+its own database connection, outside the test case's transaction, so they
+would leak between tests. The runner switches buffering off for the whole run;
+tests of the sink itself construct their own :class:`myview.audit.AuditLogSink`.
+"""
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._audit_override = override_settings(AUDIT_LOG_ASYNC=False)
+        self._audit_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._audit_override.disable()
+        super().teardown_test_environment(**kwargs)